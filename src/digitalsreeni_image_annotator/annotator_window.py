@@ -1,3 +1,4 @@
+import os
 import warnings
 
 from PyQt6.QtCore import Qt, QTimer
@@ -253,6 +254,7 @@ class ImageAnnotator(QMainWindow):
 
         # Annotation lifecycle
         il.annotationCommitted.connect(ac.add_annotation_to_list)
+        il.annotationCommitted.connect(self.qc_controller.on_annotation_committed)
         il.annotationsBatchSaved.connect(self._on_annotations_batch_saved)
         il.annotationsReplaced.connect(ac.replace_annotations)
         il.annotationListUpdateRequested.connect(ac.update_annotation_list)
@@ -400,7 +402,9 @@ class ImageAnnotator(QMainWindow):
 
         # Generate annotation statistics
         stats_dialog = AnnotationStatisticsDialog(self)
-        stats_dialog.generate_statistics(self.all_annotations)
+        stats_dialog.generate_statistics(
+            self.all_annotations, self.image_controller.annotation_statistics()
+        )
 
         dialog = ProjectDetailsDialog(self, stats_dialog)
 
@@ -450,6 +454,9 @@ class ImageAnnotator(QMainWindow):
         if not self.image_label.check_unsaved_changes():
             event.ignore()
             return
+        self.image_controller.wait_for_onion_ghosts()
+        self.sam_utils.wait_for_prefetch()
+        self.qc_controller.wait_for_live_checks()
         event.accept()
 
     def switch_slice(self, item):
@@ -521,9 +528,6 @@ class ImageAnnotator(QMainWindow):
     def create_slices(self, image_array, dimensions, image_path):
         return self.image_controller.create_slices(image_array, dimensions, image_path)
 
-    def add_slice_to_list(self, slice_name):
-        return self.image_controller.add_slice_to_list(slice_name)
-
     def normalize_array(self, array):
         return image_utils.normalize_array(array)
 
@@ -566,7 +570,7 @@ class ImageAnnotator(QMainWindow):
             elif self.image_list.hasFocus() and self.image_list.currentItem():
                 self.delete_selected_image()
         # NOTE: there is deliberately no Up/Down branch here. A focused
-        # QListWidget consumes the arrow keys for its own row navigation and
+        # list view consumes the arrow keys for its own row navigation and
         # never propagates them, so this was unreachable code pretending to be
         # the slice-navigation implementation -- the row moved and the canvas
         # stayed put. Slice navigation is driven by the slice list's
@@ -574,7 +578,7 @@ class ImageAnnotator(QMainWindow):
         elif event.key() == Qt.Key.Key_Home or event.key() == Qt.Key.Key_End:
             # First / last frame jump for videos (issue #48), for Home/End
             # pressed while the CANVAS has focus. The slice-list case is
-            # deliberately absent: a focused QListWidget handles Home/End
+            # deliberately absent: a focused list view handles Home/End
             # itself, and since currentRowChanged now drives navigation it
             # already jumps the canvas with it -- for stacks as well as videos,
             # which is a widening of #48's video-only gate and a welcome one.
@@ -613,6 +617,28 @@ class ImageAnnotator(QMainWindow):
         self.snake_game.show()
         self.snake_game.setFocus()
 
+    def toggle_paint_hud(self):
+        self.image_label.toggle_paint_hud()
+
+    def dump_paint_profile(self):
+        """Write the canvas paint profile to the log, and beside the project
+        as ``<project>.paint_profile.json`` when one is open, so timings can be
+        compared per project and across commits."""
+        label = self.image_label
+        context = label.paint_profile_context()
+        label.paint_profiler.dump_to_log(logger, context)
+        project_file = getattr(self, "current_project_file", None)
+        if not project_file:
+            return None
+        path = os.path.splitext(project_file)[0] + ".paint_profile.json"
+        try:
+            label.paint_profiler.dump_json(path, context)
+        except OSError as e:
+            logger.warning("Could not write paint profile to %s: %s", path, e)
+            return None
+        logger.info("Paint profile written to %s", path)
+        return path
+
     def import_annotations(self):
         return io_controller.import_annotations(self)
 
@@ -733,6 +759,12 @@ class ImageAnnotator(QMainWindow):
     def run_dino_detection_batch(self):
         return self.dino_controller.run_dino_detection_batch()
 
+    def review_detection_journal(self):
+        return self.dino_controller.review_detection_journal()
+
+    def forget_detection_journal(self):
+        return self.dino_controller.forget_detection_journal()
+
 
     def _collect_dino_batch_work_items(self):
         return self.dino_controller._collect_dino_batch_work_items()
@@ -790,6 +822,9 @@ class ImageAnnotator(QMainWindow):
     def check_annotations(self):
         return self.qc_controller.run_audit()
 
+    def toggle_live_qc(self, enabled):
+        return self.qc_controller.set_live_enabled(enabled)
+
     def open_train_dialog(self):
         return self.training_controller.open_dialog()
 
@@ -814,7 +849,7 @@ class ImageAnnotator(QMainWindow):
             return
         try:
             self.annotation_stats_dialog = show_annotation_statistics(
-                self, self.all_annotations
+                self, self.all_annotations, self.image_controller.annotation_statistics()
             )
         except Exception as e:
             QMessageBox.critical(
@@ -894,9 +929,9 @@ class ImageAnnotator(QMainWindow):
                 return
 
         # Clear images
-        self.image_list.clear()
         self.image_paths.clear()
         self.all_images.clear()
+        self.image_list.sync()
         self.current_image = None
         self.image_file_name = ""
 
@@ -908,10 +943,12 @@ class ImageAnnotator(QMainWindow):
 
         # Clear annotations
         self.all_annotations.clear()
+        self.image_controller.note_annotations_changed()
         self.annotation_list.setRowCount(0)
         self.image_label.annotations.clear()
         self.image_label.highlighted_annotations.clear()
         self.annotation_controller.clear_history()  # drop undo/redo stacks
+        self.qc_controller.clear_live()
 
         # Clear current class
         self.current_class = None
@@ -34,6 +34,17 @@ _KEY_ONION_OFFSET = "ui/onion_offset"
 _KEY_ONION_MODE = "ui/onion_mode"
 _KEY_ONION_CONTENT = "ui/onion_content"
 
+# Grounding DINO: share one forward pass between all classes. A speed/recall
+# trade-off made once per user, not per project.
+_KEY_DINO_SINGLE_PASS = "detection/dino_single_pass"
+
+# Segment Everything: segment a large image tile by tile at full resolution.
+# Slower, so opt-in, and per user like the DINO trade-off above.
+_KEY_EVERYTHING_TILED = "detection/everything_tiled"
+
+# Live QC: re-check the edited image in the background after every edit.
+_KEY_LIVE_QC = "qc/live"
+
 
 def clamp_font_pt(pt) -> int:
     """Coerce any stored/passed value to a usable point size.
@@ -106,6 +117,45 @@ def save_onion_prefs(enabled, opacity, offset, mode, content, settings=None) ->
     settings.setValue(_KEY_ONION_CONTENT, onion.normalise_content(content))
 
 
+def load_dino_single_pass(settings=None) -> bool:
+    """Whether DINO detection packs every class into one prompt (default off)."""
+    if settings is None:
+        settings = _settings()
+    return bool(settings.value(_KEY_DINO_SINGLE_PASS, False, type=bool))
+
+
+def save_dino_single_pass(enabled, settings=None) -> None:
+    if settings is None:
+        settings = _settings()
+    settings.setValue(_KEY_DINO_SINGLE_PASS, bool(enabled))
+
+
+def load_everything_tiled(settings=None) -> bool:
+    """Whether Segment Everything tiles large images (default off)."""
+    if settings is None:
+        settings = _settings()
+    return bool(settings.value(_KEY_EVERYTHING_TILED, False, type=bool))
+
+
+def save_everything_tiled(enabled, settings=None) -> None:
+    if settings is None:
+        settings = _settings()
+    settings.setValue(_KEY_EVERYTHING_TILED, bool(enabled))
+
+
+def load_live_qc(settings=None) -> bool:
+    """Whether QC re-checks each image as it is edited (default off)."""
+    if settings is None:
+        settings = _settings()
+    return bool(settings.value(_KEY_LIVE_QC, False, type=bool))
+
+
+def save_live_qc(enabled, settings=None) -> None:
+    if settings is None:
+        settings = _settings()
+    settings.setValue(_KEY_LIVE_QC, bool(enabled))
+
+
 def load_mlflow_prefs(settings=None) -> tuple[str, str]:
     """Return (tracking_uri, experiment_name).
 
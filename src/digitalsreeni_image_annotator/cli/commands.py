@@ -201,6 +201,7 @@ def run_validate(args):
     the exit code is the primary output and the JSON report is optional.
     """
     from ..core import annotation_qc
+    from ..core.qc_cache import QCCache
 
     project, code = _load_project(args.project)
     if project is None:
@@ -210,6 +211,8 @@ def run_validate(args):
         project.all_annotations,
         image_sizes=project.image_sizes(),
         class_names=project.class_names(),
+        workers=args.jobs if args.jobs > 0 else annotation_qc.AUDIT_WORKERS,
+        cache=QCCache(args.cache) if args.cache else None,
     )
     summary = annotation_qc.summarise(findings)
 
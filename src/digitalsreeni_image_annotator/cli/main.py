@@ -80,6 +80,15 @@ def build_parser():
         "--fail-on", default="error", choices=["error", "warning", "info", "never"],
         help="lowest severity that makes the command exit non-zero",
     )
+    validate.add_argument(
+        "--jobs", type=int, default=0,
+        help="processes to audit images in (default: one per core)",
+    )
+    validate.add_argument(
+        "--cache", default=None,
+        help="per-image results file kept between runs; only images whose "
+             "annotations changed are audited again",
+    )
 
     predict = subparsers.add_parser(
         "predict", help="run a model over a folder of images"
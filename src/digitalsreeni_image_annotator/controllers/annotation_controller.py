@@ -22,6 +22,7 @@ State stays on the main window:
 import copy
 import json
 
+import numpy as np
 from PyQt6.QtCore import Qt, QObject
 from PyQt6.QtGui import QColor
 from PyQt6.QtWidgets import (
@@ -46,6 +47,7 @@ from ..core.constants import (
     ANNOT_COL_ID,
     default_class_color,
 )
+from ..core.geometry import annotation_areas
 from ..io.export_formats import create_coco_annotation as _export_create_coco_annotation
 from ..utils import (
     calculate_area,
@@ -276,6 +278,14 @@ class AnnotationController(QObject):
             del self.mw.all_annotations[current_name]
 
         self.mw.update_slice_list_colors()
+        self._schedule_live_qc(current_name)
+
+    def _schedule_live_qc(self, image_key):
+        # Live QC re-checks whichever image an edit touched (no-op while the
+        # mode is off).
+        qc = getattr(self.mw, "qc_controller", None)
+        if qc is not None:
+            qc.schedule_live_check(image_key)
 
     def replace_annotations(self, image_key: str, annotations: dict) -> None:
         """Replace the full per-class annotation dict for one image.
@@ -290,6 +300,7 @@ class AnnotationController(QObject):
         self.update_annotation_list()
         self.save_current_annotations()
         self.mw.class_controller.update_slice_list_colors()
+        self._schedule_live_qc(image_key)
 
     # --- Undo / redo (ADR-026) ---
 
@@ -311,11 +322,19 @@ class AnnotationController(QObject):
             return
         snapshot = copy.deepcopy(self.mw.all_annotations.get(key, {}))
         self.history.record(key, snapshot)
+        self._note_changed(key)
         # Any explicit edit ends a Detail-% coalescing run and drops any stale
         # deferred-gesture baseline (e.g. a discarded paint stroke).
         self._detail_coalesce_key = None
         self._pending_baseline = None
 
+    def _note_changed(self, key):
+        # The image-list status index rechecks only the keys it is told about
+        # (besides the current one).
+        image_controller = getattr(self.mw, "image_controller", None)
+        if image_controller is not None:
+            image_controller.note_annotations_changed(key)
+
     def rename_class_in_history(self, old_name, new_name):
         """Follow a class rename into the undo/redo snapshots (ADR-026).
 
@@ -434,6 +453,7 @@ class AnnotationController(QObject):
         model (breaking value-equality selection matching). See ADR-026.
         """
         self.mw.all_annotations[key] = copy.deepcopy(snapshot)
+        self._note_changed(key)
         self.mw.image_label.annotations = copy.deepcopy(snapshot)
         self.mw.image_label.highlighted_annotations.clear()
         self._sync_selection_buttons(0)
@@ -486,12 +506,10 @@ class AnnotationController(QObject):
         sorted_annotations = []
         for class_name in annotations.keys():
             if not class_name.startswith("Temp-"):
-                class_annotations = sorted(
-                    annotations[class_name],
-                    key=lambda x: calculate_area(x),
-                    reverse=True,
-                )
-                sorted_annotations.extend(class_annotations)
+                class_annotations = annotations[class_name]
+                # Stable, so equal areas keep their order as sorted(reverse=True) would.
+                order = np.argsort(-annotation_areas(class_annotations), kind="stable")
+                sorted_annotations.extend(class_annotations[i] for i in order.tolist())
 
         self.update_annotation_list_with_sorted(sorted_annotations)
 
@@ -553,6 +571,7 @@ class AnnotationController(QObject):
         self.mw.update_image_list()
 
         self.mw.all_annotations.clear()
+        self.mw.image_controller.note_annotations_changed()
         for annotation in self.mw.loaded_json["annotations"]:
             image_id = annotation["image_id"]
             file_name = image_id_to_filename.get(image_id)
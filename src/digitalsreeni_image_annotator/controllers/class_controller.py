@@ -68,44 +68,23 @@ class ClassController(QObject):
     def update_slice_list_colors(self):
         if self.mw.dark_mode:
             self.mw.slice_list.setStyleSheet(
-                "QListWidget { background-color: rgb(40, 40, 40); }"
+                "QListView { background-color: rgb(40, 40, 40); }"
             )
         else:
             self.mw.slice_list.setStyleSheet(
-                "QListWidget { background-color: rgb(240, 240, 240); }"
+                "QListView { background-color: rgb(240, 240, 240); }"
             )
 
-        for i in range(self.mw.slice_list.count()):
-            item = self.mw.slice_list.item(i)
-            slice_name = item.text()
-
-            if self.mw.dark_mode:
-                if slice_name in self.mw.all_annotations and any(
-                    self.mw.all_annotations[slice_name].values()
-                ):
-                    item.setForeground(QColor(235, 235, 235))
-                    item.setBackground(QColor(58, 95, 140))
-                else:
-                    item.setForeground(QColor(200, 200, 200))
-                    item.setBackground(QColor(40, 40, 40))
-            else:
-                if slice_name in self.mw.all_annotations and any(
-                    self.mw.all_annotations[slice_name].values()
-                ):
-                    item.setForeground(QColor(255, 255, 255))
-                    item.setBackground(QColor(70, 130, 180))
-                else:
-                    item.setForeground(QColor(0, 0, 0))
-                    item.setBackground(QColor(240, 240, 240))
-
-        self.mw.slice_list.repaint()
+        # The row colours are read from all_annotations when a row is
+        # painted (ImageController._slice_colors), so this is a repaint.
+        self.mw.slice_list.viewport().update()
 
         # Re-apply hook for the image-list annotation filter. Contract:
         # every annotation-mutation site either calls this method directly
         # or emits annotationsBatchSaved, whose handler
         # (_on_annotations_batch_saved) calls it. New mutation paths must
         # keep one of those two routes.
-        self.mw.image_controller.apply_image_filter()
+        self.mw.image_controller.refresh_annotation_status()
 
         # Repaint the video timeline's annotated-frame marks (issue #48). This
         # is THE mark-refresh choke point (runs on every annotation mutation AND
@@ -605,6 +584,7 @@ class ClassController(QObject):
 
             for image_annotations in self.mw.all_annotations.values():
                 image_annotations.pop(class_name, None)
+            self.mw.image_controller.note_annotations_changed()
 
             self.mw.image_label.annotations.pop(class_name, None)
 
@@ -10,21 +10,27 @@ controller has no delete path at all, which is the strongest form that promise
 can take.
 """
 
+import functools
 import os
 
-import numpy as np
-from PyQt6.QtCore import QObject, Qt
+from PyQt6.QtCore import QEventLoop, QObject, Qt
 from PyQt6.QtGui import QCursor
 from PyQt6.QtWidgets import QApplication, QMessageBox, QProgressDialog
 
 from ..core import similarity
 from ..core.dataset_split import derive_groups, merge_groups, translate_clusters
+from ..core.embedding_cache import EmbeddingCache
 from ..core.logging_config import get_logger
 from ..core.slice_cache import slice_names
+from ..inference.batch_detection import slice_loaders
+from ..inference.batch_embedding import (
+    EMBED_BATCH_IMAGES,
+    EmbeddingWorker,
+    read_qimage_rgb,
+)
 from ..inference.embedding_utils import (
     DEFAULT_MODEL,
     EMBEDDING_MODELS,
-    EmbeddingCache,
     EmbeddingUnavailableError,
     EmbeddingUtils,
     content_hash,
@@ -43,13 +49,19 @@ class CurationController(QObject):
         self.model_name = DEFAULT_MODEL
         self.threshold = similarity.DEFAULT_SIMILARITY
         self.mode_threshold = similarity.MODE_SIMILARITY
+        # Recall knob of the approximate pass (core.ann_index). None compares
+        # every pair up to ALL_PAIRS_LIMIT images and probes the default
+        # number of lists above it.
+        self.probes = None
         self._embeddings = {}
         self._cache = None
-        # In-flight guard (ADR-013). `compute` spins `processEvents` on every
-        # item and its progress dialog is non-modal, so the model combo stays
-        # live for the whole run: a second selection re-enters here, unloads
-        # the model the outer loop is still using, and the outer loop then
-        # overwrites `embeddings` with a mixture of CLIP and DINOv2 vectors.
+        # Images per forward pass of the embedding worker.
+        self.batch_size = EMBED_BATCH_IMAGES
+        # In-flight guard (ADR-013). `compute` runs an event loop while the
+        # worker embeds and its progress dialog is non-modal, so the model
+        # combo stays live for the whole run: a second selection re-enters
+        # here, unloads the model the worker is still using, and the outer
+        # run then overwrites `embeddings` with a mixture of CLIP and DINOv2 vectors.
         # Both are 768-d, so nothing downstream can detect it -- and `refine`
         # feeds those clusters straight into a real training run's split.
         self._computing = False
@@ -58,8 +70,10 @@ class CurationController(QObject):
         self._clusters_cache = None
         # Source-file digests for this run. Hashing a 2 GB video once is fine;
         # hashing it once per frame is not, and the frames are the reason the
-        # cache exists at all.
+        # cache exists at all. Filled by the embedding worker, the only reader
+        # while a run is in flight.
         self._digests = {}
+        self._progress = None
 
     @property
     def embeddings(self):
@@ -200,9 +214,9 @@ class CurationController(QObject):
                 "At least two images are needed to look for near-duplicates.",
             )
             return False
-        if len(items) > similarity.ALL_PAIRS_LIMIT:
+        if len(items) > similarity.CURATION_LIMIT:
             QMessageBox.warning(
-                parent, "Dataset similarity", similarity.ALL_PAIRS_LIMIT_MESSAGE
+                parent, "Dataset similarity", similarity.CURATION_LIMIT_MESSAGE
             )
             return False
 
@@ -213,6 +227,7 @@ class CurationController(QObject):
             return False
 
         cache = self.cache()
+        worker = self._embedding_worker(items, cache)
         progress = QProgressDialog(
             f"Computing {self.model_name} embeddings…",
             "Cancel",
@@ -223,38 +238,39 @@ class CurationController(QObject):
         progress.setWindowTitle("Dataset similarity")
         progress.setMinimumDuration(0)
 
-        embeddings = {}
-        cached_hits = 0
-        for index, (name, kind, payload) in enumerate(items):
-            progress.setValue(index)
-            progress.setLabelText(f"Embedding {name}…")
-            QApplication.processEvents()
-            if progress.wasCanceled():
-                logger.info("curation run cancelled after %d image(s)", index)
-                progress.close()
-                # Whatever was computed is still in the cache and will be
-                # reused; it is simply not enough to report on.
-                cache.save()
-                return False
-            try:
-                vector, from_cache = self._embed_one(kind, payload, cache)
-            except EmbeddingUnavailableError as exc:
-                progress.close()
-                QMessageBox.warning(parent, "Dataset similarity", str(exc))
-                return False
-            except Exception:
-                logger.exception("embedding failed for %s", name)
-                continue
-            if vector is not None:
-                # float32 arrays, not Python float lists: at the supported
-                # ceiling that is the difference between roughly 60 MB and
-                # half a gigabyte of live objects, and every consumer in
-                # core.similarity works on arrays anyway.
-                embeddings[name] = np.asarray(vector, dtype=np.float32)
-                cached_hits += int(from_cache)
+        # Decoding and the model both run on the worker; this thread only
+        # repaints the progress dialog and hears its Cancel button, inside the
+        # same looks-synchronous event loop as `sam_utils._run_sync`.
+        self._progress = progress
+        worker.progress.connect(self._on_embedding_progress)
+        progress.canceled.connect(worker.cancel)
+        loop = QEventLoop()
+        worker.finished.connect(loop.quit)
+        try:
+            worker.start()
+            loop.exec()
+            worker.wait()
+        finally:
+            self._progress = None
+            # Closing the dialog emits `canceled` too; a finished run is not
+            # a cancelled one.
+            progress.canceled.disconnect(worker.cancel)
+            # Whatever was computed is in the cache and will be reused, even
+            # when the run was cancelled or failed part-way.
+            cache.save()
         progress.setValue(len(items))
-        cache.save()
+        progress.close()
 
+        if worker.error is not None:
+            QMessageBox.warning(parent, "Dataset similarity", worker.error)
+            return False
+        if worker.canceled:
+            logger.info(
+                "curation run cancelled after %d image(s)", len(worker.results)
+            )
+            return False
+
+        embeddings = worker.results
         if len(embeddings) < 2:
             QMessageBox.information(
                 parent,
@@ -268,12 +284,17 @@ class CurationController(QObject):
             "embedded %d image(s) with %s, %d from cache",
             len(embeddings),
             self.model_name,
-            cached_hits,
+            worker.cached_hits,
         )
         return True
 
-    def _embed_one(self, kind, payload, cache):
-        """``(vector, came_from_cache)`` for one work item.
+    def _on_embedding_progress(self, done):
+        """Progress from the embedding worker (GUI thread)."""
+        if self._progress is not None:
+            self._progress.setValue(done)
+
+    def _embedding_worker(self, items, cache):
+        """An :class:`EmbeddingWorker` over the work items, not yet started.
 
         Slices are cached too (#82). They used not to be, on the reasoning that
         a slice has no content hash of its own -- but the source file does, and
@@ -281,38 +302,53 @@ class CurationController(QObject):
         that costs no decoding (:func:`slice_digest`). Since slices and video
         frames are the *primary* case for this feature, "everything except the
         primary case is cached" meant a second run was never fast.
+
+        Digests and loaders are both called on the worker, so hashing a large
+        source file does not stall the GUI either.
         """
-        if kind == "path":
-            digest = self._source_digest(payload)
-            cached = cache.get(self.model_name, digest)
-            if cached is not None:
-                return cached, True
-            from PyQt6.QtGui import QImage
-
-            qimage = QImage(payload)
-            if qimage.isNull():
-                return None, False
-            vector = self.embedder.embed_qimage(qimage)
-            cache.put(self.model_name, digest, vector)
-            return vector, False
-
-        slices, name, source = payload
+        jobs = []
+        readers = []
+        loaders = {}
+        for name, kind, payload in items:
+            if kind == "path":
+                jobs.append((
+                    name,
+                    functools.partial(self._source_digest, payload),
+                    functools.partial(read_qimage_rgb, payload),
+                ))
+                continue
+            slices, slice_name, source = payload
+            if id(slices) not in loaders:
+                loaders[id(slices)] = dict(slice_loaders(slices, readers) or ())
+            load = loaders[id(slices)].get(slice_name)
+            if load is None:
+                logger.warning(
+                    "skipping %s: its slices cannot be read off the GUI thread",
+                    slice_name,
+                )
+                continue
+            jobs.append((
+                slice_name,
+                functools.partial(self._slice_digest, slices, slice_name, source),
+                load,
+            ))
+        return EmbeddingWorker(
+            jobs,
+            self.embedder.embed_arrays,
+            cache,
+            self.model_name,
+            batch_size=self.batch_size,
+            readers=readers,
+        )
+
+    def _slice_digest(self, slices, name, source):
         # The axis assignment is part of the key: two assignments of one array
         # can produce identical slice names for different pixels (see
         # `slice_digest`). A video provider has no `dimensions` and needs none.
         provider = getattr(slices, "provider", None)
-        digest = slice_digest(
+        return slice_digest(
             self._source_digest(source), name, getattr(provider, "dimensions", None)
         )
-        cached = cache.get(self.model_name, digest)
-        if cached is not None:
-            return cached, True
-        qimage = slices.get(name)
-        if qimage is None:
-            return None, False
-        vector = self.embedder.embed_qimage(qimage)
-        cache.put(self.model_name, digest, vector)
-        return vector, False
 
     # --- results ---
 
@@ -327,6 +363,7 @@ class CurationController(QObject):
             self.embeddings,
             self.threshold if threshold is None else threshold,
             self.mode_threshold,
+            self.probes,
         )
 
     def clusters(self, threshold=None):
@@ -335,15 +372,15 @@ class CurationController(QObject):
         The memo is what makes :meth:`refine` honest about its cost. Every
         export and every training launch asks for the clusters, and at the
         supported ceiling one pass is several seconds on the GUI thread —
-        cheap once, not cheap four times. It is keyed by model and threshold,
-        and dropped outright whenever ``embeddings`` is assigned, so it cannot
-        outlive the vectors it describes.
+        cheap once, not cheap four times. It is keyed by model, threshold and
+        probes, and dropped outright whenever ``embeddings`` is assigned, so it
+        cannot outlive the vectors it describes.
         """
         threshold = self.threshold if threshold is None else threshold
-        key = (self.model_name, threshold)
+        key = (self.model_name, threshold, self.probes)
         if self._clusters_cache is not None and self._clusters_cache[0] == key:
             return self._clusters_cache[1]
-        result = similarity.cluster(self.embeddings, threshold)
+        result = similarity.cluster(self.embeddings, threshold, self.probes)
         self._clusters_cache = (key, result)
         return result
 
@@ -355,7 +392,9 @@ class CurationController(QObject):
 
     def outliers(self, threshold=None):
         return similarity.outliers(
-            self.embeddings, self.threshold if threshold is None else threshold
+            self.embeddings,
+            self.threshold if threshold is None else threshold,
+            self.probes,
         )
 
     # --- seeding the train/val split (#80 question 1, ADR-044/045) ---
@@ -409,11 +448,9 @@ class CurationController(QObject):
     def review_scores(self, names):
         """``{name: score}`` from the #71 review run, for the names it covers.
 
-        Empty when no review has been run, and -- more often -- when the
-        project is a video or a stack: review scoring runs from a file path and
-        skips slices entirely, while curation exists mainly *for* slices. The
-        two features overlap on plain-image projects and nowhere else, which is
-        worth knowing before reading anything into an empty column.
+        Empty when no review has been run. Review scores each slice and frame
+        under its own name, so a stack or video is covered as long as it was
+        opened in the session that ran the review.
         """
         review = getattr(self.mw, "review_controller", None)
         if review is None or not review.has_scores():
@@ -472,14 +509,13 @@ class CurationController(QObject):
         this is a visual grouping and a starting point, not a bulk-operation
         target. Slice names have no row of their own and are skipped.
         """
-        wanted = set(names or [])
         image_list = self.mw.image_list
         image_list.clearSelection()
         selected = 0
-        for row in range(image_list.count()):
-            item = image_list.item(row)
-            if item is not None and item.text() in wanted:
-                item.setSelected(True)
+        for name in dict.fromkeys(names or []):
+            items = image_list.findItems(name, Qt.MatchFlag.MatchExactly)
+            if items:
+                items[0].setSelected(True)
                 selected += 1
         # Deliberately no setCurrentItem: currentRowChanged is wired to
         # switch_image, which would navigate away and collapse the very
@@ -24,11 +24,12 @@ here too — it was originally a separate workflow for YOLO predictions
 but is now shared with DINO and most easily co-located.
 """
 
+import functools
 import os
 from collections import Counter
 
-from PyQt6.QtCore import QEvent, QObject, Qt, QTimer
-from PyQt6.QtGui import QColor, QImage
+from PyQt6.QtCore import QEvent, QEventLoop, QObject, Qt, QTimer
+from PyQt6.QtGui import QColor
 from PyQt6.QtWidgets import (
     QApplication,
     QFileDialog,
@@ -38,11 +39,27 @@ from PyQt6.QtWidgets import (
 
 from ..core.annotation_types import resolve_category_id
 from ..core.constants import default_class_color
+from ..core.detection_journal import (
+    DetectionJournal,
+    config_key,
+    journal_path,
+    merge_detections,
+)
+from ..core.feature_cache import array_digest
 from ..core.keypoint_schema import schema_k
 from ..core.mask_filters import SAM_EVERYTHING_SOURCE
 from ..core.slice_cache import slice_names
+from ..inference.batch_detection import (
+    BatchDetectionWorker,
+    read_image_rgb,
+    slice_loaders,
+)
 from ..inference.sam3_utils import SAM3_MODEL_LABEL
-from ..inference.sam_utils import InferenceBusyError
+from ..inference.sam_utils import (
+    InferenceBusyError,
+    claim_inference,
+    release_inference,
+)
 from ..ui.input_gates import focus_is_text_entry, no_modal_open
 
 from ..core.logging_config import get_logger
@@ -99,10 +116,50 @@ class DINOReviewEventFilter(QObject):
         return True
 
 
+class _BatchJob:
+    """What a batch detection run detects, captured on the GUI thread before
+    it starts: the batch worker reads no widget.
+
+    ``dino_options`` holds the ``DINOUtils.detect_many_blocking`` keywords,
+    or is ``None`` for SAM 3. ``model_key`` and ``class_keys`` key the run's
+    entries in the detection journal (``core.detection_journal``).
+    """
+
+    def __init__(self, class_configs, dino_options, journal, model_settings):
+        self.class_configs = class_configs
+        self.dino_options = dino_options
+        self.journal = journal
+        self.model_key = config_key(model_settings)
+        self.class_keys = [config_key(cfg) for cfg in class_configs]
+        self.configs_by_key = dict(zip(self.class_keys, class_configs))
+        if dino_options is None:
+            self.nms_thr = None  # SAM 3 has no cross-class NMS
+        else:
+            from ..inference.dino_utils import DEFAULT_CROSS_CLASS_NMS_THR
+            self.nms_thr = DEFAULT_CROSS_CLASS_NMS_THR
+
+
+class _BatchRun:
+    """Book-keeping of one "Detect All Images" run, updated as its results
+    arrive on the GUI thread."""
+
+    def __init__(self, auto_accept, progress, worker):
+        self.auto_accept = auto_accept
+        self.progress = progress
+        self.worker = worker
+        self.processed = 0
+        self.committed = 0
+        self.skipped = Counter()
+
+
 class DINOController(QObject):
     def __init__(self, main_window):
         super().__init__(main_window)
         self.mw = main_window
+        # Detection journal of a project never saved to disk (in memory).
+        self._memory_journal = None
+        self._journal = None
+        self._batch_run = None
 
     # --- Model picker plumbing ---
 
@@ -293,8 +350,9 @@ class DINOController(QObject):
     def _run_text_detection(self, qimage):
         """Detect + mask for one image, returning ``(results, sam_results)``.
 
-        The single shared detect+mask step for BOTH the single and batch
-        paths. Returns two parallel lists the existing DINO pipeline zips:
+        The detect+mask step of the single-image path; the batch path's
+        worker-side twin is :meth:`_detect_batch`, which returns the same
+        shape. Returns two parallel lists the existing DINO pipeline zips:
 
         - ``results``:     ``[{"class_name", "score", "bbox"[, "source"]}, ...]``
         - ``sam_results``: ``[{"segmentation", "score"}, ...]``
@@ -323,20 +381,7 @@ class DINOController(QObject):
             instances = self.mw.sam3_utils.detect_text(qimage, class_configs)
             if instances is None:
                 return None, None
-            # bbox is carried only for shape-parity with the DINO results dict
-            # (downstream commit/store/temp-attach/accept read segmentation/
-            # class_name/score/source, never bbox); keeping it avoids a
-            # divergent results shape between the two producers.
-            results = [
-                {"class_name": inst["class_name"], "score": inst["score"],
-                 "bbox": inst["bbox"], "source": "sam3"}
-                for inst in instances
-            ]
-            sam_results = [
-                {"segmentation": inst["segmentation"], "score": inst["score"]}
-                for inst in instances
-            ]
-            return results, sam_results
+            return self._split_sam3_instances(instances)
 
         # DINO two-stage (byte-for-byte behaviourally unchanged).
         model_name = self.mw.dino_model_selector.currentText()
@@ -344,6 +389,7 @@ class DINOController(QObject):
             qimage, class_configs,
             model_name=model_name,
             custom_model_path=self.mw.dino_custom_model_path,
+            single_pass=self.mw.dino_single_pass_checkbox.isChecked(),
         )
         if results is None:
             return None, None
@@ -353,6 +399,185 @@ class DINOController(QObject):
         sam_results = self.mw.sam_utils.apply_sam_predictions_batch(qimage, bboxes)
         return results, sam_results
 
+    @staticmethod
+    def _split_sam3_instances(instances):
+        """SAM 3's combined instances as the DINO pipeline's two parallel
+        lists, tagged ``source="sam3"``."""
+        # bbox is carried only for shape-parity with the DINO results dict
+        # (downstream commit/store/temp-attach/accept read segmentation/
+        # class_name/score/source, never bbox); keeping it avoids a
+        # divergent results shape between the two producers.
+        results = [
+            {"class_name": inst["class_name"], "score": inst["score"],
+             "bbox": inst["bbox"], "source": "sam3"}
+            for inst in instances
+        ]
+        sam_results = [
+            {"segmentation": inst["segmentation"], "score": inst["score"]}
+            for inst in instances
+        ]
+        return results, sam_results
+
+    def _detect_batch(self, job, batch):
+        """Detect + mask for one batch of ``(name, RGB array)``, on the batch
+        worker.
+
+        Returns one ``(results, sam_results)`` per image, shaped as
+        :meth:`_run_text_detection` returns them, holding only what this run
+        detected: classes already in the journal for the image's content are
+        not run again, and an image with nothing left to do comes back as
+        ``([], [])``. Fresh results are recorded in the journal before they
+        are returned, and cross-class NMS runs against the recorded classes
+        too, so a new class cannot duplicate a box that an earlier run
+        already produced.
+        """
+        digests = [array_digest(image_np) for _, image_np in batch]
+        groups = {}
+        for i, digest in enumerate(digests):
+            missing = job.journal.missing(digest, job.model_key, job.class_keys)
+            if missing:
+                groups.setdefault(tuple(missing), []).append(i)
+
+        outcomes = [([], [])] * len(batch)
+        for keys, indices in groups.items():
+            found = self._detect_classes(
+                [job.configs_by_key[k] for k in keys],
+                job.dino_options,
+                [batch[i][1] for i in indices],
+            )
+            for i, per_class in zip(indices, found):
+                if per_class is None:
+                    outcomes[i] = (None, None)
+                    continue
+                job.journal.record(
+                    digests[i], job.model_key, batch[i][0], dict(zip(keys, per_class))
+                )
+                fresh = {id(d) for detections in per_class for d in detections}
+                merged = merge_detections(
+                    [job.journal.detections(digests[i], job.model_key, k)
+                     for k in job.class_keys],
+                    job.nms_thr,
+                )
+                outcomes[i] = self._split_detections(
+                    [d for d in merged if id(d) in fresh]
+                )
+        return outcomes
+
+    def _detect_classes(self, class_configs, dino_options, arrays):
+        """Per image, one list of journal detections per class config
+        (``None`` for an image the producer could not run on).
+
+        A journal detection is one result with its mask: ``class_name``,
+        ``score``, ``bbox``, ``source`` and either ``segmentation`` or SAM's
+        ``error``.
+        """
+        if dino_options is None:
+            found = []
+            for image_np in arrays:
+                instances = self.mw.sam3_utils.detect_text_blocking(image_np, class_configs)
+                if instances is None:
+                    found.append(None)
+                    continue
+                by_name = {cfg["name"]: [] for cfg in class_configs}
+                for inst in instances:
+                    by_name.setdefault(inst["class_name"], []).append({
+                        "class_name": inst["class_name"], "score": inst["score"],
+                        "bbox": inst["bbox"], "source": "sam3",
+                        "segmentation": inst["segmentation"],
+                    })
+                found.append([by_name[cfg["name"]] for cfg in class_configs])
+            return found
+
+        per_image = self.mw.dino_utils.detect_many_blocking(
+            arrays, class_configs, merge=False, **dino_options
+        )
+        if per_image is None:
+            return [None] * len(arrays)
+        found = []
+        for image_np, per_class in zip(arrays, per_image):
+            results = [r for class_results in per_class for r in class_results]
+            sam_results = (
+                self.mw.sam_utils.predict_boxes_blocking(
+                    image_np, [r["bbox"] for r in results]
+                )
+                if results else []
+            )
+            if sam_results is not None and len(sam_results) != len(results):
+                # One entry per box, at the box's index, is
+                # predict_boxes_blocking's contract. Without it there is no
+                # telling which mask is whose, so the image counts as failed
+                # (and is not journalled) rather than pairing masks by guess.
+                logger.warning(
+                    f"SAM returned {len(sam_results)} result(s) for "
+                    f"{len(results)} box(es); not recording this image"
+                )
+                sam_results = None
+            if sam_results is None:
+                found.append(None)
+                continue
+            masked = iter(zip(results, sam_results))
+            found.append([
+                [self._journal_detection(*next(masked)) for _ in class_results]
+                for class_results in per_class
+            ])
+        return found
+
+    @staticmethod
+    def _journal_detection(result, sam_result):
+        detection = {
+            "class_name": result["class_name"], "score": result["score"],
+            "bbox": result["bbox"], "source": result.get("source", "dino"),
+        }
+        if "error" in sam_result:
+            detection["error"] = sam_result["error"]
+        else:
+            detection["segmentation"] = sam_result["segmentation"]
+        return detection
+
+    @staticmethod
+    def _split_detections(detections):
+        """Journal detections as the pipeline's ``(results, sam_results)``."""
+        results = [
+            {"class_name": d["class_name"], "score": d["score"],
+             "bbox": d["bbox"], "source": d["source"]}
+            for d in detections
+        ]
+        sam_results = [
+            {"error": d["error"]} if "error" in d
+            else {"segmentation": d["segmentation"], "score": d["score"]}
+            for d in detections
+        ]
+        return results, sam_results
+
+    def _batch_job(self, class_configs):
+        """The :class:`_BatchJob` for the producer selected now."""
+        if self._is_sam3_selected():
+            return _BatchJob(class_configs, None, self._detection_journal(),
+                             {"producer": "sam3"})
+        dino_options = {
+            "model_name": self.mw.dino_model_selector.currentText(),
+            "custom_model_path": self.mw.dino_custom_model_path,
+            "single_pass": self.mw.dino_single_pass_checkbox.isChecked(),
+        }
+        return _BatchJob(
+            class_configs, dino_options, self._detection_journal(),
+            {"producer": "dino", "sam": self.mw.sam_utils.current_sam_model,
+             **dino_options},
+        )
+
+    def _detection_journal(self):
+        """The project's detection journal, beside its ``.iap``; in memory
+        for a project not saved yet."""
+        project_file = getattr(self.mw, "current_project_file", None)
+        if not project_file:
+            if self._memory_journal is None:
+                self._memory_journal = DetectionJournal()
+            return self._memory_journal
+        path = journal_path(project_file)
+        if self._journal is None or self._journal.path != path:
+            self._journal = DetectionJournal(path)
+        return self._journal
+
     def run_dino_detection_single(self):
         is_sam3 = self._is_sam3_selected()
         if not is_sam3:
@@ -555,69 +780,63 @@ class DINOController(QObject):
         )
         logger.debug(f"detect_batch: auto_accept={auto_accept}")
 
-        # Build a flat list of (display_name, qimage) work items covering
-        # both regular images (loaded from disk) and multi-dim image
-        # slices (already QImages in memory). Slices live in
-        # self.mw.image_slices[base_name], indexed by their slice_name
-        # (e.g. "stack_T1_Z1_C1"). The earlier implementation only
-        # iterated self.all_images and skipped multi-slice entries with
-        # a console warning, leaving slice-based projects unable to use
-        # Detect All.
-        work_items = self._collect_dino_batch_work_items()
+        # A flat list of (display_name, loader) work items covering both
+        # regular images and every slice of multi-dim images / videos.
+        # Nothing is decoded here: the batch worker's decode stage runs the
+        # loaders a few images ahead of detection (inference/batch_detection).
+        work_items, readers = self._collect_dino_batch_work_items()
         if not work_items:
             QMessageBox.information(
                 self.mw, "Detect All Images",
                 "No images or slices available to process."
             )
             return
+
+        job = self._batch_job(class_configs)
         total = len(work_items)
 
+        try:
+            claim_inference()
+        except InferenceBusyError:
+            logger.warning("detect_batch: inference busy, not starting")
+            self.mw.lbl_dino_status.setText(
+                "Another detection is still running; try again when it finishes."
+            )
+            return
+
         progress = QProgressDialog("Running LLM Detection...", "Cancel", 0, total, self.mw)
         progress.setWindowModality(Qt.WindowModality.WindowModal)
         progress.setMinimumDuration(0)
 
-        committed_total = 0
-        skipped_total = Counter()
-
-        for idx, (image_name, qimage) in enumerate(work_items):
-            if progress.wasCanceled():
-                break
-            progress.setValue(idx)
-            QApplication.processEvents()
-
-            try:
-                results, sam_results = self._run_text_detection(qimage)
-            except InferenceBusyError:
-                logger.warning(f"inference busy, skipping {image_name}")
-                continue
-            except Exception:
-                logger.exception(f"text detection failed for {image_name}")
-                continue
-
-            if not results:
-                continue
-            if sam_results is None:
-                continue
-
-            if auto_accept:
-                committed, skipped = self._commit_dino_results(
-                    image_name, results, sam_results
-                )
-                committed_total += committed
-                skipped_total.update(skipped)
-            else:
-                self._store_dino_batch_results(image_name, results, sam_results)
+        worker = BatchDetectionWorker(
+            work_items, functools.partial(self._detect_batch, job), readers=readers
+        )
+        self._batch_run = _BatchRun(auto_accept, progress, worker)
+        worker.item_done.connect(self._on_batch_item)
+        progress.canceled.connect(worker.cancel)
+        # Same shape as sam_utils._run_sync: the call looks synchronous while
+        # the GUI thread keeps pumping events, which is where the results
+        # are committed (_on_batch_item) and the Cancel button is heard.
+        loop = QEventLoop()
+        worker.finished.connect(loop.quit)
+        try:
+            worker.start()
+            loop.exec()
+            worker.wait()
+        finally:
+            release_inference()
+            run, self._batch_run = self._batch_run, None
 
         progress.setValue(total)
         progress.close()
 
         if auto_accept:
-            if skipped_total:
-                self._warn_unknown_classes(skipped_total, committed_total)
+            if run.skipped:
+                self._warn_unknown_classes(run.skipped, run.committed)
             else:
                 QMessageBox.information(
                     self.mw, "Batch Detection Complete",
-                    f"{committed_total} detection(s) saved to annotations."
+                    f"{run.committed} detection(s) saved to annotations."
                 )
             self.mw.update_annotation_list()
             self.mw.update_slice_list_colors()
@@ -625,16 +844,87 @@ class DINOController(QObject):
         else:
             self._show_dino_batch_review()
 
-    def _collect_dino_batch_work_items(self):
-        """Return a flat ``[(name, QImage), …]`` list for batch DINO.
+    def review_detection_journal(self):
+        """Put the journal's detections for the selected model and classes
+        into batch review -- a run from an earlier session, or one whose
+        review was closed before every image was accepted or rejected."""
+        class_configs = self._build_dino_class_configs()
+        if not class_configs:
+            QMessageBox.warning(self.mw, "No Classes",
+                                "Please add at least one class with phrases.")
+            return
+        job = self._batch_job(class_configs)
+        pending = job.journal.pending(job.model_key, job.class_keys)
+        logger.debug(f"review journal: {len(pending)} image(s) with saved results")
+
+        self.mw.image_label.temp_annotations = []
+        for image_name, per_class in pending.items():
+            detections = merge_detections(per_class, job.nms_thr)
+            if detections:
+                self._store_dino_batch_results(
+                    image_name, *self._split_detections(detections)
+                )
+        self._show_dino_batch_review()
+
+    def forget_detection_journal(self):
+        """Drop the journal's results for the selected model and classes, so
+        the next Detect All Images runs them again instead of skipping every
+        image it already did -- the way out of a run with bad settings."""
+        class_configs = self._build_dino_class_configs()
+        if not class_configs:
+            QMessageBox.warning(self.mw, "No Classes",
+                                "Please add at least one class with phrases.")
+            return
+        answer = QMessageBox.question(
+            self.mw, "Forget Saved Detections",
+            "Forget the saved detections for the current model and classes? "
+            "The next Detect All Images will detect every image again.",
+        )
+        if answer != QMessageBox.StandardButton.Yes:
+            return
+        job = self._batch_job(class_configs)
+        dropped = job.journal.forget(job.model_key, job.class_keys)
+        logger.info(f"forgot {dropped} saved detection entry(ies)")
+
+    def _on_batch_item(self, image_name, outcome):
+        """One work item back from the batch worker (GUI thread).
 
-        Regular images are loaded from disk via PIL → QImage. Multi-dim
-        images contribute one entry per slice from ``self.mw.image_slices``;
-        slices that haven't been materialised yet (the parent image was
-        never opened in this session) are skipped with a console log.
+        Items that arrive after Cancel -- the batch that was in flight -- are
+        dropped rather than committed; the journal still has them, for the
+        next run or for Review Saved Detections.
+        """
+        run = self._batch_run
+        if run is None or run.worker.canceled:
+            return
+        run.processed += 1
+        run.progress.setValue(run.processed)
+        if outcome is None:
+            return  # failed to decode or detect; logged by the worker
+        results, sam_results = outcome
+        if not results or sam_results is None:
+            return
+        if run.auto_accept:
+            committed, skipped = self._commit_dino_results(
+                image_name, results, sam_results
+            )
+            run.committed += committed
+            run.skipped.update(skipped)
+        else:
+            self._store_dino_batch_results(image_name, results, sam_results)
+
+    def _collect_dino_batch_work_items(self):
+        """Return ``([(name, load), ...], readers)`` for batch detection.
+
+        ``load()`` decodes the item to an RGB array and is called on the
+        batch worker's decode thread. Regular images are read from disk;
+        multi-dim images contribute one entry per slice of
+        ``self.mw.image_slices`` (see ``batch_detection.slice_loaders``),
+        videos one per frame. Images whose slices were never loaded in this
+        session are skipped with a console log. ``readers`` are the video
+        readers the loaders share, closed by the decode thread when done.
         """
-        from PIL import Image as PILImage
         items = []
+        readers = []
         for img_info in self.mw.all_images:
             file_name = img_info["file_name"]
             if img_info.get("is_multi_slice", False):
@@ -645,27 +935,20 @@ class DINOController(QObject):
                                    "no slices loaded (open the image first to "
                                    "materialise its slices).")
                     continue
-                for slice_name, qimage in slices:
-                    items.append((slice_name, qimage))
+                loaders = slice_loaders(slices, readers)
+                if loaders is None:
+                    logger.warning(f"Skipping multi-slice image '{file_name}': "
+                                   "its slices cannot be read off the GUI thread.")
+                    continue
+                items.extend(loaders)
             else:
                 image_path = self.mw.image_paths.get(file_name)
                 if not image_path or not os.path.exists(image_path):
                     logger.warning(f"Skipping '{file_name}': missing image path.")
                     continue
-                try:
-                    pil_img = PILImage.open(image_path).convert("RGB")
-                    qimage = QImage(
-                        pil_img.tobytes(),
-                        pil_img.width,
-                        pil_img.height,
-                        pil_img.width * 3,
-                        QImage.Format.Format_RGB888,
-                    )
-                    items.append((file_name, qimage))
-                except Exception:
-                    logger.exception(f"Skipping '{file_name}': failed to load.")
+                items.append((file_name, functools.partial(read_image_rgb, image_path)))
         logger.debug(f"batch work items: {len(items)} total")
-        return items
+        return items, readers
 
     def _commit_dino_results(self, image_name, dino_results, sam_results):
         """Commit DINO+SAM results to annotations for a single image.
@@ -805,12 +1088,11 @@ class DINOController(QObject):
         Used by batch-review navigation, which mixes regular image
         names and slice names in ``dino_batch_results``.
         """
-        for i in range(self.mw.image_list.count()):
-            item = self.mw.image_list.item(i)
-            if item and item.text() == name:
-                self.mw.image_list.setCurrentRow(i)
-                self.mw.switch_image(item)
-                return True
+        items = self.mw.image_list.findItems(name, Qt.MatchFlag.MatchExactly)
+        if items:
+            self.mw.image_list.setCurrentItem(items[0])
+            self.mw.switch_image(items[0])
+            return True
         for base_name, slices in self.mw.image_slices.items():
             # Name-only membership check — don't materialise every slice's
             # QImage just to find one by name (issue #45).
@@ -824,12 +1106,11 @@ class DINOController(QObject):
                 if os.path.splitext(file_name)[0] == base_name:
                     self.mw.image_list.setCurrentRow(i)
                     self.mw.switch_image(item)
-                    for s_i in range(self.mw.slice_list.count()):
-                        s_item = self.mw.slice_list.item(s_i)
-                        if s_item and s_item.text() == name:
-                            self.mw.slice_list.setCurrentRow(s_i)
-                            self.mw.switch_slice(s_item)
-                            return True
+                    s_items = self.mw.slice_list.findItems(name, Qt.MatchFlag.MatchExactly)
+                    if s_items:
+                        self.mw.slice_list.setCurrentItem(s_items[0])
+                        self.mw.switch_slice(s_items[0])
+                        return True
                     break
             return False
         return False
@@ -1174,6 +1455,7 @@ class DINOController(QObject):
                     del self.mw.all_annotations[image_name][class_name]
             if not self.mw.all_annotations[image_name]:
                 del self.mw.all_annotations[image_name]
+        self.mw.image_controller.note_annotations_changed()
 
         for class_name in list(self.mw.image_label.class_colors.keys()):
             if class_name.startswith("Temp-"):
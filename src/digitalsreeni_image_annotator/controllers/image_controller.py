@@ -20,6 +20,7 @@ The `DimensionDialog` widget lives here too — it is only used by
 """
 
 import os
+from functools import partial
 
 from czifile import CziFile
 from PyQt6.QtCore import Qt, QObject
@@ -31,8 +32,6 @@ from PyQt6.QtWidgets import (
     QFileDialog,
     QGridLayout,
     QLabel,
-    QListWidget,
-    QListWidgetItem,
     QMessageBox,
     QProgressDialog,
     QPushButton,
@@ -43,6 +42,8 @@ from tifffile import TiffFile
 
 from ..app_settings import save_onion_prefs
 from ..core import image_utils, onion
+from ..core.annotation_index import AnnotationIndex
+from ..core.annotation_stats import AnnotationStats
 from ..core.slice_cache import (
     LazySliceList,
     SliceProvider,
@@ -59,9 +60,19 @@ from ..core.video_handler import (
 )
 
 from ..core.logging_config import get_logger
+from ..ui.image_list_model import SliceListView
+from ..widgets.onion_ghosts import OnionGhostPreparer
 
 logger = get_logger(__name__)
 
+# Slice-list row colours, (annotated, dark_mode) -> (foreground, background).
+_SLICE_ROW_COLORS = {
+    (True, True): (QColor(235, 235, 235), QColor(58, 95, 140)),
+    (False, True): (QColor(200, 200, 200), QColor(40, 40, 40)),
+    (True, False): (QColor(255, 255, 255), QColor(70, 130, 180)),
+    (False, False): (QColor(0, 0, 0), QColor(240, 240, 240)),
+}
+
 
 class DimensionDialog(QDialog):
     def __init__(self, shape, file_name, parent=None, default_dimensions=None):
@@ -99,6 +110,10 @@ class DimensionDialog(QDialog):
 
 
 class ImageController(QObject):
+    # Off-GUI-thread image ghosts (widgets/onion_ghosts), created on the first
+    # lazy stack or video that wants them.
+    _onion_preparer = None
+
     def __init__(self, main_window):
         super().__init__(main_window)
         self.mw = main_window
@@ -106,6 +121,18 @@ class ImageController(QObject):
         # dark: bool). Each is painted once and reused; cleared on a
         # dark-mode flip via on_theme_changed (issue #43).
         self._status_icon_cache = {}
+        # Annotation counts behind the badges and the status filter. Synced
+        # in full by apply_image_filter, then one key at a time by
+        # refresh_annotation_status on every mutation.
+        self.annotation_index = AnnotationIndex()
+        self._indexed = None  # (all_annotations, row count) it was built for
+        self._owner_of = None
+        self._changed_keys = set()
+        # Class, shape and area statistics per key, for the statistics and
+        # training dialogs and the QC audit. Told about the same keys as the
+        # index (note_annotations_changed), measured when a view asks
+        # (annotation_statistics).
+        self.annotation_stats = AnnotationStats()
 
     def update_image_list(self):
         # Rebuild (and sort) the list, preserving the current selection
@@ -113,55 +140,36 @@ class ImageController(QObject):
         self.sort_image_list()
 
     def sort_image_list(self, select_name=None, do_switch=False):
-        """Populate image_list in alphabetical order (upstream issue #60).
-
-        Sorts the model (`all_images`) and the view together so the
-        `all_images[i]` ↔ `image_list.item(i)` positional invariant holds
-        (relied on by COCO import reconciliation). `setSortingEnabled` is
-        deliberately NOT used: `currentRowChanged` is wired to
-        `switch_image`, so a live re-sort would fire spurious image
-        switches. We rebuild with signals blocked instead, then re-select
-        explicitly.
-
-        select_name: file to select after the rebuild (defaults to the
-        previously-current item). do_switch: call switch_image once for
-        the selected item (used when adding new images).
+        """Show all_images in the image list, in alphabetical order
+        (upstream issue #60).
+
+        The list's model reads `all_images` itself, so sorting it in place
+        keeps the `all_images[i]` ↔ `image_list.item(i)` positional invariant
+        (relied on by COCO import reconciliation). The sort is one layout
+        change: nothing is rebuilt, and the current row follows its image
+        without a `currentRowChanged` -- which is wired to `switch_image`.
+
+        select_name: file to select afterwards (defaults to the current
+        one). do_switch: call switch_image once for the selected item (used
+        when adding new images).
         """
-        current = None
-        if self.mw.image_list.currentItem() is not None:
-            current = self.mw.image_list.currentItem().text()
-
         # Grouped images cluster together (ungrouped first, blank group
         # sorts before any name); within a group, by file name (issue #43).
-        self.mw.all_images.sort(
-            key=lambda info: (
+        self.mw.image_list.sort_images(
+            lambda info: (
                 info.get("group", "").casefold(),
                 info.get("file_name", "").casefold(),
                 info.get("file_name", ""),
             )
         )
 
-        self.mw.image_list.blockSignals(True)
-        self.mw.image_list.clear()
-        for info in self.mw.all_images:
-            item = QListWidgetItem(info["file_name"])
-            group = info.get("group")
-            if group:
-                # Item TEXT stays the bare file name (many consumers read
-                # item(i).text() as a filename — DINO batch nav, COCO
-                # import). The group shows only in the tooltip. See #43.
-                item.setToolTip(f"{info['file_name']}  [{group}]")
-            self.mw.image_list.addItem(item)
-        self.mw.image_list.blockSignals(False)
-
         self._populate_group_combo()
 
         self.apply_image_filter()
 
-        target = select_name if select_name is not None else current
-        if target is not None:
+        if select_name is not None:
             items = self.mw.image_list.findItems(
-                target, Qt.MatchFlag.MatchExactly
+                select_name, Qt.MatchFlag.MatchExactly
             )
             if items:
                 self.mw.image_list.blockSignals(True)
@@ -182,7 +190,7 @@ class ImageController(QObject):
     def sort_image_list_by_score(self, descending=True):
         """Reorder the list by review score, highest first (issue #71).
 
-        Sorts ``all_images`` and rebuilds, exactly like
+        Sorts ``all_images`` through the list, exactly like
         :meth:`sort_image_list`, so the ``all_images[i]`` ↔ ``item(i)``
         positional invariant other code relies on is preserved. Unscored
         images sink to the bottom rather than being hidden — the point of the
@@ -199,28 +207,8 @@ class ImageController(QObject):
             return (0, -score if descending else score,
                     info.get("file_name", "").casefold())
 
-        current = None
-        if self.mw.image_list.currentItem() is not None:
-            current = self.mw.image_list.currentItem().text()
-
-        self.mw.all_images.sort(key=key)
-        self.mw.image_list.blockSignals(True)
-        self.mw.image_list.clear()
-        for info in self.mw.all_images:
-            item = QListWidgetItem(info["file_name"])
-            group = info.get("group")
-            if group:
-                item.setToolTip(f"{info['file_name']}  [{group}]")
-            self.mw.image_list.addItem(item)
-        self.mw.image_list.blockSignals(False)
+        self.mw.image_list.sort_images(key)
         self.apply_image_filter()
-
-        if current is not None:
-            items = self.mw.image_list.findItems(current, Qt.MatchFlag.MatchExactly)
-            if items:
-                self.mw.image_list.blockSignals(True)
-                self.mw.image_list.setCurrentItem(items[0])
-                self.mw.image_list.blockSignals(False)
         return True
 
     def image_has_annotations(self, image_info):
@@ -259,14 +247,142 @@ class ImageController(QObject):
 
         return False
 
+    def _owner_resolver(self):
+        """``key -> file name`` of the image-list row a key's annotations
+        count towards, by the rules of :meth:`image_has_annotations`."""
+        files = set()
+        slices_of = {}
+        unloaded_stacks = {}
+        for info in self.mw.all_images:
+            file_name = info["file_name"]
+            files.add(file_name)
+            if not info.get("is_multi_slice", False):
+                continue
+            base_name = os.path.splitext(file_name)[0]
+            slices = self.mw.image_slices.get(base_name)
+            if slices:
+                for slice_name in slice_names(slices):
+                    slices_of.setdefault(slice_name, file_name)
+            else:
+                unloaded_stacks[base_name] = file_name
+
+        def owner_of(key):
+            if key in files:
+                return key
+            owner = slices_of.get(key)
+            if owner is None and unloaded_stacks:
+                # Longest "{base_name}_" prefix first, as a key can match
+                # several bases ("a_b_Z1" under both "a" and "a_b").
+                cut = key.rfind("_")
+                while owner is None and cut > 0:
+                    owner = unloaded_stacks.get(key[:cut])
+                    cut = key.rfind("_", 0, cut)
+            return owner
+
+        return owner_of
+
+    def owner_of(self, key):
+        """File name of the image-list row ``key`` (an image, slice or
+        frame) belongs to, or ``None``."""
+        if self._owner_of is None or not self._index_is_current():
+            return self._owner_resolver()(key)
+        return self._owner_of(key)
+
+    def _rebuild_annotation_index(self):
+        self._owner_of = self._owner_resolver()
+        self.annotation_index.rebuild(self.mw.all_annotations, self._owner_of)
+        self._indexed = (id(self.mw.all_annotations), self.mw.image_list.count())
+        self._changed_keys.clear()
+
+    def _index_is_current(self):
+        return self._indexed == (id(self.mw.all_annotations), self.mw.image_list.count())
+
+    def note_annotations_changed(self, key=None):
+        """Tell the status index and the statistics ``key`` changed; ``None``
+        for "anything may have". The current image is always rechecked, so
+        only writes to other keys need this -- ``record_history`` calls it
+        for every one."""
+        if key is None:
+            self._indexed = None
+        else:
+            self._changed_keys.add(key)
+        self.annotation_stats.invalidate(key)
+
+    def refresh_annotation_status(self):
+        """Badges and status filter after an annotation mutation.
+
+        The incremental half of :meth:`apply_image_filter`: recounts the
+        current key and those passed to :meth:`note_annotations_changed`,
+        and repaints only the rows whose status flipped. Anything the index
+        cannot account for -- a new list, a replaced ``all_annotations``, a
+        key added or removed without notice -- falls back to the full pass.
+        """
+        all_annotations = self.mw.all_annotations
+        if not self._index_is_current():
+            self.apply_image_filter()
+            return
+        keys = self._changed_keys
+        current = self.mw.current_slice or self.mw.image_file_name
+        if current:
+            keys.add(current)
+        flipped = set()
+        for key in keys:
+            flipped.update(self.annotation_index.update(
+                key, all_annotations.get(key), self._owner_of(key),
+                present=key in all_annotations,
+            ))
+        keys.clear()
+        if len(self.annotation_index) != len(all_annotations):
+            # A key came or went that nobody noted.
+            self.apply_image_filter()
+            return
+        if flipped:
+            self._repaint_rows(flipped)
+
+    def annotation_statistics(self):
+        """The project's :class:`AnnotationStats`, brought up to date.
+
+        Only keys reported since the last call (or whose counts no longer
+        match) are measured again. The image on screen is always re-measured,
+        since its edits may not have been written back yet.
+        """
+        current = self.mw.current_slice or self.mw.image_file_name
+        if current:
+            self.annotation_stats.invalidate(current)
+        return self.annotation_stats.sync(self.mw.all_annotations)
+
+    def _repaint_rows(self, file_names):
+        # The badge and the filter both read the index live; telling the
+        # list the rows changed repaints and re-filters just those.
+        self.mw.image_list.refresh_rows(file_names)
+
+    def _filter_state(self):
+        """``(status mode, active group or None)`` from the two combos."""
+        combo = getattr(self.mw, "image_filter_combo", None)
+        mode = combo.currentIndex() if combo is not None else 0
+        group_combo = getattr(self.mw, "image_group_combo", None)
+        active_group = None
+        if group_combo is not None and group_combo.currentIndex() > 0:
+            active_group = group_combo.currentText()
+        return mode, active_group
+
+    @staticmethod
+    def _row_hidden(info, annotated, mode, active_group):
+        """Hide a row if EITHER filter excludes it."""
+        status_hide = mode != 0 and (annotated if mode == 1 else not annotated)
+        group_hide = active_group is not None and not (
+            info and info.get("group") == active_group
+        )
+        return status_hide or group_hide
+
     def apply_image_filter(self):
         """Hide image-list rows that don't match the annotation-status
         filter (upstream issue #27).
 
-        Rows are hidden via setRowHidden, never removed: other code
-        (DINO batch navigation, COCO import) iterates the list by row
-        index, and hiding fires no currentRowChanged so it cannot
-        trigger a spurious switch_image.
+        Rows are hidden by the list's filter proxy, never removed from the
+        model: other code (DINO batch navigation, COCO import) iterates the
+        list by model row, and hiding fires no currentRowChanged so it
+        cannot trigger a spurious switch_image.
 
         A non-matching row is hidden even when it is the current
         selection — hiding does not change `current_image`, so the canvas
@@ -274,42 +390,26 @@ class ImageController(QObject):
         (e.g. the image just gained its first annotation under the
         "Without annotations" filter). Keyboard nav skips hidden rows.
         """
-        combo = getattr(self.mw, "image_filter_combo", None)
-        if combo is None:
+        if getattr(self.mw, "image_filter_combo", None) is None:
             return
-        mode = combo.currentIndex()  # 0 = all, 1 = without, 2 = with
-
-        # Group filter (issue #43): a specific group selected (index > 0)
-        # hides rows whose image isn't in it. Index 0 ("All groups") means
-        # "hide nothing", so the default path below stays a cheap unhide.
-        group_combo = getattr(self.mw, "image_group_combo", None)
-        active_group = None
-        if group_combo is not None and group_combo.currentIndex() > 0:
-            active_group = group_combo.currentText()
+        # 0 = all, 1 = without, 2 = with. Group filter (issue #43): a
+        # specific group selected hides rows whose image isn't in it.
+        mode, active_group = self._filter_state()
+        self._rebuild_annotation_index()
 
+        image_list = self.mw.image_list
         if mode == 0 and active_group is None:
-            # Default case runs on every update_slice_list_colors — skip the
-            # per-row hide computation (nothing is filtered) but still refresh
-            # the status badges, which necessarily scan annotation state per
-            # row (unavoidable: badges must stay current after every mutation).
-            for i in range(self.mw.image_list.count()):
-                self.mw.image_list.setRowHidden(i, False)
-            self.refresh_image_status_icons()
-            return
-        infos = {info["file_name"]: info for info in self.mw.all_images}
-        for i in range(self.mw.image_list.count()):
-            info = infos.get(self.mw.image_list.item(i).text())
-            if mode == 0:
-                status_hide = False
-            else:
-                annotated = bool(info) and self.image_has_annotations(info)
-                status_hide = annotated if mode == 1 else not annotated
-            if active_group is None:
-                group_hide = False
-            else:
-                group_hide = not (info and info.get("group") == active_group)
-            # Hide the row if EITHER filter excludes it.
-            self.mw.image_list.setRowHidden(i, status_hide or group_hide)
+            image_list.set_row_filter(None)
+        else:
+            model = image_list.source_model()
+            index = self.annotation_index
+
+            def hidden(row):
+                info = model.info(row)
+                annotated = index.annotated(info["file_name"])
+                return self._row_hidden(info, annotated, mode, active_group)
+
+            image_list.set_row_filter(hidden)
 
         self.refresh_image_status_icons()
 
@@ -323,17 +423,22 @@ class ImageController(QObject):
         on the dark sidebar), so on_theme_changed clears the cache on a
         dark-mode flip to force a repaint at the new theme's colours.
 
-        Called at the end of apply_image_filter (so it refreshes on every
-        annotation mutation via update_slice_list_colors) and after
-        sort_image_list's rebuild.
+        The list asks status_icon_for at paint time, so this is a repaint
+        of the visible rows. Called at the end of apply_image_filter; an
+        annotation mutation repaints only the rows whose status flipped
+        (refresh_annotation_status). Read from the annotation index, rebuilt
+        here if the list changed under it.
         """
-        dark = bool(getattr(self.mw, "dark_mode", False))
-        infos = {info["file_name"]: info for info in self.mw.all_images}
-        for i in range(self.mw.image_list.count()):
-            item = self.mw.image_list.item(i)
-            info = infos.get(item.text())
-            annotated = bool(info) and self.image_has_annotations(info)
-            item.setIcon(self._status_icon(annotated, dark))
+        if not self._index_is_current():
+            self._rebuild_annotation_index()
+        self.mw.image_list.viewport().update()
+
+    def status_icon_for(self, file_name):
+        """The badge of ``file_name``'s row; the image list's decoration."""
+        return self._status_icon(
+            self.annotation_index.annotated(file_name),
+            bool(getattr(self.mw, "dark_mode", False)),
+        )
 
     def _status_icon(self, annotated, dark):
         key = (annotated, dark)
@@ -438,9 +543,9 @@ class ImageController(QObject):
         combo.blockSignals(False)
 
     def setup_slice_list(self):
-        self.mw.slice_list = QListWidget()
+        self.mw.slice_list = SliceListView(self._slice_colors)
         self.mw.slice_list.itemClicked.connect(self.switch_slice)
-        # Keyboard navigation. A focused QListWidget handles the arrow keys
+        # Keyboard navigation. A focused list view handles the arrow keys
         # itself and does NOT propagate them, so the main window's keyPressEvent
         # never saw Up/Down here -- the row moved and the canvas did not follow.
         # The image list above has always connected both signals, which is
@@ -451,14 +556,21 @@ class ImageController(QObject):
         self.mw.image_list_layout.addWidget(QLabel("Slices:"))
         self.mw.image_list_layout.addWidget(self.mw.slice_list)
 
+    def _slice_colors(self, slice_name):
+        """``(foreground, background)`` of a slice-list row, read when the
+        row is painted; update_slice_list_colors repaints."""
+        by_class = self.mw.all_annotations.get(slice_name)
+        annotated = bool(by_class) and any(by_class.values())
+        return _SLICE_ROW_COLORS[annotated, bool(self.mw.dark_mode)]
+
     def open_images(self):
         file_names, _ = QFileDialog.getOpenFileNames(
             self.mw, "Open Images or Videos", "", file_dialog_filter()
         )
         if file_names:
-            self.mw.image_list.clear()
             self.mw.image_paths.clear()
             self.mw.all_images.clear()
+            self.mw.image_list.sync()
             self.mw.slice_list.clear()
             # Drop the outgoing stacks' cached QImages AND their retained
             # source arrays: image_slices is being replaced wholesale, so wipe
@@ -636,9 +748,7 @@ class ImageController(QObject):
         self.mw.image_slices[base_name] = lazy
         self.mw.slices = lazy
 
-        self.mw.slice_list.clear()
-        for slice_name in lazy.names:
-            self.add_slice_to_list(slice_name)
+        self.mw.slice_list.set_names(lazy.names)
 
         if lazy:
             first_name, first_image = lazy[0]
@@ -1162,7 +1272,6 @@ class ImageController(QObject):
 
     def create_slices(self, image_array, dimensions, image_path):
         base_name = os.path.splitext(os.path.basename(image_path))[0]
-        self.mw.slice_list.clear()
 
         logger.debug(f"Creating slices for {base_name}")
         logger.debug(f"Dimensions: {dimensions}")
@@ -1181,9 +1290,7 @@ class ImageController(QObject):
         # progress dialog (pixel work only) is gone; building names is cheap.
         provider = SliceProvider(image_array, dimensions, base_name)
         lazy = LazySliceList(provider)
-
-        for slice_name in lazy.names:
-            self.add_slice_to_list(slice_name)
+        self.mw.slice_list.set_names(lazy.names)
 
         # mw.image_slices[base] and mw.slices MUST be the same object — several
         # paths compare/assign them (issue #45 guardrail).
@@ -1209,26 +1316,6 @@ class ImageController(QObject):
         logger.info(f"Created {len(lazy)} slices for {base_name}")
         return lazy
 
-    def add_slice_to_list(self, slice_name):
-        item = QListWidgetItem(slice_name)
-
-        if self.mw.dark_mode:
-            item.setBackground(QColor(40, 40, 40))
-            if slice_name in self.mw.all_annotations:
-                item.setForeground(QColor(235, 235, 235))
-                item.setBackground(QColor(58, 95, 140))
-            else:
-                item.setForeground(QColor(200, 200, 200))
-        else:
-            item.setBackground(QColor(240, 240, 240))
-            if slice_name in self.mw.all_annotations:
-                item.setForeground(QColor(255, 255, 255))
-                item.setBackground(QColor(70, 130, 180))
-            else:
-                item.setForeground(QColor(0, 0, 0))
-
-        self.mw.slice_list.addItem(item)
-
     def activate_slice(self, slice_name):
         self.mw.current_slice = slice_name
         self.mw.image_file_name = slice_name
@@ -1249,20 +1336,9 @@ class ImageController(QObject):
             self.mw.slice_list.setCurrentItem(items[0])
 
     def update_slice_list(self):
-        self.mw.slice_list.clear()
         # Name-only (slice_names) — rebuilding the list must not decode pixels
         # (issue #45).
-        for slice_name in slice_names(self.mw.slices):
-            item = QListWidgetItem(slice_name)
-            if slice_name in self.mw.all_annotations:
-                item.setForeground(QColor(Qt.GlobalColor.green))
-            else:
-                item.setForeground(
-                    QColor(Qt.GlobalColor.black)
-                    if not self.mw.dark_mode
-                    else QColor(Qt.GlobalColor.white)
-                )
-            self.mw.slice_list.addItem(item)
+        self.mw.slice_list.set_names(slice_names(self.mw.slices))
 
         if self.mw.current_slice:
             items = self.mw.slice_list.findItems(
@@ -1312,6 +1388,7 @@ class ImageController(QObject):
 
             for key in keys_to_remove:
                 del self.mw.all_annotations[key]
+            self.note_annotations_changed()
 
             if base_name in self.mw.image_slices:
                 # Drop this stack's cached QImages before dropping the list so
@@ -1350,11 +1427,11 @@ class ImageController(QObject):
         if current_item:
             file_name = current_item.text()
 
-            self.mw.image_list.takeItem(self.mw.image_list.row(current_item))
             self.mw.image_paths.pop(file_name, None)
             self.mw.all_images = [
                 img for img in self.mw.all_images if img["file_name"] != file_name
             ]
+            self.mw.image_list.sync()
 
             self.mw.all_annotations.pop(file_name, None)
 
@@ -1417,11 +1494,11 @@ class ImageController(QObject):
             )
 
             if reply == QMessageBox.StandardButton.Yes:
-                self.mw.image_list.takeItem(self.mw.image_list.row(current_item))
                 self.mw.image_paths.pop(file_name, None)
                 self.mw.all_images = [
                     img for img in self.mw.all_images if img["file_name"] != file_name
                 ]
+                self.mw.image_list.sync()
 
                 self.mw.all_annotations.pop(file_name, None)
 
@@ -1488,12 +1565,56 @@ class ImageController(QObject):
                 self.mw.image_label.setPixmap(pixmap)
                 self.mw.image_label.adjustSize()
                 self.refresh_onion_skin()
+                self.prefetch_sam_features()
             else:
                 logger.warning("Null pixmap")
         else:
             self.mw.image_label.clear()
             logger.debug("No current image to display")
 
+    # --- SAM encoder prefetch ---
+
+    def prefetch_sam_features(self):
+        """Start encoding the image on screen, and the one after it, for SAM
+        prompts, so the first box or point on an image does not wait for the
+        image encoder. A no-op unless a SAM model is loaded."""
+        sam_utils = getattr(self.mw, "sam_utils", None)
+        if sam_utils is None or not sam_utils.current_sam_model:
+            return
+        sam_utils.prefetch_features([self.mw.current_image, self._next_image_source()])
+
+    def _next_image_source(self):
+        """The next slice as a ``QImage`` when it is already materialised, the
+        next plain image in the list as a file path, else ``None``.
+
+        Never decodes anything here: a slice not in the LRU and a multi-slice
+        file are left for when the user actually gets there.
+        """
+        names = slice_names(self.mw.slices)
+        if names:
+            if self.mw.current_slice not in names:
+                return None
+            index = names.index(self.mw.current_slice) + 1
+            if index >= len(names):
+                return None
+            if isinstance(self.mw.slices, LazySliceList):
+                return self.mw.slices.cached(names[index])
+            return self.mw.slices[index][1]
+        image_list = getattr(self.mw, "image_list", None)
+        if image_list is None:
+            return None
+        item = image_list.item(image_list.currentRow() + 1)
+        if item is None:
+            return None
+        file_name = item.text()
+        info = next((i for i in self.mw.all_images if i["file_name"] == file_name), None)
+        if info is None or info.get("is_multi_slice", False):
+            return None
+        path = self.mw.image_paths.get(file_name) or os.path.join(
+            self.mw.current_project_dir or "", "images", file_name
+        )
+        return path if os.path.exists(path) else None
+
     # --- Onion skin (issue #67) ---
 
     def onion_available(self) -> bool:
@@ -1509,16 +1630,21 @@ class ImageController(QObject):
         would put a cache lookup, and on a miss a full decode, in the pan and
         zoom path.
 
-        Neighbours are fetched through the same ``LazySliceList.get`` every
-        other consumer uses, so the shared bounded LRU (ADR-036) stays the only
-        owner of decoded slice pixels. In the default single-neighbour mode
-        that is one extra live decode; "both" makes it two, which is why the
-        LRU capacity of 8 is left alone rather than quietly raised.
+        For a lazy stack or video the image ghosts are prepared off the GUI
+        thread (``widgets/onion_ghosts``): the neighbour is extracted -- or,
+        when the shared LRU (ADR-036) already holds it, taken from there -- and
+        scaled on a worker, then swapped in when ready. The preparer keeps only
+        the ghosts on screen plus the slice just left, which is what a
+        one-slice step turns into the next ghost. A plain slice list (legacy,
+        tests) is still decoded through ``get`` on the spot.
         """
         label = self.mw.image_label
         label.set_onion_pixmaps([])
         label.set_onion_annotations([])
+        preparer = self._onion_preparer
         if not self.mw.onion_enabled or not self.mw.current_slice:
+            if preparer is not None:
+                preparer.clear()
             return
 
         slices = self.mw.slices
@@ -1537,12 +1663,19 @@ class ImageController(QObject):
             label.set_onion_annotations(self._onion_annotations_for(names))
 
         if not onion.wants_image(self.mw.onion_content):
+            if preparer is not None:
+                preparer.clear()
             return  # nothing will draw the pixels; don't pay to decode them
 
         getter = getattr(slices, "get", None)
         if getter is None:
             return  # plain-list slice collection (legacy/tests): nothing to do
 
+        provider = getattr(slices, "provider", None)
+        if provider is not None:
+            self._prepare_onion_ghosts(slices, provider, names)
+            return
+
         pixmaps = []
         for name in names:
             qimage = getter(name)
@@ -1551,6 +1684,37 @@ class ImageController(QObject):
             pixmaps.append(QPixmap.fromImage(qimage))
         label.set_onion_pixmaps(pixmaps)
 
+    def _prepare_onion_ghosts(self, slices, provider, names):
+        preparer = self._onion_preparer
+        if preparer is None:
+            preparer = self._onion_preparer = OnionGhostPreparer(
+                self.mw.image_label, parent=self.mw.image_label
+            )
+        threaded = getattr(provider, "thread_safe_extract", False)
+        sources = []
+        for name in names:
+            image = slices.cached(name)
+            if image is None:
+                # A video frame is decoded here: its capture is not ours to
+                # seek from another thread. Scaling still goes to the worker.
+                image = partial(provider.extract, name) if threaded else slices.get(name)
+            sources.append(((provider.provider_id, name), image))
+        preparer.show(sources)
+        label = self.mw.image_label
+        preparer.remember(
+            (provider.provider_id, self.mw.current_slice),
+            self.mw.current_image,
+            label.scaled_pixmap,
+            label.zoom_factor,
+        )
+
+    def wait_for_onion_ghosts(self):
+        """Let in-flight ghost workers finish (window close, tests)."""
+        preparer = self._onion_preparer
+        if preparer is not None:
+            preparer.clear()
+            preparer.wait()
+
     def _onion_annotations_for(self, names):
         """Committed annotations of the neighbour slices, grouped by class.
 
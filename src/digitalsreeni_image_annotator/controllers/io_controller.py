@@ -300,6 +300,7 @@ def import_annotations(mw):
             )
             return
 
+    mw.image_controller.note_annotations_changed()
     for image_name, annotations in imported_annotations.items():
         if image_name not in mw.image_paths:
             continue
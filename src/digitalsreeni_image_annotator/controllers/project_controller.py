@@ -195,6 +195,7 @@ class ProjectController(QObject):
         self.mw.image_paths = project_data.get("image_paths", {})
 
         self.mw.all_annotations.clear()
+        self.mw.image_controller.note_annotations_changed()
         for image_info in project_data["images"]:
             if image_info.get("is_multi_slice", False):
                 for slice_info in image_info.get("slices", []):
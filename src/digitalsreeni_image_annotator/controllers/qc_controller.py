@@ -4,9 +4,20 @@ The rules themselves live in :mod:`core.annotation_qc`, Qt-free so the headless
 CLI can run them as a CI gate (issue #76). This controller is the GUI adapter:
 it gathers the inputs the engine needs (annotations, image sizes, class names),
 shows the dialog, and applies repairs through the undo choke point.
+
+**Live checks.** With Tools > Check While Annotating on, every edit schedules
+the per-image rules (geometry, pose, redundancy) for the image it touched.
+Edits are coalesced for ``LIVE_QC_DELAY_MS``; the image's annotations are
+copied on the GUI thread and checked on a worker thread within
+``LIVE_QC_BUDGET_S`` (:func:`annotation_qc.check_image`). The results form
+:attr:`QCController.live_findings`, which the image list reads to badge the
+rows with problems. A result for an image edited again since it was
+scheduled is dropped: the newer check is already on its way.
 """
 
-from PyQt6.QtCore import QObject
+import copy
+
+from PyQt6.QtCore import QObject, QThread, QTimer, pyqtSignal
 from PyQt6.QtWidgets import QMessageBox
 
 from ..core import annotation_qc
@@ -15,12 +26,69 @@ from ..core.slice_cache import slice_names
 
 logger = get_logger(__name__)
 
+# Quiet time after an edit before the live check starts. A drag or a burst of
+# vertex edits is checked once, when it settles.
+LIVE_QC_DELAY_MS = 400
+
+# Seconds one live check may take before its remaining rule groups are
+# skipped (annotation_qc.check_image).
+LIVE_QC_BUDGET_S = 0.5
+
+_SEVERITY_LABELS = {
+    annotation_qc.SEVERITY_ERROR: "error",
+    annotation_qc.SEVERITY_WARNING: "warning",
+    annotation_qc.SEVERITY_INFO: "note",
+}
+
+
+class _LiveCheckThread(QThread):
+    """Runs ``check_image`` over ``[(image, generation, by_class, size), ...]``.
+
+    The annotations are private copies, so nothing here touches the window.
+    """
+
+    checked = pyqtSignal(str, int, list, bool)
+
+    def __init__(self, jobs, config, budget):
+        super().__init__()
+        self.jobs = jobs
+        self.config = config
+        self.budget = budget
+
+    def run(self):
+        for image, generation, by_class, size in self.jobs:
+            if self.isInterruptionRequested():
+                return
+            try:
+                findings, complete = annotation_qc.check_image(
+                    image, by_class, size, self.config, self.budget
+                )
+            except Exception:
+                logger.exception("Live QC check of %s failed", image)
+                continue
+            self.checked.emit(image, generation, findings, complete)
+
 
 class QCController(QObject):
     def __init__(self, main_window):
         super().__init__(main_window)
         self.mw = main_window
         self.config = annotation_qc.QCConfig()
+        self.live_enabled = False
+        # {image or slice name: [Finding, ...]}, only images with findings.
+        self.live_findings = {}
+        # {image or slice name: the image-list row it belongs to}
+        self._live_rows = {}
+        self._live_pending = {}
+        self._live_generation = {}
+        # Source of the generations above. Never reset, so a result still in
+        # flight from before a clear_live cannot match a later edit.
+        self._live_serial = 0
+        self._live_thread = None
+        self._live_timer = QTimer(self)
+        self._live_timer.setSingleShot(True)
+        self._live_timer.setInterval(LIVE_QC_DELAY_MS)
+        self._live_timer.timeout.connect(self._start_live_checks)
 
     def collect_image_sizes(self):
         """``{image_or_slice_name: (width, height)}`` for the whole project.
@@ -77,6 +145,7 @@ class QCController(QObject):
                 image_sizes=self.collect_image_sizes(),
                 class_names=list(self.mw.image_label.class_colors.keys()),
                 config=self.config,
+                stats=self.mw.image_controller.annotation_statistics(),
             )
         except Exception:
             logger.exception("Annotation QC audit failed")
@@ -99,6 +168,121 @@ class QCController(QObject):
 
         AnnotationQCDialog(self.mw, findings).exec()
 
+    # --- live checks ------------------------------------------------------
+
+    def set_live_enabled(self, enabled):
+        """Turn live checks on (starting with the image on screen) or off
+        (dropping every live finding)."""
+        self.live_enabled = bool(enabled)
+        if self.live_enabled:
+            self.schedule_live_check()
+        else:
+            self.clear_live()
+
+    def on_annotation_committed(self, _annotation):
+        self.schedule_live_check()
+
+    def schedule_live_check(self, key=None):
+        """Check ``key`` (default: the image on screen) once edits settle."""
+        if not self.live_enabled or self.mw.is_loading_project:
+            return
+        current = self.mw.current_slice or self.mw.image_file_name
+        key = key or current
+        if not key:
+            return
+        self._live_serial += 1
+        self._live_generation[key] = self._live_serial
+        # A slice is badged on its image's row.
+        if key == current:
+            row = self.mw.image_file_name
+        else:
+            row = self.mw.image_controller.owner_of(key) or key
+        self._live_pending[key] = row
+        self._live_timer.start()
+
+    def _start_live_checks(self):
+        if self._live_thread is not None or not self._live_pending:
+            return  # the running check starts the next batch when it ends
+        current = self.mw.current_slice or self.mw.image_file_name
+        jobs = []
+        for key, row in self._live_pending.items():
+            # The image on screen is edited on the label, and only written
+            # back to all_annotations later; that working copy is the truth.
+            if key == current:
+                by_class = self.mw.image_label.annotations
+            else:
+                by_class = self.mw.all_annotations.get(key) or {}
+            self._live_rows[key] = row
+            jobs.append((
+                key, self._live_generation[key], copy.deepcopy(by_class),
+                self._size_of(key, current),
+            ))
+        self._live_pending = {}
+        thread = self._live_thread = _LiveCheckThread(jobs, self.config, LIVE_QC_BUDGET_S)
+        thread.checked.connect(self._on_live_checked)
+        thread.finished.connect(self._on_live_finished)
+        thread.start()
+
+    def _size_of(self, key, current):
+        pixmap = self.mw.image_label.original_pixmap
+        if key == current and pixmap is not None:
+            return (pixmap.width(), pixmap.height())
+        return self.collect_image_sizes().get(key)
+
+    def _on_live_checked(self, image, generation, findings, complete):
+        if generation != self._live_generation.get(image):
+            return  # edited again, or live checks were reset, since scheduled
+        if not complete:
+            logger.debug("Live QC of %s ran out of time; findings are partial", image)
+        if findings:
+            self.live_findings[image] = findings
+        else:
+            self.live_findings.pop(image, None)
+        self.mw.image_list.viewport().update()
+
+    def _on_live_finished(self):
+        thread, self._live_thread = self._live_thread, None
+        if thread is not None:
+            thread.deleteLater()
+        self._start_live_checks()
+
+    def live_badge(self, row_name):
+        """``(worst severity, summary)`` of the live findings on an image-list
+        row (the image and any of its slices), or None."""
+        counts = {}
+        for image, findings in self.live_findings.items():
+            if self._live_rows.get(image) != row_name:
+                continue
+            for finding in findings:
+                counts[finding.severity] = counts.get(finding.severity, 0) + 1
+        if not counts:
+            return None
+        severities = [severity for severity in _SEVERITY_LABELS if severity in counts]
+        summary = ", ".join(
+            f"{counts[severity]} {_SEVERITY_LABELS.get(severity, severity)}(s)"
+            for severity in severities
+        )
+        return severities[0], f"Live check: {summary}"
+
+    def clear_live(self):
+        """Forget every live finding and ignore the checks still in flight."""
+        self._live_timer.stop()
+        self._live_pending = {}
+        self._live_generation = {}
+        self._live_rows = {}
+        self.live_findings = {}
+        if self._live_thread is not None:
+            self._live_thread.requestInterruption()
+        self.mw.image_list.viewport().update()
+
+    def wait_for_live_checks(self, msecs=5000):
+        """Block until the running live check has finished (tests, shutdown)."""
+        self._live_timer.stop()
+        self._live_pending = {}
+        if self._live_thread is not None:
+            self._live_thread.requestInterruption()
+            self._live_thread.wait(msecs)
+
     def fix_findings(self, findings):
         """Repair every fixable finding. Returns the number actually changed.
 
@@ -151,6 +335,8 @@ class QCController(QObject):
             self.mw.update_annotation_list()
         self.mw.image_label.update()
         self.mw.auto_save()
+        for image in snapshotted:
+            self.schedule_live_check(image)
         logger.info(
             "QC repaired %d finding(s) across %d image(s)", repaired, len(snapshotted)
         )
@@ -20,21 +20,69 @@ annotations through the existing review overlay, and the existing accept/reject
 path applies.
 """
 
+import functools
+import hashlib
+import json
 import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 
-from PyQt6.QtCore import QObject
-from PyQt6.QtWidgets import QApplication, QMessageBox, QProgressDialog
+from PyQt6.QtCore import QEventLoop, QObject, Qt
+from PyQt6.QtWidgets import QMessageBox, QProgressDialog
 
 from ..core import disagreement
 from ..core.logging_config import get_logger
+from ..core.prediction_cache import PredictionCache
 from ..core.slice_cache import slice_names
 from ..core.video_handler import is_video
+from ..inference.batch_detection import (
+    BatchDetectionWorker,
+    read_image_rgb,
+    slice_loaders,
+)
+from ..inference.embedding_utils import content_hash, slice_digest
 
 logger = get_logger(__name__)
 
 MODE_DISAGREEMENT = "disagreement"
 MODE_UNCERTAINTY = "uncertainty"
 
+# Images per model call. Large enough to amortise the per-call overhead over a
+# video's frames, small enough that a batch of full-size images fits on an
+# 8 GB GPU.
+REVIEW_BATCH_IMAGES = 8
+
+# Threads scoring predictions against the labels while the model runs.
+SCORING_WORKERS = min(4, os.cpu_count() or 1)
+
+
+def score_predictions(ground_truth, predictions):
+    """The score record of one image: disagreement with its labels, or the
+    model's uncertainty when it has none. Qt-free, so it runs on the scoring
+    pool."""
+    if ground_truth:
+        score, breakdown = disagreement.disagreement_score(ground_truth, predictions)
+        mode = MODE_DISAGREEMENT
+    else:
+        score, breakdown = disagreement.uncertainty_score(predictions)
+        mode = MODE_UNCERTAINTY
+    return {"score": score, "mode": mode, "breakdown": breakdown}
+
+
+@dataclass
+class _ReviewRun:
+    """State of the run in flight, for the item callback."""
+
+    progress: QProgressDialog
+    pool: ThreadPoolExecutor
+    cache: PredictionCache
+    model_key: str | None
+    digest_of: dict
+    digests: dict = field(default_factory=dict)
+    processed: int = 0
+    cached: int = 0
+    futures: dict = field(default_factory=dict)
+
 
 class ReviewController(QObject):
     def __init__(self, main_window):
@@ -42,6 +90,11 @@ class ReviewController(QObject):
         self.mw = main_window
         # name -> {"score", "mode", "breakdown", "model"}
         self.scores = {}
+        # file name -> highest slice score, for the image-list row of a stack.
+        self.stack_scores = {}
+        self._run = None
+        self._cache = None
+        self._digests = {}
         # The model identity the current scores belong to. Scores from a
         # previous training round say nothing about the model you just
         # trained, so they are dropped rather than silently reused.
@@ -50,33 +103,115 @@ class ReviewController(QObject):
     # --- collection ---
 
     def collect_work_items(self):
-        """``[(image_name, image_path)]`` for every scorable image.
-
-        Only plain 2D images: prediction runs from a file path, and neither a
-        multi-dimensional stack nor a video has one per slice. That limit is
-        the same one ``predict_single_image`` already enforces, and it is
-        reported rather than silently applied.
+        """``([(name, load, digest), ...], readers, skipped)`` for a review run.
+
+        ``load()`` decodes one item to an RGB array on the batch worker's
+        decode thread, exactly as for "Detect All Images": plain images are
+        read from disk, stacks contribute one item per slice and videos one per
+        frame (``batch_detection.slice_loaders``), each scored under the slice
+        name its annotations are stored under. ``readers`` are the video
+        readers the loaders share. ``skipped`` names the images the run cannot
+        cover -- a missing file, or a stack whose slices were never loaded in
+        this session -- so the report can say so. ``digest()`` is the item's
+        key in the prediction cache: the file's content hash, or for a slice
+        the source's hash with the slice coordinate (``slice_digest``, as
+        curation keys its embeddings).
         """
         items = []
+        readers = []
+        skipped = []
         for info in self.mw.all_images:
             file_name = info.get("file_name")
             if not file_name:
                 continue
             if info.get("is_multi_slice") or info.get("is_video") or is_video(file_name):
+                base_name = os.path.splitext(file_name)[0]
+                slices = self.mw.image_slices.get(base_name)
+                loaders = slice_loaders(slices, readers) if slices else None
+                if not loaders:
+                    logger.warning("Review skips %s: its slices are not loaded", file_name)
+                    skipped.append(file_name)
+                    continue
+                source = self.mw.image_paths.get(file_name)
+                dimensions = getattr(getattr(slices, "provider", None), "dimensions", None)
+                items.extend(
+                    (name, load, functools.partial(
+                        self._slice_digest, source, name, dimensions
+                    ))
+                    for name, load in loaders
+                )
                 continue
             path = self.mw.image_paths.get(file_name)
             if path and os.path.exists(path):
-                items.append((file_name, path))
-        return items
-
-    def skipped_count(self):
-        """How many images the run cannot cover, for an honest UI message."""
-        return len(self.mw.all_images) - len(self.collect_work_items())
+                items.append((
+                    file_name,
+                    functools.partial(read_image_rgb, path),
+                    functools.partial(self._source_digest, path),
+                ))
+            else:
+                skipped.append(file_name)
+        return items, readers, skipped
+
+    def _source_digest(self, path):
+        """Content hash of ``path``, computed at most once per run."""
+        if path not in self._digests:
+            self._digests[path] = content_hash(path) if path else None
+        return self._digests[path]
+
+    def _slice_digest(self, source, name, dimensions):
+        return slice_digest(self._source_digest(source), name, dimensions)
+
+    def cache(self):
+        """The prediction cache, beside the project file; in memory for a
+        project-less session. Reopened when the project changes."""
+        project_file = getattr(self.mw, "current_project_file", None)
+        directory = os.path.dirname(project_file) if project_file else None
+        if self._cache is None or self._cache.directory != directory:
+            self._cache = PredictionCache(directory)
+        return self._cache
+
+    def model_key(self, trainer):
+        """Identity of what the model would predict, or ``None``.
+
+        A digest of the weights themselves rather than of a path: after
+        training, the model in memory is not the checkpoint
+        ``loaded_model_path`` names, and a path says nothing about a file
+        overwritten in place. The class names and the confidence threshold
+        are part of it because both change the predictions. ``None`` (no
+        caching) when the weights cannot be read.
+        """
+        try:
+            digest = hashlib.blake2b(digest_size=16)
+            for name, tensor in trainer.model.model.state_dict().items():
+                digest.update(name.encode())
+                digest.update(tensor.detach().cpu().numpy().tobytes())
+        except Exception:
+            logger.debug("no weights digest for the review model", exc_info=True)
+            return None
+        names = getattr(trainer.model, "names", None) or {}
+        digest.update(json.dumps(
+            {"names": {str(k): v for k, v in dict(names).items()},
+             "conf": getattr(trainer, "conf_threshold", None)},
+            sort_keys=True,
+        ).encode())
+        return digest.hexdigest()
 
     # --- run ---
 
     def run(self):
-        """Score every scorable image with the loaded prediction model."""
+        """Score every image, slice and frame with the loaded prediction model.
+
+        Everything runs on the streaming pipeline of "Detect All Images"
+        (:class:`~inference.batch_detection.BatchDetectionWorker`). Its decode
+        thread hashes each item and looks it up in the prediction cache first:
+        predictions kept for this model and these pixels are re-scored
+        against the current labels without decoding or inference. The rest
+        are decoded ahead of the model, which sees
+        :data:`REVIEW_BATCH_IMAGES` of them per call, and each item's
+        predictions are scored against its labels on a thread pool while the
+        next batch runs. Cancelling -- hashing included -- keeps the scores of
+        the items already done.
+        """
         trainer = getattr(self.mw, "yolo_trainer", None)
         if trainer is None or getattr(trainer, "model", None) is None:
             QMessageBox.warning(
@@ -86,65 +221,149 @@ class ReviewController(QObject):
             )
             return
 
-        items = self.collect_work_items()
+        items, readers, skipped = self.collect_work_items()
         if not items:
             QMessageBox.information(
                 self.mw,
                 "Review with model",
-                "No plain 2D images to score. Multi-dimensional stacks and "
-                "videos are not covered by this run.",
+                "No images to score. Open a stack or video once to load its "
+                "slices before reviewing it.",
             )
             return
 
         self.mw.save_current_annotations()
 
+        cache = self.cache()
+        model_key = self.model_key(trainer)
+        pool = ThreadPoolExecutor(SCORING_WORKERS)
+        self._digests = {}
+
         progress = QProgressDialog(
             "Scoring images…", "Cancel", 0, len(items), self.mw
         )
         progress.setWindowTitle("Review with model")
+        progress.setWindowModality(Qt.WindowModality.WindowModal)
         progress.setMinimumDuration(0)
 
+        run = self._run = _ReviewRun(
+            progress, pool, cache, model_key,
+            {name: digest for name, _load, digest in items},
+        )
+        worker = BatchDetectionWorker(
+            [(name, load) for name, load, _digest in items],
+            functools.partial(self._predict_batch, trainer),
+            batch_size=REVIEW_BATCH_IMAGES,
+            readers=readers,
+            # Without a model key nothing is cached, so nothing is hashed.
+            lookup=None if model_key is None else functools.partial(self._lookup, run),
+        )
+        worker.item_done.connect(self._on_item)
+        worker.item_cached.connect(self._on_cached)
+        progress.canceled.connect(worker.cancel)
+        loop = QEventLoop()
+        worker.finished.connect(loop.quit)
+        try:
+            worker.start()
+            loop.exec()
+            worker.wait()
+            pool.shutdown(wait=True)
+        finally:
+            self._run = None
+            cache.save()
+        logger.info(
+            "Review: %d item(s) from the prediction cache, %d predicted",
+            run.cached, run.processed - run.cached,
+        )
+        if worker.canceled:
+            logger.info("Review run cancelled after %d item(s)", run.processed)
+        progress.setValue(len(items))
+        progress.close()
+
         scores = {}
-        for index, (file_name, path) in enumerate(items):
-            progress.setValue(index)
-            progress.setLabelText(f"Scoring {file_name}…")
-            QApplication.processEvents()
-            if progress.wasCanceled():
-                logger.info("Review run cancelled after %d image(s)", index)
-                break
+        for name, future in run.futures.items():
             try:
-                scores[file_name] = self.score_image(file_name, path, trainer)
+                scores[name] = future.result()
             except Exception:
-                logger.exception("Scoring failed for %s", file_name)
-        progress.setValue(len(items))
-
+                logger.exception("Scoring failed for %s", name)
         if not scores:
             return
 
         self.scores = scores
+        self.stack_scores = self._stack_scores(scores)
         self.scored_model = getattr(trainer, "model_path", None) or id(trainer.model)
         self.mw.image_controller.refresh_image_list_scores()
-        self._report(scores)
+        self._report(scores, skipped)
+
+    def _predict_batch(self, trainer, batch):
+        """Predictions for one batch of ``[(name, array), ...]`` (worker thread)."""
+        results = trainer.predict_batch([image for _name, image in batch])
+        return [
+            self.extract_predictions([result], name)
+            for (name, _image), result in zip(batch, results)
+        ]
 
-    def score_image(self, file_name, path, trainer):
-        """Score one image. Returns the score record; never mutates anything."""
-        predictions = self.extract_predictions(trainer.predict(path), file_name)
+    def _lookup(self, run, name):
+        """Cached predictions for ``name``, or ``None`` (decode thread).
+
+        Hashing reads the whole source file, which is why it happens here and
+        not before the run starts.
+        """
+        digest = run.digests[name] = run.digest_of[name]()
+        return run.cache.get(run.model_key, digest)
+
+    def _on_cached(self, name, predictions):
+        """Predictions the cache had for ``name`` (GUI thread): score them."""
+        run = self._run
+        if run is None:
+            return
+        run.cached += 1
+        self._on_item(name, predictions, cached=True)
+
+    def _on_item(self, name, predictions, cached=False):
+        """One item's predictions back from the worker (GUI thread): queue its
+        scoring against the labels as they are now."""
+        run = self._run
+        if run is None:
+            return
+        run.processed += 1
+        run.progress.setValue(run.processed)
+        if predictions is None:
+            return  # failed to decode or predict; logged by the worker
+        if not cached:
+            run.cache.put(run.model_key, run.digests.get(name), predictions)
+        self._submit(run, name, predictions)
+
+    def _submit(self, run, name, predictions):
+        """Score ``name`` on the pool against its labels as they are now."""
+        run.futures[name] = run.pool.submit(
+            score_predictions, self._ground_truth(name), predictions
+        )
 
-        ground_truth = [
+    def _ground_truth(self, name):
+        return [
             annotation
-            for annotations in (self.mw.all_annotations.get(file_name) or {}).values()
+            for annotations in (self.mw.all_annotations.get(name) or {}).values()
             for annotation in annotations
         ]
 
-        if ground_truth:
-            score, breakdown = disagreement.disagreement_score(
-                ground_truth, predictions
-            )
-            mode = MODE_DISAGREEMENT
-        else:
-            score, breakdown = disagreement.uncertainty_score(predictions)
-            mode = MODE_UNCERTAINTY
-        return {"score": score, "mode": mode, "breakdown": breakdown}
+    def _stack_scores(self, scores):
+        """``{file name: highest slice score}`` for the stacks and videos scored.
+
+        The image list has one row per file, so a stack's row shows its worst
+        slice: the question the row answers is where to start looking.
+        """
+        rows = {}
+        for info in self.mw.all_images:
+            file_name = info.get("file_name")
+            if not file_name or file_name in scores:
+                continue
+            slices = self.mw.image_slices.get(os.path.splitext(file_name)[0])
+            values = [
+                scores[name]["score"] for name in slice_names(slices) if name in scores
+            ]
+            if values:
+                rows[file_name] = max(values)
+        return rows
 
     def extract_predictions(self, results, file_name):
         """Ultralytics results -> annotation-shaped dicts for scoring.
@@ -182,11 +401,10 @@ class ReviewController(QObject):
                 predictions.append(entry)
         return predictions
 
-    def _report(self, scores):
+    def _report(self, scores, skipped=()):
         ranked = disagreement.rank(
             {name: record["score"] for name, record in scores.items()}
         )
-        skipped = self.skipped_count()
         top = ", ".join(f"{name} ({value:.1f})" for name, value in ranked[:3])
         message = (
             f"Scored {len(scores)} image(s). Highest disagreement: {top}.\n\n"
@@ -195,8 +413,8 @@ class ReviewController(QObject):
         )
         if skipped:
             message += (
-                f"\n\n{skipped} image(s) were not scored: multi-dimensional "
-                "stacks and videos are outside this run."
+                f"\n\n{len(skipped)} image(s) were not scored: the file is "
+                "missing, or the stack or video was not opened in this session."
             )
         pose_skipped = sum(
             record["breakdown"].get("skipped_pose", 0) for record in scores.values()
@@ -211,8 +429,10 @@ class ReviewController(QObject):
     # --- lookups used by the image list ---
 
     def score_for(self, file_name):
+        """The score of an image or slice; for a stack or video, its worst
+        slice (see :meth:`_stack_scores`)."""
         record = self.scores.get(file_name)
-        return record["score"] if record else None
+        return record["score"] if record else self.stack_scores.get(file_name)
 
     def mode_for(self, file_name):
         """Which question this image's score answers, or ``None``.
@@ -237,6 +457,7 @@ class ReviewController(QObject):
         worse than none because it still looks authoritative.
         """
         self.scores = {}
+        self.stack_scores = {}
         self.scored_model = None
         self.mw.image_controller.refresh_image_list_scores()
 
@@ -19,6 +19,8 @@ Clicking one assigns the active class, which is what makes the digit hotkeys
 from issue #65 the difference between "many clicks" and "fast".
 """
 
+import threading
+
 from PyQt6.QtCore import QObject
 from PyQt6.QtWidgets import QApplication, QMessageBox, QProgressDialog
 
@@ -76,11 +78,19 @@ class SegmentEverythingController(QObject):
         )
         progress.setWindowTitle("Segment Everything")
         progress.setMinimumDuration(0)
+        # A tiled run checks this between tiles, so Cancel takes effect
+        # without waiting for the rest of the image.
+        stop = threading.Event()
+        progress.canceled.connect(stop.set)
         progress.show()
         QApplication.processEvents()
         cancelled = False
         try:
-            proposals = self.mw.sam_utils.apply_sam_everything(self.mw.current_image)
+            proposals = self.mw.sam_utils.apply_sam_everything(
+                self.mw.current_image,
+                tiled=self.mw.segment_everything_tiled_checkbox.isChecked(),
+                stop=stop,
+            )
         except InferenceBusyError:
             QMessageBox.warning(
                 self.mw,
@@ -0,0 +1,98 @@
+"""Annotation counts per key and per image-list row, kept up to date by edits.
+
+The image list's status badges and its "with / without annotations" filter
+used to ask :meth:`ImageController.image_has_annotations` about every row
+after every annotation mutation. For a stack that is a scan of every slice
+name -- or, before its slices are loaded, of every key in ``all_annotations``
+-- so one edit in a project of 10 000 stacks meant millions of lookups before
+the canvas could repaint.
+
+The index keeps how many annotations each ``all_annotations`` key holds and
+the sum per row (the image's file name: a plain image is its own key, a
+stack's or video's slices and frames belong to its file). An edit updates
+the one key it touched and reports whether that row's annotated status
+flipped, so the caller repaints only those rows.
+
+What belongs to which row is decided by the caller (``owner_of``), with the
+same rules ``image_has_annotations`` applies.
+
+Qt-free.
+"""
+
+from collections.abc import Callable, Iterable, Mapping
+from typing import Any
+
+
+def annotation_count(by_class: Mapping[str, Any] | None) -> int:
+    """Annotations in one key's ``{class: [annotation, ...]}``."""
+    return sum(len(annotations) for annotations in by_class.values()) if by_class else 0
+
+
+class AnnotationIndex:
+    """``{key: count}`` with the per-row totals maintained alongside."""
+
+    def __init__(self) -> None:
+        self._counts: dict[str, int] = {}
+        self._owners: dict[str, str | None] = {}
+        self._totals: dict[str, int] = {}
+
+    def rebuild(
+        self,
+        all_annotations: Mapping[str, Any],
+        owner_of: Callable[[str], str | None],
+    ) -> None:
+        """Count every key from scratch."""
+        self._counts.clear()
+        self._owners.clear()
+        self._totals.clear()
+        for key, by_class in all_annotations.items():
+            self._set(key, annotation_count(by_class), owner_of(key))
+
+    def update(
+        self,
+        key: str,
+        by_class: Mapping[str, Any] | None,
+        owner: str | None,
+        present: bool = True,
+    ) -> list[str]:
+        """Recount ``key``; the rows whose annotated status flipped.
+
+        ``present=False`` drops a key deleted from ``all_annotations``, so the
+        index keeps one entry per key and a caller can compare lengths to
+        notice a key it was never told about.
+        """
+        rows = {row for row in (self._owners.get(key), owner) if row}
+        before = {row: self.annotated(row) for row in rows}
+        self._set(key, annotation_count(by_class), owner, present)
+        return sorted(row for row in rows if self.annotated(row) != before[row])
+
+    def _set(self, key: str, count: int, owner: str | None, present: bool = True) -> None:
+        old_owner = self._owners.pop(key, None)
+        old_count = self._counts.pop(key, 0)
+        if old_owner is not None and old_count:
+            remaining = self._totals[old_owner] - old_count
+            if remaining:
+                self._totals[old_owner] = remaining
+            else:
+                del self._totals[old_owner]
+        if not present:
+            return
+        self._owners[key] = owner
+        if count:
+            self._counts[key] = count
+            if owner is not None:
+                self._totals[owner] = self._totals.get(owner, 0) + count
+
+    def count(self, file_name: str) -> int:
+        """Annotations on a row: the image, or all of a stack's slices."""
+        return self._totals.get(file_name, 0)
+
+    def annotated(self, file_name: str | None) -> bool:
+        return bool(file_name) and file_name in self._totals
+
+    def keys(self) -> Iterable[str]:
+        """Every key counted, annotated or not."""
+        return self._owners.keys()
+
+    def __len__(self) -> int:
+        return len(self._owners)
@@ -20,11 +20,34 @@ touch. Only unambiguous repairs — repairing self-intersection, recomputing a
 bbox from its own polygon, clamping into bounds — are offered.
 """
 
-from dataclasses import dataclass, field
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
 from statistics import median
 
-from ..utils import calculate_area, calculate_bbox
-from .mask_filters import polygon_iou
+import numpy as np
+
+from ..utils import calculate_bbox
+from .annotation_stats import AnnotationStats, KeyStats, is_pose
+from .geometry import PackedPolygons, annotation_areas, keypoint_rows
+from .logging_config import get_logger
+from .mask_filters import overlapping_pairs
+
+logger = get_logger(__name__)
+
+# Part of every shard_key: bump it when a per-image rule changes what it
+# finds, so cached results from the old rules are not reused.
+QC_RULES_VERSION = 1
+
+# Processes for a sharded audit: one per core.
+AUDIT_WORKERS = os.cpu_count() or 1
+
+# Below this many images to audit, starting the processes costs more than the
+# audit.
+_PARALLEL_MIN_IMAGES = 64
 
 # --- severities ------------------------------------------------------------
 
@@ -113,16 +136,6 @@ def edit_distance(a: str, b: str) -> int:
     return previous[-1]
 
 
-def is_pose(annotation) -> bool:
-    """True for a pose instance.
-
-    Identified by the **absence** of a segmentation key, which is the
-    discriminator the whole app routes on (ADR-029). Polygon rules must skip
-    these entirely; they get their own group.
-    """
-    return "keypoints" in annotation and not annotation.get("segmentation")
-
-
 def _polygon_is_valid(segmentation):
     """``(is_valid, reason)`` for a flat coordinate ring."""
     from shapely.geometry import Polygon
@@ -154,79 +167,116 @@ def _iter_annotations(all_annotations):
 # --- individual rule groups ------------------------------------------------
 
 
+def _by_image(all_annotations):
+    """``(image, [(class_name, annotation), ...])`` in ``_iter_annotations``
+    order, so a rule can measure an image's annotations in one batch."""
+    for image, by_class in (all_annotations or {}).items():
+        yield image, [
+            (class_name, annotation)
+            for class_name, annotations in (by_class or {}).items()
+            for annotation in annotations or []
+        ]
+
+
 def check_geometry(all_annotations, image_sizes, config):
+    """Polygon validity, area, bounds and bbox consistency.
+
+    Areas, polygon bounds and derived boxes are measured for a whole image at
+    once (``core.geometry``); the per-annotation loop only compares numbers.
+    """
     findings = []
-    for image, class_name, annotation in _iter_annotations(all_annotations):
-        number = annotation.get("number")
-        if is_pose(annotation):
+    for image, entries in _by_image(all_annotations):
+        shapes = [(name, ann) for name, ann in entries if not is_pose(ann)]
+        if not shapes:
             continue
+        annotations = [annotation for _, annotation in shapes]
+        areas = annotation_areas(annotations)
+        bounds = PackedPolygons(
+            [annotation.get("segmentation") for annotation in annotations]
+        ).bounds()
+        derived_boxes = bounds.copy()
+        derived_boxes[:, 2:] -= derived_boxes[:, :2]
+        size = image_sizes.get(image) if image_sizes else None
 
-        segmentation = annotation.get("segmentation")
-        if segmentation:
-            vertex_count = len(segmentation) // 2
-            if vertex_count < 3:
+        for k, (class_name, annotation) in enumerate(shapes):
+            number = annotation.get("number")
+            segmentation = annotation.get("segmentation")
+            if segmentation:
+                vertex_count = len(segmentation) // 2
+                if vertex_count < 3:
+                    findings.append(Finding(
+                        RULE_TOO_FEW_VERTICES, SEVERITY_ERROR,
+                        f"Polygon has only {vertex_count} vertices.",
+                        image, class_name, number,
+                    ))
+                    continue
+                valid, reason = _polygon_is_valid(segmentation)
+                if not valid:
+                    findings.append(Finding(
+                        RULE_SELF_INTERSECTING, SEVERITY_ERROR,
+                        f"Invalid polygon: {reason}.",
+                        image, class_name, number, fixable=True,
+                    ))
+
+            area = float(areas[k])
+            if area < config.min_area:
                 findings.append(Finding(
-                    RULE_TOO_FEW_VERTICES, SEVERITY_ERROR,
-                    f"Polygon has only {vertex_count} vertices.",
+                    RULE_DEGENERATE_AREA, SEVERITY_ERROR,
+                    f"Annotation has effectively no area ({area:.2f} px2).",
                     image, class_name, number,
                 ))
-                continue
-            valid, reason = _polygon_is_valid(segmentation)
-            if not valid:
-                findings.append(Finding(
-                    RULE_SELF_INTERSECTING, SEVERITY_ERROR,
-                    f"Invalid polygon: {reason}.",
-                    image, class_name, number, fixable=True,
-                ))
-
-        area = calculate_area(annotation)
-        if area < config.min_area:
-            findings.append(Finding(
-                RULE_DEGENERATE_AREA, SEVERITY_ERROR,
-                f"Annotation has effectively no area ({area:.2f} px2).",
-                image, class_name, number,
-            ))
 
-        size = image_sizes.get(image) if image_sizes else None
-        if size:
-            width, height = size
-            if _out_of_bounds(annotation, width, height):
-                findings.append(Finding(
-                    RULE_OUT_OF_BOUNDS, SEVERITY_ERROR,
-                    f"Coordinates fall outside the {width}x{height} image.",
-                    image, class_name, number, fixable=True,
-                ))
+            if size:
+                width, height = size
+                if _out_of_bounds(annotation, width, height, bounds[k]):
+                    findings.append(Finding(
+                        RULE_OUT_OF_BOUNDS, SEVERITY_ERROR,
+                        f"Coordinates fall outside the {width}x{height} image.",
+                        image, class_name, number, fixable=True,
+                    ))
 
-        if segmentation and annotation.get("bbox") is not None:
-            derived = calculate_bbox(segmentation)
-            stored = annotation["bbox"]
-            if any(
-                abs(a - b) > config.bbox_tolerance for a, b in zip(derived, stored)
+            stored = annotation.get("bbox")
+            if segmentation and stored is not None and any(
+                abs(a - b) > config.bbox_tolerance
+                for a, b in zip(derived_boxes[k], stored)
             ):
                 findings.append(Finding(
                     RULE_BBOX_MISMATCH, SEVERITY_WARNING,
                     "Stored bounding box does not match the outline.",
                     image, class_name, number, fixable=True,
-                    detail={"stored": list(stored), "derived": derived},
+                    detail={
+                        "stored": list(stored),
+                        "derived": calculate_bbox(segmentation),
+                    },
                 ))
     return findings
 
 
-def _out_of_bounds(annotation, width, height):
+def _outside(points, x0, y0, x1, y1):
+    """Mask of the ``(k, 2)`` ``points`` outside ``[x0, x1] x [y0, y1]``."""
+    return ~(
+        (points[:, 0] >= x0) & (points[:, 0] <= x1)
+        & (points[:, 1] >= y0) & (points[:, 1] <= y1)
+    )
+
+
+def _out_of_bounds(annotation, width, height, polygon_bounds=None):
+    """``polygon_bounds`` is the segmentation's ``[min_x, min_y, max_x,
+    max_y]`` when the caller has already measured it."""
     segmentation = annotation.get("segmentation")
     if segmentation:
-        xs, ys = segmentation[0::2], segmentation[1::2]
-        if xs and (min(xs) < 0 or max(xs) > width):
-            return True
-        if ys and (min(ys) < 0 or max(ys) > height):
+        if polygon_bounds is None:
+            polygon_bounds = PackedPolygons([segmentation]).bounds()[0]
+        min_x, min_y, max_x, max_y = polygon_bounds
+        if min_x < 0 or max_x > width or min_y < 0 or max_y > height:
             return True
     keypoints = annotation.get("keypoints")
     if keypoints:
-        for i in range(0, len(keypoints) - 2, 3):
-            if keypoints[i + 2] <= 0:
-                continue  # v=0 points are padding pinned at (0, 0)
-            if not (0 <= keypoints[i] <= width and 0 <= keypoints[i + 1] <= height):
-                return True
+        rows = keypoint_rows(keypoints)
+        # v=0 points are padding pinned at (0, 0)
+        labelled = rows[rows[:, 2] > 0, :2]
+        if _outside(labelled, 0, 0, width, height).any():
+            return True
     bbox = annotation.get("bbox")
     if bbox and not segmentation and not keypoints:
         x, y, w, h = bbox
@@ -243,10 +293,11 @@ def check_pose(all_annotations, image_sizes, config):
     for image, class_name, annotation in _iter_annotations(all_annotations):
         if not is_pose(annotation):
             continue
-        keypoints = annotation.get("keypoints") or []
+        rows = keypoint_rows(annotation.get("keypoints"))
+        visible = rows[:, 2] > 0
         number = annotation.get("number")
 
-        labelled = sum(1 for i in range(2, len(keypoints), 3) if keypoints[i] > 0)
+        labelled = int(visible.sum())
         stated = annotation.get("num_keypoints")
         if stated is not None and stated != labelled:
             findings.append(Finding(
@@ -258,12 +309,9 @@ def check_pose(all_annotations, image_sizes, config):
         bbox = annotation.get("bbox")
         if bbox:
             x, y, w, h = bbox
-            outside = [
-                i // 3
-                for i in range(0, len(keypoints) - 2, 3)
-                if keypoints[i + 2] > 0
-                and not (x <= keypoints[i] <= x + w and y <= keypoints[i + 1] <= y + h)
-            ]
+            outside = np.flatnonzero(
+                visible & _outside(rows[:, :2], x, y, x + w, y + h)
+            ).tolist()
             if outside:
                 findings.append(Finding(
                     RULE_POSE_POINT_OUTSIDE_BBOX, SEVERITY_WARNING,
@@ -277,9 +325,9 @@ def check_pose(all_annotations, image_sizes, config):
 def check_redundancy(all_annotations, image_sizes, config):
     """Near-duplicates within a class and heavy cross-class overlap.
 
-    Pairwise IoU is O(n²), so ``polygon_iou`` rejects on bounding boxes before
-    doing any polygon work — on an image with thousands of annotations almost
-    every pair is nowhere near its partner.
+    Only pairs that actually overlap are compared (``overlapping_pairs``): on
+    an image with thousands of annotations almost every pair is nowhere near
+    its partner, and looping over all of them was the whole cost of the audit.
     """
     findings = []
     for image, by_class in (all_annotations or {}).items():
@@ -289,63 +337,71 @@ def check_redundancy(all_annotations, image_sizes, config):
             for annotation in annotations or []
             if annotation.get("segmentation")
         ]
-        for i in range(len(flat)):
+        pairs = overlapping_pairs([annotation["segmentation"] for _, annotation in flat])
+        for i, j, iou in pairs:
             class_a, ann_a = flat[i]
-            for j in range(i + 1, len(flat)):
-                class_b, ann_b = flat[j]
-                iou = polygon_iou(ann_a["segmentation"], ann_b["segmentation"])
-                if class_a == class_b:
-                    if iou >= config.duplicate_iou:
-                        findings.append(Finding(
-                            RULE_NEAR_DUPLICATE, SEVERITY_WARNING,
-                            f"Almost identical to annotation "
-                            f"#{ann_b.get('number')} (IoU {iou:.2f}).",
-                            image, class_a, ann_a.get("number"),
-                            detail={"other": ann_b.get("number"), "iou": iou},
-                        ))
-                elif iou >= config.cross_class_iou:
+            class_b, ann_b = flat[j]
+            if class_a == class_b:
+                if iou >= config.duplicate_iou:
                     findings.append(Finding(
-                        RULE_CROSS_CLASS_OVERLAP, SEVERITY_WARNING,
-                        f"Overlaps '{class_b}' annotation "
-                        f"#{ann_b.get('number')} heavily (IoU {iou:.2f}).",
+                        RULE_NEAR_DUPLICATE, SEVERITY_WARNING,
+                        f"Almost identical to annotation "
+                        f"#{ann_b.get('number')} (IoU {iou:.2f}).",
                         image, class_a, ann_a.get("number"),
-                        detail={"other_class": class_b, "iou": iou},
+                        detail={"other": ann_b.get("number"), "iou": iou},
                     ))
+            elif iou >= config.cross_class_iou:
+                findings.append(Finding(
+                    RULE_CROSS_CLASS_OVERLAP, SEVERITY_WARNING,
+                    f"Overlaps '{class_b}' annotation "
+                    f"#{ann_b.get('number')} heavily (IoU {iou:.2f}).",
+                    image, class_a, ann_a.get("number"),
+                    detail={"other_class": class_b, "iou": iou},
+                ))
     return findings
 
 
-def check_statistics(all_annotations, image_sizes, config):
+def check_statistics(all_annotations, image_sizes, config, stats=None):
     """Area outliers, class imbalance and unannotated images.
 
     These are informational by design. An outlier might be a genuinely large
     object; an imbalance might be the real distribution. Reporting is useful,
     auto-fixing would be wrong.
+
+    ``stats`` is an :class:`~core.annotation_stats.AnnotationStats` already
+    synced to ``all_annotations``; without one the project is measured here.
     """
+    stats = stats if stats is not None else AnnotationStats().sync(all_annotations or {})
+    measures = stats.qc_measures(all_annotations or {})
+    return _statistics(measures, all_annotations, image_sizes, config)
+
+
+def _statistics(measures, all_annotations, image_sizes, config):
+    """``check_statistics`` over ``(image, KeyStats.measures())`` pairs."""
     findings = []
 
     areas_by_class = {}
     counts = {}
-    for image, class_name, annotation in _iter_annotations(all_annotations):
-        counts[class_name] = counts.get(class_name, 0) + 1
-        if not is_pose(annotation):
-            areas_by_class.setdefault(class_name, []).append(
-                (image, annotation, calculate_area(annotation))
-            )
+    for image, measure in measures:
+        for class_name, count in measure["counts"].items():
+            counts[class_name] = counts.get(class_name, 0) + count
+        for class_name, number, area in measure["areas"]:
+            areas_by_class.setdefault(class_name, []).append((image, number, area))
 
     for class_name, entries in areas_by_class.items():
-        areas = [area for _image, _ann, area in entries if area > 0]
+        areas = [area for _image, _number, area in entries if area > 0]
         if len(areas) < 4:
             continue  # a median over three samples says nothing
         class_median = median(areas)
         if class_median <= 0:
             continue
-        for image, annotation, area in entries:
+        for image, number, area in entries:
             if area > class_median * config.outlier_factor:
                 findings.append(Finding(
                     RULE_AREA_OUTLIER, SEVERITY_INFO,
                     f"Area {area:.0f} px2 is {area / class_median:.1f}x the "
                     f"median for '{class_name}'.",
-                    image, class_name, annotation.get("number"),
+                    image, class_name, number,
                     detail={"area": area, "median": class_median},
                 ))
 
@@ -417,7 +473,70 @@ def check_hygiene(all_annotations, class_names, config):
 # --- entry point -----------------------------------------------------------
 
 
-def run_audit(all_annotations, image_sizes=None, class_names=None, config=None):
+def shard_key(image, by_class, size, config):
+    """Digest of everything :func:`audit_image` reads for one image, so a
+    cached result is reused only while all of it is unchanged."""
+    text = json.dumps(
+        [QC_RULES_VERSION, image, by_class, size, asdict(config)],
+        sort_keys=True, separators=(",", ":"), default=str,
+    )
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def audit_image(image, by_class, size, config):
+    """The per-image half of the audit, as plain JSON-ready data.
+
+    ``findings`` are the geometry, pose and redundancy findings of ``image``
+    (as ``asdict(Finding)``); ``measures`` is what the project-wide statistics
+    need of it. Everything else in the audit compares images with each other
+    and runs once over these results.
+    """
+    findings, _complete = check_image(image, by_class, size, config)
+    return {
+        "findings": [asdict(finding) for finding in findings],
+        "measures": KeyStats(by_class).measures(),
+    }
+
+
+def check_image(image, by_class, size, config, budget=None):
+    """The per-image rule groups over one image: ``(findings, complete)``.
+
+    Geometry, pose, then redundancy -- cheapest first. With ``budget``
+    seconds, a group that would start after the budget is spent is skipped
+    and ``complete`` is False; a group already running always finishes, so
+    the findings of each group that ran are whole. This is what live QC runs
+    after every edit, where a late answer is worth less than a partial one.
+    """
+    one = {image: by_class}
+    sizes = {image: size} if size else {}
+    deadline = None if budget is None else time.monotonic() + budget
+    findings = []
+    for group in (check_geometry, check_pose, check_redundancy):
+        if deadline is not None and time.monotonic() >= deadline:
+            return findings, False
+        findings += group(one, sizes, config)
+    return findings, True
+
+
+def _audit_shard(task):
+    """Process-pool entry point: ``audit_image(*task)``."""
+    return audit_image(*task)
+
+
+def _audit_shards(tasks, workers):
+    """``audit_image`` of every ``(image, by_class, size, config)`` task, in
+    order; spread over ``workers`` processes when there are enough of them."""
+    if workers <= 1 or len(tasks) < _PARALLEL_MIN_IMAGES:
+        return [_audit_shard(task) for task in tasks]
+    # A few chunks per process: fewer round trips than one image at a time,
+    # and a slow image does not leave the other processes idle for long.
+    chunk = max(1, len(tasks) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_audit_shard, tasks, chunksize=chunk))
+
+
+def run_audit(all_annotations, image_sizes=None, class_names=None, config=None,
+              workers=1, cache=None, stats=None):
     """Run every rule over a project and return findings, most severe first.
 
     ``all_annotations`` is ``{image_name: {class_name: [annotation, ...]}}``.
@@ -426,6 +545,16 @@ def run_audit(all_annotations, image_sizes=None, class_names=None, config=None):
     resolve every size should still get the rest of the audit.
     ``class_names`` defaults to the classes that actually appear in the
     annotations, which is the right answer for a CLI run with no project UI.
+
+    The audit is sharded per image (:func:`audit_image`). ``workers`` > 1
+    audits the shards in a process pool; a :class:`core.qc_cache.QCCache`
+    as ``cache`` supplies the shards whose :func:`shard_key` it already holds,
+    keeps the rest, and is saved before returning. Either way the findings
+    are the same, in the same order.
+
+    ``stats``, an :class:`~core.annotation_stats.AnnotationStats` synced to
+    ``all_annotations``, supplies the project-wide statistics instead of the
+    shards' own measures -- the same numbers the statistics dialog shows.
     """
     config = config or QCConfig()
     image_sizes = image_sizes or {}
@@ -434,11 +563,37 @@ def run_audit(all_annotations, image_sizes=None, class_names=None, config=None):
             {name for _i, name, _a in _iter_annotations(all_annotations)}
         )
 
-    findings = []
-    findings += check_geometry(all_annotations, image_sizes, config)
-    findings += check_pose(all_annotations, image_sizes, config)
-    findings += check_redundancy(all_annotations, image_sizes, config)
-    findings += check_statistics(all_annotations, image_sizes, config)
+    images = list(all_annotations or {})
+    results = {}
+    tasks = []
+    keys = []
+    for image in images:
+        by_class = all_annotations[image] or {}
+        size = image_sizes.get(image)
+        size = list(size) if size else None
+        key = shard_key(image, by_class, size, config) if cache is not None else None
+        cached = cache.get(key) if cache is not None else None
+        if cached is not None:
+            results[image] = cached
+            continue
+        tasks.append((image, by_class, size, config))
+        keys.append(key)
+    for (image, *_rest), key, result in zip(tasks, keys, _audit_shards(tasks, workers)):
+        results[image] = result
+        if cache is not None:
+            cache.put(key, result)
+    if cache is not None:
+        cache.save()
+    logger.debug("audited %d of %d image(s)", len(tasks), len(images))
+
+    findings = [
+        Finding(**finding) for image in images for finding in results[image]["findings"]
+    ]
+    if stats is not None:
+        measures = stats.qc_measures(images)
+    else:
+        measures = [(image, results[image]["measures"]) for image in images]
+    findings += _statistics(measures, all_annotations, image_sizes, config)
     findings += check_hygiene(all_annotations, class_names, config)
     findings.sort(key=Finding.sort_key)
     return findings
@@ -0,0 +1,272 @@
+"""Annotation statistics, measured per key and totalled as keys change.
+
+The statistics dialog, the training dialog's Data row (``task_inference``) and
+the QC statistics rules each walked every annotation in the project to count
+classes, shapes and areas -- separately, with slightly different rules, every
+time they were opened. On a large project that made the dialog slow to appear,
+and the three could disagree about what they were counting.
+
+:class:`AnnotationStats` keeps one :class:`KeyStats` per ``all_annotations``
+key: its count per class and per shape kind, and (when first asked for) its
+annotation areas. The mutation path says which keys it touched
+(:meth:`AnnotationStats.invalidate`, from
+``ImageController.note_annotations_changed``) and :meth:`AnnotationStats.sync`
+measures only those, plus keys added, removed or replaced. Per-class and
+per-shape totals are kept running as keys are measured, so opening a view
+after an edit costs the keys it touched, not the project. Every view reads the
+same totals, so they agree by construction.
+
+Counting rules, shared by every consumer:
+
+- ``counts`` is per class and includes ``Temp-`` review classes; a class with
+  an empty list is not counted.
+- ``shapes`` (pose / polygon / bbox) and :meth:`AnnotationStats.classes`
+  leave review classes out -- they are not training data.
+- Areas are ``geometry.annotation_areas`` of the non-pose annotations.
+
+Qt-free.
+"""
+
+from collections.abc import Iterable, Mapping
+from typing import Any
+
+import numpy as np
+
+from .geometry import annotation_areas
+
+SHAPE_KINDS = ("polygon", "bbox", "pose")
+
+
+def is_review_class(class_name: str) -> bool:
+    """A ``Temp-`` class holds detections pending review, not labels."""
+    return class_name.startswith("Temp-")
+
+
+def is_pose(annotation: Mapping[str, Any]) -> bool:
+    """Pose instances are identified by the **absence** of a segmentation key,
+    the discriminator the whole app routes on (ADR-029). Polygon rules and
+    area measures skip them."""
+    return "keypoints" in annotation and not annotation.get("segmentation")
+
+
+def shape_kind(annotation: Mapping[str, Any]) -> str | None:
+    """``"pose"``, ``"polygon"``, ``"bbox"``, or ``None`` for none of them."""
+    if is_pose(annotation):
+        return "pose"
+    if annotation.get("segmentation"):
+        return "polygon"
+    if annotation.get("bbox"):
+        return "bbox"
+    return None
+
+
+class KeyStats:
+    """What the project-wide statistics need of one ``all_annotations`` key."""
+
+    __slots__ = ("counts", "shapes", "source", "_areas", "_area_values")
+
+    def __init__(self, by_class: Mapping[str, Any] | None) -> None:
+        self.counts: dict[str, int] = {}
+        self.shapes: dict[str, int] = dict.fromkeys(SHAPE_KINDS, 0)
+        self.source = by_class
+        self._areas: list[list[Any]] | None = None
+        self._area_values: np.ndarray | None = None
+        for class_name, annotations in (by_class or {}).items():
+            if not annotations:
+                continue
+            self.counts[class_name] = len(annotations)
+            if is_review_class(class_name):
+                continue
+            for annotation in annotations:
+                kind = shape_kind(annotation)
+                if kind is not None:
+                    self.shapes[kind] += 1
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values())
+
+    @property
+    def trainable(self) -> bool:
+        """True if any non-review class has an annotation here."""
+        return any(not is_review_class(name) for name in self.counts)
+
+    @property
+    def areas(self) -> list[list[Any]]:
+        """``[class_name, number, area]`` per non-pose annotation.
+
+        Measured on first use: counting is cheap and wanted by every view,
+        areas cost a pass over the geometry and only some views want them.
+        """
+        if self._areas is None:
+            shapes = [
+                (class_name, annotation)
+                for class_name, annotations in (self.source or {}).items()
+                for annotation in annotations or []
+                if not is_pose(annotation)
+            ]
+            areas = annotation_areas([annotation for _, annotation in shapes])
+            self._areas = [
+                [class_name, annotation.get("number"), area]
+                for (class_name, annotation), area in zip(shapes, areas.tolist())
+            ]
+        return self._areas
+
+    def area_values(self, class_name: str | None = None) -> np.ndarray:
+        """The areas of one class, or of every non-review class."""
+        if class_name is not None:
+            return np.array(
+                [area for name, _number, area in self.areas if name == class_name],
+                dtype=np.float64,
+            )
+        if self._area_values is None:
+            self._area_values = np.array(
+                [area for name, _number, area in self.areas if not is_review_class(name)],
+                dtype=np.float64,
+            )
+        return self._area_values
+
+    def measures(self) -> dict[str, Any]:
+        """The per-image measures ``annotation_qc``'s statistics rules read."""
+        return {"counts": dict(self.counts), "areas": self.areas}
+
+
+class AnnotationStats:
+    """``{key: KeyStats}`` for one ``all_annotations``, with running totals."""
+
+    def __init__(self) -> None:
+        self._keys: dict[str, KeyStats] = {}
+        self._source: Mapping[str, Any] | None = None
+        self._stale: set[str] = set()
+        self._class_counts: dict[str, int] = {}
+        self._shape_counts: dict[str, int] = dict.fromkeys(SHAPE_KINDS, 0)
+        self._trainable: set[str] = set()
+
+    def invalidate(self, key: str | None = None) -> None:
+        """Re-measure ``key`` on the next :meth:`sync`; ``None`` for all."""
+        if key is None:
+            self._source = None
+        else:
+            self._stale.add(key)
+
+    def sync(self, all_annotations: Mapping[str, Any]) -> "AnnotationStats":
+        """Bring the measures in line with ``all_annotations``; returns self.
+
+        Keys reported through :meth:`invalidate` are measured again, as are
+        keys added, removed or replaced by a new dict. An edit made in place
+        to a key nobody reported is not noticed -- the same contract the
+        image list's status index relies on. A different ``all_annotations``
+        (another project) starts over.
+        """
+        if all_annotations is not self._source:
+            self._clear()
+            self._source = all_annotations
+        keys = self._keys
+        for key in self._stale:
+            if key in all_annotations:
+                self._put(key, KeyStats(all_annotations[key]))
+            elif key in keys:
+                self._drop(key)
+        self._stale.clear()
+        for key, by_class in all_annotations.items():
+            entry = keys.get(key)
+            if entry is None or entry.source is not by_class:
+                self._put(key, KeyStats(by_class))
+        if len(keys) != len(all_annotations):
+            for key in [key for key in keys if key not in all_annotations]:
+                self._drop(key)
+        return self
+
+    def _clear(self) -> None:
+        self._keys.clear()
+        self._stale.clear()
+        self._class_counts.clear()
+        self._shape_counts = dict.fromkeys(SHAPE_KINDS, 0)
+        self._trainable.clear()
+
+    def _put(self, key: str, entry: KeyStats) -> None:
+        old = self._keys.get(key)
+        if old is not None:
+            self._subtract(key, old)
+        self._keys[key] = entry  # a re-measured key keeps its place
+        for class_name, count in entry.counts.items():
+            self._class_counts[class_name] = self._class_counts.get(class_name, 0) + count
+        for kind, count in entry.shapes.items():
+            self._shape_counts[kind] += count
+        if entry.trainable:
+            self._trainable.add(key)
+
+    def _drop(self, key: str) -> None:
+        self._subtract(key, self._keys.pop(key))
+
+    def _subtract(self, key: str, entry: KeyStats) -> None:
+        for class_name, count in entry.counts.items():
+            remaining = self._class_counts[class_name] - count
+            if remaining:
+                self._class_counts[class_name] = remaining
+            else:
+                del self._class_counts[class_name]
+        for kind, count in entry.shapes.items():
+            self._shape_counts[kind] -= count
+        self._trainable.discard(key)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __getitem__(self, key: str) -> KeyStats:
+        return self._keys[key]
+
+    def keys(self) -> Iterable[str]:
+        return self._keys.keys()
+
+    def total(self) -> int:
+        """Every annotation, review classes included."""
+        return sum(self._class_counts.values())
+
+    def class_counts(self) -> dict[str, int]:
+        """Annotations per class, review classes included."""
+        return dict(self._class_counts)
+
+    def key_counts(self) -> dict[str, int]:
+        """Annotations per key (image, slice or frame), zeros included."""
+        return {key: entry.total for key, entry in self._keys.items()}
+
+    def shape_counts(self) -> dict[str, int]:
+        """``{"polygon", "bbox", "pose"}`` counts, review classes left out."""
+        return dict(self._shape_counts)
+
+    def classes(self) -> list[str]:
+        """Sorted non-review classes that have at least one annotation."""
+        return sorted(name for name in self._class_counts if not is_review_class(name))
+
+    def trainable(self, key: str) -> bool:
+        """True if ``key`` has an annotation in a non-review class."""
+        return key in self._trainable
+
+    def trainable_count(self, keys: Iterable[str]) -> int:
+        """How many of ``keys`` have an annotation in a non-review class."""
+        trainable = self._trainable
+        return sum(1 for key in keys if key in trainable)
+
+    def areas_by_class(self) -> dict[str, list[tuple[str, Any, float]]]:
+        """``{class_name: [(key, number, area), ...]}`` over the project."""
+        by_class: dict[str, list[tuple[str, Any, float]]] = {}
+        for key, entry in self._keys.items():
+            for class_name, number, area in entry.areas:
+                by_class.setdefault(class_name, []).append((key, number, area))
+        return by_class
+
+    def area_histogram(
+        self, class_name: str | None = None, bins: int = 20
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """``numpy.histogram`` of the positive areas of one class, or of
+        every non-review class."""
+        parts = [entry.area_values(class_name) for entry in self._keys.values()]
+        areas = np.concatenate(parts) if parts else np.zeros(0)
+        return np.histogram(areas[areas > 0], bins=bins)
+
+    def qc_measures(self, keys: Iterable[str]) -> list[tuple[str, dict[str, Any]]]:
+        """``(key, KeyStats.measures())`` for ``keys``, in that order, for
+        ``annotation_qc`` -- whose findings must not depend on the order keys
+        were measured in here."""
+        return [(key, self._keys[key].measures()) for key in keys]
@@ -0,0 +1,237 @@
+"""Run journal for batch text detection ("Detect All Images").
+
+A batch over thousands of images used to keep its results in memory only:
+cancelling, crashing or closing the app before reviewing them threw away
+hours of detection. The journal checkpoints every image as soon as it is
+done, in a JSON-lines file beside the project (``<project>.detections.jsonl``),
+so nothing finished is ever computed twice.
+
+Entries are keyed by three things:
+
+- the **image content** -- :func:`core.feature_cache.array_digest` of the
+  decoded pixels, so an edited or replaced image is detected afresh while a
+  renamed one is not;
+- the **model settings** (:func:`config_key` of the producer, checkpoint,
+  single-pass flag and SAM model);
+- the **class configuration**, one entry per class (:func:`config_key` of
+  that class's name, phrases and thresholds).
+
+Keying per class is what lets a re-run after adding a class detect only that
+class: every other class of every image is already in the journal. Cross-class
+NMS, which couples the classes, is therefore applied when entries are merged
+(:func:`merge_detections`) rather than before they are written.
+
+Each detection is stored whole -- class, score, box and SAM polygon (or the
+SAM error) -- so the journal can be reviewed later without the models.
+
+The file is appended to and flushed after each image. A crash can leave at
+most one partial last line, which loading skips. When the same key appears
+twice the later line wins. :meth:`DetectionJournal.forget` drops entries so
+the next run detects them again (results of a bad run, say), and rewrites the
+file with only what is left; a file that has grown mostly superseded lines is
+rewritten the same way when it is loaded. Thread-safe: the batch worker
+records entries while the GUI thread reads them.
+
+Qt-free.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections.abc import Sequence
+from typing import Any
+
+from .logging_config import get_logger
+
+logger = get_logger(__name__)
+
+JOURNAL_SUFFIX = ".detections.jsonl"
+
+
+def journal_path(project_file: str) -> str:
+    """The journal that belongs to ``project_file`` (``.iap``)."""
+    return os.path.splitext(project_file)[0] + JOURNAL_SUFFIX
+
+
+def config_key(value: Any) -> str:
+    """Short, stable key of a JSON-serialisable value."""
+    text = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def _plain(value: Any) -> Any:
+    """``json.dumps`` fallback for numpy scalars and arrays in a detection."""
+    for method in ("tolist", "item"):
+        if hasattr(value, method):
+            return getattr(value, method)()
+    raise TypeError(f"{type(value).__name__} is not JSON serialisable")
+
+
+def _iou(a: Sequence[float], b: Sequence[float]) -> float:
+    width = min(a[2], b[2]) - max(a[0], b[0])
+    height = min(a[3], b[3]) - max(a[1], b[1])
+    if width <= 0 or height <= 0:
+        return 0.0
+    inter = width * height
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union > 0 else 0.0
+
+
+def merge_detections(
+    per_class: Sequence[Sequence[dict]], iou_thr: float | None
+) -> list[dict]:
+    """Join per-class detections, applying cross-class NMS at ``iou_thr``.
+
+    Greedy by descending score, as ``torchvision.ops.nms``: a detection is
+    dropped when its box overlaps a kept one by more than ``iou_thr``.
+    ``None`` skips the NMS (SAM 3 has none).
+    """
+    detections = sorted(
+        (d for detections in per_class for d in detections),
+        key=lambda d: d["score"],
+        reverse=True,
+    )
+    if iou_thr is None:
+        return detections
+    kept: list[dict] = []
+    for detection in detections:
+        if all(_iou(detection["bbox"], k["bbox"]) <= iou_thr for k in kept):
+            kept.append(detection)
+    return kept
+
+
+class DetectionJournal:
+    """Per-image, per-class detection results, optionally backed by a file.
+
+    ``path=None`` keeps the journal in memory (a project never saved): a
+    cancelled run can still be resumed in the same session.
+    """
+
+    def __init__(self, path: str | None = None):
+        self.path = path
+        self._entries: dict[tuple[str, str, str], dict] = {}
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            self._load(path)
+
+    def _load(self, path: str) -> None:
+        skipped = 0
+        lines = 0
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                lines += 1
+                try:
+                    entry = json.loads(line)
+                    key = (entry["image"], entry["model"], entry["class"])
+                except (ValueError, KeyError, TypeError):
+                    skipped += 1
+                    continue
+                self._entries.pop(key, None)
+                self._entries[key] = entry
+        if skipped:
+            logger.warning(f"{path}: skipped {skipped} unreadable line(s)")
+        logger.debug(f"{path}: {len(self._entries)} journal entries")
+        if lines > 2 * len(self._entries):
+            # Mostly re-detections and torn lines: keep only the live ones.
+            self.compact()
+
+    def compact(self) -> bool:
+        """Rewrite the file with one line per entry; False if it could not
+        be written (the old file is then left as it was)."""
+        with self._lock:
+            return self._rewrite()
+
+    def _rewrite(self) -> bool:
+        if not self.path:
+            return True
+        temp = self.path + ".tmp"
+        try:
+            with open(temp, "w", encoding="utf-8") as f:
+                for entry in self._entries.values():
+                    f.write(json.dumps(entry, separators=(",", ":"), default=_plain) + "\n")
+            os.replace(temp, self.path)
+        except OSError:
+            logger.exception(f"could not rewrite detection journal {self.path}")
+            return False
+        return True
+
+    def forget(self, model: str | None = None, class_keys: Sequence[str] | None = None) -> int:
+        """Drop the entries under ``model`` (every model if ``None``) for
+        ``class_keys`` (every class if ``None``), so the next run detects
+        them again, and rewrite the file without them. Returns how many
+        entries were dropped."""
+        wanted = None if class_keys is None else set(class_keys)
+        with self._lock:
+            dropped = [
+                key for key in self._entries
+                if (model is None or key[1] == model)
+                and (wanted is None or key[2] in wanted)
+            ]
+            for key in dropped:
+                del self._entries[key]
+            if dropped:
+                self._rewrite()
+        return len(dropped)
+
+    def missing(self, image: str, model: str, class_keys: Sequence[str]) -> list[str]:
+        """The ``class_keys`` not yet recorded for ``image`` under ``model``."""
+        with self._lock:
+            return [k for k in class_keys if (image, model, k) not in self._entries]
+
+    def detections(self, image: str, model: str, class_key: str) -> list[dict] | None:
+        with self._lock:
+            entry = self._entries.get((image, model, class_key))
+        return None if entry is None else entry["detections"]
+
+    def record(
+        self, image: str, model: str, name: str, by_class: dict[str, list[dict]]
+    ) -> None:
+        """Record the detections of one image, ``{class_key: detections}``,
+        and append them to the file. A write failure is logged; the entries
+        stay in memory."""
+        entries: list[dict[str, Any]] = [
+            {"image": image, "model": model, "class": class_key, "name": name,
+             "detections": detections}
+            for class_key, detections in by_class.items()
+        ]
+        # Serialised before anything is stored, so an unserialisable value
+        # fails the whole image rather than leaving half of it on disk.
+        lines = [
+            json.dumps(entry, separators=(",", ":"), default=_plain) + "\n"
+            for entry in entries
+        ]
+        with self._lock:
+            for entry in entries:
+                key = (image, model, entry["class"])
+                self._entries.pop(key, None)
+                self._entries[key] = entry
+            if not self.path:
+                return
+            try:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.writelines(lines)
+            except OSError:
+                logger.exception(f"could not write detection journal {self.path}")
+
+    def pending(self, model: str, class_keys: Sequence[str]) -> dict[str, list[list[dict]]]:
+        """Recorded detections under ``model`` for ``class_keys``, per image
+        name: ``{name: [detections of one class, ...]}``.
+
+        An image recorded under several contents (edited between runs) only
+        contributes its most recently recorded one.
+        """
+        wanted = set(class_keys)
+        with self._lock:
+            entries = [e for e in self._entries.values() if e["model"] == model]
+        latest: dict[str, str] = {}
+        for entry in entries:
+            latest[entry["name"]] = entry["image"]
+        pending: dict[str, list[list[dict]]] = {}
+        for entry in entries:
+            if entry["class"] in wanted and latest[entry["name"]] == entry["image"]:
+                pending.setdefault(entry["name"], []).append(entry["detections"])
+        return pending
+
+    def __len__(self) -> int:
+        return len(self._entries)
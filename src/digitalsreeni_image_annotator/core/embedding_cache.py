@@ -0,0 +1,400 @@
+"""Binary, memory-mapped store for curation embeddings (#72).
+
+The cache used to be one JSON object of Python float lists
+(``.embedding_cache.json``), parsed whole on open and rewritten whole on every
+save. At 20 000 vectors of 768 floats that was already a text file of a few
+hundred megabytes that took longer to load than most curation runs take to
+cluster.
+
+Now each model has a pair of files in ``.embedding_cache/`` beside the
+project:
+
+- ``<model>.keys`` -- a JSON header line (``{"model": ..., "dim": ...,
+  "rows": ...}``), then one digest per line, line *i* naming row *i*;
+- the rows file the header names (``<model>.f32`` until the store is first
+  compacted) -- the vectors, one little-endian float32 row each.
+
+Opening maps the rows read-only and reads only the keys.
+:meth:`EmbeddingCache.matrix` returns the mapped rows as one ``(n, dim)``
+matrix with the row of each digest, and :meth:`get` a view of one row: the
+vectors of a cached run are never parsed, and the controller hands those
+views straight to :mod:`core.similarity`, which copies each once into its
+matrix of unit rows. :meth:`save` appends the rows added since the last save
+rather than rewriting the store.
+
+Keyed by ``(model_name, digest)`` as before, so switching backend never
+reuses the other one's vectors. A digest written twice keeps its latest row,
+and rows never change once written, so a view stays valid after later saves.
+A crash between the two appends leaves the files disagreeing about the row
+count; opening keeps the rows both agree on.
+
+The superseded rows of a digest written again stay in the file until the
+store is rewritten: once they would outnumber the live rows, and when opening
+finds the files disagreeing. A rewrite compacts, keeping only the live rows.
+It writes a new rows file and then replaces the keys file naming it, so a
+crash leaves either the old pair or the new one; a rows file no keys file
+names is removed on open.
+
+A legacy JSON cache is imported on open, and removed once the import has
+been written.
+
+Qt-free.
+"""
+
+import json
+import os
+import re
+
+import numpy as np
+
+from .logging_config import get_logger
+
+logger = get_logger(__name__)
+
+CACHE_DIRNAME = ".embedding_cache"
+LEGACY_CACHE_FILENAME = ".embedding_cache.json"
+
+_ROW_DTYPE = np.dtype("<f4")
+_ROWS_SUFFIX = ".f32"
+_KEYS_SUFFIX = ".keys"
+
+
+def _slug(model_name: str) -> str:
+    """File-name stem for ``model_name`` (``"CLIP (ViT-B/32)"`` -> ``clip-vit-b-32``)."""
+    return re.sub(r"[^a-z0-9]+", "-", model_name.lower()).strip("-") or "model"
+
+
+class _ModelStore:
+    """One model's vectors: ``<stem>.f32`` rows and ``<stem>.keys`` digests.
+
+    ``stem=None`` keeps everything in memory.
+    """
+
+    def __init__(self, model_name: str, stem: str | None, dim: int | None = None):
+        self.model_name = model_name
+        self.stem = stem
+        self.dim = dim
+        # Rows file generation: 0 is ``<stem>.f32``, n ``<stem>.<n>.f32``.
+        self.generation = 0
+        self._index: dict[str, int] = {}
+        self._count = 0
+        self._rows: np.ndarray | None = None
+        self._pending: dict[str, np.ndarray] = {}
+        # The files disagree, or hold rows of a digest written again, and
+        # are rewritten by the next flush.
+        self._rewrite = False
+
+    @property
+    def rows_path(self) -> str:
+        return self._rows_path(self.generation)
+
+    def _rows_path(self, generation: int) -> str:
+        if generation:
+            return f"{self.stem}.{generation}{_ROWS_SUFFIX}"
+        return f"{self.stem}{_ROWS_SUFFIX}"
+
+    @property
+    def keys_path(self) -> str:
+        return f"{self.stem}{_KEYS_SUFFIX}"
+
+    @property
+    def _row_bytes(self) -> int:
+        return (self.dim or 0) * _ROW_DTYPE.itemsize
+
+    @classmethod
+    def open(cls, stem: str) -> "_ModelStore | None":
+        """The store at ``stem``, or ``None`` when its keys are unreadable."""
+        try:
+            with open(f"{stem}{_KEYS_SUFFIX}", encoding="utf-8") as handle:
+                header = json.loads(handle.readline())
+                digests = handle.read().splitlines()
+            store = cls(str(header["model"]), stem, int(header["dim"]))
+            store.generation = int(header.get("rows", 0))
+            size = os.path.getsize(store.rows_path)
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            return None
+        if store.dim is None or store.dim <= 0:
+            return None
+        count = min(len(digests), size // store._row_bytes)
+        store._index = {digest: row for row, digest in enumerate(digests[:count])}
+        store._map(count)
+        if count != len(digests) or count * store._row_bytes != size:
+            logger.warning(
+                "%s: keeping the %d row(s) its files agree on", stem, count
+            )
+            store._rewrite = True
+            store.flush()
+        return store
+
+    def _header(self) -> str:
+        header = {"model": self.model_name, "dim": self.dim, "rows": self.generation}
+        return json.dumps(header) + "\n"
+
+    def _map(self, count: int) -> None:
+        # A new map for every size. Views of the old one keep it alive and
+        # stay valid: the rows they show are never rewritten.
+        self._count = count
+        self._rows = None
+        if count and self.dim:
+            self._rows = np.memmap(
+                self.rows_path, dtype=_ROW_DTYPE, mode="r", shape=(count, self.dim)
+            )
+
+    def _discard_tail(self) -> None:
+        """Cut the rows file back to the rows the keys name, so a failed
+        append cannot shift every later row against its key."""
+        try:
+            with open(self.rows_path, "r+b") as handle:
+                handle.truncate(self._count * self._row_bytes)
+        except OSError:
+            pass
+
+    def matrix(self) -> tuple[np.ndarray, dict[str, int]]:
+        """The saved rows as one read-only ``(n, dim)`` float32 matrix,
+        mapped from the file, and the row of each digest in it."""
+        if self._rows is None:
+            return np.empty((0, self.dim or 0), dtype=_ROW_DTYPE), {}
+        return self._rows, dict(self._index)
+
+    def get(self, digest: str) -> np.ndarray | None:
+        vector = self._pending.get(digest)
+        if vector is not None:
+            return vector
+        row = self._index.get(digest)
+        return None if row is None or self._rows is None else self._rows[row]
+
+    def put(self, digest: str, vector) -> None:
+        vector = np.asarray(vector, dtype=_ROW_DTYPE).ravel()
+        if self.dim is None:
+            self.dim = vector.size
+        if vector.size != self.dim:
+            logger.warning(
+                "not caching a %d-d vector in the %d-d %s store",
+                vector.size, self.dim, self.model_name,
+            )
+            return
+        self._pending[digest] = vector
+
+    def flush(self) -> bool:
+        """Append the vectors added since the last flush to the files, or
+        rewrite them compacted; False if they could not be written (they
+        stay pending)."""
+        if self.stem is None or not (self._pending or self._rewrite):
+            return True
+        live = len(self)
+        superseded = self._count + len(self._pending) - live
+        if self._rewrite or superseded > live:
+            return self._compact()
+        digests = list(self._pending)
+        rows = np.stack([self._pending[digest] for digest in digests])
+        count = self._count
+        new = not os.path.exists(self.keys_path)
+        try:
+            # Rows first: a crash after them leaves rows without keys, which
+            # opening drops; the reverse would name rows that are not there.
+            with open(self.rows_path, "ab") as handle:
+                handle.write(rows.tobytes())
+            with open(self.keys_path, "a", encoding="utf-8") as handle:
+                if new:
+                    handle.write(self._header())
+                handle.writelines(f"{digest}\n" for digest in digests)
+        except OSError:
+            logger.warning("could not write the embedding cache to %s", self.stem)
+            self._discard_tail()
+            return False
+        for offset, digest in enumerate(digests):
+            self._index[digest] = count + offset
+        self._pending.clear()
+        self._map(count + len(digests))
+        return True
+
+    def _compact(self) -> bool:
+        """Rewrite the store with only its live rows, into the next
+        generation's rows file."""
+        saved = sorted(
+            (row, digest) for digest, row in self._index.items()
+            if digest not in self._pending
+        )
+        digests = [digest for _, digest in saved] + list(self._pending)
+        parts = []
+        if saved and self._rows is not None:
+            parts.append(np.asarray(self._rows[[row for row, _ in saved]]))
+        if self._pending:
+            parts.append(np.stack(list(self._pending.values())))
+        old = self.rows_path
+        self.generation += 1
+        rows_path = self.rows_path
+        temp = self.keys_path + ".tmp"
+        try:
+            with open(rows_path, "wb") as handle:
+                for part in parts:
+                    handle.write(part.astype(_ROW_DTYPE, copy=False).tobytes())
+            with open(temp, "w", encoding="utf-8") as handle:
+                handle.write(self._header())
+                handle.writelines(f"{digest}\n" for digest in digests)
+            # The keys file names the rows file, so replacing it switches
+            # the store to the new pair in one step.
+            os.replace(temp, self.keys_path)
+        except OSError:
+            logger.warning("could not rewrite the embedding cache %s", self.stem)
+            self.generation -= 1
+            for path in (rows_path, temp):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            return False
+        removed = self._count - len(saved)
+        self._index = {digest: row for row, digest in enumerate(digests)}
+        self._pending.clear()
+        self._rewrite = False
+        self._map(len(digests))
+        try:
+            os.remove(old)
+        except OSError:
+            # Still mapped on some platforms; the next open removes it.
+            pass
+        if removed:
+            logger.info("%s: compacted away %d superseded row(s)", self.stem, removed)
+        return True
+
+    def __len__(self) -> int:
+        return len(self._index.keys() | self._pending.keys())
+
+
+class EmbeddingCache:
+    """Content-hash-keyed embedding store, persisted beside the project.
+
+    Keyed by ``(model_name, content_hash)`` so switching backend does not
+    silently reuse the other one's vectors — which would produce clusters that
+    look plausible and mean nothing. ``directory=None`` keeps the cache in
+    memory.
+    """
+
+    def __init__(self, directory: str | None = None):
+        self.directory = directory
+        self._stores: dict[str, _ModelStore] = {}
+        if directory:
+            self.load()
+
+    @property
+    def path(self) -> str | None:
+        return os.path.join(self.directory, CACHE_DIRNAME) if self.directory else None
+
+    def _store(self, model_name: str) -> _ModelStore:
+        store = self._stores.get(model_name)
+        if store is None:
+            stem = os.path.join(self.path, _slug(model_name)) if self.path else None
+            store = self._stores[model_name] = _ModelStore(model_name, stem)
+        return store
+
+    def get(self, model_name: str, digest: str | None) -> np.ndarray | None:
+        """The cached vector, a read-only float32 view, or ``None``."""
+        if digest is None:
+            return None
+        store = self._stores.get(model_name)
+        return None if store is None else store.get(digest)
+
+    def matrix(self, model_name: str) -> tuple[np.ndarray, dict[str, int]]:
+        """``model_name``'s saved vectors as one read-only ``(n, dim)``
+        float32 matrix mapped from the file, and ``{digest: row}``.
+
+        Zero-copy: :meth:`get` returns rows of the same map. Rows a digest
+        was written to again before the last compaction are in the matrix
+        but not in the index; vectors not saved yet are in neither.
+        """
+        store = self._stores.get(model_name)
+        if store is None:
+            return np.empty((0, 0), dtype=_ROW_DTYPE), {}
+        return store.matrix()
+
+    def put(self, model_name: str, digest: str | None, vector) -> None:
+        if digest is None:
+            return
+        self._store(model_name).put(digest, vector)
+
+    def load(self) -> None:
+        if not self.path:
+            return
+        if os.path.isdir(self.path):
+            entries = sorted(os.listdir(self.path))
+            for entry in entries:
+                if not entry.endswith(_KEYS_SUFFIX):
+                    continue
+                stem = os.path.join(self.path, entry[: -len(_KEYS_SUFFIX)])
+                store = _ModelStore.open(stem)
+                if store is None:
+                    # A corrupt cache is a performance problem, never a
+                    # correctness one -- drop it and recompute rather than
+                    # failing the run.
+                    logger.warning("discarding unreadable embedding cache %s", stem)
+                    self._remove(f"{stem}{_KEYS_SUFFIX}")
+                    continue
+                self._stores[store.model_name] = store
+            # Rows files of discarded stores, and the files of a compaction
+            # that did not finish or whose old rows could not be removed.
+            named = {
+                os.path.basename(store.rows_path) for store in self._stores.values()
+            }
+            for entry in entries:
+                if entry.endswith(".tmp") or (
+                    entry.endswith(_ROWS_SUFFIX) and entry not in named
+                ):
+                    self._remove(os.path.join(self.path, entry))
+        self._import_legacy()
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError:
+            logger.warning("could not remove %s", path)
+
+    def _import_legacy(self) -> None:
+        """Move a ``.embedding_cache.json`` from before the binary store in."""
+        if not self.directory:
+            return
+        legacy = os.path.join(self.directory, LEGACY_CACHE_FILENAME)
+        if not os.path.exists(legacy):
+            return
+        try:
+            with open(legacy, encoding="utf-8") as handle:
+                data = json.load(handle)
+        except OSError:
+            logger.warning("could not read the old embedding cache %s", legacy)
+            return
+        except ValueError:
+            logger.warning("discarding unreadable embedding cache at %s", legacy)
+            data = {}
+        imported = 0
+        for key, vector in data.items() if isinstance(data, dict) else ():
+            model_name, separator, digest = key.partition("::")
+            if separator and isinstance(vector, list):
+                self.put(model_name, digest, vector)
+                imported += 1
+        if not self.save():
+            # Its vectors are only in memory: keep the old file for next time.
+            logger.warning("keeping the old embedding cache %s until it is imported", legacy)
+            return
+        try:
+            os.remove(legacy)
+        except OSError:
+            logger.warning("could not remove the old embedding cache %s", legacy)
+        logger.info("imported %d embedding(s) from %s", imported, legacy)
+
+    def save(self) -> bool:
+        """Write what was added since the last save; False if any of it
+        could not be written."""
+        if not self.path:
+            return True
+        try:
+            os.makedirs(self.path, exist_ok=True)
+        except OSError:
+            logger.warning("could not write the embedding cache to %s", self.path)
+            return False
+        return all([store.flush() for store in self._stores.values()])
+
+    def __len__(self) -> int:
+        return sum(len(store) for store in self._stores.values())
@@ -0,0 +1,86 @@
+"""Memory-bounded LRU for per-image model features (SAM encoder embeddings).
+
+An interactive SAM prompt -- a box drag, one more point -- only changes the
+prompt; the image under it is the same one the previous click ran on. The
+image encoder is by far the expensive half of SAM (seconds per call on CPU,
+against milliseconds for the prompt encoder and mask decoder), so its output is
+worth keeping per image and reusing for every prompt on that image.
+
+Entries are large and uneven (a SAM 2 embedding is ~16 MB, a SAM 1 one 4 MB),
+so the bound is on bytes rather than on a count: the least recently used
+entries are evicted until the total fits the budget again. An entry larger
+than the whole budget is simply not stored.
+
+Keys are whatever the caller makes them; :func:`array_digest` gives a content
+key for a decoded image, so two slices with identical pixels share an entry
+and an edited image never reuses a stale one.
+
+Thread-safe: a background prefetch stores entries while the GUI-side prompt
+path reads them.
+
+Qt-free and torch-free; values are opaque.
+"""
+
+import collections
+import hashlib
+import threading
+from collections.abc import Hashable
+from typing import Any
+
+
+def array_digest(array: Any) -> str:
+    """Content key of a numpy array: its shape, dtype and bytes."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{array.shape}:{array.dtype}".encode("ascii"))
+    digest.update(array if array.flags.c_contiguous else array.tobytes())
+    return digest.hexdigest()
+
+
+class FeatureCache:
+    """Least-recently-used mapping bounded by the total ``nbytes`` of its
+    values."""
+
+    def __init__(self, budget_bytes: int):
+        self.budget_bytes = budget_bytes
+        self._entries: collections.OrderedDict[Hashable, tuple[Any, int]] = (
+            collections.OrderedDict()
+        )
+        self._nbytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key: Hashable, value: Any, nbytes: int) -> None:
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._nbytes -= old[1]
+            if nbytes > self.budget_bytes:
+                return
+            self._entries[key] = (value, nbytes)
+            self._nbytes += nbytes
+            while self._nbytes > self.budget_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._nbytes -= evicted
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._nbytes = 0
+
+    @property
+    def nbytes(self) -> int:
+        """Total size of the stored values, as reported to :meth:`put`."""
+        return self._nbytes
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,113 @@
+"""Vectorised polygon measurements over packed coordinate arrays.
+
+``utils.calculate_area`` and ``utils.calculate_bbox`` measure one flat
+``[x1, y1, x2, y2, ...]`` polygon at a time in Python: a generator for the
+shoelace sum, ``min``/``max`` over sliced lists. That is fine for the one
+annotation being edited, and it is the whole cost of the loops that measure
+*every* annotation of an image -- the QC audit, the proposal filter, sorting
+by area -- once an image holds thousands of SAM polygons of a hundred
+vertices each.
+
+:class:`PackedPolygons` packs an image's polygons into one ``(N, 2)`` array
+with per-polygon offsets, and measures all of them in a handful of NumPy
+operations. A missing, empty or one-coordinate polygon packs as zero vertices:
+area 0, bounds NaN. A trailing odd coordinate is ignored, as ``zip`` over the
+two slices would.
+
+The scalar helpers in ``utils`` stay the reference for single annotations:
+their results go into exported files, where an integer bbox must stay an
+integer.
+
+Qt-free.
+"""
+
+from collections.abc import Sequence
+
+import numpy as np
+
+
+class PackedPolygons:
+    """Flat polygons packed into one coordinate array.
+
+    ``coords`` is ``(N, 2)`` float64; polygon ``k`` is
+    ``coords[offsets[k]:offsets[k + 1]]``.
+    """
+
+    def __init__(self, segmentations: Sequence):
+        counts = np.array(
+            [len(s) // 2 if s else 0 for s in segmentations], dtype=np.intp
+        )
+        self.counts = counts
+        self.offsets = np.concatenate(([0], np.cumsum(counts)))
+        parts = [
+            np.asarray(s[: 2 * count], dtype=np.float64)
+            for s, count in zip(segmentations, counts.tolist())
+            if count
+        ]
+        self.coords = (
+            np.concatenate(parts).reshape(-1, 2) if parts else np.empty((0, 2))
+        )
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    def _reduce(self, ufunc: np.ufunc, values: np.ndarray, empty: float) -> np.ndarray:
+        """``ufunc`` over each polygon's run of ``values``; ``empty`` for a
+        polygon with no vertices (``reduceat`` would return its neighbour's
+        first value instead)."""
+        filled = self.counts > 0
+        out = np.full((len(self),) + values.shape[1:], empty, dtype=np.float64)
+        if filled.any():
+            out[filled] = ufunc.reduceat(values, self.offsets[:-1][filled], axis=0)
+        return out
+
+    def areas(self) -> np.ndarray:
+        """Shoelace area of every polygon, ``(n,)``."""
+        if not len(self.coords):
+            return np.zeros(len(self))
+        following = np.arange(1, len(self.coords) + 1)
+        # Each polygon's last vertex closes the ring back onto its first.
+        filled = self.counts > 0
+        following[self.offsets[1:][filled] - 1] = self.offsets[:-1][filled]
+        x, y = self.coords[:, 0], self.coords[:, 1]
+        cross = x * y[following] - x[following] * y
+        return 0.5 * np.abs(self._reduce(np.add, cross, 0.0))
+
+    def bounds(self) -> np.ndarray:
+        """``(n, 4)`` ``[min_x, min_y, max_x, max_y]``; NaN for no vertices."""
+        return np.concatenate(
+            [
+                self._reduce(np.minimum, self.coords, np.nan),
+                self._reduce(np.maximum, self.coords, np.nan),
+            ],
+            axis=1,
+        )
+
+    def bboxes(self) -> np.ndarray:
+        """``(n, 4)`` ``[x, y, w, h]``, as ``utils.calculate_bbox`` would
+        give each well-formed polygon."""
+        bounds = self.bounds()
+        bounds[:, 2:] -= bounds[:, :2]
+        return bounds
+
+
+def annotation_areas(annotations: Sequence[dict]) -> np.ndarray:
+    """``utils.calculate_area`` of every annotation, polygons in one pass.
+
+    An annotation without a segmentation falls back to its ``[x, y, w, h]``
+    box, and one with neither is 0 -- the same rules, in the same order.
+    """
+    polygons = [annotation.get("segmentation") for annotation in annotations]
+    areas = PackedPolygons(polygons).areas()
+    for k, annotation in enumerate(annotations):
+        if polygons[k] is None and "bbox" in annotation:
+            _x, _y, w, h = annotation["bbox"]
+            areas[k] = w * h
+    return areas
+
+
+def keypoint_rows(keypoints: Sequence[float] | None) -> np.ndarray:
+    """A flat ``[x1, y1, v1, ...]`` keypoint list as ``(k, 3)`` rows; a
+    trailing partial triple is dropped."""
+    values = np.asarray(keypoints or [], dtype=np.float64)
+    return values[: len(values) // 3 * 3].reshape(-1, 3)
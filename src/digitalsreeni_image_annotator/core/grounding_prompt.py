@@ -0,0 +1,120 @@
+"""Grounding DINO prompts covering several classes at once.
+
+Detection used to run one Grounding DINO forward pass per class: the same
+image through the same backbone fifteen times for fifteen classes, with only
+the text changing. The model is built to ground many phrases in one caption,
+so all classes can share a pass: their phrases are joined into one prompt,
+and each token the model scores is traced back to the class whose phrase it
+came from.
+
+The caption is bounded by the text encoder's token limit (256 for the released
+checkpoints), so :func:`pack_prompts` splits the classes over as few prompts as
+fit. A class is never split across two prompts -- its phrases are scored
+together. One whose phrases alone overflow the limit gets a prompt of its own
+and is truncated there, exactly as it would be in the per-class pass.
+
+Qt-free and model-free: token counting is passed in, so the packing can be
+tested without a tokenizer.
+"""
+
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass, field
+
+# Text tokens a Grounding DINO checkpoint attends over (``config.max_text_len``).
+DEFAULT_MAX_TOKENS = 256
+
+# [CLS] and [SEP] around every tokenised prompt.
+_SPECIAL_TOKENS = 2
+
+# What follows each phrase in a prompt, as in the per-class pass.
+_SEPARATOR = " ."
+
+
+def clean_phrases(class_cfg: dict) -> list[str]:
+    """The prompt phrases of one class config.
+
+    Phrases are used verbatim (trimmed, trailing dot dropped); an empty list
+    falls back to the class name.
+    """
+    phrases = list(class_cfg.get("phrases") or [class_cfg["name"]])
+    cleaned = [p.strip().rstrip(".") for p in phrases if p.strip()]
+    return cleaned or [class_cfg["name"]]
+
+
+def class_prompt(phrases: Sequence[str]) -> str:
+    """``"cell . nucleus ."`` -- the prompt of one class on its own."""
+    return " . ".join(phrases) + _SEPARATOR
+
+
+@dataclass
+class PromptChunk:
+    """One prompt and where each class's phrases sit in it.
+
+    ``spans`` holds ``(start, end, class_index)`` character ranges, one per
+    phrase, with ``class_index`` into the list given to :func:`pack_prompts`.
+    """
+
+    text: str = ""
+    spans: list[tuple[int, int, int]] = field(default_factory=list)
+
+    def append(self, class_index: int, phrases: Sequence[str]) -> None:
+        for phrase in phrases:
+            if self.text:
+                self.text += " "
+            start = len(self.text)
+            self.text += phrase + _SEPARATOR
+            self.spans.append((start, start + len(phrase), class_index))
+
+    @property
+    def classes(self) -> list[int]:
+        return sorted({span[2] for span in self.spans})
+
+
+def pack_prompts(
+    phrase_lists: Sequence[Sequence[str]],
+    count_tokens: Callable[[str], int],
+    max_tokens: int = DEFAULT_MAX_TOKENS,
+) -> list[PromptChunk]:
+    """Pack every class's phrases into as few prompts as fit ``max_tokens``.
+
+    ``count_tokens(text)`` is the tokenizer's length for ``text`` without
+    special tokens. Classes keep their order; packing is greedy, which for a
+    handful of classes per prompt is as good as optimal.
+    """
+    budget = max_tokens - _SPECIAL_TOKENS
+    chunks: list[PromptChunk] = []
+    current = PromptChunk()
+    used = 0
+    for index, phrases in enumerate(phrase_lists):
+        if not phrases:
+            continue
+        cost = count_tokens(class_prompt(phrases))
+        if current.spans and used + cost > budget:
+            chunks.append(current)
+            current, used = PromptChunk(), 0
+        current.append(index, phrases)
+        used += cost
+    if current.spans:
+        chunks.append(current)
+    return chunks
+
+
+def token_classes(
+    offsets: Sequence[tuple[int, int]], spans: Sequence[tuple[int, int, int]]
+) -> list[int]:
+    """The class index of every token, ``-1`` for tokens of no phrase.
+
+    ``offsets`` are the tokenizer's ``(start, end)`` character offsets; special
+    tokens come back as ``(0, 0)`` and separators fall outside every span, so
+    neither is credited to a class.
+    """
+    owners = []
+    for start, end in offsets:
+        owner = -1
+        if end > start:
+            for span_start, span_end, class_index in spans:
+                if span_start <= start and end <= span_end:
+                    owner = class_index
+                    break
+        owners.append(owner)
+    return owners
@@ -9,9 +9,21 @@ reason.
 Qt-free and pure: filtering is arithmetic over polygons, and keeping it out of
 the controller means the thresholds can be tested exhaustively without a model,
 a canvas or a QApplication.
+
+**Tiled runs.** SAM segments at a fixed input size, so an unprompted pass over
+a large microscopy field sees it downscaled and small objects vanish. A tiled
+run (:func:`tile_grid`) segments overlapping tiles at full resolution, and
+:func:`merge_tiled_proposals` turns the tiles' proposals into one set for the
+filters below: duplicates from the overlaps are suppressed and objects cut by
+a tile border are stitched back together.
 """
 
-from ..utils import calculate_area, calculate_bbox
+import math
+
+import numpy as np
+
+from ..utils import calculate_bbox
+from .geometry import PackedPolygons
 
 # Tag carried by every unprompted proposal. Lives here rather than on the
 # controller so the canvas and the review filter can recognise one without
@@ -34,6 +46,16 @@ DEFAULT_MAX_AREA_FRACTION = 0.5  # a mask over half the image is the background
 DEFAULT_MAX_CANDIDATES = 500
 DEFAULT_OVERLAP_IOU = 0.5        # already-annotated regions are not proposals
 
+# Tiled runs. Two proposals of one object from overlapping tiles above this
+# IoU are the same proposal; below it they are neighbouring objects.
+DEFAULT_TILE_IOU = 0.5
+# A proposal whose box comes this close to a tile edge inside the image was
+# cut by it, and is only part of an object.
+_TILE_EDGE_MARGIN = 2
+# A cut part lying this much inside a whole proposal from another tile is
+# that proposal's object, seen through the edge of a tile.
+_PART_CONTAINED = 0.8
+
 
 def _boxes_overlap(a, b):
     """Cheap AABB rejection before any polygon work."""
@@ -42,6 +64,25 @@ def _boxes_overlap(a, b):
     return ax < bx + bw and bx < ax + aw and ay < by + bh and by < ay + ah
 
 
+def bounds_overlap(box, others):
+    """Which of an ``(n, 4)`` array of ``[min_x, min_y, max_x, max_y]`` boxes
+    ``box`` overlaps, as a boolean array -- the cheap rejection before any
+    polygon work, vectorised. A NaN (empty) box overlaps nothing."""
+    return (
+        (box[0] < others[:, 2]) & (others[:, 0] < box[2])
+        & (box[1] < others[:, 3]) & (others[:, 1] < box[3])
+    )
+
+
+def _polygon(segmentation):
+    """Shapely polygon of a flat ``[x1, y1, ...]`` list, repaired with
+    ``buffer(0)`` when invalid."""
+    from shapely.geometry import Polygon
+
+    polygon = Polygon(list(zip(segmentation[0::2], segmentation[1::2])))
+    return polygon if polygon.is_valid else polygon.buffer(0)
+
+
 def polygon_iou(seg_a, seg_b):
     """Intersection-over-union of two flat ``[x1, y1, ...]`` polygons.
 
@@ -53,22 +94,19 @@ def polygon_iou(seg_a, seg_b):
     Invalid geometry is repaired with ``buffer(0)`` rather than raising — a
     self-intersecting proposal should still be comparable.
     """
-    from shapely.geometry import Polygon
-
     if not seg_a or not seg_b or len(seg_a) < 6 or len(seg_b) < 6:
         return 0.0
     if not _boxes_overlap(calculate_bbox(seg_a), calculate_bbox(seg_b)):
         return 0.0
 
-    poly_a = Polygon(list(zip(seg_a[0::2], seg_a[1::2])))
-    poly_b = Polygon(list(zip(seg_b[0::2], seg_b[1::2])))
-    if not poly_a.is_valid:
-        poly_a = poly_a.buffer(0)
-    if not poly_b.is_valid:
-        poly_b = poly_b.buffer(0)
+    poly_a = _polygon(seg_a)
+    poly_b = _polygon(seg_b)
     if poly_a.is_empty or poly_b.is_empty:
         return 0.0
+    return _geometry_iou(poly_a, poly_b)
+
 
+def _geometry_iou(poly_a, poly_b):
     intersection = poly_a.intersection(poly_b).area
     if intersection == 0:
         return 0.0
@@ -76,6 +114,44 @@ def polygon_iou(seg_a, seg_b):
     return intersection / union if union else 0.0
 
 
+def overlapping_pairs(segmentations):
+    """``(i, j, iou)`` for every pair ``i < j`` of ``segmentations`` that
+    overlap, in index order -- ``polygon_iou`` of every pair, without the
+    pairs that cannot overlap.
+
+    Calling ``polygon_iou`` on every pair of an image's annotations is O(n²)
+    calls, each rebuilding both bboxes and both polygons; at a few thousand
+    cells that was minutes. Here each polygon is built once, and an
+    ``STRtree`` over their bounds hands out only the pairs whose boxes meet,
+    so the work follows the number of overlapping pairs. Degenerate or empty
+    polygons overlap nothing, as in ``polygon_iou``.
+    """
+    from shapely import STRtree
+
+    polygons = []
+    positions = []
+    for position, segmentation in enumerate(segmentations or []):
+        if not segmentation or len(segmentation) < 6:
+            continue
+        polygon = _polygon(segmentation)
+        if polygon.is_empty:
+            continue
+        polygons.append(polygon)
+        positions.append(position)
+    if len(polygons) < 2:
+        return []
+
+    first, second = STRtree(polygons).query(polygons)
+    keep = first < second
+    order = np.lexsort((second[keep], first[keep]))
+    pairs = []
+    for a, b in zip(first[keep][order].tolist(), second[keep][order].tolist()):
+        iou = _geometry_iou(polygons[a], polygons[b])
+        if iou > 0:
+            pairs.append((positions[a], positions[b], iou))
+    return pairs
+
+
 def filter_mask_proposals(
     proposals,
     image_width,
@@ -111,21 +187,31 @@ def filter_mask_proposals(
     dropped = {"too_small": 0, "too_large": 0, "overlapping": 0, "over_limit": 0}
     kept = []
 
-    for proposal in proposals or []:
+    # Every proposal's area and box, and every existing annotation's box, in
+    # one pass each; only box-overlapping pairs reach the polygon IoU.
+    proposals = list(proposals or [])
+    packed = PackedPolygons([proposal.get("segmentation") for proposal in proposals])
+    areas = packed.areas().tolist()
+    bounds = packed.bounds()
+    existing_segmentations = list(existing_segmentations)
+    existing_bounds = PackedPolygons(existing_segmentations).bounds()
+
+    for k, proposal in enumerate(proposals):
         segmentation = proposal.get("segmentation")
         if not segmentation or len(segmentation) < 6:
             dropped["too_small"] += 1
             continue
-        area = calculate_area({"segmentation": segmentation})
+        area = areas[k]
         if area < min_area:
             dropped["too_small"] += 1
             continue
         if area > max_area:
             dropped["too_large"] += 1
             continue
+        near = np.flatnonzero(bounds_overlap(bounds[k], existing_bounds))
         if any(
-            polygon_iou(segmentation, existing) >= overlap_iou
-            for existing in existing_segmentations
+            polygon_iou(segmentation, existing_segmentations[i]) >= overlap_iou
+            for i in near.tolist()
         ):
             dropped["overlapping"] += 1
             continue
@@ -139,6 +225,184 @@ def filter_mask_proposals(
     return kept, dropped
 
 
+def tile_grid(width, height, tile, overlap):
+    """``(x0, y0, x1, y1)`` tiles of side ``tile`` covering the image, row by
+    row.
+
+    Neighbours overlap by at least ``overlap`` pixels, and the tiles are
+    spread evenly so the last one ends on the image edge rather than hanging
+    past it. An image no larger than ``tile`` is one tile.
+    """
+
+    def starts(size):
+        if size <= tile:
+            return [0]
+        count = math.ceil((size - tile) / max(1, tile - overlap)) + 1
+        return [round(i * (size - tile) / (count - 1)) for i in range(count)]
+
+    return [
+        (x, y, min(x + tile, width), min(y + tile, height))
+        for y in starts(height)
+        for x in starts(width)
+    ]
+
+
+def _cut_by_tile(box, tile, width, height):
+    """Whether a proposal with bbox ``box`` touches an edge of its ``tile``
+    that lies inside the image."""
+    x, y, w, h = box
+    x0, y0, x1, y1 = tile
+    m = _TILE_EDGE_MARGIN
+    return (
+        (x0 > 0 and x <= x0 + m)
+        or (y0 > 0 and y <= y0 + m)
+        or (x1 < width and x + w >= x1 - 1 - m)
+        or (y1 < height and y + h >= y1 - 1 - m)
+    )
+
+
+def _tiles_overlap(a, b):
+    return a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]
+
+
+def _flat(polygon):
+    """Flat ``[x1, y1, ...]`` exterior of a polygon, or of the largest part
+    of a multipolygon."""
+    if polygon.geom_type != "Polygon":
+        polygon = max(getattr(polygon, "geoms", []), key=lambda p: p.area, default=None)
+        if polygon is None or polygon.geom_type != "Polygon":
+            return None
+    coordinates = list(polygon.exterior.coords)[:-1]
+    return [value for point in coordinates for value in point]
+
+
+def merge_tiled_proposals(proposals, image_width, image_height, iou=DEFAULT_TILE_IOU):
+    """One proposal set from the proposals of overlapping tiles.
+
+    Each proposal is in image coordinates and carries the ``tile`` it came
+    from, as :func:`tile_grid` made it. Proposals are sorted into two kinds:
+
+    - **whole** proposals, clear of every tile edge inside the image. Two of
+      them from overlapping tiles with ``polygon_iou`` at or above ``iou`` are
+      one object segmented twice, and greedy NMS keeps the higher score.
+    - **parts**, cut by a tile edge. A part lying inside a whole proposal is
+      that object seen through the edge of a tile, and is dropped. The
+      remaining parts of one object are the pieces of something larger than
+      the tile overlap: two parts from overlapping tiles are joined when they
+      agree (IoU at or above ``iou``) on the region both tiles saw, and each
+      group is stitched into one polygon with the best score of its pieces.
+
+    Only proposals reaching into another tile are compared at all: one
+    inside its tile's own interior has no counterpart anywhere.
+    Returns proposals without the ``tile`` key, best score first.
+    """
+    from shapely.geometry import box as rectangle
+    from shapely.ops import unary_union
+
+    entries = []
+    for proposal in proposals or []:
+        segmentation = proposal.get("segmentation")
+        if not segmentation or len(segmentation) < 6:
+            continue
+        bbox = calculate_bbox(segmentation)
+        tile = tuple(proposal["tile"])
+        entries.append({
+            "proposal": proposal,
+            "bbox": bbox,
+            "tile": tile,
+            "cut": _cut_by_tile(bbox, tile, image_width, image_height),
+        })
+    tiles = sorted({entry["tile"] for entry in entries})
+    for entry in entries:
+        x, y, w, h = entry["bbox"]
+        entry["reaches"] = [
+            other for other in tiles
+            if other != entry["tile"] and _tiles_overlap((x, y, x + w + 1, y + h + 1), other)
+        ]
+
+    def score(entry):
+        return entry["proposal"].get("score", 0.0)
+
+    # Whole proposals: greedy NMS against the ones already kept from the
+    # tiles this one reaches into.
+    kept_by_tile = {tile: [] for tile in tiles}
+    whole = []
+    for entry in sorted((e for e in entries if not e["cut"]), key=score, reverse=True):
+        segmentation = entry["proposal"]["segmentation"]
+        if any(
+            _boxes_overlap(entry["bbox"], other["bbox"])
+            and polygon_iou(segmentation, other["proposal"]["segmentation"]) >= iou
+            for tile in entry["reaches"]
+            for other in kept_by_tile[tile]
+        ):
+            continue
+        kept_by_tile[entry["tile"]].append(entry)
+        whole.append(entry)
+
+    parts = []
+    for entry in (e for e in entries if e["cut"]):
+        part = _polygon(entry["proposal"]["segmentation"])
+        if part.is_empty:
+            continue
+        entry["polygon"] = part
+        if any(
+            part.intersection(_polygon(other["proposal"]["segmentation"])).area
+            >= _PART_CONTAINED * part.area
+            for tile in entry["reaches"]
+            for other in kept_by_tile[tile]
+            if _boxes_overlap(entry["bbox"], other["bbox"])
+        ):
+            continue
+        parts.append(entry)
+
+    # Parts of one object: joined where both tiles saw the same pixels.
+    group = list(range(len(parts)))
+
+    def find(index):
+        while group[index] != index:
+            group[index] = group[group[index]]
+            index = group[index]
+        return index
+
+    for i, first in enumerate(parts):
+        for j in range(i + 1, len(parts)):
+            second = parts[j]
+            if second["tile"] not in first["reaches"] or not _boxes_overlap(
+                first["bbox"], second["bbox"]
+            ):
+                continue
+            a, b = first["tile"], second["tile"]
+            shared = rectangle(max(a[0], b[0]), max(a[1], b[1]),
+                               min(a[2], b[2]), min(a[3], b[3]))
+            seen_first = first["polygon"].intersection(shared)
+            seen_second = second["polygon"].intersection(shared)
+            union = seen_first.union(seen_second).area
+            if union and seen_first.intersection(seen_second).area / union >= iou:
+                group[find(j)] = find(i)
+
+    groups = {}
+    for index, entry in enumerate(parts):
+        groups.setdefault(find(index), []).append(entry)
+
+    merged = [entry["proposal"] for entry in whole]
+    for members in groups.values():
+        best = max(members, key=score)
+        if len(members) == 1:
+            merged.append(best["proposal"])
+            continue
+        segmentation = _flat(unary_union([member["polygon"] for member in members]))
+        if segmentation is None:
+            continue
+        merged.append({**best["proposal"], "segmentation": segmentation})
+
+    merged = [
+        {key: value for key, value in proposal.items() if key != "tile"}
+        for proposal in merged
+    ]
+    merged.sort(key=lambda p: p.get("score", 0.0), reverse=True)
+    return merged
+
+
 def describe_dropped(dropped):
     """Human-readable summary of a ``dropped_counts`` mapping, or ``""``."""
     labels = {
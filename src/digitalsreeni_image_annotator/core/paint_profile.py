@@ -0,0 +1,241 @@
+"""Opt-in timing counters for the canvas paint pass.
+
+``ImageLabel.paintEvent`` draws the image, the onion skin, every annotation,
+the tool overlays and the temp (DINO/YOLO) annotations in one pass on the GUI
+thread. Before this module a slow layer was only ever visible as a user
+complaint ("panning is sluggish on this project"), with nothing to say *which*
+layer had regressed or by how much.
+
+:class:`PaintProfiler` wraps each layer in a timing section and keeps two kinds
+of figures per layer: lifetime totals (count, total, max) and a rolling window
+of the most recent samples, which is what the on-canvas HUD shows and what
+answers "is it slow *now*". Frames are timed the same way, and the rolling
+frame window gives the FPS and latency read-out.
+
+Off by default and close to free when off: :meth:`PaintProfiler.layer` returns
+one shared no-op context manager, so an uninstrumented repaint pays an
+attribute read and a ``with`` per layer, nothing more.
+
+Qt-free on purpose, like the rest of ``core/``. The counters are plain floats
+and the report is a plain dict, so the CLI, a benchmark script or a test can
+read them without a display.
+"""
+
+import json
+import logging
+import os
+import time
+from collections import deque
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager, nullcontext
+from typing import Any, ContextManager
+
+# Environment switch, mirroring IMAGE_ANNOTATOR_DEBUG (ADR-030): set it to
+# anything but "" or "0" to have the counters running from the first frame,
+# rather than from whenever someone remembers to press the HUD shortcut.
+ENV_VAR = "IMAGE_ANNOTATOR_PROFILE_PAINT"
+
+# Rolling window length, in samples. ~2 s of frames at 60 Hz: long enough that
+# the HUD does not flicker, short enough that it reflects the last pan or zoom
+# rather than the whole session.
+DEFAULT_WINDOW = 120
+
+REPORT_VERSION = 1
+
+_NULL = nullcontext()
+
+
+def enabled_from_env(environ: Any = None) -> bool:
+    """Whether the environment asks for profiling from startup."""
+    environ = os.environ if environ is None else environ
+    return environ.get(ENV_VAR, "") not in ("", "0")
+
+
+def _percentile(samples: list[float], fraction: float) -> float:
+    """Nearest-rank percentile; 0.0 for no samples."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = min(len(ordered) - 1, max(0, int(round(fraction * (len(ordered) - 1)))))
+    return ordered[rank]
+
+
+class _Counter:
+    """Lifetime totals plus a rolling window for one timed section."""
+
+    __slots__ = ("count", "total", "max", "recent")
+
+    def __init__(self, window: int) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.recent: deque[float] = deque(maxlen=window)
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        self.recent.append(seconds)
+
+    def summary(self) -> dict[str, float]:
+        """Milliseconds throughout -- seconds read as 0.000 for any layer
+        worth looking at."""
+        recent = list(self.recent)
+        recent_mean = sum(recent) / len(recent) if recent else 0.0
+        return {
+            "count": self.count,
+            "total_ms": self.total * 1000.0,
+            "mean_ms": (self.total / self.count * 1000.0) if self.count else 0.0,
+            "max_ms": self.max * 1000.0,
+            "recent_mean_ms": recent_mean * 1000.0,
+            "recent_p95_ms": _percentile(recent, 0.95) * 1000.0,
+        }
+
+
+class PaintProfiler:
+    """Per-layer and per-frame paint timings.
+
+    Usage from a paint pass::
+
+        profiler.begin_frame()
+        with profiler.layer("annotations"):
+            renderer.draw_annotations(painter)
+        profiler.end_frame()
+
+    Layer names are free-form; the order they are first seen in is kept, so a
+    report lists layers in draw order.
+    """
+
+    def __init__(
+        self,
+        window: int = DEFAULT_WINDOW,
+        clock: Callable[[], float] = time.perf_counter,
+        enabled: bool = False,
+    ) -> None:
+        self._window = max(1, int(window))
+        self._clock = clock
+        self.enabled = bool(enabled)
+        self._layers: dict[str, _Counter] = {}
+        self._frame = _Counter(self._window)
+        # Start timestamps of recent frames: the FPS figure is the rate at which
+        # frames were actually painted, which is what a user perceives -- not
+        # 1 / paint time, which would read 900 FPS on an idle canvas.
+        self._frame_starts: deque[float] = deque(maxlen=self._window)
+        self._frame_start: float | None = None
+
+    # --- recording ----------------------------------------------------------
+
+    def set_enabled(self, enabled: bool) -> None:
+        self.enabled = bool(enabled)
+        self._frame_start = None
+
+    def begin_frame(self) -> None:
+        if not self.enabled:
+            return
+        self._frame_start = self._clock()
+        self._frame_starts.append(self._frame_start)
+
+    def end_frame(self) -> None:
+        if not self.enabled or self._frame_start is None:
+            return
+        self._frame.add(self._clock() - self._frame_start)
+        self._frame_start = None
+
+    def layer(self, name: str) -> ContextManager[None]:
+        """Time the enclosed block as layer ``name`` (a no-op when disabled)."""
+        if not self.enabled:
+            return _NULL
+        return self._timed(name)
+
+    @contextmanager
+    def _timed(self, name: str) -> Iterator[None]:
+        start = self._clock()
+        try:
+            yield
+        finally:
+            self.record(name, self._clock() - start)
+
+    def record(self, name: str, seconds: float) -> None:
+        """Add one sample for ``name`` directly (for callers that time
+        themselves)."""
+        counter = self._layers.get(name)
+        if counter is None:
+            counter = self._layers[name] = _Counter(self._window)
+        counter.add(seconds)
+
+    def reset(self) -> None:
+        self._layers.clear()
+        self._frame = _Counter(self._window)
+        self._frame_starts.clear()
+        self._frame_start = None
+
+    # --- reading ------------------------------------------------------------
+
+    def fps(self) -> float:
+        """Painted frames per second over the rolling window."""
+        if len(self._frame_starts) < 2:
+            return 0.0
+        span = self._frame_starts[-1] - self._frame_starts[0]
+        if span <= 0:
+            return 0.0
+        return (len(self._frame_starts) - 1) / span
+
+    def layer_names(self) -> list[str]:
+        return list(self._layers)
+
+    def report(self, context: dict[str, Any] | None = None) -> dict[str, Any]:
+        """The whole profile as a JSON-serialisable dict.
+
+        ``context`` is copied in verbatim -- the caller's chance to record what
+        was on screen (image size, annotation count, zoom), without which two
+        reports cannot be compared.
+        """
+        return {
+            "version": REPORT_VERSION,
+            "context": dict(context or {}),
+            "fps": self.fps(),
+            "frame": self._frame.summary(),
+            "layers": {name: c.summary() for name, c in self._layers.items()},
+        }
+
+    def hud_lines(self) -> list[str]:
+        """Short text lines for the on-canvas read-out, slowest layer first."""
+        frame = self._frame.summary()
+        lines = [
+            f"{self.fps():5.1f} FPS  frame {frame['recent_mean_ms']:6.2f} ms"
+            f"  p95 {frame['recent_p95_ms']:6.2f} ms"
+        ]
+        layers = sorted(
+            self._layers.items(),
+            key=lambda item: item[1].summary()["recent_mean_ms"],
+            reverse=True,
+        )
+        for name, counter in layers:
+            summary = counter.summary()
+            lines.append(
+                f"{name:<18} {summary['recent_mean_ms']:6.2f} ms"
+                f"  max {summary['max_ms']:6.2f}"
+            )
+        return lines
+
+    def dump_to_log(self, logger: logging.Logger, context: dict[str, Any] | None = None) -> None:
+        """Write the report to ``logger`` at INFO, one line per layer."""
+        report = self.report(context)
+        frame = report["frame"]
+        logger.info(
+            "Paint profile: %d frames, %.1f FPS, frame mean %.2f ms (max %.2f ms)",
+            frame["count"], report["fps"], frame["mean_ms"], frame["max_ms"],
+        )
+        for name, layer in report["layers"].items():
+            logger.info(
+                "  %-18s n=%-6d mean %.3f ms  p95(recent) %.3f ms  max %.3f ms",
+                name, layer["count"], layer["mean_ms"], layer["recent_p95_ms"],
+                layer["max_ms"],
+            )
+
+    def dump_json(self, path: str, context: dict[str, Any] | None = None) -> str:
+        """Write the report to ``path`` as JSON and return the path."""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(context), f, indent=2)
+        return path
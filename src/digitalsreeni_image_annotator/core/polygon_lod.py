@@ -0,0 +1,87 @@
+"""Level-of-detail polygon simplification for the canvas (render-only).
+
+SAM masks (``_mask_to_polygon`` returns the raw ``cv2.findContours`` boundary)
+and paint-tool strokes routinely carry thousands of vertices, and the canvas
+drew every one of them at every zoom. At 10 % zoom a 2000-vertex outline of a
+cell covers a few dozen screen pixels: most of those vertices land on the same
+pixel as their neighbours, and the paint pass pays for them anyway.
+
+This module picks, for a zoom factor, how coarse a Douglas-Peucker tolerance
+the outline can take while staying within :data:`SCREEN_TOLERANCE_PX` of the
+true outline *on screen*, and produces the simplified ring. Tolerances are
+quantised to a few power-of-two **levels** so a cache can hold a handful of
+variants per annotation instead of one per zoom step.
+
+**Render-only.** Nothing here writes to an annotation. The stored
+``segmentation`` is what is hit-tested, exported and QC'd; this is the same
+distinction ADR-025's Detail % draws between the raw and the effective polygon,
+except that LOD never becomes the effective polygon. Simplification is a
+property of the view, not of the data.
+
+Qt-free; the ``QPolygonF`` cache that consumes it lives in
+``widgets/render_cache.py``.
+"""
+
+import math
+from collections.abc import Sequence
+
+import numpy as np
+
+# Maximum on-screen deviation, in device pixels, between the drawn and the true
+# outline. Below a pixel the difference cannot be seen; antialiasing makes
+# half a pixel the safe figure.
+SCREEN_TOLERANCE_PX = 0.5
+
+# Image-space tolerance of level 0; level k is BASE_TOLERANCE * 2**k. Level 0
+# applies below a zoom of 1.0, so at or above 100 % the raw outline is always
+# what is drawn.
+BASE_TOLERANCE = SCREEN_TOLERANCE_PX
+LEVELS = 8  # up to 64 image px, i.e. down to ~1 % zoom
+
+# Outlines this small are never worth simplifying: the approxPolyDP call would
+# cost more than the vertices it removes.
+MIN_VERTICES = 32
+
+RAW_LEVEL = -1
+
+
+def level_for_zoom(zoom_factor: float) -> int:
+    """The coarsest level whose tolerance stays under the screen budget.
+
+    :data:`RAW_LEVEL` when the view is at or above native resolution (or the
+    zoom is nonsense), otherwise ``0 .. LEVELS - 1``.
+    """
+    if not zoom_factor or zoom_factor <= 0 or not math.isfinite(zoom_factor):
+        return RAW_LEVEL
+    allowed = SCREEN_TOLERANCE_PX / zoom_factor
+    if allowed <= BASE_TOLERANCE:
+        return RAW_LEVEL
+    # Floor, never round: rounding up would exceed the screen budget.
+    return min(LEVELS - 1, int(math.floor(math.log2(allowed / BASE_TOLERANCE))))
+
+
+def tolerance(level: int) -> float:
+    """Image-space Douglas-Peucker tolerance of ``level`` (0 for raw)."""
+    if level < 0:
+        return 0.0
+    return BASE_TOLERANCE * (2 ** level)
+
+
+def simplify_ring(flat: Sequence[float], level: int) -> list[float]:
+    """The flat ``[x0, y0, ...]`` ring simplified to ``level``.
+
+    Returns the input (as a list) for :data:`RAW_LEVEL`, for rings below
+    :data:`MIN_VERTICES`, and whenever simplification would leave fewer than
+    three vertices -- a shape that vanishes on zoom-out is worse than a shape
+    drawn with a few vertices too many.
+    """
+    n = len(flat) // 2
+    if level < 0 or n < MIN_VERTICES:
+        return list(flat)
+    import cv2
+
+    contour = np.asarray(flat[: n * 2], dtype=np.float32).reshape(-1, 1, 2)
+    approx = cv2.approxPolyDP(contour, tolerance(level), True)
+    if len(approx) < 3:
+        return list(flat)
+    return [float(v) for v in approx.reshape(-1)]
@@ -0,0 +1,202 @@
+"""Raw model predictions, kept between review runs (#71).
+
+A review run spends nearly all of its time in inference, yet the usual reason
+to run it again is that the *labels* changed: the model and the pixels did
+not, so neither did the predictions. Keeping them under ``(model key, image
+digest)`` lets a re-run only re-score, and run the model only for images it
+has not seen or after the model changed.
+
+Each model key has a JSON-lines file in ``.prediction_cache/`` beside the
+project, ``{"digest": ..., "predictions": [...]}`` one image each, read the
+first time that key is asked for. :meth:`PredictionCache.save` appends the
+entries added since the last save. A digest whose predictions changed, or a
+file that holds a digest twice or an unreadable line, is rewritten whole
+instead, so a file has one line per image. The model key is a digest itself
+(see ``ReviewController.model_key``), so it is safe as a file name.
+
+Every training round is a new model key, so saving also keeps only the
+:data:`MAX_MODEL_KEYS` most recently used ones and deletes the other files.
+Thread-safe: the review's decode thread looks predictions up while the GUI
+thread adds them.
+
+``directory=None`` keeps the cache in memory.
+
+Qt-free.
+"""
+
+import json
+import os
+import threading
+from typing import Any
+
+from .logging_config import get_logger
+
+logger = get_logger(__name__)
+
+CACHE_DIRNAME = ".prediction_cache"
+CACHE_SUFFIX = ".jsonl"
+
+# Models whose predictions are kept. Enough to go back a few training rounds;
+# each file holds one line per image of the project.
+MAX_MODEL_KEYS = 5
+
+
+def _line(digest: str, predictions: Any) -> str:
+    return json.dumps({"digest": digest, "predictions": predictions}, separators=(",", ":")) + "\n"
+
+
+class PredictionCache:
+    """``{(model key, digest): predictions}``, optionally persisted."""
+
+    def __init__(self, directory: str | None = None):
+        self.directory = directory
+        # Least recently used model key first.
+        self._entries: dict[str, dict[str, Any]] = {}
+        self._pending: dict[str, dict[str, Any]] = {}
+        self._rewrite: set[str] = set()
+        self._lock = threading.Lock()
+
+    @property
+    def path(self) -> str | None:
+        return os.path.join(self.directory, CACHE_DIRNAME) if self.directory else None
+
+    def _file(self, model_key: str) -> str | None:
+        return os.path.join(self.path, model_key + CACHE_SUFFIX) if self.path else None
+
+    def _model(self, model_key: str) -> dict[str, Any]:
+        entries = self._entries.pop(model_key, None)
+        if entries is None:
+            entries = self._load(model_key)
+        self._entries[model_key] = entries
+        return entries
+
+    def _load(self, model_key: str) -> dict[str, Any]:
+        entries: dict[str, Any] = {}
+        path = self._file(model_key)
+        if not path or not os.path.exists(path):
+            return entries
+        lines = skipped = 0
+        try:
+            with open(path, encoding="utf-8") as handle:
+                for line in handle:
+                    lines += 1
+                    try:
+                        entry = json.loads(line)
+                        entries[entry["digest"]] = entry["predictions"]
+                    except (ValueError, KeyError, TypeError):
+                        skipped += 1
+        except OSError:
+            # A lost cache only costs inference.
+            logger.warning("could not read the prediction cache %s", path)
+        if skipped:
+            logger.warning("%s: skipped %d unreadable line(s)", path, skipped)
+        if lines > len(entries):
+            self._rewrite.add(model_key)
+        return entries
+
+    def get(self, model_key: str | None, digest: str | None) -> Any | None:
+        """The cached predictions, or ``None`` (also for a missing key)."""
+        if model_key is None or digest is None:
+            return None
+        with self._lock:
+            return self._model(model_key).get(digest)
+
+    def put(self, model_key: str | None, digest: str | None, predictions: Any) -> None:
+        if model_key is None or digest is None:
+            return
+        with self._lock:
+            entries = self._model(model_key)
+            if digest in entries and digest not in self._pending.get(model_key, {}):
+                if entries[digest] == predictions:
+                    return
+                self._rewrite.add(model_key)  # appending would repeat the digest
+            entries[digest] = predictions
+            self._pending.setdefault(model_key, {})[digest] = predictions
+
+    def save(self) -> None:
+        """Write the entries added since the last save, then drop all but the
+        :data:`MAX_MODEL_KEYS` most recently used model keys."""
+        with self._lock:
+            if not self.path:
+                self._pending.clear()
+                self._rewrite.clear()
+                self._prune([])
+                return
+            try:
+                os.makedirs(self.path, exist_ok=True)
+            except OSError:
+                logger.warning("could not write the prediction cache to %s", self.path)
+                return
+            for model_key in set(self._pending) | self._rewrite:
+                if model_key in self._rewrite:
+                    written = self._write_all(model_key)
+                else:
+                    written = self._append(model_key)
+                if written:
+                    self._pending.pop(model_key, None)
+                    self._rewrite.discard(model_key)
+            self._prune(self._files_by_age())
+
+    def _append(self, model_key: str) -> bool:
+        path = self._file(model_key)
+        if path is None:
+            return False
+        try:
+            with open(path, "a", encoding="utf-8") as handle:
+                for digest, predictions in self._pending[model_key].items():
+                    handle.write(_line(digest, predictions))
+        except OSError:
+            logger.warning("could not write the prediction cache %s", path)
+            return False
+        return True
+
+    def _write_all(self, model_key: str) -> bool:
+        path = self._file(model_key)
+        if path is None:
+            return False
+        temp = path + ".tmp"
+        try:
+            with open(temp, "w", encoding="utf-8") as handle:
+                for digest, predictions in self._entries[model_key].items():
+                    handle.write(_line(digest, predictions))
+            os.replace(temp, path)
+        except OSError:
+            logger.warning("could not rewrite the prediction cache %s", path)
+            return False
+        return True
+
+    def _files_by_age(self) -> list[str]:
+        """Model keys with a file but not used in this session, oldest first."""
+        if self.path is None:
+            return []
+        ages = {}
+        try:
+            for name in os.listdir(self.path):
+                model_key, suffix = os.path.splitext(name)
+                if suffix == CACHE_SUFFIX and model_key not in self._entries:
+                    ages[model_key] = os.path.getmtime(os.path.join(self.path, name))
+        except OSError:
+            logger.warning("could not list the prediction cache %s", self.path)
+        return sorted(ages, key=ages.__getitem__)
+
+    def _prune(self, unused: list[str]) -> None:
+        """Forget, and delete the file of, every model key but the
+        :data:`MAX_MODEL_KEYS` most recently used. ``unused`` are the keys
+        on disk not used in this session, which are older than any that
+        were."""
+        for model_key in (unused + list(self._entries))[:-MAX_MODEL_KEYS]:
+            self._entries.pop(model_key, None)
+            self._pending.pop(model_key, None)
+            self._rewrite.discard(model_key)
+            path = self._file(model_key)
+            if path is None:
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError:
+                logger.warning("could not remove the prediction cache %s", path)
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self._entries.values())
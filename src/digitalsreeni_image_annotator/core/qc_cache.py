@@ -0,0 +1,93 @@
+"""Per-image QC results, kept between audits.
+
+A project's annotations mostly do not change between two CI runs of
+``sreeni-cli validate``, yet every run audited every image again. The
+per-image half of the audit (:func:`annotation_qc.audit_image`) depends only
+on that image's annotations, its size and the :class:`QCConfig`, so its result
+can be stored under a digest of exactly those (:func:`annotation_qc.shard_key`)
+and reused until one of them changes.
+
+The file is JSON lines, ``{"key": ..., "result": ...}`` one image each. It is
+rewritten after an audit that added or outgrew entries, keeping only the
+entries that audit used: an edited image's old result is never read again,
+and a file that only grew would hold every past state of the project.
+
+``path=None`` keeps the cache in memory.
+
+Qt-free.
+"""
+
+import json
+import os
+from typing import Any
+
+from .logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class QCCache:
+    """``{shard key: per-image audit result}``, optionally backed by a file."""
+
+    def __init__(self, path: str | None = None):
+        self.path = path
+        self._entries: dict[str, Any] = {}
+        self._used: set[str] = set()
+        self._dirty = False
+        if path and os.path.exists(path):
+            self._load(path)
+
+    def _load(self, path: str) -> None:
+        skipped = 0
+        try:
+            with open(path, encoding="utf-8") as handle:
+                for line in handle:
+                    try:
+                        entry = json.loads(line)
+                        self._entries[entry["key"]] = entry["result"]
+                    except (ValueError, KeyError, TypeError):
+                        skipped += 1
+        except OSError:
+            # A lost cache only costs a full audit.
+            logger.warning("could not read the QC cache %s", path)
+        if skipped:
+            logger.warning("%s: skipped %d unreadable line(s)", path, skipped)
+
+    def get(self, key: str) -> Any | None:
+        result = self._entries.get(key)
+        if result is not None:
+            self._used.add(key)
+        return result
+
+    def put(self, key: str, result: Any) -> None:
+        self._entries[key] = result
+        self._used.add(key)
+        self._dirty = True
+
+    def save(self) -> None:
+        """Keep only the entries used since the last save, and write them if
+        anything changed."""
+        changed = self._dirty or len(self._entries) > len(self._used)
+        self._entries = {
+            key: result for key, result in self._entries.items() if key in self._used
+        }
+        self._used.clear()
+        if not self.path or not changed:
+            self._dirty = False
+            return
+        temporary = f"{self.path}.tmp"
+        try:
+            with open(temporary, "w", encoding="utf-8") as handle:
+                for key, result in self._entries.items():
+                    handle.write(
+                        json.dumps({"key": key, "result": result}, separators=(",", ":"))
+                        + "\n"
+                    )
+            os.replace(temporary, self.path)
+        except OSError:
+            logger.warning("could not write the QC cache %s", self.path)
+            return
+        self._dirty = False
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -22,9 +22,13 @@ threshold is instant, since the embeddings do not change.
 
 import collections
 import math
+import os
+from concurrent.futures import ThreadPoolExecutor
 
 import numpy as np
 
+from .ann_index import DEFAULT_PROBES, IVFIndex
+
 DEFAULT_SIMILARITY = 0.95
 
 # Appearance modes are components at a deliberately *low* threshold: the
@@ -46,27 +50,37 @@ MODE_SIMILARITY = 0.80
 # limit below.
 _MAX_BLOCK_ELEMENTS = 4_000_000
 
-# Above this many images the run stops being worth starting. The old limit was
-# 3000 and it measured the implementation rather than the problem: a pure-
-# Python double loop recomputing both vector norms per pair. Vectorised, 20 000
-# images re-cluster in a few seconds with bounded peak memory, and the binding
-# cost has moved to *embedding* -- one forward pass per image through CLIP or
-# DINOv2, which nothing here makes cheaper.
+# Threads a pairwise pass is spread over. Threads rather than processes: the
+# matrix products and comparisons release the GIL, and every worker reads the
+# one (n, d) matrix in place instead of a pickled copy of it. The block budget
+# above is shared between them, so peak memory does not grow with the count.
+SCAN_WORKERS = min(8, os.cpu_count() or 1)
+
+# Up to this many images every pair is compared. The old limit was 3000 and
+# it measured the implementation rather than the problem: a pure-Python double
+# loop recomputing both vector norms per pair. Vectorised, 20 000 images
+# re-cluster in a few seconds with bounded peak memory.
 #
 # Measured on this module at 20 000 images with 768-d vectors: the (n, d)
 # matrix is a 61 MB floor that every routine pays, and the blocked pairwise
-# work sits on top of it -- analyse 99 MB, representative 94 MB, cohesion
-# 113 MB. The floor is inherent; the pairwise term is what blocking bounds.
+# work sits on top of it -- analyse 99 MB, cohesion 113 MB. The floor is
+# inherent; the pairwise term is what blocking bounds.
 #
-# So the limit is now set by what a person will wait for, not by what fits in
-# RAM, and the message says which.
+# Above it the pass goes through an IVF index (core.ann_index) instead, which
+# compares each image only with the few lists of images nearest it: quadratic
+# time is what stopped at 20 000, not memory.
 ALL_PAIRS_LIMIT = 20_000
 
-ALL_PAIRS_LIMIT_MESSAGE = (
-    f"This project has more than {ALL_PAIRS_LIMIT} images. Every one of them "
+# Above this many images a run stops being worth starting. The (n, d) matrix
+# is 1.5 GB at 768-d, and every one of the images has to go through the
+# embedding model once before anything can be compared -- days without a GPU.
+CURATION_LIMIT = 500_000
+
+CURATION_LIMIT_MESSAGE = (
+    f"This project has more than {CURATION_LIMIT} images. Every one of them "
     "has to go through the embedding model once before anything can be "
-    "compared, and at this scale that alone runs for a long time -- hours "
-    "without a GPU. Comparing them afterwards is quick by contrast.\n\n"
+    "compared, and at this scale that alone runs for days without a GPU, "
+    "while the comparison needs several gigabytes of memory.\n\n"
     "Narrow the selection (for example by group) and try again."
 )
 
@@ -152,13 +166,50 @@ def _matrix(embeddings):
     return names, _stack(names, embeddings or {})
 
 
-def _block_rows(n):
+def _block_rows(n, workers=1):
     """How many rows to multiply at once so one block stays inside the budget.
 
+    ``workers`` blocks are in flight at once, so each gets its share of it.
     At least one row, so a very wide embedding can never divide to zero and
     loop forever.
     """
-    return max(1, _MAX_BLOCK_ELEMENTS // max(1, n))
+    return max(1, _MAX_BLOCK_ELEMENTS // max(1, workers) // max(1, n))
+
+
+def _workers(workers):
+    return max(1, SCAN_WORKERS if workers is None else workers)
+
+
+def _in_parallel(work, tasks, workers):
+    """``work(stripe)`` for each of ``workers`` interleaved stripes of
+    ``tasks``, on a thread pool; the results in stripe order.
+
+    Each stripe is one call, so a worker keeps whatever it accumulates -- a
+    partial labelling, a running minimum -- to itself, and nothing is shared
+    until the results are merged.
+    """
+    stripes = [tasks[offset::workers] for offset in range(workers)]
+    stripes = [stripe for stripe in stripes if stripe]
+    if len(stripes) <= 1:
+        return [work(stripe) for stripe in stripes]
+    with ThreadPoolExecutor(len(stripes)) as pool:
+        return list(pool.map(work, stripes))
+
+
+def _merged(n, partials):
+    """One :class:`_Labelling` joining the components of every partial one.
+
+    A partial labelling says each row is connected to the row its label
+    names, so those ``(row, label)`` pairs are all the edges it found, as far
+    as components go.
+    """
+    if len(partials) == 1:
+        return partials[0]
+    labelling = _Labelling(n)
+    rows = np.arange(n)
+    for partial in partials:
+        labelling.join(rows, partial.labels)
+    return labelling
 
 
 class _Labelling:
@@ -210,6 +261,43 @@ class _Labelling:
             if self.distinct <= 1:
                 return
 
+    def join(self, first, second):
+        """Merge the components of each row pair ``(first[k], second[k])``.
+
+        The index scan's counterpart of :meth:`absorb`: its blocks are
+        scattered rows against scattered columns, and at a few hundred
+        thousand rows the per-merge O(n) rewrite of ``absorb`` is what would
+        dominate. Here the pairs collapse to the handful of distinct labels
+        they touch, those are joined by min-label propagation with pointer
+        jumping, and the labels are rewritten once.
+        """
+        if self.distinct <= 1:
+            return
+        labels = self.labels
+        left, right = labels[first], labels[second]
+        differ = left != right
+        if not differ.any():
+            return
+        left, right = left[differ], right[differ]
+        ids, inverse = np.unique(np.concatenate([left, right]), return_inverse=True)
+        left, right = inverse[: left.size], inverse[left.size:]
+        # `root[i]` converges to the smallest position in i's component, and
+        # `ids` is sorted, so ids[root] is the component's smallest label.
+        root = np.arange(ids.size)
+        while True:
+            low = np.minimum(root[left], root[right])
+            moved = root.copy()
+            np.minimum.at(moved, left, low)
+            np.minimum.at(moved, right, low)
+            moved = moved[moved]
+            if np.array_equal(moved, root):
+                break
+            root = moved
+        self.distinct -= ids.size - np.unique(root).size
+        lookup = np.arange(labels.size)
+        lookup[ids] = ids[root]
+        self.labels = lookup[labels]
+
     def groups(self):
         """Row indices per component, each ascending."""
         components = {}
@@ -218,7 +306,16 @@ class _Labelling:
         return list(components.values())
 
 
-def _scan(matrix, thresholds):
+def _approximate(n, probes):
+    """Whether a pass over ``n`` rows goes through the index.
+
+    ``probes=None`` decides by size; a number asks for the index with that
+    many probes at any size.
+    """
+    return probes is not None or n > ALL_PAIRS_LIMIT
+
+
+def _scan(matrix, thresholds, probes=None, workers=None):
     """One blocked pass over every pair. ``(labellings, nearest)``.
 
     A single matrix product per block serves *all* the questions asked of it:
@@ -232,23 +329,80 @@ def _scan(matrix, thresholds):
     (:func:`_block_rows`), so peak memory is bounded by a constant instead of
     the n^2 the old implementation would have needed had it materialised
     anything at all.
+
+    Above ``ALL_PAIRS_LIMIT``, or whenever ``probes`` is given, the pass only
+    covers the pairs the IVF index probes (:func:`_index_scan`).
+
+    The blocks are spread over ``workers`` threads (``SCAN_WORKERS`` by
+    default). Each worker labels its own blocks into labellings of its own,
+    and those are merged once at the end: the labels are the one thing the
+    blocks share, and merging them is cheap next to locking them per block.
+    ``nearest`` needs no merge -- every row is in exactly one block.
+    """
+    n = matrix.shape[0]
+    workers = _workers(workers)
+    if _approximate(n, probes):
+        return _index_scan(matrix, thresholds, probes or DEFAULT_PROBES, workers)
+    nearest = np.full(n, -np.inf, dtype=np.float32)
+    chunk = _block_rows(n, workers)
+
+    def work(starts):
+        labellings = [_Labelling(n) for _ in thresholds]
+        for start in starts:
+            stop = min(start + chunk, n)
+            similarities = matrix[start:stop] @ matrix.T
+            # A row is not its own neighbour, and must not be its own nearest.
+            similarities[np.arange(stop - start), np.arange(start, stop)] = -np.inf
+            nearest[start:stop] = similarities.max(axis=1)
+            for labelling, threshold in zip(labellings, thresholds):
+                hits = similarities >= threshold
+                labelling.absorb(hits, hits.sum(axis=1), start)
+        return labellings
+
+    partials = _in_parallel(work, list(range(0, n, chunk)), workers)
+    return _merge_partials(n, thresholds, partials), nearest
+
+
+def _merge_partials(n, thresholds, partials):
+    """Per-threshold labellings from each worker's list of them."""
+    if not partials:
+        return [_Labelling(n) for _ in thresholds]
+    return [
+        _merged(n, [labellings[position] for labellings in partials])
+        for position in range(len(thresholds))
+    ]
+
+
+def _index_scan(matrix, thresholds, probes, workers=1):
+    """:func:`_scan` over the pairs an :class:`IVFIndex` probes.
+
+    Same answers to the same questions, with the index's recall: a pair the
+    index never compares is an edge no labelling sees, so a component can
+    only come out split, and ``nearest`` can only come out low. Spread over
+    ``workers`` threads the same way.
     """
     n = matrix.shape[0]
-    labellings = [_Labelling(n) for _ in thresholds]
     nearest = np.full(n, -np.inf, dtype=np.float32)
-    chunk = _block_rows(n)
+    index = IVFIndex(
+        matrix, probes, block_elements=_MAX_BLOCK_ELEMENTS // max(1, workers)
+    )
 
-    for start in range(0, n, chunk):
-        stop = min(start + chunk, n)
-        similarities = matrix[start:stop] @ matrix.T
-        # A row is not its own neighbour, and must not be its own nearest.
-        similarities[np.arange(stop - start), np.arange(start, stop)] = -np.inf
-        nearest[start:stop] = similarities.max(axis=1)
-        for labelling, threshold in zip(labellings, thresholds):
-            hits = similarities >= threshold
-            labelling.absorb(hits, hits.sum(axis=1), start)
+    def work(blocks):
+        labellings = [_Labelling(n) for _ in thresholds]
+        for rows, columns, offset in blocks:
+            similarities = matrix[rows] @ matrix[columns].T
+            local = np.arange(rows.size)
+            similarities[local, offset + local] = -np.inf
+            # Every row is the `rows` of exactly one block, so this is the
+            # row's only write.
+            nearest[rows] = similarities.max(axis=1)
+            for labelling, threshold in zip(labellings, thresholds):
+                hit_rows, hit_columns = np.nonzero(similarities >= threshold)
+                labelling.join(rows[hit_rows], columns[hit_columns])
+        return labellings
 
-    return labellings, nearest
+    partials = _in_parallel(work, list(index.blocks()), workers)
+    return _merge_partials(n, thresholds, partials), nearest
 
 
 def _named_groups(names, labelling):
@@ -258,29 +412,47 @@ def _named_groups(names, labelling):
     return groups
 
 
-def _pairwise_stats(matrix):
-    """``(minimum, mean)`` over the distinct pairs of ``matrix``' rows."""
+def _pairwise_stats(matrix, workers=None):
+    """``(minimum, mean)`` over the distinct pairs of ``matrix``' rows.
+
+    The mean is exact at any size: the pairwise sum is the squared norm of the
+    column sum less each row's similarity to itself. The minimum needs the
+    pairs, so above ``ALL_PAIRS_LIMIT`` rows it is taken over that many evenly
+    spaced rows -- which can only overstate it. The minimum's blocks are
+    spread over ``workers`` threads like :func:`_scan`'s.
+    """
     n = matrix.shape[0]
-    chunk = _block_rows(n)
-    minimum, total, count = math.inf, 0.0, 0
-    for start in range(0, n, chunk):
-        stop = min(start + chunk, n)
-        similarities = matrix[start:stop] @ matrix.T
-        # Upper triangle only, so each pair is counted once and no row is
-        # compared with itself.
-        upper = similarities[
-            np.arange(start, stop)[:, None] < np.arange(n)[None, :]
-        ]
-        if upper.size:
-            minimum = min(minimum, float(upper.min()))
-            total += float(upper.sum())
-            count += upper.size
-    if not count:
+    if n < 2:
         return None
-    return minimum, total / count
-
-
-def cluster(embeddings, threshold=DEFAULT_SIMILARITY):
+    column_sum = matrix.sum(axis=0, dtype=np.float64)
+    own = float(np.einsum("ij,ij->", matrix, matrix, dtype=np.float64))
+    mean = (float(column_sum @ column_sum) - own) / (n * (n - 1))
+
+    if n > ALL_PAIRS_LIMIT:
+        matrix = matrix[np.linspace(0, n - 1, ALL_PAIRS_LIMIT).astype(np.intp)]
+        n = ALL_PAIRS_LIMIT
+    workers = _workers(workers)
+    chunk = _block_rows(n, workers)
+
+    def work(starts):
+        minimum = math.inf
+        for start in starts:
+            stop = min(start + chunk, n)
+            # Upper triangle only, so no row is compared with itself -- and
+            # only the columns past the block's first row can hold any of it.
+            similarities = matrix[start:stop] @ matrix[start:].T
+            upper = similarities[
+                np.arange(stop - start)[:, None] < np.arange(n - start)[None, :]
+            ]
+            if upper.size:
+                minimum = min(minimum, float(upper.min()))
+        return minimum
+
+    minimum = min(_in_parallel(work, list(range(0, n, chunk)), workers))
+    return minimum, mean
+
+
+def cluster(embeddings, threshold=DEFAULT_SIMILARITY, probes=None):
     """Group names whose embeddings are mutually reachable above ``threshold``.
 
     ``embeddings`` is ``{name: vector}``. Returns a list of clusters, each a
@@ -293,17 +465,22 @@ def cluster(embeddings, threshold=DEFAULT_SIMILARITY):
     C are below the threshold. That is the right transitive behaviour for a
     burst of frames drifting slowly: consecutive pairs are near-identical while
     the ends of the run are not.
+
+    ``probes`` is the index's recall knob (:mod:`core.ann_index`); ``None``
+    compares every pair up to ``ALL_PAIRS_LIMIT`` images and uses the index
+    with ``DEFAULT_PROBES`` above it. The same applies to every function here
+    that takes it.
     """
     names, matrix = _matrix(embeddings)
     if len(names) < 2:
         return []
-    labellings, _nearest = _scan(matrix, [threshold])
+    labellings, _nearest = _scan(matrix, [threshold], probes)
     return [
         group for group in _named_groups(names, labellings[0]) if len(group) > 1
     ]
 
 
-def modes(embeddings, threshold=MODE_SIMILARITY):
+def modes(embeddings, threshold=MODE_SIMILARITY, probes=None):
     """A **partition** of every name into coarse appearance modes.
 
     Same machinery as :func:`cluster` at a lower threshold and with singletons
@@ -318,12 +495,15 @@ def modes(embeddings, threshold=MODE_SIMILARITY):
     names, matrix = _matrix(embeddings)
     if not names:
         return []
-    labellings, _nearest = _scan(matrix, [threshold])
+    labellings, _nearest = _scan(matrix, [threshold], probes)
     return _named_groups(names, labellings[0])
 
 
 def analyse(
-    embeddings, threshold=DEFAULT_SIMILARITY, mode_threshold=MODE_SIMILARITY
+    embeddings,
+    threshold=DEFAULT_SIMILARITY,
+    mode_threshold=MODE_SIMILARITY,
+    probes=None,
 ):
     """``{"clusters", "outliers", "modes"}`` from a single pass over the pairs.
 
@@ -338,6 +518,9 @@ def analyse(
     is returned: the slider reaches 0.50, well below the 0.80 default, and
     modes finer than the near-duplicate clusters they are supposed to
     generalise would invert the relationship the report describes.
+
+    ``approximate`` says whether the pass went through the index, so the
+    report can say its clusters may be split.
     """
     mode_threshold = min(mode_threshold, threshold)
     names, matrix = _matrix(embeddings)
@@ -347,9 +530,10 @@ def analyse(
             "outliers": [],
             "modes": [[name] for name in names],
             "mode_threshold": mode_threshold,
+            "approximate": False,
         }
 
-    labellings, nearest = _scan(matrix, [threshold, mode_threshold])
+    labellings, nearest = _scan(matrix, [threshold, mode_threshold], probes)
     return {
         "clusters": [
             group for group in _named_groups(names, labellings[0]) if len(group) > 1
@@ -359,6 +543,7 @@ def analyse(
         ],
         "modes": _named_groups(names, labellings[1]),
         "mode_threshold": mode_threshold,
+        "approximate": _approximate(len(names), probes),
     }
 
 
@@ -376,7 +561,8 @@ def cohesion(cluster_names, embeddings):
     deserves a second look before anything is skipped on its account.
 
     ``None`` for fewer than two names: a single image has no pairs, and
-    reporting 1.0 for it would be inventing a measurement.
+    reporting 1.0 for it would be inventing a measurement. Above
+    ``ALL_PAIRS_LIMIT`` members the minimum is sampled (:func:`_pairwise_stats`).
     """
     present = [name for name in (cluster_names or []) if name in (embeddings or {})]
     if len(present) < 2:
@@ -400,36 +586,30 @@ def representative(cluster_names, embeddings):
     if len(cluster_names) == 1:
         return cluster_names[0]
     matrix = _stack(cluster_names, embeddings)
-    count = matrix.shape[0]
-    totals = np.empty(count, dtype=np.float32)
-    # Blocked like everything else here. A single video clusters into ONE
-    # component, so `cluster_names` can be the whole dataset -- an unblocked
-    # k x k product would be a 1.6 GB allocation at the supported ceiling, and
-    # the dialog calls this once per cluster.
-    chunk = _block_rows(count)
-    for start in range(0, count, chunk):
-        stop = min(start + chunk, count)
-        similarities = matrix[start:stop] @ matrix.T
-        # Mean similarity to the *others*: the row sum less the row's
-        # similarity to itself, which is 1 for any real vector and 0 for a zero
-        # one -- so it is subtracted rather than assumed. The divisor is the
-        # same for every row, so argmax over the sums is the same answer.
-        own = similarities[np.arange(stop - start), np.arange(start, stop)]
-        totals[start:stop] = similarities.sum(axis=1) - own
+    # Each row's summed similarity to every row is its dot product with the
+    # column sum, so the medoid is one matrix-vector product: exact, linear,
+    # and no pairwise pass at all -- a single video clusters into ONE
+    # component, so `cluster_names` can be hundreds of thousands of frames.
+    # Less the row's similarity to itself, which is 1 for any real vector and
+    # 0 for a zero one -- so it is subtracted rather than assumed. The divisor
+    # is the same for every row, so argmax over the sums is the same answer.
+    column_sum = matrix.sum(axis=0, dtype=np.float64).astype(np.float32)
+    totals = matrix @ column_sum - np.einsum("ij,ij->i", matrix, matrix)
     # argmax takes the first of a tie, matching the strict `>` the loop used.
     return cluster_names[int(np.argmax(totals))]
 
 
-def outliers(embeddings, threshold=DEFAULT_SIMILARITY):
+def outliers(embeddings, threshold=DEFAULT_SIMILARITY, probes=None):
     """Names whose nearest neighbour is below ``threshold``.
 
     The other half of the diversity picture: these are the images nothing else
     in the dataset resembles, which is where coverage is thinnest.
+    An approximate pass can only add names, never drop one.
     """
     names, matrix = _matrix(embeddings)
     if len(names) < 2:
         return []
-    _labellings, nearest = _scan(matrix, [])
+    _labellings, nearest = _scan(matrix, [], probes)
     return [name for index, name in enumerate(names) if nearest[index] < threshold]
 
 
@@ -137,6 +137,11 @@ class SliceProvider:
     orphans annotations).
     """
 
+    # ``extract`` only reads the retained array, so a worker thread may call it
+    # while the GUI thread extracts other slices (onion-ghost preparation).
+    # VideoSliceProvider does not say this: its extract seeks a shared capture.
+    thread_safe_extract = True
+
     def __init__(self, image_array, dimensions, base_name):
         self._array = image_array
         self.dimensions = list(dimensions)
@@ -190,6 +195,7 @@ class LazySliceList:
     Supports the access patterns every consumer uses:
 
     - ``lazy.get(name)`` — LRU-cached materialise (miss extracts + inserts).
+    - ``lazy.cached(name)`` — LRU hit or ``None``; never extracts.
     - ``lazy[i]`` -> ``(name, qimage)`` (probes like ``slices[0][1]``).
     - ``for name, qimage in lazy`` — one-at-a-time materialise, feeding/
       evicting the shared LRU so a full export/DINO-batch pass never holds
@@ -221,6 +227,11 @@ class LazySliceList:
         self._lru.put(key, qimage)
         return qimage
 
+    def cached(self, name):
+        """The slice QImage for ``name`` if the shared LRU holds it, else
+        ``None`` -- never extracts. GUI thread only, like the LRU itself."""
+        return self._lru.get((self.provider.provider_id, name))
+
     def __getitem__(self, index):
         name = self.names[index]
         return (name, self.get(name))
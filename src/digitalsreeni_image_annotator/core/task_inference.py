@@ -13,22 +13,23 @@ train is a bug by construction, so both derive from the same rules here.
 Qt-free: this is arithmetic over the annotations dict, and it is the sort of
 thing that should be exhaustively unit-tested on hand-built inputs rather than
 through a dialog.
+
+The counting itself is ``core.annotation_stats``'s, so the Data row and the
+statistics dialog agree; a caller holding the project's
+:class:`~core.annotation_stats.AnnotationStats` passes it as ``stats`` instead
+of having every annotation walked again.
 """
 
 import os
 
+from .annotation_stats import AnnotationStats, is_pose
+
 TASK_DETECT = "detect"
 TASK_SEGMENT = "segment"
 TASK_POSE = "pose"
 
 
-def _is_pose(annotation):
-    """Pose instances are identified by the **absence** of a segmentation key,
-    the discriminator the whole app routes on (ADR-029)."""
-    return "keypoints" in annotation and not annotation.get("segmentation")
-
-
-def infer_task(all_annotations):
+def infer_task(all_annotations, stats=None):
     """``(task, reason)`` for a project's annotations.
 
     Precedence is pose > segment > detect, and that order is deliberate rather
@@ -40,7 +41,7 @@ def infer_task(all_annotations):
     An empty project yields ``(None, reason)`` — there is nothing to train, and
     guessing a default would produce a confusing failure later.
     """
-    counts = count_shapes(all_annotations)
+    counts = count_shapes(all_annotations, stats)
     if counts["pose"]:
         if counts["polygon"] or counts["bbox"]:
             return TASK_POSE, (
@@ -61,54 +62,32 @@ def infer_task(all_annotations):
     return None, "no annotations to train on"
 
 
-def count_shapes(all_annotations):
+def _stats(all_annotations, stats):
+    return stats if stats is not None else AnnotationStats().sync(all_annotations or {})
+
+
+def count_shapes(all_annotations, stats=None):
     """``{"polygon", "bbox", "pose"}`` counts across the project.
 
-    Iterates the annotations mapping, which is keyed by image *and* slice name,
-    so slices count too.
+    Counts the annotations mapping, which is keyed by image *and* slice name,
+    so slices count too. ``Temp-`` classes are pending review, not training
+    data, and are left out.
     """
-    counts = {"polygon": 0, "bbox": 0, "pose": 0}
-    for by_class in (all_annotations or {}).values():
-        for class_name, annotations in (by_class or {}).items():
-            if class_name.startswith("Temp-"):
-                continue  # pending review, not training data
-            for annotation in annotations or []:
-                if _is_pose(annotation):
-                    counts["pose"] += 1
-                elif annotation.get("segmentation"):
-                    counts["polygon"] += 1
-                elif annotation.get("bbox"):
-                    counts["bbox"] += 1
-    return counts
-
-
-def summarise_dataset(all_annotations, image_names):
+    return _stats(all_annotations, stats).shape_counts()
+
+
+def summarise_dataset(all_annotations, image_names, stats=None):
     """Live figures for the training dialog's Data row.
 
     ``unlabelled`` is the one that matters: a project where most images have no
     annotations trains badly, and the number is invisible until someone counts
     it. Surfacing it before the run is much cheaper than discovering it after.
     """
+    stats = _stats(all_annotations, stats)
     names = list(image_names or [])
-    annotated = 0
-    for name in names:
-        by_class = (all_annotations or {}).get(name) or {}
-        if any(
-            annotations
-            for class_name, annotations in by_class.items()
-            if not class_name.startswith("Temp-")
-        ):
-            annotated += 1
-
-    counts = count_shapes(all_annotations)
-    classes = sorted(
-        {
-            class_name
-            for by_class in (all_annotations or {}).values()
-            for class_name, annotations in (by_class or {}).items()
-            if annotations and not class_name.startswith("Temp-")
-        }
-    )
+    annotated = stats.trainable_count(names)
+    counts = stats.shape_counts()
+    classes = stats.classes()
     return {
         "images": len(names),
         "annotated_images": annotated,
@@ -146,7 +125,7 @@ def pose_training_blockers(all_annotations, keypoint_schemas):
         class_name
         for by_class in (all_annotations or {}).values()
         for class_name, annotations in (by_class or {}).items()
-        if any(_is_pose(a) for a in annotations or [])
+        if any(is_pose(a) for a in annotations or [])
     }
     ks = {}
     for class_name in pose_classes:
@@ -151,6 +151,12 @@ class VideoSliceProvider:
             frame_key(base_name, i) for i in range(video_handler.total_frames)
         ]
 
+    @property
+    def path(self):
+        """The video file, for readers that need their own capture (a worker
+        thread may not touch this provider's)."""
+        return self._handler.path
+
     def extract(self, name):
         """Decode the frame named ``name`` to a QImage (``None`` if unknown)."""
         idx = parse_frame_index(name)
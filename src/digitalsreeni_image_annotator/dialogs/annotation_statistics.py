@@ -6,6 +6,8 @@ import tempfile
 import os
 import webbrowser
 
+from ..core.annotation_stats import AnnotationStats
+
 class AnnotationStatisticsDialog(QDialog):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -34,26 +36,21 @@ class AnnotationStatisticsDialog(QDialog):
         self.move(parent_geo.center() - self.rect().center())
         self.show()
 
-    def generate_statistics(self, annotations):
+    def generate_statistics(self, annotations, stats=None):
+        # stats: the project's AnnotationStats, already synced (see
+        # ImageController.annotation_statistics); measured here if not given.
         try:
-            # Class distribution
-            class_distribution = {}
-            objects_per_image = {}
-            total_objects = 0
-    
-            for image, image_annotations in annotations.items():
-                objects_in_image = 0
-                for class_name, class_annotations in image_annotations.items():
-                    class_count = len(class_annotations)
-                    class_distribution[class_name] = class_distribution.get(class_name, 0) + class_count
-                    objects_in_image += class_count
-                    total_objects += class_count
-                objects_per_image[image] = objects_in_image
+            if stats is None:
+                stats = AnnotationStats().sync(annotations)
+            class_distribution = stats.class_counts()
+            objects_per_image = stats.key_counts()
+            total_objects = stats.total()
     
-            avg_objects_per_image = total_objects / len(annotations) if annotations else 0
+            avg_objects_per_image = total_objects / len(objects_per_image) if objects_per_image else 0
+            area_counts, area_edges = stats.area_histogram()
     
             # Create plots
-            fig = make_subplots(rows=2, cols=1, subplot_titles=("Class Distribution", "Objects per Image"))
+            fig = make_subplots(rows=3, cols=1, subplot_titles=("Class Distribution", "Objects per Image", "Annotation Areas"))
     
             # Class distribution plot
             fig.add_trace(go.Bar(x=list(class_distribution.keys()), y=list(class_distribution.values()), name="Classes"),
@@ -68,14 +65,23 @@ class AnnotationStatisticsDialog(QDialog):
                 hoverinfo="text"
             ), row=2, col=1)
     
+            # Area histogram (all non-review classes)
+            fig.add_trace(go.Bar(
+                x=((area_edges[:-1] + area_edges[1:]) / 2).tolist(),
+                y=area_counts.tolist(),
+                width=(area_edges[1:] - area_edges[:-1]).tolist(),
+                name="Areas"
+            ), row=3, col=1)
+    
             # Update layout
-            fig.update_layout(height=800, title_text="Annotation Statistics")
+            fig.update_layout(height=1100, title_text="Annotation Statistics")
             
             # Hide x-axis labels for the second subplot (Objects per Image)
             fig.update_xaxes(showticklabels=False, title_text="Images", row=2, col=1)
             
             # Update y-axis title for the second subplot
             fig.update_yaxes(title_text="Number of Objects", row=2, col=1)
+            fig.update_xaxes(title_text="Area (px²)", row=3, col=1)
     
             # Save the plot to a temporary HTML file
             with tempfile.NamedTemporaryFile(mode="w", suffix=".html", delete=False) as tmp:
@@ -106,8 +112,8 @@ class AnnotationStatisticsDialog(QDialog):
             os.unlink(self.plot_file)
         super().closeEvent(event)
 
-def show_annotation_statistics(parent, annotations):
+def show_annotation_statistics(parent, annotations, stats=None):
     dialog = AnnotationStatisticsDialog(parent)
-    dialog.generate_statistics(annotations)
+    dialog.generate_statistics(annotations, stats)
     dialog.show_centered(parent)
     return dialog
\ No newline at end of file
@@ -197,12 +197,20 @@ class DatasetCurationDialog(QDialog):
         outliers = result["outliers"]
         stats = similarity.summarise(clusters, len(self.controller.embeddings))
 
-        self.summary_label.setText(
+        summary = (
             f"{stats['clusters']} near-duplicate cluster(s) covering "
             f"{stats['clustered_images']} of {stats['total_images']} images. "
             f"Keeping one per cluster would skip {stats['redundant_images']}. "
             f"{len(outliers)} image(s) resemble nothing else."
         )
+        if result.get("approximate"):
+            # Said rather than hidden: the index can split a cluster, and a
+            # count stated without that caveat would read as exact.
+            summary += (
+                " Compared approximately at this size: a cluster may show up "
+                "split in two."
+            )
+        self.summary_label.setText(summary)
         self.coverage_label.setText(
             self._coverage_text(result["modes"], result["mode_threshold"])
         )
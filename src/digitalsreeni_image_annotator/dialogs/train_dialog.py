@@ -83,11 +83,15 @@ class TrainDialog(QDialog):
         image_names = task_inference.trainable_image_names(
             getattr(main_window, "all_images", []), slice_names_by_base
         )
+        # The project's running statistics, so the Data row and the task
+        # agree with the statistics dialog; counted here without them.
+        image_controller = getattr(main_window, "image_controller", None)
+        stats = image_controller.annotation_statistics() if image_controller else None
         self.summary = task_inference.summarise_dataset(
-            main_window.all_annotations, image_names
+            main_window.all_annotations, image_names, stats
         )
         self.task, self.task_reason = task_inference.infer_task(
-            main_window.all_annotations
+            main_window.all_annotations, stats
         )
 
         layout = QVBoxLayout(self)
@@ -877,6 +877,24 @@ class YOLOTrainer(QObject):
         original_size = results[0].orig_img.shape[:2]
         return results, input_size, original_size
 
+    def predict_batch(self, images):
+        """One model call over several RGB arrays; one result per image, in order.
+
+        The arrays come from the batch decoders (``read_image_rgb``, the slice
+        and frame loaders), which all produce RGB. Ultralytics reads a bare
+        array as BGR -- what ``cv2.imread`` gives -- so they are flipped here.
+        """
+        if self.model is None:
+            raise ValueError("No model loaded. Please load a model first.")
+        from ..core.torch_utils import resolve_torch_device
+        device, _ = resolve_torch_device()
+        sources = [
+            np.ascontiguousarray(image[..., ::-1]) if image.ndim == 3 else image
+            for image in images
+        ]
+        return list(self.model(sources, conf=self.conf_threshold, save=False,
+                               show=False, device=device, verbose=False))
+
     def class_name_for(self, index):
         """Name for a predicted class index.
 
@@ -0,0 +1,268 @@
+"""Streaming pipeline behind "Detect All Images".
+
+The batch used to decode every image of the project into a ``QImage`` before
+starting -- the whole project in RAM, every slice of every stack materialised
+-- and then ran the items strictly one after another, each one a full
+``_run_sync`` round trip with the GUI thread idle in between.
+
+Now three stages overlap:
+
+1. **Decode** (:class:`_DecodeThread`) loads images ahead of the detector into
+   a queue bounded at :data:`PREFETCH_IMAGES`, so memory stays flat whatever
+   the size of the project.
+2. **Detect** (:class:`BatchDetectionWorker`) takes up to
+   :data:`BATCH_IMAGES` decoded images at a time and hands them to one
+   detector call: DINO runs one batched forward pass per prompt over all of
+   them, and SAM then decodes each image's boxes in a single prompt.
+3. **Commit** happens on the GUI thread, which receives each image's
+   ``(results, sam_results)`` through the queued :attr:`item_done` signal.
+
+Work items are ``(name, load)`` pairs, where ``load()`` runs on the decode
+thread and returns an RGB ``uint8`` array (or ``None`` when the image cannot
+be read). An optional ``lookup(name)`` runs there first and may return an
+outcome kept from an earlier run; such an item is never decoded or detected,
+and comes back through :attr:`~BatchDetectionWorker.item_cached` instead.
+
+The loaders below never touch the shared slice LRU or a video's shared
+capture, neither of which is thread-safe: stack slices are extracted from the
+provider's retained array, and each video is read through a private capture
+of its own.
+
+Cancelling stops the decode stage at the next image and lets the batch in
+flight finish; nothing is committed after the worker reports
+:meth:`~BatchDetectionWorker.cancel`.
+"""
+
+import functools
+import queue
+import threading
+
+import cv2
+import numpy as np
+from PyQt6.QtCore import QThread, pyqtSignal
+
+from ..core.logging_config import get_logger
+from ..core.video_handler import parse_frame_index
+from .sam_utils import qimage_to_numpy
+
+logger = get_logger(__name__)
+
+# Decoded images waiting for the detector. Bounds the pipeline's memory to
+# this many images plus the batch being detected.
+PREFETCH_IMAGES = 8
+
+# Images per detector call. Four keeps the DINO forward pass on an 8 GB GPU;
+# beyond that the per-image gain flattens out.
+BATCH_IMAGES = 4
+
+_END = object()
+
+
+# ── loaders ────────────────────────────────────────────────────────────────
+
+def read_image_rgb(path):
+    """Decode the image file at ``path`` to an RGB array."""
+    from PIL import Image as PILImage
+
+    with PILImage.open(path) as image:
+        return np.asarray(image.convert("RGB"))
+
+
+def _extract_rgb(provider, name):
+    qimage = provider.extract(name)
+    return None if qimage is None else qimage_to_numpy(qimage)
+
+
+class VideoFrameReader:
+    """Reads one video's frames through a capture of its own.
+
+    Opened lazily by the first :meth:`read`, so the capture is created on the
+    decode thread that uses it. Sequential reads skip the seek. Reads are
+    serialised, so a pool of decode threads may share one reader.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._cap = None
+        self._next = None
+        self._lock = threading.Lock()
+
+    def read(self, index):
+        """Frame ``index`` as an RGB array, or ``None``."""
+        if index is None:
+            return None
+        with self._lock:
+            return self._read(index)
+
+    def _read(self, index):
+        if self._cap is None:
+            self._cap = cv2.VideoCapture(self.path)
+        if index != self._next:
+            self._cap.set(cv2.CAP_PROP_POS_FRAMES, index)
+        ok, frame = self._cap.read()
+        if not ok:
+            self._next = None
+            return None
+        self._next = index + 1
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+    def close(self):
+        with self._lock:
+            if self._cap is not None:
+                self._cap.release()
+                self._cap = None
+
+
+def slice_loaders(slices, readers):
+    """``[(name, load), ...]`` for every slice of one stack or video.
+
+    ``slices`` is a :class:`~core.slice_cache.LazySliceList` or a plain
+    ``[(name, QImage), ...]`` list. A video's :class:`VideoFrameReader` is
+    appended to ``readers``, for the decode thread to close. ``None`` when
+    the provider can be read neither off the GUI thread nor from a file.
+    """
+    provider = getattr(slices, "provider", None)
+    if provider is None:
+        return [(name, functools.partial(qimage_to_numpy, qimage)) for name, qimage in slices]
+    if getattr(provider, "thread_safe_extract", False):
+        return [(name, functools.partial(_extract_rgb, provider, name)) for name in slices.names]
+    path = getattr(provider, "path", None)
+    if path is None:
+        return None
+    reader = VideoFrameReader(path)
+    readers.append(reader)
+    return [
+        (name, functools.partial(reader.read, parse_frame_index(name)))
+        for name in slices.names
+    ]
+
+
+# ── threads ────────────────────────────────────────────────────────────────
+
+class _DecodeThread(QThread):
+    """Runs the loaders in order into ``decoded``, then puts ``_END``.
+
+    Entries are ``(name, image, cached)``: ``cached`` is what ``lookup``
+    returned for the item, in which case ``image`` is ``None`` and the loader
+    never ran.
+
+    ``put`` blocks while the queue is full, which is what bounds memory; the
+    worker drains the queue to ``_END`` even when cancelled, so it never
+    blocks for good. Closes ``readers`` on this thread, where they were
+    opened.
+    """
+
+    def __init__(self, items, decoded, stop, readers, lookup=None):
+        super().__init__()
+        self._items = items
+        self._decoded = decoded
+        self._stop = stop
+        self._readers = readers
+        self._lookup = lookup
+
+    def run(self):
+        try:
+            for name, load in self._items:
+                if self._stop.is_set():
+                    break
+                cached = None
+                if self._lookup is not None:
+                    try:
+                        cached = self._lookup(name)
+                    except Exception:
+                        logger.exception(f"batch detection could not look up {name}")
+                if cached is not None:
+                    self._decoded.put((name, None, cached))
+                    continue
+                try:
+                    image = load()
+                except Exception:
+                    logger.exception(f"batch detection could not decode {name}")
+                    image = None
+                self._decoded.put((name, image, None))
+        finally:
+            for reader in self._readers:
+                reader.close()
+            self._decoded.put(_END)
+
+
+class BatchDetectionWorker(QThread):
+    """Detects over ``items`` in batches while the next images decode.
+
+    ``detect(batch)`` runs on this thread with ``[(name, array), ...]`` and
+    returns one ``(results, sam_results)`` per entry, in order. A batch that
+    raises is retried one image at a time, so a single bad image costs only
+    itself.
+    :attr:`item_done` carries ``(name, outcome)`` for every item processed,
+    with ``outcome`` ``None`` when the image could not be decoded or
+    detected; :attr:`item_cached` carries ``(name, outcome)`` for an item
+    ``lookup`` answered.
+    """
+
+    item_done = pyqtSignal(str, object)
+    item_cached = pyqtSignal(str, object)
+
+    def __init__(self, items, detect, batch_size=BATCH_IMAGES,
+                 prefetch=PREFETCH_IMAGES, readers=(), lookup=None):
+        super().__init__()
+        self._items = list(items)
+        self._detect = detect
+        self._batch_size = max(1, batch_size)
+        self._prefetch = max(1, prefetch)
+        self._readers = list(readers)
+        self._lookup = lookup
+        self._stop = threading.Event()
+
+    def cancel(self):
+        """Stop after the batch in flight. Safe from any thread."""
+        self._stop.set()
+
+    @property
+    def canceled(self):
+        return self._stop.is_set()
+
+    def run(self):
+        decoded = queue.Queue(maxsize=self._prefetch)
+        decoder = _DecodeThread(
+            self._items, decoded, self._stop, self._readers, self._lookup
+        )
+        decoder.start()
+        try:
+            batch = []
+            while True:
+                entry = decoded.get()
+                if entry is _END:
+                    break
+                name, image, cached = entry
+                if cached is not None:
+                    self.item_cached.emit(name, cached)
+                    continue
+                if image is None:
+                    self.item_done.emit(name, None)
+                    continue
+                batch.append((name, image))
+                if len(batch) >= self._batch_size:
+                    self._run_batch(batch)
+                    batch = []
+            if batch:
+                self._run_batch(batch)
+        finally:
+            decoder.wait()
+
+    def _run_batch(self, batch):
+        if self._stop.is_set():
+            return
+        try:
+            outcomes = self._detect(batch)
+        except Exception:
+            if len(batch) > 1:
+                logger.warning(
+                    f"batch of {len(batch)} failed; retrying image by image"
+                )
+                for entry in batch:
+                    self._run_batch([entry])
+                return
+            logger.exception(f"text detection failed for {batch[0][0]}")
+            outcomes = [None]
+        for (name, _), outcome in zip(batch, outcomes):
+            self.item_done.emit(name, outcome)
@@ -0,0 +1,215 @@
+"""Background pipeline behind the dataset-curation embedding run (#72).
+
+The run used to embed one image per iteration of a loop on the GUI thread:
+decode to ``QImage``, convert, resize, a batch-of-one forward pass, then
+``processEvents`` so the progress dialog could repaint. A 20 000-frame video
+project ran at the speed of that loop, with the model idle for most of it.
+
+:class:`EmbeddingWorker` does the whole run on a thread of its own, in two
+phases:
+
+1. **Lookup.** Every item's cache digest is computed and looked up. A hit is
+   never decoded -- for a long video, decoding is the expensive half.
+2. **Embed.** The misses are decoded and resized to ``EMBED_SIZE`` by a pool
+   of :data:`DECODE_WORKERS` threads, at most a few batches ahead of the
+   model, and reach the model :data:`EMBED_BATCH_IMAGES` at a time.
+
+Only the progress dialog stays on the GUI thread, fed by the queued
+:attr:`~EmbeddingWorker.progress` signal. For the length of the run the
+worker owns the cache and the results; the controller reads both once the
+worker has finished.
+
+Work items are ``(name, digest, load)``: ``digest()`` returns the item's cache
+digest (or ``None``, "do not cache"), and ``load()`` returns an RGB array (or
+``None``). Both run off the GUI thread, so loaders come from
+:func:`batch_detection.slice_loaders`, which never touch the shared slice LRU
+or a video's shared capture.
+"""
+
+import collections
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PyQt6.QtCore import QThread, pyqtSignal
+from PyQt6.QtGui import QImage
+
+from ..core.logging_config import get_logger
+from .embedding_utils import EmbeddingUnavailableError, prepare_image
+from .sam_utils import qimage_to_numpy
+
+logger = get_logger(__name__)
+
+# Images per forward pass. CLIP ViT-B/32 and DINOv2-base both fit 32 at 224 px
+# in well under 2 GB, and on a CPU the batch mostly saves Python overhead.
+EMBED_BATCH_IMAGES = 32
+
+# Threads decoding and resizing ahead of the model. PIL and OpenCV release the
+# GIL while they work, so a few threads keep one model fed.
+DECODE_WORKERS = min(4, os.cpu_count() or 1)
+
+# Batches decoded ahead of the one being embedded. Bounds memory to a few
+# batches of 224 px images whatever the size of the project.
+PREFETCH_BATCHES = 2
+
+
+def read_qimage_rgb(path):
+    """Decode the image file at ``path`` to an RGB array, as the display
+    path would (16-bit and grayscale go through the same conversion)."""
+    qimage = QImage(path)
+    return None if qimage.isNull() else qimage_to_numpy(qimage)
+
+
+def _prepare(load):
+    array = load()
+    return None if array is None else prepare_image(array)
+
+
+class EmbeddingWorker(QThread):
+    """Embeds ``items`` into ``results``, reading and filling ``cache``.
+
+    ``embed(arrays)`` runs on this thread and returns one vector per array
+    (:meth:`EmbeddingUtils.embed_arrays`). A batch that raises is retried one
+    image at a time, so a single bad image costs only itself, as does one
+    whose digest cannot be computed (a file deleted since the run was
+    planned). :class:`EmbeddingUnavailableError`, or any other failure of the
+    run itself, ends it with the reason in :attr:`error`, so a partial run is
+    never taken for a finished one. :attr:`progress` carries the number of
+    items done.
+    """
+
+    progress = pyqtSignal(int)
+
+    def __init__(self, items, embed, cache, model_name,
+                 batch_size=EMBED_BATCH_IMAGES, decode_workers=DECODE_WORKERS,
+                 readers=()):
+        super().__init__()
+        self._items = list(items)
+        self._embed = embed
+        self._cache = cache
+        self._model_name = model_name
+        self._batch_size = max(1, batch_size)
+        self._decode_workers = max(1, decode_workers)
+        self._readers = list(readers)
+        self._stop = threading.Event()
+        self._done = 0
+        self.results = {}
+        self.cached_hits = 0
+        self.error = None
+
+    def cancel(self):
+        """Stop after the batch in flight. Safe from any thread."""
+        self._stop.set()
+
+    @property
+    def canceled(self):
+        return self._stop.is_set()
+
+    def run(self):
+        try:
+            self._embed_misses(self._lookup())
+        except EmbeddingUnavailableError as exc:
+            self.error = str(exc)
+        except Exception as exc:
+            logger.exception("curation embedding run failed")
+            self.error = f"Embedding failed: {exc}"
+        finally:
+            for reader in self._readers:
+                reader.close()
+
+    def _advance(self, count):
+        self._done += count
+        self.progress.emit(self._done)
+
+    def _store(self, name, vector):
+        # float32 arrays, not Python float lists: at the supported ceiling
+        # that is the difference between roughly 60 MB and half a gigabyte of
+        # live objects, and every consumer in core.similarity works on arrays.
+        # A cache hit is a row of the memory-mapped store and is not copied.
+        self.results[name] = np.asarray(vector, dtype=np.float32)
+
+    def _lookup(self):
+        """Serve the cache hits; return the misses as ``(name, digest, load)``."""
+        misses = []
+        hits = 0
+        for name, digest_of, load in self._items:
+            if self._stop.is_set():
+                return []
+            try:
+                digest = digest_of()
+            except Exception:
+                logger.exception("curation could not hash %s", name)
+                self._advance(1)
+                continue
+            cached = self._cache.get(self._model_name, digest)
+            if cached is None:
+                misses.append((name, digest, load))
+                continue
+            self._store(name, cached)
+            self.cached_hits += 1
+            hits += 1
+            if hits % self._batch_size == 0:
+                self._advance(self._batch_size)
+        self._advance(hits % self._batch_size)
+        return misses
+
+    def _embed_misses(self, misses):
+        if not misses:
+            return
+        window = self._batch_size * (PREFETCH_BATCHES + 1)
+        todo = iter(misses)
+        pending = collections.deque()
+        with ThreadPoolExecutor(self._decode_workers) as pool:
+            def fill():
+                while len(pending) < window and not self._stop.is_set():
+                    entry = next(todo, None)
+                    if entry is None:
+                        return
+                    name, digest, load = entry
+                    pending.append((name, digest, pool.submit(_prepare, load)))
+
+            batch = []
+            fill()
+            while pending and not self._stop.is_set():
+                name, digest, future = pending.popleft()
+                fill()
+                try:
+                    array = future.result()
+                except Exception:
+                    logger.exception("curation could not decode %s", name)
+                    array = None
+                if array is None:
+                    self._advance(1)
+                    continue
+                batch.append((name, digest, array))
+                if len(batch) >= self._batch_size:
+                    self._run_batch(batch)
+                    batch = []
+            if batch:
+                self._run_batch(batch)
+            for _name, _digest, future in pending:
+                future.cancel()
+
+    def _run_batch(self, batch):
+        if self._stop.is_set():
+            return
+        try:
+            vectors = self._embed([array for _, _, array in batch])
+        except EmbeddingUnavailableError:
+            raise
+        except Exception:
+            if len(batch) > 1:
+                logger.warning(
+                    "embedding batch of %d failed; retrying image by image", len(batch)
+                )
+                for entry in batch:
+                    self._run_batch([entry])
+                return
+            logger.exception("embedding failed for %s", batch[0][0])
+            self._advance(1)
+            return
+        for (name, digest, _), vector in zip(batch, vectors):
+            self._cache.put(self._model_name, digest, vector)
+            self._store(name, vector)
+        self._advance(len(batch))
@@ -14,6 +14,22 @@ Threading model
 Same as ``sam_utils.SAMUtils``: inference runs on a worker thread; the
 caller's thread pumps its event loop while waiting via ``_run_sync``.
 torch + transformers are imported lazily on first detect call.
+
+Batch detection (``inference/batch_detection``) runs its own worker and calls
+:meth:`DINOUtils.detect_many_blocking` there directly, which puts several
+images through each forward pass.
+
+Single-pass mode
+----------------
+By default every class gets its own forward pass with its own prompt. With
+``single_pass=True`` the classes' phrases are packed into as few prompts as
+the text encoder's token limit allows (``core.grounding_prompt``) -- usually
+one -- and each query's per-token scores are traced back to the class whose
+phrase the token belongs to. Per-class box thresholds, the area filter and
+per-class NMS are then applied exactly as in the per-class pass, so one
+backbone pass serves every class. Scores can differ slightly from the
+per-class pass: the phrases now share one caption, and a class's score is
+the best over its own phrase tokens rather than over the whole prompt.
 """
 
 from __future__ import annotations
@@ -27,6 +43,7 @@ from PyQt6.QtGui import QImage
 from .sam_utils import _qimage_to_numpy, _run_sync
 from ..utils import models_base_dir
 
+from ..core import grounding_prompt
 from ..core.logging_config import get_logger
 
 logger = get_logger(__name__)
@@ -152,6 +169,7 @@ class DINOUtils(QObject):
         model_name: str = "grounding-dino-base",
         custom_model_path: str | None = None,
         cross_class_nms_thr: float | None = None,
+        single_pass: bool = False,
     ):
         """Run text-prompted detection. Returns list of dicts:
 
@@ -160,11 +178,11 @@ class DINOUtils(QObject):
 
         Returns ``None`` on error (model resolution failure or runtime
         exception). An empty list means "ran, no boxes survived
-        filtering".
+        filtering". ``single_pass`` shares forward passes between classes
+        (see module docstring).
         """
-        model_path = custom_model_path or GDINO_MODEL_PATHS.get(model_name)
+        model_path = self._model_path_for(model_name, custom_model_path)
         if model_path is None:
-            logger.warning(f"Unknown DINO model: {model_name}")
             return None
 
         # Marshal to numpy on the calling thread, with the array
@@ -179,14 +197,63 @@ class DINOUtils(QObject):
             list(class_configs),
             model_path,
             cross_class_nms_thr,
+            single_pass,
+        )
+
+    def detect_many_blocking(
+        self,
+        images_np: list,
+        class_configs: list[dict],
+        model_name: str = "grounding-dino-base",
+        custom_model_path: str | None = None,
+        cross_class_nms_thr: float | None = None,
+        single_pass: bool = False,
+        merge: bool = True,
+    ):
+        """:meth:`detect` for several RGB arrays at once, batched through each
+        forward pass. One result list per image, in order, or ``None`` when
+        the model cannot be resolved. With ``merge=False`` each image gets one
+        result list per class config instead, before cross-class NMS (the
+        batch journal merges classes itself).
+
+        For callers already on a worker thread that hold the inference claim
+        (``sam_utils.claim_inference``) -- batch detection. Raises on hard
+        errors like :meth:`detect`'s worker does.
+        """
+        model_path = self._model_path_for(model_name, custom_model_path)
+        if model_path is None:
+            return None
+        return self._detect_many(
+            images_np, list(class_configs), model_path, cross_class_nms_thr, single_pass,
+            merge,
         )
 
+    def _model_path_for(self, model_name, custom_model_path):
+        model_path = custom_model_path or GDINO_MODEL_PATHS.get(model_name)
+        if model_path is None:
+            logger.warning(f"Unknown DINO model: {model_name}")
+        return model_path
+
     def _detect_blocking(
         self,
         image_np,
         class_configs: list[dict],
         model_path: str,
         cross_class_nms_thr: float | None,
+        single_pass: bool = False,
+    ):
+        return self._detect_many(
+            [image_np], class_configs, model_path, cross_class_nms_thr, single_pass
+        )[0]
+
+    def _detect_many(
+        self,
+        images_np,
+        class_configs: list[dict],
+        model_path: str,
+        cross_class_nms_thr: float | None,
+        single_pass: bool,
+        merge: bool = True,
     ):
         # We're already on a worker thread (called via _run_sync). Load
         # the model directly here when needed — calling _run_sync from
@@ -197,22 +264,42 @@ class DINOUtils(QObject):
         if self._loaded_model_path != model_path or self._model is None:
             self._load_model_blocking(model_path)
 
-        import torch
         from PIL import Image as PILImage
-        from torchvision.ops import nms
 
-        image_pil = PILImage.fromarray(image_np).convert("RGB")
+        images_pil = [PILImage.fromarray(image_np).convert("RGB") for image_np in images_np]
         device = self._device or "cpu"
 
-        all_boxes, all_scores, all_labels = [], [], []
         # Model lives on `device` permanently after the first load
         # (set in _load_model_blocking). Earlier code shuffled it
         # CPU↔GPU on every call, defeating the in-process caching
         # win documented in ADR-013 — moving a 1.9 GB DINO base
         # over PCIe costs hundreds of ms per call. unload() is
         # the explicit way to free GPU memory when the user wants to.
-        for cfg in class_configs:
-            boxes, scores, labels = self._run_for_class(image_pil, cfg, device)
+        if single_pass:
+            per_image = self._run_single_pass(images_pil, class_configs, device)
+        else:
+            by_class = [
+                self._run_for_class(images_pil, cfg, device) for cfg in class_configs
+            ]
+            per_image = [list(classes) for classes in zip(*by_class)] or [
+                [] for _ in images_pil
+            ]
+        if not merge:
+            return [
+                [self._as_results(*found) for found in per_class] for per_class in per_image
+            ]
+        return [
+            self._merge_classes(per_class, cross_class_nms_thr) for per_class in per_image
+        ]
+
+    def _merge_classes(self, per_class, cross_class_nms_thr):
+        """Cross-class NMS over one image's ``(boxes, scores, labels)`` per
+        class, formatted as :meth:`detect`'s result dicts."""
+        import torch
+        from torchvision.ops import nms
+
+        all_boxes, all_scores, all_labels = [], [], []
+        for boxes, scores, labels in per_class:
             if len(boxes):
                 all_boxes.append(boxes)
                 all_scores.append(scores)
@@ -243,76 +330,148 @@ class DINOUtils(QObject):
             f'{len(cross_keep)} survivor(s)'
         )
 
+        results = self._as_results(all_boxes, all_scores, all_labels)
+        logger.debug(f'detect() returning {len(results)} result(s)')
+        return results
+
+    @staticmethod
+    def _as_results(boxes, scores, labels):
+        """``(boxes, scores, labels)`` as :meth:`detect`'s result dicts."""
         results = []
-        for i in range(len(all_boxes)):
-            box = all_boxes[i].numpy().tolist()
+        for i in range(len(boxes)):
+            box = boxes[i].numpy().tolist()
             results.append({
-                "class_name": all_labels[i],
+                "class_name": labels[i],
                 "bbox": [float(v) for v in box],
-                "score": float(all_scores[i].item()),
-                "label": all_labels[i],
+                "score": float(scores[i].item()),
+                "label": labels[i],
             })
-        logger.debug(f'detect() returning {len(results)} result(s)')
         return results
 
-    def _run_for_class(self, image_pil, class_cfg, device):
-        """Single DINO inference for one class. Returns (boxes, scores, labels)."""
+    def _run_for_class(self, images_pil, class_cfg, device):
+        """One batched DINO inference for one class over ``images_pil``.
+        Returns one ``(boxes, scores, labels)`` per image."""
         import torch
-        from torchvision.ops import nms
 
         # Use the phrases provided by the caller verbatim. The earlier
         # auto-prepend of class_cfg["name"] silently overrode any
         # rename of row-0 in the phrase editor (see ADR-015 area + arc42
         # DINO Temp Annotations section). If the user emptied phrases
         # entirely, fall back to the class name as the single prompt.
-        phrases = list(class_cfg.get("phrases") or [class_cfg["name"]])
-        clean_phrases = [p.strip().rstrip(".") for p in phrases if p.strip()]
-        if not clean_phrases:
-            clean_phrases = [class_cfg["name"]]
-        prompt = " . ".join(clean_phrases) + " ."
+        clean_phrases = grounding_prompt.clean_phrases(class_cfg)
+        prompt = grounding_prompt.class_prompt(clean_phrases)
 
         box_thr = class_cfg.get("box_thr", 0.25)
         txt_thr = class_cfg.get("txt_thr", 0.25)
-        nms_thr = class_cfg.get("nms_thr", 0.50)
 
         logger.debug(
             f'Class: "{class_cfg["name"]}" '
             f'({len(clean_phrases)} phrase(s), '
-            f'box={box_thr:.2f} txt={txt_thr:.2f} nms={nms_thr:.2f})'
+            f'box={box_thr:.2f} txt={txt_thr:.2f} '
+            f'nms={class_cfg.get("nms_thr", 0.50):.2f})'
         )
 
         inputs = self._proc(
-            images=image_pil,
-            text=prompt,
+            images=images_pil,
+            text=[prompt] * len(images_pil),
             return_tensors="pt",
         ).to(device)
 
         with torch.no_grad():
             outputs = self._model(**inputs)
 
-        det = self._proc.post_process_grounded_object_detection(
+        detections = self._proc.post_process_grounded_object_detection(
             outputs,
             inputs.input_ids,
             threshold=box_thr,
             text_threshold=txt_thr,
-            target_sizes=[image_pil.size[::-1]],
-        )[0]
+            target_sizes=[image_pil.size[::-1] for image_pil in images_pil],
+        )
 
-        boxes = det["boxes"].cpu()
-        scores = det["scores"].cpu()
-        raw_labels = det.get("text_labels", det.get("labels", []))
+        per_image = []
+        for image_pil, det in zip(images_pil, detections):
+            boxes = det["boxes"].cpu()
+            scores = det["scores"].cpu()
+            top_scores = [float(s) for s in scores[:5].tolist()] if len(scores) else []
+            logger.debug(
+                f'post_process: {len(boxes)} raw box(es), '
+                f'top scores={top_scores}'
+            )
+            per_image.append(self._filter_class(boxes, scores, class_cfg, image_pil.size))
+        return per_image
+
+    def _run_single_pass(self, images_pil, class_configs, device):
+        """Every class from shared, batched forward passes. Returns, per
+        image, one ``(boxes, scores, labels)`` per class config, in order."""
+        import torch
+        from transformers.image_transforms import center_to_corners_format
 
-        top_scores = [float(s) for s in scores[:5].tolist()] if len(scores) else []
+        tokenizer = self._proc.tokenizer
+        max_tokens = getattr(
+            self._model.config, "max_text_len", grounding_prompt.DEFAULT_MAX_TOKENS
+        )
+        chunks = grounding_prompt.pack_prompts(
+            [grounding_prompt.clean_phrases(cfg) for cfg in class_configs],
+            lambda text: len(tokenizer(text, add_special_tokens=False)["input_ids"]),
+            max_tokens,
+        )
         logger.debug(
-            f'post_process: {len(boxes)} raw box(es), '
-            f'top scores={top_scores}'
+            f'single pass: {len(class_configs)} class(es) in {len(chunks)} prompt(s)'
         )
 
+        found = [{} for _ in images_pil]
+        for chunk in chunks:
+            inputs = self._proc(
+                images=images_pil, text=[chunk.text] * len(images_pil), return_tensors="pt"
+            ).to(device)
+            with torch.no_grad():
+                outputs = self._model(**inputs)
+
+            offsets = tokenizer(
+                chunk.text, return_offsets_mapping=True, truncation=True,
+                max_length=max_tokens,
+            )["offset_mapping"]
+            owners = torch.tensor(grounding_prompt.token_classes(offsets, chunk.spans))
+            all_probs = torch.sigmoid(outputs.logits.float()).cpu()[:, :, : len(owners)]
+            owners = owners[: all_probs.shape[2]]
+            all_boxes = center_to_corners_format(outputs.pred_boxes.float().cpu())
+
+            for b, image_pil in enumerate(images_pil):
+                iw, ih = image_pil.size
+                boxes = all_boxes[b] * torch.tensor([iw, ih, iw, ih], dtype=torch.float32)
+                for index in chunk.classes:
+                    class_tokens = owners == index
+                    if not bool(class_tokens.any()):
+                        continue  # truncated away entirely
+                    cfg = class_configs[index]
+                    scores = all_probs[b][:, class_tokens].max(dim=1).values
+                    keep = scores > cfg.get("box_thr", 0.25)
+                    logger.debug(
+                        f'Class: "{cfg["name"]}": {int(keep.sum())} raw box(es)'
+                    )
+                    found[b][index] = self._filter_class(
+                        boxes[keep], scores[keep], cfg, image_pil.size
+                    )
+
+        empty = (torch.zeros((0, 4)), torch.zeros(0), [])
+        return [
+            [image_found.get(index, empty) for index in range(len(class_configs))]
+            for image_found in found
+        ]
+
+    def _filter_class(self, boxes, scores, class_cfg, image_size):
+        """Area filter and per-class NMS over one class's raw boxes.
+
+        Returns ``(boxes, scores, labels)`` with every label the class name.
+        """
+        import torch
+        from torchvision.ops import nms
+
         if len(boxes) == 0:
             return torch.zeros((0, 4)), torch.zeros(0), []
 
         # Area filter
-        iw, ih = image_pil.size
+        iw, ih = image_size
         area = iw * ih
         keep = [
             i for i, b in enumerate(boxes)
@@ -324,18 +483,16 @@ class DINOUtils(QObject):
 
         boxes = boxes[keep]
         scores = scores[keep]
-        raw_labels = [raw_labels[i] for i in keep]
 
         # Per-class NMS
+        nms_thr = class_cfg.get("nms_thr", 0.50)
         keep2 = nms(boxes, scores, nms_thr).tolist()
         logger.debug(f'after per-class NMS (iou={nms_thr:.2f}): {len(keep2)} kept')
         boxes = boxes[keep2]
         scores = scores[keep2]
-        raw_labels = [raw_labels[i] for i in keep2]
 
-        # Override DINO's free-text labels to our canonical class name
-        norm_labels = [class_cfg["name"]] * len(raw_labels)
-        return boxes, scores, norm_labels
+        # DINO's free-text labels are replaced by our canonical class name
+        return boxes, scores, [class_cfg["name"]] * len(keep2)
 
     # ── model download ────────────────────────────────────────────────
 
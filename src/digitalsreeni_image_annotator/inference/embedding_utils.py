@@ -14,8 +14,9 @@ without touching a line of clustering code. CLIP is the default for footprint
 and familiarity.
 
 **The cache is what makes this usable twice.** Embeddings are keyed by content
-hash *and* model identity and persisted beside the project; a second run over
-an unchanged dataset is nearly instant. Without that nobody runs it a second
+hash *and* model identity and persisted beside the project in a memory-mapped
+binary store (:mod:`core.embedding_cache`); a second run over an unchanged
+dataset is nearly instant. Without that nobody runs it a second
 time, and a curation tool you run once is a curation tool you do not use.
 
 Nothing here ever deletes or modifies an image. Selection and recommendation
@@ -25,13 +26,10 @@ this feature's call.
 
 import gc
 import hashlib
-import json
-import os
 
 from PyQt6.QtCore import QObject
 
 from ..core.logging_config import get_logger
-from ..core.similarity import l2_normalise
 
 logger = get_logger(__name__)
 
@@ -49,7 +47,15 @@ DEFAULT_MODEL = "CLIP (ViT-B/32)"
 # for no additional signal.
 EMBED_SIZE = 224
 
-CACHE_FILENAME = ".embedding_cache.json"
+
+def prepare_image(array):
+    """``array`` as the ``EMBED_SIZE`` square RGB ``uint8`` image the models
+    take. Thread-safe; the batch pipeline calls it on its decode pool."""
+    import numpy as np
+    from PIL import Image
+
+    pil = Image.fromarray(array.astype(np.uint8)).convert("RGB")
+    return np.asarray(pil.resize((EMBED_SIZE, EMBED_SIZE)))
 
 
 class EmbeddingUnavailableError(RuntimeError):
@@ -114,67 +120,6 @@ def slice_digest(source_digest, slice_name, dimensions=None):
     return key
 
 
-class EmbeddingCache:
-    """Content-hash-keyed embedding store, persisted as JSON beside the project.
-
-    Keyed by ``(model_name, content_hash)`` so switching backend does not
-    silently reuse the other one's vectors — which would produce clusters that
-    look plausible and mean nothing.
-    """
-
-    def __init__(self, directory=None):
-        self.directory = directory
-        self._entries = {}
-        if directory:
-            self.load()
-
-    @property
-    def path(self):
-        return os.path.join(self.directory, CACHE_FILENAME) if self.directory else None
-
-    @staticmethod
-    def _key(model_name, digest):
-        return f"{model_name}::{digest}"
-
-    def get(self, model_name, digest):
-        if digest is None:
-            return None
-        return self._entries.get(self._key(model_name, digest))
-
-    def put(self, model_name, digest, vector):
-        if digest is None:
-            return
-        self._entries[self._key(model_name, digest)] = list(vector)
-
-    def load(self):
-        if not self.path or not os.path.exists(self.path):
-            return
-        try:
-            with open(self.path, "r", encoding="utf-8") as handle:
-                data = json.load(handle)
-            if isinstance(data, dict):
-                self._entries = {
-                    key: value for key, value in data.items() if isinstance(value, list)
-                }
-        except (OSError, ValueError):
-            # A corrupt cache is a performance problem, never a correctness
-            # one -- drop it and recompute rather than failing the run.
-            logger.warning("discarding unreadable embedding cache at %s", self.path)
-            self._entries = {}
-
-    def save(self):
-        if not self.path:
-            return
-        try:
-            with open(self.path, "w", encoding="utf-8") as handle:
-                json.dump(self._entries, handle)
-        except OSError:
-            logger.warning("could not write the embedding cache to %s", self.path)
-
-    def __len__(self):
-        return len(self._entries)
-
-
 class EmbeddingUtils(QObject):
     """Loads an embedding backend and produces one vector per image.
 
@@ -277,6 +222,18 @@ class EmbeddingUtils(QObject):
         Feeding raw 16-bit values would produce a technically-valid embedding
         of a nearly-black image.
         """
+        from .sam_utils import _qimage_to_numpy
+
+        return self.embed_arrays([prepare_image(_qimage_to_numpy(qimage))])[0]
+
+    def embed_arrays(self, arrays):
+        """Unit-length embeddings of ``arrays`` in one forward pass.
+
+        ``arrays`` come from :func:`prepare_image`, which is where the decode
+        and resize cost lives -- the batch pipeline runs it on a thread pool,
+        so this call is the model and nothing else. Returns one list of floats
+        per array, in order.
+        """
         if self._model is None:
             raise EmbeddingUnavailableError("No embedding model is loaded.")
 
@@ -284,17 +241,16 @@ class EmbeddingUtils(QObject):
         import torch
         from PIL import Image
 
-        from .sam_utils import _qimage_to_numpy
-
-        array = _qimage_to_numpy(qimage)
-        pil = Image.fromarray(array.astype(np.uint8)).convert("RGB")
-        pil = pil.resize((EMBED_SIZE, EMBED_SIZE))
-
-        inputs = self._processor(images=pil, return_tensors="pt").to(self._device)
+        images = [Image.fromarray(array) for array in arrays]
+        inputs = self._processor(images=images, return_tensors="pt").to(self._device)
         with torch.no_grad():
             outputs = self._model(**inputs)
         pooled = getattr(outputs, "pooler_output", None)
         if pooled is None:
             pooled = outputs.last_hidden_state.mean(dim=1)
-        vector = pooled.squeeze(0).cpu().numpy().tolist()
-        return l2_normalise(vector)
+        vectors = pooled.float().cpu().numpy()
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        # A zero vector stays as it is, as in `l2_normalise`: a blank image is
+        # a legitimate input.
+        vectors = np.divide(vectors, norms, out=vectors, where=norms > 0)
+        return vectors.tolist()
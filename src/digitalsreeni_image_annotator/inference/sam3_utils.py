@@ -271,6 +271,15 @@ class SAM3Utils(QObject):
             list(class_configs),
         )
 
+    def detect_text_blocking(self, image_np, class_configs: list[dict]):
+        """:meth:`detect_text` on an RGB array, run on the calling thread.
+
+        For workers holding the inference claim
+        (``sam_utils.claim_inference``) -- batch detection. SAM 3 sets one
+        image at a time, so there is no cross-image batching here.
+        """
+        return self._detect_text_blocking(image_np, list(class_configs))
+
     def _detect_text_blocking(self, image_np, class_configs: list[dict]):
         # Worker thread. set_image once, then one predictor call per class
         # with that class's phrase list. Filter each instance by the
@@ -25,11 +25,38 @@ under a possible second click.
 
 torch / ultralytics are imported lazily on first inference so app
 startup stays fast for users who never touch SAM.
+
+Encoder feature cache
+---------------------
+Prompted calls (box, points, batch of boxes) run the heavy image encoder once
+per image and keep its output in a memory-bounded LRU
+(:class:`core.feature_cache.FeatureCache`), keyed by the loaded checkpoint
+and a digest of the pixels. Every further prompt on that image runs only the
+prompt encoder and mask decoder. :meth:`SAMUtils.prefetch_features` encodes
+the image on screen and the next one on a background thread, so the first
+click usually finds its features ready. If the decoder-only route fails on
+some checkpoint, the full ``model(image, prompts)`` call takes over for the
+rest of the session. Segment-everything is unprompted and always takes the
+full path.
+
+Mask post-processing
+--------------------
+A prompted call gets several candidate masks back and keeps the largest one
+that honours the prompt. Every candidate used to be traced with a
+full-image ``cv2.findContours`` before its constraints were even looked at.
+Now the areas, extents and prompt points of all candidates are read off the
+mask stack in a few array operations (:func:`_mask_extents`,
+:func:`_points_in_extents`), the candidates that cannot pass are dropped, and
+the rest are traced largest first, each from a crop around its extent, until
+one passes the contour check. That is usually the first one. Only what
+*implies* a failed contour check is used to drop a candidate, so the mask
+picked is the one the old loop picked.
 """
 
 from __future__ import annotations
 
 import os
+import threading
 
 import cv2
 import numpy as np
@@ -38,6 +65,8 @@ from PyQt6.QtGui import QImage
 
 from ..utils import models_base_dir
 
+from ..core import mask_filters
+from ..core.feature_cache import FeatureCache, array_digest
 from ..core.logging_config import get_logger
 
 logger = get_logger(__name__)
@@ -68,6 +97,22 @@ MODEL_FILES = {
 # SAM weights live under <models_base>/sam/, parallel to DINO models.
 SAM_MODELS_DIR = os.path.join(models_base_dir(), "sam")
 
+# Memory for cached encoder outputs. A SAM 2 image embedding with its
+# high-resolution feature maps is ~16 MB, so this holds about sixteen images:
+# the current one, its neighbours, and the ones just revisited.
+FEATURE_CACHE_BYTES = 256 * 1024 * 1024
+
+# Tiled segment-everything. A tile is SAM's own input size, so it is segmented
+# at full resolution; the overlap is wider than most objects a user would
+# annotate on a microscopy field, so those land whole in at least one tile.
+EVERYTHING_TILE = 1024
+EVERYTHING_TILE_OVERLAP = 256
+
+# What ``SAM.predict`` passes its predictor; the decoder-only path builds its
+# predictor with the same arguments so both paths produce the same masks.
+_PREDICT_OVERRIDES = {"conf": 0.25, "task": "segment", "mode": "predict",
+                      "imgsz": 1024, "retina_masks": True, "save": False}
+
 
 def _rows(qimage: QImage, channels: int) -> np.ndarray:
     """``(height, width, channels)`` view of ``qimage``, honouring its stride.
@@ -133,9 +178,22 @@ _qimage_to_numpy = qimage_to_numpy
 
 # ── geometry helpers ────────────────────────────────────────────────────────
 
-def _mask_to_polygon(mask: np.ndarray) -> list | None:
+def _mask_to_polygon(mask: np.ndarray, extent=None) -> list | None:
+    """The biggest external contour of ``mask`` (area above 10), flat
+    ``[x0, y0, x1, y1, ...]``, or ``None``.
+
+    ``extent`` is the mask's ``[x0, y0, x1, y1]`` from :func:`_mask_extents`;
+    given, only that region (plus a pixel of margin, so a contour on the
+    crop's edge is traced as it would be in the full image) is traced.
+    """
+    x = y = 0
+    if extent is not None:
+        height, width = mask.shape[:2]
+        x, y = max(0, int(extent[0]) - 1), max(0, int(extent[1]) - 1)
+        mask = mask[y:min(height, int(extent[3]) + 2), x:min(width, int(extent[2]) + 2)]
     contours, _ = cv2.findContours(
-        (mask > 0).astype(np.uint8), cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE
+        (mask > 0).astype(np.uint8), cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE,
+        offset=(x, y),
     )
     polygons = []
     for contour in contours:
@@ -152,6 +210,95 @@ def _mask_to_polygon(mask: np.ndarray) -> list | None:
     return biggest
 
 
+def _mask_extents(binary: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """``(areas, extents)`` of an ``(n, h, w)`` boolean mask stack.
+
+    ``areas`` are pixel counts; ``extents`` are ``[x0, y0, x1, y1]`` pixel
+    bounds, the bbox a contour of the whole mask would have (-1 for an empty
+    mask).
+    """
+    n, height, width = binary.shape
+    rows = binary.any(axis=2)
+    columns = binary.any(axis=1)
+    areas = np.count_nonzero(binary, axis=(1, 2))
+    extents = np.stack([
+        columns.argmax(axis=1),
+        rows.argmax(axis=1),
+        width - 1 - columns[:, ::-1].argmax(axis=1),
+        height - 1 - rows[:, ::-1].argmax(axis=1),
+    ], axis=1)
+    extents[areas == 0] = -1
+    return areas, extents
+
+
+def _points_in_extents(extents: np.ndarray, points: list) -> np.ndarray:
+    """``(n, len(points))``: whether each ``(x, y)`` point lies within each
+    mask's extent.
+
+    A point the traced contour contains is within the extent, so a point
+    outside it fails :func:`_check_points` for certain. The converse does
+    not hold -- a click in a ring mask's hole is inside the contour and on
+    no mask pixel -- which is why the test is against the extent and not
+    the pixels.
+    """
+    if not points:
+        return np.zeros((len(extents), 0), dtype=bool)
+    xy = np.asarray(points, dtype=np.float64)
+    x, y = xy[:, 0][None, :], xy[:, 1][None, :]
+    return (
+        (extents[:, 0:1] <= x) & (x <= extents[:, 2:3])
+        & (extents[:, 1:2] <= y) & (y <= extents[:, 3:4])
+    )
+
+
+def _bbox_plausible(extents: np.ndarray, user_bbox) -> np.ndarray:
+    """Per mask, whether its extent leaves :func:`_bbox_constraints_ok` any
+    chance. ``user_bbox`` is one box for every mask, or one box per mask.
+
+    Only the lower bounds are checked. The contour the constraints apply to
+    lies inside the mask's extent, so a mask too small here is too small
+    there; but one stray speck can stretch a mask's extent well past a
+    contour that fits, so the upper bounds wait for the contour.
+    """
+    user = np.asarray(user_bbox, dtype=np.float64).reshape(-1, 4)
+    user_widths, user_heights = user[:, 2] - user[:, 0], user[:, 3] - user[:, 1]
+    user_area = np.maximum(user_widths, 0) * np.maximum(user_heights, 0)
+    widths = (extents[:, 2] - extents[:, 0]).astype(np.float64)
+    heights = (extents[:, 3] - extents[:, 1]).astype(np.float64)
+    return (
+        (extents[:, 0] >= 0)
+        & (user_area > 0)
+        & (widths * heights >= 0.20 * user_area)
+        & (widths >= 0.5 * user_widths)
+        & (heights >= 0.5 * user_heights)
+    )
+
+
+def _largest_first(areas: np.ndarray, candidates: np.ndarray) -> list[int]:
+    """Indices of the ``candidates`` by descending area, ties by index."""
+    return [int(i) for i in np.argsort(-areas, kind="stable") if candidates[i]]
+
+
+def _binary(masks: np.ndarray) -> np.ndarray:
+    return masks if masks.dtype == bool else masks > 0
+
+
+def _confidence(confidences, i: int) -> float:
+    return float(confidences[i]) if i < len(confidences) else 0.0
+
+
+def _tensor_nbytes(value) -> int:
+    """Bytes held by the tensors in an encoder output (tensor, list or dict)."""
+    if isinstance(value, dict):
+        return sum(_tensor_nbytes(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(_tensor_nbytes(v) for v in value)
+    try:
+        return int(value.numel() * value.element_size())
+    except AttributeError:
+        return 0
+
+
 def _bbox_of_contour(contour: list) -> tuple[float, float, float, float]:
     pts = np.array(contour).reshape(-1, 2)
     return (
@@ -240,6 +387,26 @@ class _InferenceThread(QThread):
         self.finished_with_result.emit()
 
 
+class _PrefetchThread(QThread):
+    """Encodes the images queued by :meth:`SAMUtils.prefetch_features`.
+
+    Drains the queue, which the GUI thread may replace at any time; takes the
+    model lock per image, so a foreground prompt waits for at most one
+    encode.
+    """
+
+    def __init__(self, sam_utils):
+        super().__init__()
+        self._sam_utils = sam_utils
+
+    def run(self):
+        while True:
+            image_np = self._sam_utils._next_prefetch()
+            if image_np is None:
+                return
+            self._sam_utils._prefetch_one(image_np)
+
+
 class InferenceBusyError(RuntimeError):
     """Raised when ``_run_sync`` is re-entered before the first call returns.
 
@@ -287,13 +454,7 @@ def _run_sync(fn, *args, **kwargs):
             "_run_sync must be called from the GUI thread. "
             "See ADR-013 — the re-entry guard is GUI-thread-local."
         )
-    global _inference_in_flight
-    if _inference_in_flight:
-        raise InferenceBusyError(
-            "Another SAM/DINO inference is still running. "
-            "Wait for it to finish or cancel before issuing a new call."
-        )
-    _inference_in_flight = True
+    claim_inference()
     try:
         thread = _InferenceThread(fn, *args, **kwargs)
         loop = QEventLoop()
@@ -305,7 +466,31 @@ def _run_sync(fn, *args, **kwargs):
             raise thread._exc
         return thread._result
     finally:
-        _inference_in_flight = False
+        release_inference()
+
+
+def claim_inference() -> None:
+    """Take the in-flight flag for a caller that drives its own worker thread
+    (batch detection). Raises :class:`InferenceBusyError` when it is taken.
+
+    While claimed, every ``_run_sync`` call is refused, so the claimant's
+    worker may call the ``*_blocking`` methods directly. Pair with
+    :func:`release_inference` in a ``finally``. GUI thread only, like
+    ``_run_sync``.
+    """
+    global _inference_in_flight
+    if _inference_in_flight:
+        raise InferenceBusyError(
+            "Another SAM/DINO inference is still running. "
+            "Wait for it to finish or cancel before issuing a new call."
+        )
+    _inference_in_flight = True
+
+
+def release_inference() -> None:
+    """Give back the flag taken by :func:`claim_inference`."""
+    global _inference_in_flight
+    _inference_in_flight = False
 
 
 # ── public class ───────────────────────────────────────────────────────────
@@ -328,6 +513,19 @@ class SAMUtils(QObject):
         # from training.sam_trainer.list_custom_models() so they load through
         # the same SAM(path) path as the built-ins (see SAM fine-tuning ADR).
         self.custom_models: dict[str, str] = {}
+        # Encoder outputs per (checkpoint, pixel digest); see module docstring.
+        self._features = FeatureCache(FEATURE_CACHE_BYTES)
+        self._predictor = None  # ultralytics predictor for the decoder-only path
+        self._decoder_only = True
+        # Serialises every use of the model between the foreground inference
+        # worker and the background prefetch thread; _run_sync's in-flight flag
+        # only guards the GUI thread against re-entry.
+        self._model_lock = threading.Lock()
+        # Replaced from the GUI thread while the prefetch thread pops from it:
+        # mutated in place, and only under the lock.
+        self._prefetch_queue: list = []
+        self._prefetch_lock = threading.Lock()
+        self._prefetch_thread: _PrefetchThread | None = None
 
     def register_custom_models(self, mapping: dict) -> None:
         """Merge fine-tuned model entries so they become selectable."""
@@ -343,6 +541,7 @@ class SAMUtils(QObject):
     # ── model lifecycle ────────────────────────────────────────────────
 
     def change_sam_model(self, model_name: str) -> None:
+        self._forget_features()
         if model_name == "Pick a SAM Model":
             self.current_sam_model = None
             self._model = None
@@ -374,6 +573,8 @@ class SAMUtils(QObject):
         os.makedirs(os.path.dirname(model_file), exist_ok=True)
         self._model = SAM(model_file)
         self._loaded_model_file = model_file
+        self._predictor = None
+        self._decoder_only = True
 
     def _log_device(self) -> None:
         try:
@@ -407,6 +608,7 @@ class SAMUtils(QObject):
         user must restart the app.
         """
         import gc
+        self._forget_features()
         try:
             if self._model is not None and hasattr(self._model, "model"):
                 self._model.model.cpu()
@@ -432,6 +634,175 @@ class SAMUtils(QObject):
             )
         logger.info("unload complete")
 
+    # ── encoder feature cache ──────────────────────────────────────────
+
+    def prefetch_features(self, images) -> None:
+        """Encode ``images`` in the background so later prompts on them only
+        run the mask decoder.
+
+        Each item is a ``QImage`` (converted here, on the calling thread) or an
+        image file path (read on the worker, exactly as ``QImage(path)`` would
+        read it for display). Replaces whatever is still queued: only the
+        images around the latest navigation are worth encoding. A no-op when
+        no model is loaded.
+        """
+        if self._model is None or not self._decoder_only:
+            return
+        queue = []
+        for image in images:
+            if isinstance(image, QImage) and not image.isNull():
+                queue.append(_qimage_to_numpy(image))
+            elif isinstance(image, str):
+                queue.append(image)
+        with self._prefetch_lock:
+            self._prefetch_queue[:] = queue
+        self._start_prefetch()
+
+    def wait_for_prefetch(self, msecs: int = 30000) -> None:
+        """Drop queued prefetches and block until the running one is done
+        (model switch, unload, shutdown)."""
+        with self._prefetch_lock:
+            self._prefetch_queue.clear()
+        thread = self._prefetch_thread
+        if thread is not None:
+            thread.wait(msecs)
+
+    def _start_prefetch(self):
+        with self._prefetch_lock:
+            queued = bool(self._prefetch_queue)
+        if queued and self._prefetch_thread is None:
+            thread = _PrefetchThread(self)
+            thread.finished.connect(self._on_prefetch_finished)
+            self._prefetch_thread = thread
+            thread.start()
+
+    def _on_prefetch_finished(self):
+        thread, self._prefetch_thread = self._prefetch_thread, None
+        if thread is not None:
+            thread.deleteLater()
+        self._start_prefetch()  # queued after the worker had already drained
+
+    def _next_prefetch(self):
+        """Pop the next queued image as an RGB array (worker thread)."""
+        while True:
+            with self._prefetch_lock:
+                if not self._prefetch_queue:
+                    return None
+                source = self._prefetch_queue.pop(0)
+            if isinstance(source, np.ndarray):
+                return source
+            image = QImage(source)
+            if not image.isNull():
+                return _qimage_to_numpy(image)
+            logger.debug("prefetch: could not read %s", source)
+
+    def _prefetch_one(self, image_np) -> None:
+        with self._model_lock:
+            if self._model is None or not self._decoder_only:
+                return
+            try:
+                self._encoded(image_np)
+            except Exception:
+                logger.warning("SAM feature prefetch failed", exc_info=True)
+
+    def _forget_features(self) -> None:
+        self.wait_for_prefetch()
+        self._features.clear()
+        self._predictor = None
+
+    def _feature_predictor(self):
+        if self._predictor is None:
+            predictor_cls = self._model._smart_load("predictor")
+            predictor = predictor_cls(
+                overrides={**_PREDICT_OVERRIDES, "device": self._device},
+                _callbacks=self._model.callbacks,
+            )
+            predictor.setup_model(model=self._model.model, verbose=False)
+            self._predictor = predictor
+        return self._predictor
+
+    def _encoded(self, image_np):
+        """Encoder output for ``image_np``: cached, or computed and cached.
+
+        Caller holds ``_model_lock``.
+        """
+        key = (self._loaded_model_file, array_digest(image_np))
+        features = self._features.get(key)
+        if features is None:
+            predictor = self._feature_predictor()
+            predictor.set_image(image_np)
+            features = predictor.features
+            predictor.reset_image()
+            self._features.put(key, features, _tensor_nbytes(features))
+        return features
+
+    def _decode(self, image_np, **prompts):
+        """Masks, confidences and prompt indices for ``prompts`` from cached
+        encoder features.
+
+        Mirrors ``Predictor.postprocess``: masks come back at the image's
+        resolution and only those scoring above the predictor's ``conf`` are
+        kept, from anywhere in the list -- hence the index of the prompt each
+        kept mask answers.
+        """
+        import torch
+
+        features = self._encoded(image_np)
+        predictor = self._feature_predictor()
+        with torch.inference_mode():
+            masks, boxes = predictor.inference_features(
+                features, src_shape=image_np.shape[:2], **prompts
+            )
+        if masks is None:
+            return None
+        scores = boxes[:, 4]
+        keep = scores > predictor.args.conf
+        return (
+            masks[keep].cpu().numpy(),
+            scores[keep].cpu().numpy(),
+            np.flatnonzero(keep.cpu().numpy()),
+        )
+
+    def _predict_masks(self, image_np, **prompts):
+        """``(masks, confidences, prompts)`` for a prompted call, or ``None``
+        when the model produced no masks at all. Runs on the inference worker.
+
+        ``prompts[i]`` is the index of the prompt (box) mask ``i`` answers:
+        masks below the confidence threshold are dropped, so mask ``i`` is not
+        necessarily prompt ``i``'s. The full path reads it from the class
+        column, which ultralytics fills with the prompt index for SAM.
+        """
+        with self._model_lock:
+            if self._decoder_only:
+                try:
+                    return self._decode(image_np, **prompts)
+                except Exception:
+                    # An architecture the predictor API does not cover; the
+                    # full path still works, just without the cache.
+                    logger.warning(
+                        "SAM decoder-only inference failed; re-encoding the "
+                        "image on every prompt from now on", exc_info=True,
+                    )
+                    self._decoder_only = False
+                    self._features.clear()
+            results = self._model(image_np, device=self._device, **prompts)
+        res = results[0]
+        if not (hasattr(res, "masks") and res.masks is not None):
+            return None
+        masks = res.masks.data.cpu().numpy()
+        confidences = (
+            res.boxes.conf.cpu().numpy()
+            if hasattr(res.boxes, "conf")
+            else np.zeros(len(masks))
+        )
+        classes = getattr(res.boxes, "cls", None)
+        prompts = (
+            classes.cpu().numpy().astype(np.intp)
+            if classes is not None
+            else np.arange(len(masks))
+        )
+        return masks, confidences, prompts
+
     # ── inference ──────────────────────────────────────────────────────
 
     def apply_sam_points(self, image: QImage, positive_points, negative_points):
@@ -451,28 +822,24 @@ class SAMUtils(QObject):
     def _sam_points_blocking(self, image_np, positive_points, negative_points):
         all_points = [positive_points + negative_points]
         all_labels = [([1] * len(positive_points)) + ([0] * len(negative_points))]
-        results = self._model(
-            image_np, points=all_points, labels=all_labels, device=self._device
-        )
-
-        masks = results[0].masks.data.cpu().numpy()
-        confidences = results[0].boxes.conf.cpu().numpy()
-
-        best_result = None
-        best_score = -1.0
-        for i, mask in enumerate(masks):
-            contour = _mask_to_polygon(mask)
+        predicted = self._predict_masks(image_np, points=all_points, labels=all_labels)
+        if predicted is None:
+            return None
+        masks, confidences, _prompts = predicted
+
+        binary = _binary(masks)
+        areas, extents = _mask_extents(binary)
+        # Negative points are left to the contour check: one on a stray blob
+        # the contour leaves out does not reject the candidate.
+        candidates = (areas > 0) & _points_in_extents(extents, positive_points).all(axis=1)
+        for i in _largest_first(areas, candidates):
+            contour = _mask_to_polygon(binary[i], extents[i])
             if contour is None:
                 continue
             if not _check_points(contour, positive_points, negative_points):
                 continue
-            mask_pixels = int(mask.sum())
-            if mask_pixels > best_score:
-                score = float(confidences[i]) if i < len(confidences) else 0.0
-                best_score = mask_pixels
-                best_result = {"segmentation": contour, "score": score}
-
-        return best_result
+            return {"segmentation": contour, "score": _confidence(confidences, i)}
+        return None
 
     def apply_sam_prediction(self, image: QImage, bbox):
         if not self.current_sam_model or self._model is None:
@@ -485,33 +852,21 @@ class SAMUtils(QObject):
         )
 
     def _sam_bbox_blocking(self, image_np, bbox):
-        results = self._model(image_np, bboxes=[bbox], device=self._device)
-        res = results[0]
-        if not (hasattr(res, "masks") and res.masks is not None):
+        predicted = self._predict_masks(image_np, bboxes=[bbox])
+        if predicted is None:
             return None
+        masks, confidences, _prompts = predicted
 
-        masks = res.masks.data.cpu().numpy()
-        confidences = (
-            res.boxes.conf.cpu().numpy()
-            if hasattr(res.boxes, "conf")
-            else np.zeros(len(masks))
-        )
-
-        best = None
-        best_pixels = -1
-        for i, mask in enumerate(masks):
-            contour = _mask_to_polygon(mask)
+        binary = _binary(masks)
+        areas, extents = _mask_extents(binary)
+        for i in _largest_first(areas, _bbox_plausible(extents, bbox)):
+            contour = _mask_to_polygon(binary[i], extents[i])
             if contour is None:
                 continue
             if not _bbox_constraints_ok(contour, bbox):
                 continue
-            pixels = int(mask.sum())
-            if pixels > best_pixels:
-                best_pixels = pixels
-                score = float(confidences[i]) if i < len(confidences) else 0.0
-                best = {"segmentation": contour, "score": score}
-
-        return best
+            return {"segmentation": contour, "score": _confidence(confidences, i)}
+        return None
 
     def apply_sam_predictions_batch(self, image: QImage, bboxes: list):
         if not self.current_sam_model or self._model is None:
@@ -527,7 +882,22 @@ class SAMUtils(QObject):
             [list(b) for b in bboxes],
         )
 
-    def apply_sam_everything(self, image: QImage):
+    def predict_boxes_blocking(self, image_np, bboxes: list):
+        """:meth:`apply_sam_predictions_batch` on an RGB array, run on the
+        calling thread: every box of the image in one decoder call.
+
+        For workers holding the inference claim (:func:`claim_inference`),
+        i.e. batch detection. ``None`` when no model is loaded; otherwise
+        exactly one entry per box, an ``error`` one for a box SAM returned
+        no mask for.
+        """
+        if not self.current_sam_model or self._model is None:
+            return None
+        if not bboxes:
+            return []
+        return self._sam_batch_blocking(image_np, [list(b) for b in bboxes])
+
+    def apply_sam_everything(self, image: QImage, tiled=False, stop=None):
         """Segment everything in ``image`` with no prompt at all (issue #69).
 
         Ultralytics' SAM returns the automatic "everything" segmentation when
@@ -539,15 +909,47 @@ class SAMUtils(QObject):
         worker, so it inherits the in-flight guard (ADR-013) and serialises
         against SAM 2 / SAM 3 / DINO on the GPU — which matters more here than
         for a box prompt, since an unprompted pass is markedly heavier.
+
+        ``tiled`` segments an image larger than :data:`EVERYTHING_TILE` tile by
+        overlapping tile, at full resolution, and merges the tiles' proposals
+        (:func:`core.mask_filters.merge_tiled_proposals`). ``stop`` is a
+        :class:`threading.Event`; once set, no further tile is started.
         """
         if not self.current_sam_model or self._model is None:
             logger.warning("apply_sam_everything: no SAM model selected")
             return None
         logger.debug("apply_sam_everything: running unprompted segmentation")
-        return _run_sync(self._sam_everything_blocking, _qimage_to_numpy(image))
+        return _run_sync(
+            self._sam_everything_blocking, _qimage_to_numpy(image), tiled, stop
+        )
 
-    def _sam_everything_blocking(self, image_np):
-        results = self._model(image_np, device=self._device)
+    def _sam_everything_blocking(self, image_np, tiled=False, stop=None):
+        height, width = image_np.shape[:2]
+        if not tiled or max(height, width) <= EVERYTHING_TILE:
+            return self._everything_proposals(image_np)
+        tiles = mask_filters.tile_grid(
+            width, height, EVERYTHING_TILE, EVERYTHING_TILE_OVERLAP
+        )
+        logger.debug(f"apply_sam_everything: {len(tiles)} tile(s)")
+        proposals = []
+        for tile in tiles:
+            if stop is not None and stop.is_set():
+                break
+            x0, y0, x1, y1 = tile
+            # One tile at a time: its masks are polygons before the next one
+            # is segmented, so memory is one tile's masks whatever the image.
+            for proposal in self._everything_proposals(
+                np.ascontiguousarray(image_np[y0:y1, x0:x1])
+            ):
+                segmentation = proposal["segmentation"]
+                segmentation[0::2] = [x + x0 for x in segmentation[0::2]]
+                segmentation[1::2] = [y + y0 for y in segmentation[1::2]]
+                proposals.append({**proposal, "tile": tile})
+        return mask_filters.merge_tiled_proposals(proposals, width, height)
+
+    def _everything_proposals(self, image_np):
+        with self._model_lock:
+            results = self._model(image_np, device=self._device)
         res = results[0]
         if not (hasattr(res, "masks") and res.masks is not None):
             return []
@@ -560,45 +962,50 @@ class SAMUtils(QObject):
             else np.zeros(len(masks))
         )
 
+        binary = _binary(masks)
+        areas, extents = _mask_extents(binary)
         output = []
-        for i, mask in enumerate(masks):
-            contour = _mask_to_polygon(mask)
+        for i in np.flatnonzero(areas):
+            contour = _mask_to_polygon(binary[i], extents[i])
             if contour is None:
                 continue  # unlike the prompted paths there is no per-request
                 # slot to report against, so an unusable mask is simply dropped
-            score = float(confidences[i]) if i < len(confidences) else 0.0
-            output.append({"segmentation": contour, "score": score})
+            output.append({"segmentation": contour, "score": _confidence(confidences, i)})
         return output
 
     def _sam_batch_blocking(self, image_np, bboxes):
-        results = self._model(image_np, bboxes=bboxes, device=self._device)
-        res = results[0]
-        if not (hasattr(res, "masks") and res.masks is not None):
+        predicted = self._predict_masks(image_np, bboxes=bboxes)
+        if predicted is None:
             # Build a fresh dict per bbox so callers can mutate one
             # entry without affecting the others (a `[d] * N` would
             # alias the same dict N times).
             return [{"error": "No mask generated."} for _ in bboxes]
-
-        masks = res.masks.data.cpu().numpy()
-        confidences = (
-            res.boxes.conf.cpu().numpy()
-            if hasattr(res.boxes, "conf")
-            else np.zeros(len(masks))
-        )
-
-        output = []
-        for i in range(len(masks)):
-            mask = masks[i]
-            score = float(confidences[i]) if i < len(confidences) else 0.0
-            contour = _mask_to_polygon(mask)
+        masks, confidences, prompts = predicted
+
+        # Ultralytics drops masks below its confidence threshold, from
+        # anywhere in the list: each mask goes to the box it was prompted by,
+        # and a box whose mask was dropped keeps the error it starts with.
+        output = [{"error": "No mask generated."} for _ in bboxes]
+        answered = np.flatnonzero((prompts >= 0) & (prompts < len(bboxes)))
+        binary = _binary(masks)[answered]
+        boxes_of = [bboxes[prompts[i]] for i in answered]
+        areas, extents = _mask_extents(binary)
+        plausible = _bbox_plausible(extents, boxes_of) if len(binary) else []
+        for k, i in enumerate(answered):
+            box = prompts[i]
+            if areas[k] == 0:
+                output[box] = {"error": "No valid mask polygon."}
+                continue
+            if not plausible[k]:
+                output[box] = {"error": "Mask failed bbox constraints."}
+                continue
+            contour = _mask_to_polygon(binary[k], extents[k])
             if contour is None:
-                output.append({"error": "No valid mask polygon."})
+                output[box] = {"error": "No valid mask polygon."}
                 continue
-
-            user_bbox = bboxes[i]
-            if not _bbox_constraints_ok(contour, user_bbox):
-                output.append({"error": "Mask failed bbox constraints."})
+            if not _bbox_constraints_ok(contour, boxes_of[k]):
+                output[box] = {"error": "Mask failed bbox constraints."}
                 continue
 
-            output.append({"segmentation": contour, "score": score})
+            output[box] = {"segmentation": contour, "score": _confidence(confidences, i)}
         return output
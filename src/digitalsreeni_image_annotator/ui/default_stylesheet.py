@@ -32,14 +32,14 @@ QPushButton:checked {
 }
 
 
-QListWidget, QTreeWidget {
+QListWidget, ModelListView, QTreeWidget {
     background-color: #FFFFFF;
     border: 1px solid #CCCCCC;
     border-radius: 3px;
 }
 
 
-QListWidget::item:selected {
+QListWidget::item:selected, ModelListView::item:selected {
     background-color: #E0E0E0;
     color: #333333;
 }
@@ -161,7 +161,7 @@ QStatusBar {
     color: #666666;
 }
 
-QListWidget::item {
+QListWidget::item, ModelListView::item {
     color: none;
 }
 """
\ No newline at end of file
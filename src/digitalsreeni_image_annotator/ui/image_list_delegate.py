@@ -1,7 +1,7 @@
 """Image-list item delegate that paints the review score badge (issue #71).
 
-The image list is a ``QListWidget``, so "add a score column" means painting
-one. It cannot go into the item text for the same reason the class-list
+The image list is a single-column list view, so "add a score column" means
+painting one. It cannot go into the item text for the same reason the class-list
 shortcut badge cannot: **the item text IS the file name** throughout the app —
 DINO batch navigation matches on it, COCO import reconciliation matches on it,
 ``findItems(name, MatchExactly)`` re-selects on it, and the
@@ -9,31 +9,48 @@ DINO batch navigation matches on it, COCO import reconciliation matches on it,
 alongside it (ADR-035). Appending " (4.2)" would break every one of those, at
 runtime only.
 
-So the badge lives in the paint pass, where it is visual and inert.
+So the badge lives in the paint pass, where it is visual and inert. The live
+QC badge (the style's warning or error icon, left of any score) follows the
+same rule, and explains itself in the row's tooltip.
 """
 
 from PyQt6.QtCore import QRect, Qt
 from PyQt6.QtGui import QColor, QFont
-from PyQt6.QtWidgets import QStyledItemDelegate
+from PyQt6.QtWidgets import QStyle, QStyledItemDelegate, QToolTip
+
+from ..core.annotation_qc import SEVERITY_ERROR
+
+_SCORE_WIDTH = 40
 
 
 class ImageScoreDelegate(QStyledItemDelegate):
-    """Right-aligned review score on each image row, when one exists."""
+    """Right-aligned review score on each image row, when one exists, and
+    the live QC badge of a row with findings."""
 
     _BADGE_ALPHA = 190
 
-    def __init__(self, parent, score_lookup):
-        """``score_lookup(file_name) -> float | None``.
+    def __init__(self, parent, score_lookup, qc_lookup=None):
+        """``score_lookup(file_name) -> float | None``;
+        ``qc_lookup(file_name) -> (severity, summary) | None``.
 
-        A callable rather than a dict so the delegate always reads the live
-        scores; a snapshot would go stale the moment a run finished.
+        Callables rather than dicts so the delegate always reads the live
+        values; a snapshot would go stale the moment a run finished.
         """
         super().__init__(parent)
         self._score_lookup = score_lookup
+        self._qc_lookup = qc_lookup
+
+    def _qc_badge(self, index):
+        if self._qc_lookup is None:
+            return None
+        return self._qc_lookup(index.data(Qt.ItemDataRole.DisplayRole))
 
     def paint(self, painter, option, index):
         super().paint(painter, option, index)
         score = self._score_lookup(index.data(Qt.ItemDataRole.DisplayRole))
+        badge = self._qc_badge(index)
+        if badge is not None:
+            self._paint_qc_badge(painter, option, badge[0], score is not None)
         if score is None:
             return
 
@@ -56,3 +73,28 @@ class ImageScoreDelegate(QStyledItemDelegate):
             f"{score:.1f}",
         )
         painter.restore()
+
+    def _paint_qc_badge(self, painter, option, severity, beside_score):
+        style = option.widget.style() if option.widget is not None else None
+        if style is None:
+            return
+        icon = style.standardIcon(
+            QStyle.StandardPixmap.SP_MessageBoxCritical
+            if severity == SEVERITY_ERROR
+            else QStyle.StandardPixmap.SP_MessageBoxWarning
+        )
+        side = max(8, option.rect.height() - 6)
+        right = option.rect.right() - 6 - (_SCORE_WIDTH if beside_score else 0)
+        icon.paint(
+            painter,
+            QRect(right - side, option.rect.center().y() - side // 2, side, side),
+        )
+
+    def helpEvent(self, event, view, option, index):
+        badge = self._qc_badge(index)
+        if badge is None:
+            return super().helpEvent(event, view, option, index)
+        tooltip = index.data(Qt.ItemDataRole.ToolTipRole)
+        text = f"{tooltip}\n{badge[1]}" if tooltip else badge[1]
+        QToolTip.showText(event.globalPos(), text, view)
+        return True
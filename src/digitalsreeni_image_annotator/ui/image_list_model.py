@@ -0,0 +1,470 @@
+"""Model/view image and slice lists.
+
+The image list used to be a ``QListWidget`` that ``sort_image_list`` cleared
+and refilled -- one new ``QListWidgetItem`` per image -- on every sort, add
+and group change, with ``findItems`` scanning every row and the filter and
+badges touching every item. At 100k images each of those took seconds and
+the items alone held a lot of memory.
+
+:class:`ImageListModel` reads ``all_images`` instead: a row is the image's
+info dict, and the text, tooltip and status badge come out of ``data()``
+only for the rows the view actually paints (uniform item sizes, so the view
+never measures the rest). Sorting reorders ``all_images`` in place as one
+layout change, so the current row and the selection follow their images and
+nothing is rebuilt. Filtering is a :class:`RowFilterProxy` between the model
+and the view.
+
+The view (:class:`ModelListView`) keeps the part of the ``QListWidget`` API
+the controllers use -- ``item(row)``, ``count()``, ``findItems``,
+``currentRowChanged``, ``itemClicked`` ... -- with rows counted in the
+*model*, hidden rows included, exactly as the widget counted them. So
+``item(i)`` is still ``all_images[i]`` and ``item(i).text()`` still the file
+name (ADR-035). ``findItems`` with ``MatchExactly`` is a dict lookup.
+
+The slice list is the same view over a :class:`SliceListModel` of names.
+"""
+
+from contextlib import contextmanager
+
+from PyQt6.QtCore import (
+    QAbstractListModel,
+    QItemSelectionModel,
+    QModelIndex,
+    QPersistentModelIndex,
+    QSortFilterProxyModel,
+    Qt,
+    pyqtSignal,
+)
+from PyQt6.QtGui import QIcon
+from PyQt6.QtWidgets import QListView
+
+_ROOT = QModelIndex()
+
+
+class _NamedRowsModel(QAbstractListModel):
+    """A list model whose rows each have a name, found by name in O(1).
+
+    Subclasses provide ``name(row)`` and ``names()``, the name of every row
+    in order, and call :meth:`_rows_moved` whenever the rows change.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows_by_name = None
+
+    def row_of(self, name):
+        """The first row named ``name``, or -1."""
+        if self._rows_by_name is None:
+            names = self.names()
+            # Built backwards so the first of any duplicates wins.
+            self._rows_by_name = dict(
+                zip(reversed(names), range(len(names) - 1, -1, -1))
+            )
+        return self._rows_by_name.get(name, -1)
+
+    def _rows_moved(self):
+        self._rows_by_name = None
+
+    def refresh(self, names=None):
+        """Repaint and re-filter ``names`` (every row for ``None``)."""
+        count = self.rowCount()
+        if not count:
+            return
+        if names is None:
+            self.dataChanged.emit(self.index(0), self.index(count - 1))
+            return
+        for name in names:
+            row = self.row_of(name)
+            if row >= 0:
+                index = self.index(row)
+                self.dataChanged.emit(index, index)
+
+
+class ImageListModel(_NamedRowsModel):
+    """The rows of ``all_images``, in its order."""
+
+    InfoRole = Qt.ItemDataRole.UserRole
+
+    def __init__(self, images, icon_for=None, parent=None):
+        """``images()`` returns the live ``all_images`` (callers rebind it,
+        so a callable rather than the list); ``icon_for(file_name)`` is the
+        row's status badge."""
+        super().__init__(parent)
+        self._images = images
+        self._icon_for = icon_for
+        self._rows = []
+
+    def rowCount(self, parent=_ROOT):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def name(self, row):
+        return self._rows[row]["file_name"]
+
+    def names(self):
+        return [info["file_name"] for info in self._rows]
+
+    def info(self, row):
+        return self._rows[row]
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        info = self._rows[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return info["file_name"]
+        if role == Qt.ItemDataRole.ToolTipRole:
+            # The group shows only here; the text stays the bare file name.
+            group = info.get("group")
+            return f"{info['file_name']}  [{group}]" if group else None
+        if role == Qt.ItemDataRole.DecorationRole and self._icon_for is not None:
+            return self._icon_for(info["file_name"])
+        if role == self.InfoRole:
+            return info
+        return None
+
+    def sync(self):
+        """Show ``all_images`` again after it was appended to or replaced.
+
+        Appends become inserted rows; anything else resets the model.
+        """
+        images = self._images()
+        rows = self._rows
+        if len(images) >= len(rows) and all(
+            old is new for old, new in zip(rows, images)
+        ):
+            if len(images) > len(rows):
+                self.beginInsertRows(_ROOT, len(rows), len(images) - 1)
+                self._rows = list(images)
+                self._rows_moved()
+                self.endInsertRows()
+            return
+        self.beginResetModel()
+        self._rows = list(images)
+        self._rows_moved()
+        self.endResetModel()
+
+    def sort_images(self, key):
+        """Sort ``all_images`` in place by ``key``, as one layout change."""
+        self.sync()
+        images = self._images()
+        self.layoutAboutToBeChanged.emit()
+        old = self._rows
+        images.sort(key=key)
+        new_row = {id(info): row for row, info in enumerate(images)}
+        persistent = self.persistentIndexList()
+        self.changePersistentIndexList(
+            persistent,
+            [self.index(new_row[id(old[index.row()])]) for index in persistent],
+        )
+        self._rows = list(images)
+        self._rows_moved()
+        self.layoutChanged.emit()
+
+
+class SliceListModel(_NamedRowsModel):
+    """The slice (or frame) names of the current stack."""
+
+    def __init__(self, colors=None, parent=None):
+        """``colors(name) -> (foreground, background)`` of a row."""
+        super().__init__(parent)
+        self._colors = colors
+        self._names = []
+
+    def rowCount(self, parent=_ROOT):
+        return 0 if parent.isValid() else len(self._names)
+
+    def name(self, row):
+        return self._names[row]
+
+    def names(self):
+        return self._names
+
+    def set_names(self, names):
+        self.beginResetModel()
+        self._names = list(names)
+        self._rows_moved()
+        self.endResetModel()
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        name = self._names[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return name
+        if self._colors is not None:
+            if role == Qt.ItemDataRole.ForegroundRole:
+                return self._colors(name)[0]
+            if role == Qt.ItemDataRole.BackgroundRole:
+                return self._colors(name)[1]
+        return None
+
+
+class RowFilterProxy(QSortFilterProxyModel):
+    """Hides the source rows ``hide(row)`` is true for; ``None`` hides none.
+
+    ``hide`` is asked again for the rows a source ``dataChanged`` names, so
+    a status that flipped re-filters just that row. A new ``hide`` re-filters
+    everything as one layout change: ``invalidateFilter`` would signal each
+    run of hidden rows separately, which for an interleaved 100k-row list
+    takes seconds.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._hide = None
+
+    def set_row_filter(self, hide):
+        if hide is None and self._hide is None:
+            return
+        self._hide = hide
+        self.invalidate()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        return self._hide is None or not self._hide(source_row)
+
+
+class ListItem:
+    """One row of a :class:`ModelListView`, where a ``QListWidgetItem``
+    used to be. Follows its row through sorts; ``text()`` is the name the row
+    had when the item was made."""
+
+    __slots__ = ("_view", "_index", "_text")
+
+    def __init__(self, view, index, text):
+        self._view = view
+        self._index = QPersistentModelIndex(index)
+        self._text = text
+
+    def text(self):
+        return self._text
+
+    def data(self, role):
+        return self._index.data(role) if self._index.isValid() else None
+
+    def icon(self):
+        icon = self.data(Qt.ItemDataRole.DecorationRole)
+        return icon if isinstance(icon, QIcon) else QIcon()
+
+    def toolTip(self):
+        return self.data(Qt.ItemDataRole.ToolTipRole) or ""
+
+    def row(self):
+        return self._index.row() if self._index.isValid() else -1
+
+    def isHidden(self):
+        return self._view.isRowHidden(self.row())
+
+    def setSelected(self, selected):
+        self._view._select(self._index, selected)
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, ListItem)
+            and other._view is self._view
+            and other._index == self._index
+        )
+
+    def __hash__(self):
+        return hash((id(self._view), self._text))
+
+    def __repr__(self):
+        return f"ListItem({self._text!r}, row={self.row()})"
+
+
+class ModelListView(QListView):
+    """A ``QListView`` over a named-rows model behind a :class:`RowFilterProxy`,
+    with the ``QListWidget`` calls the controllers make.
+
+    Rows are model rows. The current row is kept as a model index of its
+    own, so -- like a hidden ``QListWidget`` row -- it stays current while
+    the filter hides it, and hiding or revealing rows never emits
+    ``currentRowChanged``. Only a user's move or ``setCurrentRow`` /
+    ``setCurrentItem`` does.
+    """
+
+    currentRowChanged = pyqtSignal(int)
+    itemClicked = pyqtSignal(object)
+
+    def __init__(self, model, parent=None):
+        super().__init__(parent)
+        self._source = model
+        self._proxy = RowFilterProxy(self)
+        self._proxy.setSourceModel(model)
+        self.setModel(self._proxy)
+        self.setUniformItemSizes(True)
+        self._current = QPersistentModelIndex()
+        self._moving = 0
+        self.selectionModel().currentChanged.connect(self._on_current_changed)
+        self.clicked.connect(self._on_clicked)
+
+    def source_model(self):
+        return self._source
+
+    # --- QListWidget-compatible rows ---
+
+    def count(self):
+        return self._source.rowCount()
+
+    def item(self, row):
+        if not 0 <= row < self._source.rowCount():
+            return None
+        return ListItem(self, self._source.index(row), self._source.name(row))
+
+    def row(self, item):
+        return item.row() if item is not None else -1
+
+    def findItems(self, text, flags=Qt.MatchFlag.MatchExactly):
+        if flags == Qt.MatchFlag.MatchExactly:
+            row = self._source.row_of(text)
+            return [self.item(row)] if row >= 0 else []
+        matches = self._source.match(
+            self._source.index(0), Qt.ItemDataRole.DisplayRole, text, -1, flags
+        )
+        return [self.item(index.row()) for index in matches]
+
+    def isRowHidden(self, row):
+        return not self._proxy.mapFromSource(self._source.index(row)).isValid()
+
+    def itemAt(self, position):
+        index = self.indexAt(position)
+        if not index.isValid():
+            return None
+        return self.item(self._proxy.mapToSource(index).row())
+
+    def selectedItems(self):
+        rows = sorted(
+            self._proxy.mapToSource(index).row()
+            for index in self.selectionModel().selectedRows()
+        )
+        return [self.item(row) for row in rows]
+
+    def _select(self, source_index, selected):
+        index = self._proxy.mapFromSource(QModelIndex(source_index))
+        if index.isValid():
+            self.selectionModel().select(
+                index,
+                QItemSelectionModel.SelectionFlag.Select
+                if selected
+                else QItemSelectionModel.SelectionFlag.Deselect,
+            )
+
+    # --- Current row ---
+
+    def currentItem(self):
+        return self.item(self.currentRow())
+
+    def currentRow(self):
+        return self._current.row() if self._current.isValid() else -1
+
+    def setCurrentRow(self, row):
+        valid = 0 <= row < self._source.rowCount()
+        self._set_current(self._source.index(row) if valid else QModelIndex())
+
+    def setCurrentItem(self, item):
+        self.setCurrentRow(self.row(item))
+
+    def _set_current(self, source_index):
+        index = self._proxy.mapFromSource(source_index)
+        if index.isValid():
+            self.selectionModel().setCurrentIndex(
+                index, QItemSelectionModel.SelectionFlag.ClearAndSelect
+            )
+            return
+        # Hidden (or no row): current without a place in the view.
+        previous = self.currentRow()
+        self._current = QPersistentModelIndex(source_index)
+        with self._rows_moving():
+            self.selectionModel().clearSelection()
+        if self.currentRow() != previous:
+            self.currentRowChanged.emit(self.currentRow())
+
+    def _on_current_changed(self, current, _previous):
+        if self._moving:
+            return
+        source_index = self._proxy.mapToSource(current)
+        if source_index == QModelIndex(self._current):
+            return
+        self._current = QPersistentModelIndex(source_index)
+        self.currentRowChanged.emit(self.currentRow())
+
+    def _on_clicked(self, index):
+        self.itemClicked.emit(self.item(self._proxy.mapToSource(index).row()))
+
+    @contextmanager
+    def _rows_moving(self):
+        """Rows change under the view: ignore the current-index moves Qt makes
+        for it, then put the view's current back on ours (or on none while
+        ours is hidden or gone)."""
+        name = self.currentItem().text() if self._current.isValid() else None
+        self._moving += 1
+        try:
+            yield
+        finally:
+            self._moving -= 1
+        if self._moving:
+            return
+        if name is not None and not self._current.isValid():
+            # A reset drops every index; find the row again by name.
+            row = self._source.row_of(name)
+            if row >= 0:
+                self._current = QPersistentModelIndex(self._source.index(row))
+        index = self._proxy.mapFromSource(QModelIndex(self._current))
+        selection = self.selectionModel()
+        if selection.currentIndex() == index:
+            return
+        self._moving += 1
+        try:
+            if index.isValid():
+                selection.setCurrentIndex(index, QItemSelectionModel.SelectionFlag.Select)
+            else:
+                selection.clearCurrentIndex()
+        finally:
+            self._moving -= 1
+
+    # --- Model changes, through the view so the current row survives ---
+
+    def set_row_filter(self, hide):
+        """Hide the model rows ``hide(row)`` is true for (``None``: none)."""
+        with self._rows_moving():
+            self._proxy.set_row_filter(hide)
+
+    def refresh_rows(self, names=None):
+        """Repaint and re-filter ``names``, or every row.
+
+        Only for a change the filter may care about: ``data()`` is read at
+        paint time, so a plain repaint is ``viewport().update()``.
+        """
+        with self._rows_moving():
+            self._source.refresh(names)
+
+
+class ImageListView(ModelListView):
+    """The image list: :class:`ModelListView` over ``all_images``."""
+
+    def __init__(self, images, icon_for=None, parent=None):
+        super().__init__(ImageListModel(images, icon_for), parent)
+
+    def sync(self):
+        """Rows follow ``all_images`` again (after appends, removals or a
+        rebind); the current image stays current if it is still there."""
+        with self._rows_moving():
+            self._source.sync()
+
+    def sort_images(self, key):
+        """Sort ``all_images`` by ``key`` and the rows with it."""
+        with self._rows_moving():
+            self._source.sort_images(key)
+
+
+class SliceListView(ModelListView):
+    """The slice list: :class:`ModelListView` over a stack's slice names."""
+
+    def __init__(self, colors=None, parent=None):
+        super().__init__(SliceListModel(colors), parent)
+
+    def set_names(self, names):
+        with self._rows_moving():
+            self._source.set_names(names)
+
+    def clear(self):
+        self.set_names([])
@@ -8,6 +8,7 @@ controllers, but the menu doesn't need to know that.
 
 from PyQt6.QtGui import QAction, QKeySequence
 
+from ..app_settings import load_live_qc, save_live_qc
 from . import theme
 
 
@@ -125,6 +126,19 @@ def build_menu_bar(window):
     check_annotations_action.triggered.connect(window.check_annotations)
     tools_menu.addAction(check_annotations_action)
 
+    # The per-image rules again after every edit, in the background; images
+    # with findings are badged in the image list.
+    window.live_qc_action = QAction("Check While Annotating", window)
+    window.live_qc_action.setCheckable(True)
+    window.live_qc_action.setToolTip(
+        "Re-check geometry, keypoints and duplicates on each image as it is "
+        "edited, and mark images with problems in the image list"
+    )
+    window.live_qc_action.toggled.connect(save_live_qc)
+    window.live_qc_action.toggled.connect(window.toggle_live_qc)
+    window.live_qc_action.setChecked(load_live_qc())
+    tools_menu.addAction(window.live_qc_action)
+
     # Embedding-based near-duplicate + diversity report (issue #72).
     dataset_similarity_action = QAction("Analyse Dataset Similarity…", window)
     dataset_similarity_action.setToolTip(
@@ -142,6 +142,18 @@ def install_shortcuts(window):
     window._redo_shortcut_alt.setContext(Qt.ShortcutContext.ApplicationShortcut)
     window._redo_shortcut_alt.activated.connect(ac.redo)
 
+    # Canvas paint instrumentation (core/paint_profile): F12 toggles the
+    # FPS / per-layer HUD, Shift+F12 dumps the counters to the log and beside
+    # the project. Developer-facing, so F-keys rather than anything a user is
+    # likely to hit while annotating.
+    window._paint_hud_shortcut = QShortcut(QKeySequence("F12"), window)
+    window._paint_hud_shortcut.setContext(Qt.ShortcutContext.ApplicationShortcut)
+    window._paint_hud_shortcut.activated.connect(window.toggle_paint_hud)
+
+    window._paint_dump_shortcut = QShortcut(QKeySequence("Shift+F12"), window)
+    window._paint_dump_shortcut.setContext(Qt.ShortcutContext.ApplicationShortcut)
+    window._paint_dump_shortcut.activated.connect(window.dump_paint_profile)
+
 
 def build_shortcut_filter(window):
     """Build the conditional-binding registry: class digits and tool letters
@@ -27,6 +27,12 @@ from PyQt6.QtWidgets import (
     QWidget,
 )
 
+from ..app_settings import (
+    load_dino_single_pass,
+    load_everything_tiled,
+    save_dino_single_pass,
+    save_everything_tiled,
+)
 from ..core import onion
 
 from ..core.constants import (
@@ -40,6 +46,7 @@ from ..inference.sam3_utils import SAM3_MODEL_LABEL
 from ..widgets.video_timeline import VideoTimeline
 from .class_list_delegate import ClassShortcutDelegate
 from .image_list_delegate import ImageScoreDelegate
+from .image_list_model import ImageListView
 
 
 def _section_header(text):
@@ -195,6 +202,16 @@ def build_sidebar(window):
     )
     sam_layout.addWidget(window.segment_everything_button)
 
+    window.segment_everything_tiled_checkbox = QCheckBox("Tile large images")
+    window.segment_everything_tiled_checkbox.setChecked(load_everything_tiled())
+    window.segment_everything_tiled_checkbox.setToolTip(
+        "Segment images larger than SAM's 1024 px input in overlapping tiles, "
+        "at full resolution, so small objects are not lost to downscaling. "
+        "Slower: one SAM pass per tile."
+    )
+    window.segment_everything_tiled_checkbox.toggled.connect(save_everything_tiled)
+    sam_layout.addWidget(window.segment_everything_tiled_checkbox)
+
     # SAM model selector
     window.sam_model_selector = QComboBox()
     window.sam_model_selector.addItem("Pick a SAM Model")
@@ -276,12 +293,38 @@ def build_sidebar(window):
     det_btn_layout.addWidget(window.btn_detect_batch)
     dino_layout.addLayout(det_btn_layout)
 
+    window.btn_review_detection_journal = QPushButton("Review Saved Detections")
+    window.btn_review_detection_journal.setToolTip(
+        "Review what earlier Detect All Images runs found with the current "
+        "model and classes. Every image's results are saved as it finishes."
+    )
+    window.btn_review_detection_journal.clicked.connect(window.review_detection_journal)
+    dino_layout.addWidget(window.btn_review_detection_journal)
+
+    window.btn_forget_detection_journal = QPushButton("Forget Saved Detections")
+    window.btn_forget_detection_journal.setToolTip(
+        "Discard the saved results for the current model and classes, so the "
+        "next Detect All Images detects every image again."
+    )
+    window.btn_forget_detection_journal.clicked.connect(window.forget_detection_journal)
+    dino_layout.addWidget(window.btn_forget_detection_journal)
+
     # Batch mode
     window.dino_batch_mode = QComboBox()
     window.dino_batch_mode.addItem("Review before accepting")
     window.dino_batch_mode.addItem("Auto-accept all detections")
     dino_layout.addWidget(window.dino_batch_mode)
 
+    window.dino_single_pass_checkbox = QCheckBox("One pass for all classes")
+    window.dino_single_pass_checkbox.setChecked(load_dino_single_pass())
+    window.dino_single_pass_checkbox.setToolTip(
+        "Detect every class in a single Grounding DINO pass instead of one "
+        "pass per class. Much faster with many classes; scores can differ "
+        "slightly because the phrases share one prompt."
+    )
+    window.dino_single_pass_checkbox.toggled.connect(save_dino_single_pass)
+    dino_layout.addWidget(window.dino_single_pass_checkbox)
+
     annotation_layout.addWidget(dino_widget)
     # --- END DINO section ---
 
@@ -548,12 +591,19 @@ def build_image_list(window):
     )
     window.image_list_layout.addWidget(window.image_group_combo)
 
-    window.image_list = QListWidget()
-    # Paints the review score (issue #71). Reads the controller live rather
-    # than a snapshot, and stays out of the item text -- see the delegate's
-    # docstring for why that matters here in particular.
+    # A view over all_images itself; rows are painted lazily, so the list
+    # costs the same at 100 images as at 100k.
+    window.image_list = ImageListView(
+        lambda: window.all_images,
+        lambda name: window.image_controller.status_icon_for(name),
+    )
+    # Paints the review score (issue #71) and the live QC badge. Reads the
+    # controllers live rather than a snapshot, and stays out of the item
+    # text -- see the delegate's docstring for why that matters here.
     window.image_score_delegate = ImageScoreDelegate(
-        window.image_list, lambda name: window.review_controller.score_for(name)
+        window.image_list,
+        lambda name: window.review_controller.score_for(name),
+        lambda name: window.qc_controller.live_badge(name),
     )
     window.image_list.setItemDelegate(window.image_score_delegate)
     window.image_list.itemClicked.connect(window.switch_image)
@@ -33,18 +33,19 @@ QPushButton:checked {
     color: #FFFFFF;
 }
 
-QListWidget, QTreeWidget {
+QListWidget, ModelListView, QTreeWidget {
     background-color: #3A3A3A;
     border: 1px solid #4A4A4A;
     border-radius: 3px;
     color: #E0E0E0;
 }
 
-QListWidget::item, QTreeWidget::item {
+QListWidget::item, ModelListView::item, QTreeWidget::item {
     color: #E0E0E0;  
 }
 
-QListWidget::item:selected, QTreeWidget::item:selected {
+QListWidget::item:selected, ModelListView::item:selected,
+QTreeWidget::item:selected {
     background-color: #4A4A4A;
     color: #FFFFFF;  /* Make selected items a bit brighter */
 }
@@ -143,7 +144,7 @@ QStatusBar {
     color: #B0B0B0;
 }
 
-QListWidget::item {
+QListWidget::item, ModelListView::item {
     color: none;
 }
 
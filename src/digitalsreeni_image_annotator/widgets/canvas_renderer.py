@@ -4,8 +4,14 @@ Canvas rendering for ImageLabel (issue #46 split).
 ``CanvasRenderer`` owns the paint-layer drawing routines for the annotation
 canvas: committed annotations, keypoint/pose instances, the selection overlay,
 the rubber-band selection rect, the in-progress editing polygon, temp
-(DINO/YOLO) annotations, the SAM bbox, the paint/eraser size indicator, and the
-overlay painter helpers (pen width, overlay font, centroid).
+(DINO/YOLO) annotations, the SAM bbox, the paint/eraser size indicator, the
+paint-timing HUD, and the overlay painter helpers (pen width, overlay font,
+centroid).
+
+Committed-annotation labels are drawn as one batch at the end of
+``draw_annotations``: in screen space, from cached ``QStaticText`` layouts, and
+decluttered (``core/label_layout``) so overlapping labels are dropped rather
+than stacked.
 
 All canvas STATE (annotations, zoom/offset, class colours, selection, temp
 annotations, SAM state, …) lives on the ImageLabel; CanvasRenderer reads it via
@@ -14,7 +20,23 @@ calls into these methods in the exact same layer order as before the split.
 """
 
 from PyQt6.QtCore import QPointF, QRectF, Qt
-from PyQt6.QtGui import QBrush, QColor, QFont, QPen, QPolygonF
+from PyQt6.QtGui import (
+    QBrush,
+    QColor,
+    QFont,
+    QFontMetricsF,
+    QPen,
+    QPolygonF,
+    QStaticText,
+    QTransform,
+)
+
+from ..core import label_layout
+from .render_cache import RenderGeometryCache
+
+# Laid-out label texts kept between repaints. Labels are "<class> <number>", so
+# even a dense project stays well under this; it only bounds a pathological one.
+_STATIC_TEXT_LIMIT = 8192
 
 
 class CanvasRenderer:
@@ -28,14 +50,114 @@ class CanvasRenderer:
 
     def __init__(self, image_label):
         self.label = image_label
+        # Built-once QPolygonFs, simplified at low zoom (render_cache /
+        # core.polygon_lod). Render-only: never written back to an annotation.
+        self._geometry = RenderGeometryCache()
+        # point size -> QFont, and (text, point size) -> laid-out QStaticText.
+        # Building either per annotation per repaint was most of the cost of
+        # drawing labels on a dense image.
+        self._fonts = {}
+        self._static_texts = {}
+
+    def begin_pass(self):
+        """Called by ``paintEvent`` before any layer is drawn."""
+        self._geometry.begin_pass()
+
+    def _ring_polygon(self, ring, annotation=None):
+        """The polygon to draw for flat ring ``ring``.
+
+        The polygon being vertex-edited bypasses the cache: its vertices are
+        dragged *in place*, which is the one mutation the cache's
+        list-identity check cannot see.
+        """
+        if annotation is not None and annotation is self.label.editing_polygon:
+            return QPolygonF([
+                QPointF(float(x), float(y)) for x, y in zip(ring[0::2], ring[1::2])
+            ])
+        return self._geometry.polygon(ring, self.label.zoom_factor)
+
+    def _ring_centroid(self, ring, annotation=None):
+        """Vertex mean of flat ring ``ring`` -- the label anchor -- cached with
+        the ring's polygons. The polygon being vertex-edited is computed live,
+        for the same reason as in :meth:`_ring_polygon`."""
+        if annotation is not None and annotation is self.label.editing_polygon:
+            n = len(ring) // 2
+            if n == 0:
+                return None
+            return QPointF(float(sum(ring[0:2 * n:2])) / n, float(sum(ring[1:2 * n:2])) / n)
+        return self._geometry.centroid(ring)
 
     def _pen_w(self, base):
         """Overlay pen width: ui-scaled, zoom-compensated (constant on screen)."""
         return base * self.label.ui_scale / self.label.zoom_factor
 
     def _overlay_font(self, base=12):
-        """Overlay label font: ui-scaled, zoom-compensated (constant on screen)."""
-        return QFont("Arial", max(1, int(base * self.label.ui_scale / self.label.zoom_factor)))
+        """Overlay label font: ui-scaled, zoom-compensated (constant on screen).
+
+        Shared between calls -- set it on a painter, do not modify it.
+        """
+        return self._font(max(1, int(base * self.label.ui_scale / self.label.zoom_factor)))
+
+    def _font(self, point_size):
+        font = self._fonts.get(point_size)
+        if font is None:
+            font = self._fonts[point_size] = QFont("Arial", point_size)
+        return font
+
+    def _static_text(self, text, point_size):
+        """``(QStaticText, width, height)`` for ``text`` at ``point_size``."""
+        key = (text, point_size)
+        cached = self._static_texts.get(key)
+        if cached is None:
+            if len(self._static_texts) >= _STATIC_TEXT_LIMIT:
+                self._static_texts.clear()
+            static = QStaticText(text)
+            static.setTextFormat(Qt.TextFormat.PlainText)
+            static.prepare(QTransform(), self._font(point_size))
+            size = static.size()
+            cached = self._static_texts[key] = (static, size.width(), size.height())
+        return cached
+
+    def _draw_labels(self, painter, labels, color):
+        """Draw queued committed-annotation labels in one batch.
+
+        ``labels`` holds ``(x, y, text, annotation)`` with the baseline-left
+        anchor in image coordinates, as ``drawText`` used to take it. Drawn in
+        screen space at a fixed point size, so the layouts survive any zoom;
+        overlapping labels are decluttered, selected annotations first, and
+        labels off the visible part of the canvas are culled.
+        """
+        if not labels:
+            return
+        point_size = max(1, int(12 * self.label.ui_scale))
+        font = self._font(point_size)
+        ascent = QFontMetricsF(font).ascent()
+        zoom = self.label.zoom_factor
+        ox, oy = self.label.offset_x, self.label.offset_y
+
+        items = []
+        boxes = []
+        for x, y, text, _ in labels:
+            static, width, height = self._static_text(text, point_size)
+            left, top = ox + x * zoom, oy + y * zoom - ascent
+            items.append((QPointF(left, top), static))
+            boxes.append((left, top, width, height))
+
+        selected = {id(a) for a in self.label.highlighted_annotations}
+        first = [i for i, item in enumerate(labels) if id(item[3]) in selected]
+        order = first + [i for i, item in enumerate(labels) if id(item[3]) not in selected]
+        visible = self.label.visibleRegion().boundingRect()
+        viewport = None if visible.isEmpty() else (
+            visible.x(), visible.y(), visible.width(), visible.height()
+        )
+
+        painter.save()
+        painter.resetTransform()
+        painter.setFont(font)
+        painter.setPen(QPen(color))
+        for i in label_layout.declutter(boxes, order, viewport):
+            painter.drawStaticText(*items[i])
+        painter.restore()
 
     def draw_onion_skin(self, painter):
         """Ghost the neighbouring slice(s) over the current image (issue #67).
@@ -59,17 +181,26 @@ class CanvasRenderer:
         self._draw_onion_annotations(painter)
 
     def _draw_onion_pixmaps(self, painter):
-        pixmaps = self.label.scaled_onion_pixmaps()
-        if not pixmaps:
+        layers = self.label.onion_layers()
+        if not layers:
             return
         painter.save()
         painter.setOpacity(self.label.onion_opacity)
-        for pixmap in pixmaps:
+        for pixmap, stretch in layers:
             # Same origin as the main image, and pre-scaled to the same zoom,
             # so ghost and current slice stay in lockstep through pan and zoom.
-            painter.drawPixmap(
-                int(self.label.offset_x), int(self.label.offset_y), pixmap
-            )
+            if stretch == 1.0:
+                painter.drawPixmap(
+                    int(self.label.offset_x), int(self.label.offset_y), pixmap
+                )
+                continue
+            # Scaled for an earlier zoom, its rescale still on the worker
+            # (widgets/onion_ghosts): stretch it meanwhile.
+            painter.save()
+            painter.translate(int(self.label.offset_x), int(self.label.offset_y))
+            painter.scale(stretch, stretch)
+            painter.drawPixmap(0, 0, pixmap)
+            painter.restore()
         painter.setOpacity(1.0)
         painter.restore()
 
@@ -121,10 +252,7 @@ class CanvasRenderer:
         """
         segmentation = annotation.get("segmentation")
         if segmentation and len(segmentation) >= 6:
-            painter.drawPolygon(QPolygonF([
-                QPointF(segmentation[i], segmentation[i + 1])
-                for i in range(0, len(segmentation) - 1, 2)
-            ]))
+            painter.drawPolygon(self._ring_polygon(segmentation))
             return
         bbox = annotation.get("bbox")
         if bbox and len(bbox) == 4:
@@ -136,6 +264,7 @@ class CanvasRenderer:
         painter.translate(self.label.offset_x, self.label.offset_y)
         painter.scale(self.label.zoom_factor, self.label.zoom_factor)
 
+        font = self._overlay_font()
         for annotation in self.label.temp_annotations:
             # An unprompted proposal that has been given a class (issue #69)
             # draws in that class's colour with a solid outline, so "assigned"
@@ -155,26 +284,20 @@ class CanvasRenderer:
 
             # Prefer segmentation polygon over bbox when both are present
             # (DINO+SAM temp annotations carry both — the polygon is the mask).
-            points = None
+            ring = None
             if "segmentation" in annotation:
-                points = [
-                    QPointF(float(x), float(y))
-                    for x, y in zip(
-                        annotation["segmentation"][0::2],
-                        annotation["segmentation"][1::2],
-                    )
-                ]
-                painter.drawPolygon(QPolygonF(points))
+                ring = annotation["segmentation"]
+                painter.drawPolygon(self._ring_polygon(ring))
             elif "bbox" in annotation:
                 x, y, w, h = annotation["bbox"]
                 painter.drawRect(QRectF(x, y, w, h))
 
             # Draw label and score
-            painter.setFont(self._overlay_font())
+            painter.setFont(font)
             name = assigned or annotation["category_name"]
             label = f"{name} {annotation['score']:.2f}"
-            if points is not None:
-                centroid = self.calculate_centroid(points)
+            if ring is not None:
+                centroid = self._ring_centroid(ring)
                 if centroid:
                     painter.drawText(centroid, label)
             elif "bbox" in annotation:
@@ -241,6 +364,35 @@ class CanvasRenderer:
 
             painter.restore()
 
+    def draw_paint_hud(self, painter):
+        """Paint-timing read-out in the top-left of the visible canvas.
+
+        Screen space (no zoom transform) and anchored to the *visible* region
+        rather than the widget origin: the label sits in a scroll area, and a
+        HUD at (0, 0) would scroll out of view as soon as the image is panned.
+        """
+        lines = self.label.paint_profiler.hud_lines()
+        painter.save()
+        painter.resetTransform()
+        font = QFont("Monospace")
+        font.setStyleHint(QFont.StyleHint.TypeWriter)
+        font.setPointSize(max(1, int(9 * self.label.ui_scale)))
+        painter.setFont(font)
+        metrics = painter.fontMetrics()
+        line_h = metrics.height()
+        width = max(metrics.horizontalAdvance(line) for line in lines) + 12
+        origin = self.label.visibleRegion().boundingRect().topLeft()
+        box = QRectF(origin.x() + 8, origin.y() + 8, width, line_h * len(lines) + 8)
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(QBrush(QColor(0, 0, 0, 170)))
+        painter.drawRect(box)
+        painter.setPen(QPen(QColor(120, 255, 120)))
+        for i, line in enumerate(lines):
+            painter.drawText(
+                QPointF(box.x() + 6, box.y() + 4 + metrics.ascent() + i * line_h), line
+            )
+        painter.restore()
+
     def draw_sam_bbox(self, painter):
         painter.save()
         painter.translate(self.label.offset_x, self.label.offset_y)
@@ -276,6 +428,8 @@ class CanvasRenderer:
         painter.translate(self.label.offset_x, self.label.offset_y)
         painter.scale(self.label.zoom_factor, self.label.zoom_factor)
 
+        text_color = Qt.GlobalColor.white if self.label.dark_mode else Qt.GlobalColor.black
+        labels = []
         for class_name, class_annotations in self.label.annotations.items():
             if not self.label._ctx.is_class_visible(class_name):
                 continue
@@ -290,7 +444,6 @@ class CanvasRenderer:
                 fill_color = QColor(color)
                 fill_color.setAlphaF(self.label.fill_opacity)
 
-                text_color = Qt.GlobalColor.white if self.label.dark_mode else Qt.GlobalColor.black
                 painter.setPen(QPen(border_color, self._pen_w(2), Qt.PenStyle.SolidLine))
                 painter.setBrush(QBrush(fill_color))
 
@@ -298,49 +451,44 @@ class CanvasRenderer:
                     segmentation = annotation["segmentation"]
                     if isinstance(segmentation, list) and len(segmentation) > 0:
                         if isinstance(segmentation[0], list):  # Multiple polygons
-                            for polygon in segmentation:
-                                points = [
-                                    QPointF(float(x), float(y))
-                                    for x, y in zip(polygon[0::2], polygon[1::2])
-                                ]
-                                if points:
-                                    painter.drawPolygon(QPolygonF(points))
+                            rings = segmentation
                         else:  # Single polygon
-                            points = [
-                                QPointF(float(x), float(y))
-                                for x, y in zip(segmentation[0::2], segmentation[1::2])
-                            ]
-                            if points:
-                                painter.drawPolygon(QPolygonF(points))
-
-                        # Draw centroid and label
-                        if points:
-                            centroid = self.calculate_centroid(points)
+                            rings = [segmentation]
+                        ring = None
+                        for ring in rings:
+                            if len(ring) >= 2:
+                                painter.drawPolygon(self._ring_polygon(ring, annotation))
+
+                        # Label at the centroid (of the last ring, as ever)
+                        if ring is not None and len(ring) >= 2:
+                            centroid = self._ring_centroid(ring, annotation)
                             if centroid:
-                                painter.setFont(self._overlay_font())
-                                painter.setPen(
-                                    QPen(text_color, self._pen_w(2), Qt.PenStyle.SolidLine)
-                                )
-                                painter.drawText(
-                                    centroid,
+                                labels.append((
+                                    centroid.x(), centroid.y(),
                                     f"{class_name} {annotation.get('number', '')}",
-                                )
+                                    annotation,
+                                ))
 
                 elif "keypoints" in annotation:
                     # Pose instance (#35): skeleton + visibility-coloured points.
                     # Drawn before the bbox branch since an instance also carries
                     # a bbox (the box is resizable via the selection handles).
-                    self._draw_keypoint_annotation(
+                    anchor = self._draw_keypoint_annotation(
                         painter, annotation, class_name, color, text_color
                     )
+                    if anchor is not None:
+                        labels.append((
+                            anchor.x(), anchor.y(),
+                            f"{class_name} {annotation.get('number', '')}",
+                            annotation,
+                        ))
 
                 elif "bbox" in annotation:
                     x, y, width, height = annotation["bbox"]
                     painter.drawRect(QRectF(x, y, width, height))
-                    painter.setPen(QPen(text_color, self._pen_w(2), Qt.PenStyle.SolidLine))
-                    painter.drawText(
-                        QPointF(x, y), f"{class_name} {annotation.get('number', '')}"
-                    )
+                    labels.append((
+                        x, y, f"{class_name} {annotation.get('number', '')}", annotation
+                    ))
 
         # Polygon-in-progress is rendered by PolygonTool.paint_overlay
         # (paintEvent calls active_tool_handler.paint_overlay).
@@ -352,13 +500,9 @@ class CanvasRenderer:
             painter.setBrush(QBrush(temp_color))
 
             segmentation = self.label.temp_sam_prediction["segmentation"]
-            points = [
-                QPointF(float(x), float(y))
-                for x, y in zip(segmentation[0::2], segmentation[1::2])
-            ]
-            if points:
-                painter.drawPolygon(QPolygonF(points))
-                centroid = self.calculate_centroid(points)
+            if len(segmentation) >= 2:
+                painter.drawPolygon(self._ring_polygon(segmentation))
+                centroid = self._ring_centroid(segmentation)
                 if centroid:
                     painter.setFont(self._overlay_font())
                     painter.drawText(
@@ -372,13 +516,18 @@ class CanvasRenderer:
             self._draw_selection_overlay(painter, annotation)
 
         painter.restore()
+        self._draw_labels(painter, labels, text_color)
 
     def _draw_keypoint_annotation(self, painter, annotation, class_name, color, text_color):
         """Render a committed pose instance (#35): a faint instance box, the
         skeleton edges (between labelled points), visibility-coloured markers
-        (filled = visible v2, hollow = occluded v1, v0 skipped), and the label.
+        (filled = visible v2, hollow = occluded v1, v0 skipped).
         Marker/skeleton geometry matches the in-progress KeypointTool overlay so
-        placing and reviewing look the same."""
+        placing and reviewing look the same.
+
+        Returns the instance label's anchor (the box top-left, else the first
+        point, else ``None``); the label itself joins ``draw_annotations``'s
+        label batch."""
         kps = annotation.get("keypoints") or []
         pts = list(zip(kps[0::3], kps[1::3], kps[2::3]))
         schema = self.label._ctx.keypoint_schema(class_name) if self.label._ctx else None
@@ -411,14 +560,10 @@ class CanvasRenderer:
 
         # Instance label at the box top-left (fallback to first point).
         if bbox:
-            anchor = QPointF(float(bbox[0]), float(bbox[1]))
-        elif pts:
-            anchor = QPointF(float(pts[0][0]), float(pts[0][1]))
-        else:
-            return
-        painter.setFont(self._overlay_font())
-        painter.setPen(QPen(text_color, self._pen_w(2), Qt.PenStyle.SolidLine))
-        painter.drawText(anchor, f"{class_name} {annotation.get('number', '')}")
+            return QPointF(float(bbox[0]), float(bbox[1]))
+        if pts:
+            return QPointF(float(pts[0][0]), float(pts[0][1]))
+        return None
 
     def _draw_selection_overlay(self, painter, annotation):
         """Mark a selected annotation the way the sibling open-garden-planner
@@ -35,7 +35,7 @@ from .tools import (
 )
 from .canvas_renderer import CanvasRenderer
 from . import edit_gestures
-from ..core import onion
+from ..core import onion, paint_profile
 from ..core.constants import DEFAULT_FILL_OPACITY
 from ..core.mask_filters import SAM_EVERYTHING_SOURCE
 from ..utils import (
@@ -189,6 +189,19 @@ class ImageLabel(QLabel):
         # pan and zoom, which is the cost the main image already avoids.
         self._scaled_onion_pixmaps = []
         self._scaled_onion_zoom = None
+        # Ghosts prepared off the GUI thread (widgets/onion_ghosts), as
+        # [(scaled pixmap, zoom it was scaled for), ...], and the preparer's
+        # rescale callback. None while ghosts come from set_onion_pixmaps.
+        self._prepared_onion = None
+        self._onion_rescaler = None
+        self._onion_rescale_zoom = None
+
+        # Paint instrumentation (core/paint_profile). Counters are off unless
+        # IMAGE_ANNOTATOR_PROFILE_PAINT is set or the HUD is toggled on.
+        self.paint_profiler = paint_profile.PaintProfiler(
+            enabled=paint_profile.enabled_from_env()
+        )
+        self.show_paint_hud = False
 
         # SAM
         self.sam_bbox = None
@@ -337,21 +350,31 @@ class ImageLabel(QLabel):
     def paintEvent(self, event):
         super().paintEvent(event)
         if self.scaled_pixmap:
+            # Per-layer timing (paint_profile). Every section below is wrapped
+            # whether or not profiling is on; off, each wrapper is a shared
+            # no-op context manager.
+            profiler = self.paint_profiler
+            profiler.begin_frame()
+            self.renderer.begin_pass()
             painter = QPainter(self)
             painter.setRenderHint(QPainter.RenderHint.Antialiasing)
             # Draw the image
-            painter.drawPixmap(
-                int(self.offset_x), int(self.offset_y), self.scaled_pixmap
-            )
+            with profiler.layer("image"):
+                painter.drawPixmap(
+                    int(self.offset_x), int(self.offset_y), self.scaled_pixmap
+                )
             # Onion-skin ghost of the neighbouring slice(s), issue #67. Sits
             # between the image and every annotation layer: visible over the
             # opaque raster, never on top of an annotation.
-            self.renderer.draw_onion_skin(painter)
+            with profiler.layer("onion_skin"):
+                self.renderer.draw_onion_skin(painter)
             # Draw committed annotations
-            self.renderer.draw_annotations(painter)
+            with profiler.layer("annotations"):
+                self.renderer.draw_annotations(painter)
             # Polygon edit mode is modal; runs orthogonal to tool selection
             if self.editing_polygon:
-                self.renderer.draw_editing_polygon(painter)
+                with profiler.layer("editing_polygon"):
+                    self.renderer.draw_editing_polygon(painter)
             # Idle-mode rubber-band selection rectangle (issue #75)
             if self.selection_rect is not None:
                 self.renderer.draw_selection_rect(painter)
@@ -380,13 +403,66 @@ class ImageLabel(QLabel):
             # their state field was populated regardless of the active
             # tool; iterating all handlers preserves that — switching
             # tools mid-stroke does not hide an unsaved mark.
-            for handler in self._tools.values():
-                handler.paint_overlay(painter)
-            self.renderer.draw_tool_size_indicator(painter)
+            with profiler.layer("tool_overlays"):
+                for handler in self._tools.values():
+                    handler.paint_overlay(painter)
+                self.renderer.draw_tool_size_indicator(painter)
             if self.temp_annotations:
-                self.renderer.draw_temp_annotations(painter)
+                with profiler.layer("temp_annotations"):
+                    self.renderer.draw_temp_annotations(painter)
+            profiler.end_frame()
+            # The HUD is drawn outside the frame it reports on, so its own
+            # text layout never shows up as a layer.
+            if self.show_paint_hud:
+                self.renderer.draw_paint_hud(painter)
             painter.end()
 
+    def set_paint_hud_visible(self, visible):
+        """Show or hide the paint-timing HUD.
+
+        Showing it switches the counters on and starts them from zero, so the
+        figures describe what happens from here on rather than averaging in
+        whatever ran before. Hiding it leaves the counters running if the
+        environment asked for them (``IMAGE_ANNOTATOR_PROFILE_PAINT``), so a
+        report can still be dumped afterwards.
+        """
+        self.show_paint_hud = bool(visible)
+        if self.show_paint_hud:
+            self.paint_profiler.reset()
+            self.paint_profiler.set_enabled(True)
+        else:
+            self.paint_profiler.set_enabled(paint_profile.enabled_from_env())
+        self.update()
+
+    def toggle_paint_hud(self):
+        self.set_paint_hud_visible(not self.show_paint_hud)
+
+    def paint_profile_context(self):
+        """What was on screen, recorded alongside a paint report so two
+        reports can be compared like for like."""
+        image_size = None
+        if self.original_pixmap is not None and not self.original_pixmap.isNull():
+            image_size = [self.original_pixmap.width(), self.original_pixmap.height()]
+        annotation_count = sum(len(v) for v in self.annotations.values())
+        vertex_count = 0
+        for class_annotations in self.annotations.values():
+            for annotation in class_annotations:
+                segmentation = annotation.get("segmentation") or []
+                if segmentation and isinstance(segmentation[0], list):
+                    vertex_count += sum(len(poly) // 2 for poly in segmentation)
+                else:
+                    vertex_count += len(segmentation) // 2
+        return {
+            "image": self.image_path,
+            "image_size": image_size,
+            "zoom_factor": self.zoom_factor,
+            "annotations": annotation_count,
+            "vertices": vertex_count,
+            "temp_annotations": len(self.temp_annotations),
+            "onion_pixmaps": len(self.onion_pixmaps),
+            "onion_annotations": sum(len(a) for _, a in self.onion_annotations),
+        }
+
     def scaled_onion_pixmaps(self):
         """Onion ghosts scaled to the current zoom, cached until zoom changes.
 
@@ -394,6 +470,8 @@ class ImageLabel(QLabel):
         this in ``draw_onion_skin`` instead would rescale full-resolution
         images on every repaint, on the GUI thread, throughout a pan.
         """
+        if self._prepared_onion is not None:
+            return [pixmap for pixmap, _ in self._prepared_onion]
         if not self.onion_pixmaps:
             return []
         if self._scaled_onion_zoom != self.zoom_factor:
@@ -415,6 +493,41 @@ class ImageLabel(QLabel):
         self.onion_pixmaps = list(pixmaps or [])
         self._scaled_onion_pixmaps = []
         self._scaled_onion_zoom = None
+        self._prepared_onion = None
+        self._onion_rescaler = None
+        self._onion_rescale_zoom = None
+
+    def set_prepared_onion_pixmaps(self, layers, rescaler):
+        """Replace the ghosts with ones already scaled off the GUI thread.
+
+        ``layers`` is ``[(pixmap, zoom), ...]``; ``rescaler(zoom)`` is called
+        (once per zoom) when the canvas zoom moves away from theirs, and the
+        stale pixmaps are stretched by the painter until the new ones arrive.
+        """
+        self._prepared_onion = list(layers)
+        self.onion_pixmaps = [pixmap for pixmap, _ in self._prepared_onion]
+        self._scaled_onion_pixmaps = []
+        self._scaled_onion_zoom = None
+        self._onion_rescaler = rescaler
+        self._onion_rescale_zoom = None
+
+    def onion_layers(self):
+        """``[(pixmap, stretch), ...]`` for the paint pass: the scaled ghosts,
+        and the extra scale to draw each at (1.0 unless a rescale is pending)."""
+        if self._prepared_onion is None:
+            return [(pixmap, 1.0) for pixmap in self.scaled_onion_pixmaps()]
+        layers = []
+        stale = False
+        for pixmap, zoom in self._prepared_onion:
+            if pixmap is None or pixmap.isNull():
+                continue
+            stretch = self.zoom_factor / zoom if zoom else 1.0
+            stale = stale or stretch != 1.0
+            layers.append((pixmap, stretch))
+        if stale and self._onion_rescaler and self._onion_rescale_zoom != self.zoom_factor:
+            self._onion_rescale_zoom = self.zoom_factor
+            self._onion_rescaler(self.zoom_factor)
+        return layers
 
     def set_onion_annotations(self, ghosts):
         """Replace the ghosted neighbour shapes.
@@ -0,0 +1,199 @@
+"""Off-GUI-thread preparation of onion-skin image ghosts (issue #67 follow-up).
+
+``refresh_onion_skin`` used to decode the neighbouring slice(s) through the
+shared LRU and ``scaled_onion_pixmaps`` rescaled them with
+``SmoothTransformation`` -- both on the GUI thread, on every slice step and
+again on every zoom change. With an offset of several slices nothing is ever
+already decoded, so each Up/Down paid a decode and a full-resolution rescale
+before the new slice could paint.
+
+:class:`OnionGhostPreparer` moves both onto a worker: the slice is extracted
+and scaled to the current zoom there, and the GUI thread only converts the
+already-scaled ``QImage`` to a ``QPixmap`` and swaps it in. Until it arrives
+the slice is drawn without that ghost; until a rescale arrives the previous
+scaled ghost is stretched by the painter, which is cheap and looks no worse
+than one frame of a wheel zoom.
+
+**Reuse across a one-slice step.** Ghosts are kept by ``(provider_id, name)``
+for as long as they stay wanted, and the slice that was on screen is kept as
+well (:meth:`OnionGhostPreparer.remember`): in the default previous-neighbour
+mode, stepping forward makes exactly that slice the new ghost, and its scaled
+pixmap is already the one the canvas was showing. Nothing is decoded or
+scaled for it at all.
+
+Only ``QImage`` crosses threads (it is safe to build and scale off the GUI
+thread; ``QPixmap`` is not). Workers never touch the shared slice LRU, which
+is not thread-safe: a slice already materialised there is looked up on the GUI
+thread and handed to the worker as a finished image; anything else is
+extracted from the provider's retained array, which the worker only reads.
+Opacity stays a paint-time ``setOpacity``, so moving the slider costs no
+re-preparation.
+"""
+
+from PyQt6.QtCore import QObject, Qt, QThread, pyqtSignal
+from PyQt6.QtGui import QImage, QPixmap
+
+from ..core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+def _scale(image, zoom):
+    return image.scaled(
+        max(1, int(image.width() * zoom)),
+        max(1, int(image.height() * zoom)),
+        Qt.AspectRatioMode.KeepAspectRatio,
+        Qt.TransformationMode.SmoothTransformation,
+    )
+
+
+class _Ghost:
+    """One prepared neighbour: the unscaled source (for later rescales, when
+    it is a ``QImage``) and the scaled pixmap drawn at ``zoom``."""
+
+    __slots__ = ("image", "scaled", "zoom")
+
+    def __init__(self, image, scaled, zoom):
+        self.image = image
+        self.scaled = scaled
+        self.zoom = zoom
+
+
+class _PrepareThread(QThread):
+    """Extract (when needed) and scale one batch of ghosts.
+
+    ``jobs`` is ``[(key, source), ...]`` where ``source`` is a ``QImage`` or a
+    zero-argument callable returning one (or ``None``).
+    """
+
+    prepared = pyqtSignal(int, float, list)
+
+    def __init__(self, generation, jobs, zoom):
+        super().__init__()
+        self.generation = generation
+        self.jobs = jobs
+        self.zoom = zoom
+
+    def run(self):
+        results = []
+        for key, source in self.jobs:
+            if self.isInterruptionRequested():
+                return
+            try:
+                image = source() if callable(source) else source
+            except Exception:
+                logger.exception("Onion ghost %s could not be extracted", key)
+                continue
+            if image is None or image.isNull():
+                continue  # first/last slice, or a failed decode: no ghost
+            results.append((key, image, _scale(image, self.zoom)))
+        if not self.isInterruptionRequested():
+            self.prepared.emit(self.generation, self.zoom, results)
+
+
+class OnionGhostPreparer(QObject):
+    """Prepares image ghosts for one ``ImageLabel`` on worker threads."""
+
+    def __init__(self, label, parent=None):
+        super().__init__(parent)
+        self.label = label
+        self._ghosts = {}
+        self._sources = {}
+        self._wanted = []
+        self._previous = None
+        self._generation = 0
+        self._threads = set()
+
+    # --- requests from the controller ---------------------------------------
+
+    def remember(self, key, image, scaled, zoom):
+        """Record the slice now on screen, so a step that makes it a ghost
+        reuses it. ``image`` may be ``None`` (a rescale then re-extracts)."""
+        if key is None or scaled is None or scaled.isNull():
+            self._previous = None
+            return
+        source = image if isinstance(image, QImage) and not image.isNull() else None
+        self._previous = (key, _Ghost(source, scaled, zoom))
+
+    def show(self, sources):
+        """Ghost ``sources`` -- ``[(key, source), ...]`` in draw order, with
+        ``source`` as for :class:`_PrepareThread` -- at the label's zoom.
+
+        Ghosts already prepared are put on the label at once; the rest follow
+        when the worker delivers them.
+        """
+        self._wanted = [key for key, _ in sources]
+        self._sources = dict(sources)
+        ghosts = {key: self._ghosts[key] for key in self._wanted if key in self._ghosts}
+        if self._previous is not None:
+            key, ghost = self._previous
+            if key in self._sources and key not in ghosts:
+                ghosts[key] = ghost
+        self._ghosts = ghosts
+        self._apply()
+        self._prepare(self.label.zoom_factor)
+
+    def rescale(self, zoom):
+        """Re-prepare every wanted ghost for ``zoom`` (label callback)."""
+        if self._wanted:
+            self._prepare(zoom)
+
+    def clear(self):
+        """Drop every ghost and ignore whatever is still in flight."""
+        self._generation += 1
+        self._wanted = []
+        self._sources = {}
+        self._ghosts = {}
+        self._interrupt()
+
+    def wait(self, msecs=5000):
+        """Block until every worker has finished (tests, shutdown)."""
+        for thread in list(self._threads):
+            thread.wait(msecs)
+
+    # --- internals ------------------------------------------------------------
+
+    def _prepare(self, zoom):
+        jobs = []
+        for key in self._wanted:
+            ghost = self._ghosts.get(key)
+            if ghost is not None and ghost.zoom == zoom:
+                continue
+            if ghost is not None and ghost.image is not None:
+                jobs.append((key, ghost.image))
+            else:
+                jobs.append((key, self._sources[key]))
+        if not jobs:
+            return
+        self._generation += 1
+        self._interrupt()
+        thread = _PrepareThread(self._generation, jobs, zoom)
+        thread.prepared.connect(self._on_prepared)
+        thread.finished.connect(lambda t=thread: self._on_finished(t))
+        self._threads.add(thread)
+        thread.start()
+
+    def _interrupt(self):
+        for thread in self._threads:
+            thread.requestInterruption()
+
+    def _on_finished(self, thread):
+        self._threads.discard(thread)
+        thread.deleteLater()
+
+    def _on_prepared(self, generation, zoom, results):
+        if generation != self._generation:
+            return  # superseded by a later step or zoom
+        for key, image, scaled in results:
+            if key in self._sources:
+                self._ghosts[key] = _Ghost(image, QPixmap.fromImage(scaled), zoom)
+        self._apply()
+        self.label.update()
+
+    def _apply(self):
+        layers = [
+            (self._ghosts[key].scaled, self._ghosts[key].zoom)
+            for key in self._wanted
+            if key in self._ghosts
+        ]
+        self.label.set_prepared_onion_pixmaps(layers, self.rescale)
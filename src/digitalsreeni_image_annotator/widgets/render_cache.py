@@ -0,0 +1,125 @@
+"""Paint-side geometry cache for CanvasRenderer.
+
+``draw_annotations`` used to turn every flat ``[x0, y0, ...]`` segmentation
+into a fresh Python list of ``QPointF`` and a ``QPolygonF`` on every repaint --
+a Python loop over every vertex of every annotation, during every pan step.
+This cache builds each polygon once, and at low zoom hands back a Douglas-
+Peucker simplified variant (``core/polygon_lod``) instead of the full outline.
+
+**Keyed on the segmentation list itself.** An entry holds a reference to the
+list it was built from and is valid while ``annotation["segmentation"]`` is
+still *that* list with the same length. Every edit path in the app (Detail %,
+handle resize/move, vertex insert/remove, clamp, undo restore, QC repair)
+assigns a new list rather than mutating the old one, so an edit invalidates
+its entry simply by happening. The one in-place mutation -- dragging a vertex
+in vertex-edit mode -- is excluded by the renderer, which never routes the
+polygon being edited through here.
+
+Holding the reference is also what makes ``id()`` a safe key: the list cannot
+be freed, and its id reused, while its entry exists.
+
+**Render-only.** Nothing here is written back to an annotation (see
+``core/polygon_lod``).
+"""
+
+from PyQt6.QtCore import QPointF
+from PyQt6.QtGui import QPolygonF
+
+from ..core import polygon_lod
+
+# An entry not drawn in this many consecutive passes is dropped at the next
+# sweep -- long enough to survive a class being toggled off and on, short
+# enough that switching images does not keep the previous image's polygons.
+_KEEP_PASSES = 3
+
+
+def _to_qpolygon(flat):
+    return QPolygonF([
+        QPointF(float(x), float(y)) for x, y in zip(flat[0::2], flat[1::2])
+    ])
+
+
+class _Entry:
+    __slots__ = ("source", "length", "polygons", "centroid", "generation")
+
+    def __init__(self, source, generation):
+        self.source = source
+        self.length = len(source)
+        # level -> QPolygonF, filled lazily: most annotations are only ever
+        # seen at one or two zoom levels.
+        self.polygons = {}
+        self.centroid = None
+        self.generation = generation
+
+
+class RenderGeometryCache:
+    """``QPolygonF`` per segmentation ring, per LOD level, plus the ring's
+    label anchor."""
+
+    def __init__(self):
+        self._entries = {}
+        self._generation = 0
+        self._touched = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def begin_pass(self):
+        """Mark the start of a paint pass, sweeping stale entries when the
+        cache holds well over what the last pass drew.
+
+        The sweep walks every entry, so it is rationed: a steady-state repaint
+        of the same image never pays for it, and the cache stays within about
+        twice the working set.
+        """
+        if len(self._entries) > 2 * self._touched + 256:
+            cutoff = self._generation + 1 - _KEEP_PASSES
+            self._entries = {
+                key: entry for key, entry in self._entries.items()
+                if entry.generation >= cutoff
+            }
+        self._generation += 1
+        self._touched = 0
+
+    def clear(self):
+        self._entries.clear()
+
+    def polygon(self, flat, zoom_factor):
+        """The ``QPolygonF`` to draw for ring ``flat`` at ``zoom_factor``."""
+        return self.polygon_at_level(flat, polygon_lod.level_for_zoom(zoom_factor))
+
+    def polygon_at_level(self, flat, level):
+        if level >= 0 and len(flat) < 2 * polygon_lod.MIN_VERTICES:
+            level = polygon_lod.RAW_LEVEL  # never simplified; one variant is enough
+        entry = self._entry(flat)
+        polygon = entry.polygons.get(level)
+        if polygon is None:
+            polygon = entry.polygons[level] = _to_qpolygon(
+                polygon_lod.simplify_ring(flat, level)
+            )
+        return polygon
+
+    def centroid(self, flat):
+        """Vertex mean of ring ``flat`` as a ``QPointF`` (``None`` if empty).
+
+        Always of the stored vertices, never a simplified variant, so a label
+        does not hop as the zoom crosses a level boundary.
+        """
+        entry = self._entry(flat)
+        if entry.centroid is None:
+            n = len(flat) // 2
+            if n == 0:
+                return None
+            entry.centroid = QPointF(
+                float(sum(flat[0:2 * n:2])) / n, float(sum(flat[1:2 * n:2])) / n
+            )
+        return entry.centroid
+
+    def _entry(self, flat):
+        self._touched += 1
+        entry = self._entries.get(id(flat))
+        if entry is None or entry.source is not flat or entry.length != len(flat):
+            entry = self._entries[id(flat)] = _Entry(flat, self._generation)
+        else:
+            entry.generation = self._generation
+        return entry
@@ -0,0 +1,409 @@
+"""Headless performance benchmarks over synthetic dense projects.
+
+NOT collected by pytest (no ``test_`` prefix); ``test_benchmark_smoke.py`` runs
+every case once at toy size so the suite cannot rot between uses. Run it by
+hand, on two commits, and compare the reports::
+
+    QT_QPA_PLATFORM=offscreen python -m tests.benchmarks.run_benchmarks \\
+        --images 20 --polygons 500 --vertices 64 --output before.json
+    git checkout my-branch
+    QT_QPA_PLATFORM=offscreen python -m tests.benchmarks.run_benchmarks \\
+        --images 20 --polygons 500 --vertices 64 --output after.json \\
+        --compare before.json
+
+``tests/unit/test_canvas_renderer_contract.py`` pins what the canvas draws;
+this pins how long it takes. Each case times one operation the way the app
+performs it, against a project built by ``tests/benchmarks/synthetic.py``:
+
+* ``render`` / ``render_zoomed_out`` -- ``CanvasRenderer.draw_annotations`` into
+  an offscreen ``QImage`` at zoom 1.0 and at 0.1 (a whole-slide overview).
+* ``paint_event`` -- the full ``ImageLabel.paintEvent``, every layer.
+* ``hit_test`` -- ``ImageLabel.annotation_at`` at random points.
+* ``serialise`` -- building and JSON-encoding the ``.iap`` document, which is
+  what every autosave pays.
+* ``export_coco`` / ``export_yolo`` -- the exporters, into a temp directory.
+* ``qc_audit`` -- ``annotation_qc.run_audit`` over the whole project.
+* ``slice_cache_cold`` / ``slice_cache_hot`` -- a full pass over a lazy stack
+  through the shared LRU, then repeated hits on one slice.
+
+Timings are wall clock (``time.perf_counter``) after one untimed warm-up run.
+The report is JSON: environment, parameters, and per case the min / median /
+mean / stdev over ``--repeat`` runs. Compare **min** across commits -- it is the
+figure least disturbed by whatever else the machine was doing.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from tests.benchmarks import synthetic
+from tests.canvas_fixtures import FakeCanvasContext
+
+REPORT_VERSION = 1
+
+# name -> (setup(workload) -> callable). Registered with @case below, in the
+# order a report lists them.
+CASES = {}
+
+
+def case(name):
+    def register(setup):
+        CASES[name] = setup
+        return setup
+    return register
+
+
+class Workload:
+    """Everything a case needs, built once per run and shared by every case.
+
+    The label and the image files are created lazily: ``--only qc_audit``
+    should not pay for a widget or write a directory of PNGs.
+    """
+
+    def __init__(self, args, workdir):
+        self.args = args
+        self.workdir = workdir
+        self.data = synthetic.project(
+            args.images, args.polygons, args.vertices,
+            width=args.width, height=args.height, seed=args.seed,
+        )
+        self._label = None
+        self._image_paths = None
+
+    @property
+    def first_image(self):
+        return next(iter(self.data["all_annotations"]))
+
+    def label(self):
+        """A model-less ImageLabel showing the first synthetic image."""
+        if self._label is None:
+            from PyQt6.QtGui import QColor, QPixmap
+            from PyQt6.QtWidgets import QApplication
+
+            from src.digitalsreeni_image_annotator.widgets.image_label import ImageLabel
+
+            self._app = QApplication.instance() or QApplication([])
+            label = ImageLabel(None)
+            pixmap = QPixmap(self.args.width, self.args.height)
+            pixmap.fill(QColor("#404040"))
+            label.setPixmap(pixmap)
+            label.set_context(FakeCanvasContext(classes=tuple(self.data["class_mapping"])))
+            label.class_colors = {
+                name: QColor.fromHsv((i * 97) % 360, 200, 230)
+                for i, name in enumerate(self.data["class_mapping"])
+            }
+            label.annotations = self.data["all_annotations"][self.first_image]
+            label.offset_x = 0
+            label.offset_y = 0
+            self._label = label
+        return self._label
+
+    def image_paths(self):
+        """Solid-colour PNGs of the declared size: the exporters copy images
+        and read their headers, so the files have to exist. One colour
+        compresses to a few KB at any size, so writing them is cheap."""
+        if self._image_paths is None:
+            from PIL import Image
+
+            directory = os.path.join(self.workdir, "images")
+            os.makedirs(directory, exist_ok=True)
+            blank = Image.new("RGB", (self.args.width, self.args.height), (64, 64, 64))
+            self._image_paths = {}
+            for name in self.data["all_annotations"]:
+                path = os.path.join(directory, name)
+                blank.save(path)
+                self._image_paths[name] = path
+        return self._image_paths
+
+
+# --- cases -----------------------------------------------------------------
+
+
+def _render_at(workload, zoom):
+    from PyQt6.QtGui import QImage, QPainter
+
+    label = workload.label()
+    width = max(1, int(workload.args.width * zoom))
+    height = max(1, int(workload.args.height * zoom))
+    target = QImage(width, height, QImage.Format.Format_ARGB32_Premultiplied)
+
+    def run():
+        label.zoom_factor = zoom
+        target.fill(0)
+        painter = QPainter(target)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        label.renderer.draw_annotations(painter)
+        painter.end()
+
+    return run
+
+
+@case("render")
+def _render(workload):
+    return _render_at(workload, 1.0)
+
+
+@case("render_zoomed_out")
+def _render_zoomed_out(workload):
+    return _render_at(workload, 0.1)
+
+
+@case("paint_event")
+def _paint_event(workload):
+    from PyQt6.QtGui import QImage
+
+    label = workload.label()
+    label.set_zoom(1.0)
+    label.resize(workload.args.width, workload.args.height)
+    target = QImage(label.size(), QImage.Format.Format_ARGB32_Premultiplied)
+
+    def run():
+        label.render(target)
+
+    return run
+
+
+@case("hit_test")
+def _hit_test(workload):
+    label = workload.label()
+    rng = random.Random(workload.args.seed)
+    points = [
+        (rng.uniform(0, workload.args.width), rng.uniform(0, workload.args.height))
+        for _ in range(workload.args.picks)
+    ]
+
+    def run():
+        for point in points:
+            label.annotation_at(point)
+
+    return run
+
+
+@case("serialise")
+def _serialise(workload):
+    from src.digitalsreeni_image_annotator.core import image_utils
+
+    def run():
+        document = synthetic.iap_document(workload.data)
+        json.dumps(image_utils.convert_to_serializable(document), indent=2)
+
+    return run
+
+
+def _export(workload, exporter, **kwargs):
+    data = workload.data
+    paths = workload.image_paths()
+
+    def run():
+        out_dir = tempfile.mkdtemp(dir=workload.workdir)
+        try:
+            exporter(data["all_annotations"], data["class_mapping"], paths, [], {},
+                     out_dir, **kwargs)
+        finally:
+            shutil.rmtree(out_dir, ignore_errors=True)
+
+    return run
+
+
+@case("export_coco")
+def _export_coco(workload):
+    from src.digitalsreeni_image_annotator.io import export_formats
+
+    return _export(workload, export_formats.export_coco_json)
+
+
+@case("export_yolo")
+def _export_yolo(workload):
+    from src.digitalsreeni_image_annotator.io import export_formats
+
+    return _export(workload, export_formats.export_yolo_v5plus, val_split=0.2)
+
+
+@case("qc_audit")
+def _qc_audit(workload):
+    from src.digitalsreeni_image_annotator.core import annotation_qc
+
+    data = workload.data
+
+    def run():
+        annotation_qc.run_audit(data["all_annotations"], data["image_sizes"])
+
+    return run
+
+
+def _lazy_stack(workload):
+    from PyQt6.QtWidgets import QApplication
+
+    from src.digitalsreeni_image_annotator.core.slice_cache import (
+        LazySliceList,
+        SliceProvider,
+    )
+
+    workload._app = QApplication.instance() or QApplication([])
+    shape = tuple(workload.args.stack) + (workload.args.stack_size, workload.args.stack_size)
+    dims = ("T", "Z", "C", "S")[: len(workload.args.stack)] + ("H", "W")
+    return LazySliceList(SliceProvider(synthetic.stack(shape, dims), dims, "stack"))
+
+
+@case("slice_cache_cold")
+def _slice_cache_cold(workload):
+    lazy = _lazy_stack(workload)
+
+    def run():
+        lazy.release()
+        for _name, _qimage in lazy:
+            pass
+
+    return run
+
+
+@case("slice_cache_hot")
+def _slice_cache_hot(workload):
+    lazy = _lazy_stack(workload)
+    name = lazy.names[0]
+
+    def run():
+        for _ in range(1000):
+            lazy.get(name)
+
+    return run
+
+
+# --- running and reporting -------------------------------------------------
+
+
+def _git_commit():
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+            timeout=10,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() or None
+
+
+def time_case(run, repeat):
+    """Seconds per run, ``repeat`` times, after one untimed warm-up."""
+    run()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def summarise(samples):
+    return {
+        "repeat": len(samples),
+        "min_s": min(samples),
+        "median_s": statistics.median(samples),
+        "mean_s": statistics.fmean(samples),
+        "stdev_s": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+    }
+
+
+def run_suite(args):
+    names = list(CASES) if not args.only else args.only
+    unknown = [n for n in names if n not in CASES]
+    if unknown:
+        raise SystemExit(f"unknown case(s): {', '.join(unknown)}; have {', '.join(CASES)}")
+
+    results = {}
+    workdir = tempfile.mkdtemp(prefix="sreeni-bench-")
+    try:
+        workload = Workload(args, workdir)
+        for name in names:
+            run = CASES[name](workload)
+            results[name] = summarise(time_case(run, args.repeat))
+            print(f"{name:<20} min {results[name]['min_s'] * 1000:10.2f} ms", file=sys.stderr)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    return {
+        "version": REPORT_VERSION,
+        "created": datetime.now(timezone.utc).isoformat(),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": {
+            "images": args.images, "polygons": args.polygons, "vertices": args.vertices,
+            "width": args.width, "height": args.height, "seed": args.seed,
+            "picks": args.picks, "stack": list(args.stack), "stack_size": args.stack_size,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+
+
+def compare(report, baseline):
+    """``[(case, baseline_min, current_min, ratio)]`` for cases in both.
+
+    ``ratio`` > 1 is slower than the baseline. Parameters must match: timing a
+    different workload is not a regression, and reporting it as one would be.
+    """
+    if report["params"] != baseline.get("params"):
+        raise ValueError("benchmark parameters differ from the baseline's")
+    rows = []
+    for name, result in report["results"].items():
+        before = baseline.get("results", {}).get(name)
+        if before is None:
+            continue
+        ratio = result["min_s"] / before["min_s"] if before["min_s"] else float("inf")
+        rows.append((name, before["min_s"], result["min_s"], ratio))
+    return rows
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--images", type=int, default=10)
+    parser.add_argument("--polygons", type=int, default=300, help="per image")
+    parser.add_argument("--vertices", type=int, default=48, help="per polygon")
+    parser.add_argument("--width", type=int, default=2048)
+    parser.add_argument("--height", type=int, default=2048)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--picks", type=int, default=200, help="hit-test points per run")
+    parser.add_argument(
+        "--stack", type=int, nargs="+", default=[4, 16],
+        help="non-spatial stack dimensions, e.g. 4 16 for T=4 x Z=16",
+    )
+    parser.add_argument("--stack-size", type=int, default=512, help="stack H and W")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", nargs="+", metavar="CASE", help=f"subset of: {' '.join(CASES)}")
+    parser.add_argument("--output", help="write the JSON report here (default: stdout)")
+    parser.add_argument("--compare", metavar="BASELINE", help="a previous report to compare to")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    report = run_suite(args)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        for name, before, after, ratio in compare(report, baseline):
+            print(
+                f"{name:<20} {before * 1000:10.2f} ms -> {after * 1000:10.2f} ms  x{ratio:.2f}",
+                file=sys.stderr,
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
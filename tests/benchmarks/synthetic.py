@@ -0,0 +1,128 @@
+"""Synthetic dense projects for the benchmark suite.
+
+Everything here is deterministic for a given seed, so two runs of the suite on
+two commits time exactly the same data. Shapes are star-convex rings (a circle
+with radial jitter), which keeps them simple polygons at any vertex count: a
+self-intersecting generator would send QC down its repair-suggestion path and
+time something other than the common case.
+
+Qt-free, like the code it feeds. The stack generator returns a NumPy array;
+wrapping it in a ``SliceProvider`` is the runner's job.
+"""
+
+import math
+import random
+
+import numpy as np
+
+DEFAULT_CLASSES = ("cell", "nucleus", "debris")
+
+
+def ring(cx, cy, radius, vertices, rng, jitter=0.25):
+    """A flat ``[x0, y0, x1, y1, ...]`` star-convex polygon around (cx, cy)."""
+    coords = []
+    for i in range(vertices):
+        angle = 2.0 * math.pi * i / vertices
+        r = radius * (1.0 + jitter * (rng.random() - 0.5))
+        coords.append(round(cx + r * math.cos(angle), 2))
+        coords.append(round(cy + r * math.sin(angle), 2))
+    return coords
+
+
+def _bbox(coords):
+    xs, ys = coords[0::2], coords[1::2]
+    return [min(xs), min(ys), max(xs) - min(xs), max(ys) - min(ys)]
+
+
+def _area(coords):
+    xs, ys = coords[0::2], coords[1::2]
+    n = len(xs)
+    return abs(sum(xs[i] * ys[(i + 1) % n] - xs[(i + 1) % n] * ys[i] for i in range(n))) / 2.0
+
+
+def image_annotations(polygons, vertices, width, height, rng, classes=DEFAULT_CLASSES,
+                      duplicate_fraction=0.02):
+    """One image's ``{class_name: [annotation, ...]}`` with ``polygons`` shapes.
+
+    Radii shrink as the density grows so a dense image looks like a dense
+    microscopy field (many small, partly overlapping cells) rather than a pile
+    of full-image blobs. ``duplicate_fraction`` of the shapes are near copies
+    of an earlier one, so the redundancy rule has real work to find.
+    """
+    per_class = {name: [] for name in classes}
+    radius = max(3.0, 0.6 * math.sqrt(width * height / max(1, polygons)))
+    made = []
+    for index in range(polygons):
+        class_name = classes[index % len(classes)]
+        if made and rng.random() < duplicate_fraction:
+            source = rng.choice(made)
+            coords = [c + rng.uniform(-0.5, 0.5) for c in source]
+        else:
+            cx = rng.uniform(radius, max(radius + 1, width - radius))
+            cy = rng.uniform(radius, max(radius + 1, height - radius))
+            coords = ring(cx, cy, radius * rng.uniform(0.5, 1.0), vertices, rng)
+        made.append(coords)
+        per_class[class_name].append({
+            "segmentation": coords,
+            "category_id": classes.index(class_name) + 1,
+            "category_name": class_name,
+            "number": len(per_class[class_name]) + 1,
+            "bbox": _bbox(coords),
+            "area": _area(coords),
+        })
+    return {name: anns for name, anns in per_class.items() if anns}
+
+
+def project(images, polygons, vertices, width=1024, height=1024, seed=0,
+            classes=DEFAULT_CLASSES):
+    """A whole project in the shapes the app and the exporters use.
+
+    Returns ``{"all_annotations", "class_mapping", "image_sizes", "images"}``:
+    the same names the main window (and ``core.project_io.LoadedProject``)
+    uses, so any function written against those takes the fields unchanged.
+    """
+    rng = random.Random(seed)
+    all_annotations = {}
+    image_sizes = {}
+    images_info = []
+    for i in range(images):
+        name = f"synthetic_{i:05d}.png"
+        all_annotations[name] = image_annotations(
+            polygons, vertices, width, height, rng, classes
+        )
+        image_sizes[name] = (width, height)
+        images_info.append({
+            "file_name": name, "width": width, "height": height,
+            "is_multi_slice": False,
+        })
+    return {
+        "all_annotations": all_annotations,
+        "class_mapping": {name: i + 1 for i, name in enumerate(classes)},
+        "image_sizes": image_sizes,
+        "images": images_info,
+    }
+
+
+def iap_document(data):
+    """The ``.iap`` JSON document :func:`project` corresponds to -- what an
+    autosave writes, minus the fields that need a live window."""
+    return {
+        "classes": [{"name": name, "color": "#1f77b4"} for name in data["class_mapping"]],
+        "images": [
+            {**info, "annotations": data["all_annotations"][info["file_name"]]}
+            for info in data["images"]
+        ],
+        "image_paths": {},
+        "notes": "",
+    }
+
+
+def stack(shape, dimensions, seed=0, dtype=np.uint16):
+    """A random multi-dimensional stack, e.g. ``shape=(4, 16, 512, 512)`` with
+    ``dimensions=("T", "Z", "H", "W")``."""
+    if len(shape) != len(dimensions):
+        raise ValueError("shape and dimensions must have the same length")
+    rng = np.random.default_rng(seed)
+    info = np.iinfo(dtype) if np.issubdtype(dtype, np.integer) else None
+    high = info.max if info is not None else 1.0
+    return rng.integers(0, high, size=shape, dtype=dtype, endpoint=True)
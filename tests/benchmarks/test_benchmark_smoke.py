@@ -0,0 +1,53 @@
+"""Keep the benchmark suite runnable.
+
+A benchmark nobody has run since the code under it changed fails the one time
+someone needs it. Every case runs once here at toy size -- this checks that the
+suite still *works*, not how fast anything is.
+"""
+
+import json
+
+import pytest
+
+from tests.benchmarks import run_benchmarks, synthetic
+
+TOY = [
+    "--images", "2", "--polygons", "12", "--vertices", "8",
+    "--width", "64", "--height", "64", "--picks", "5",
+    "--stack", "2", "--stack-size", "16", "--repeat", "1",
+]
+
+
+def test_synthetic_project_is_deterministic_and_well_formed():
+    first = synthetic.project(2, 10, 16, width=100, height=100, seed=3)
+    again = synthetic.project(2, 10, 16, width=100, height=100, seed=3)
+    assert first == again
+    annotations = [
+        ann for per_class in first["all_annotations"].values()
+        for anns in per_class.values() for ann in anns
+    ]
+    assert len(annotations) == 20
+    assert all(len(ann["segmentation"]) == 32 for ann in annotations)
+    assert all(ann["category_name"] in first["class_mapping"] for ann in annotations)
+
+
+def test_every_case_runs_and_the_report_is_json(qtbot, tmp_path):
+    output = tmp_path / "report.json"
+    assert run_benchmarks.main(TOY + ["--output", str(output)]) == 0
+    report = json.loads(output.read_text())
+    assert set(report["results"]) == set(run_benchmarks.CASES)
+    for result in report["results"].values():
+        assert result["repeat"] == 1
+        assert result["min_s"] >= 0
+
+
+def test_compare_refuses_a_different_workload():
+    report = {"params": {"images": 1}, "results": {}}
+    with pytest.raises(ValueError):
+        run_benchmarks.compare(report, {"params": {"images": 2}, "results": {}})
+
+
+def test_compare_reports_the_ratio_of_minimums():
+    baseline = {"params": {}, "results": {"render": {"min_s": 2.0}}}
+    report = {"params": {}, "results": {"render": {"min_s": 1.0}, "new": {"min_s": 1.0}}}
+    assert run_benchmarks.compare(report, baseline) == [("render", 2.0, 1.0, 0.5)]
@@ -22,7 +22,7 @@ tests that use them.
 """
 
 from PyQt6.QtCore import Qt
-from PyQt6.QtGui import QColor, QPixmap
+from PyQt6.QtGui import QColor, QPixmap, QStaticText
 
 
 class FakeCanvasContext:
@@ -136,11 +136,14 @@ class RecordingPainter:
         return [name for name, _ in self.calls]
 
     def texts(self):
-        """Every string passed to ``drawText`` (the annotation labels)."""
+        """Every string drawn with ``drawText`` or ``drawStaticText`` (the
+        annotation labels), in call order."""
         out = []
         for name, args in self.calls:
             if name == "drawText":
                 out.extend(a for a in args if isinstance(a, str))
+            elif name == "drawStaticText":
+                out.extend(a.text() for a in args if isinstance(a, QStaticText))
         return out
 
     def count(self, name):
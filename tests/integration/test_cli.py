@@ -218,6 +218,19 @@ def test_validate_writes_a_json_report_matching_the_findings(
     assert all({"rule", "severity", "message"} <= set(f) for f in payload["findings"])
 
 
+def test_validate_with_a_cache_reports_the_same_findings(broken_project, tmp_path, capsys):
+    cache = tmp_path / "ci" / "qc.jsonl"
+    cache.parent.mkdir()
+    args = ["validate", "--project", str(broken_project), "--jobs", "2",
+            "--cache", str(cache)]
+
+    assert main(args) == EXIT_FINDINGS
+    first = capsys.readouterr()
+    assert cache.exists()
+    assert main(args) == EXIT_FINDINGS
+    assert capsys.readouterr() == first
+
+
 def test_validate_reports_a_missing_project_rather_than_crashing(tmp_path):
     assert main(["validate", "--project", str(tmp_path / "nope.iap")]) == EXIT_ERROR
 
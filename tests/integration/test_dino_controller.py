@@ -7,8 +7,9 @@ These build one real ImageAnnotator (offscreen) and drive
 ``window.dino_controller`` directly.
 
 Only the inference boundary (``dino_utils.detect`` /
-``sam_utils.apply_sam_predictions_batch``) and the modal ``QMessageBox``
-statics are mocked -- no model weights, no network, no worker threads.
+``sam_utils.apply_sam_predictions_batch``, and their batch-worker twins
+``detect_many_blocking`` / ``predict_boxes_blocking``) and the modal
+``QMessageBox`` statics are mocked -- no model weights, no network.
 Annotation dicts, ``dino_batch_results``, ``temp_annotations`` and the class
 mapping are all real state.
 """
@@ -74,6 +75,19 @@ def dino_ready(window, monkeypatch):
         lambda img, boxes: [{"segmentation": [1.0, 1.0, 10.0, 1.0, 10.0, 10.0]}
                             for _ in boxes],
     )
+    monkeypatch.setattr(
+        window.dino_utils, "detect_many_blocking",
+        lambda arrays, configs, **k: [
+            [[{"class_name": cfg["name"], "score": 0.9, "bbox": [1, 1, 10, 10]}]
+             for cfg in configs]
+            for _ in arrays
+        ],
+    )
+    monkeypatch.setattr(
+        window.sam_utils, "predict_boxes_blocking",
+        lambda image_np, boxes: [{"segmentation": [1.0, 1.0, 10.0, 1.0, 10.0, 10.0]}
+                                 for _ in boxes],
+    )
     return window
 
 
@@ -433,11 +447,13 @@ def test_collect_batch_work_items_flattens_slices_and_skips(window, tmp_path):
         # "empty" absent -> no materialised slices
     }
 
-    items = c._collect_dino_batch_work_items()
+    items, readers = c._collect_dino_batch_work_items()
 
     names = [n for n, _ in items]
     assert names == ["reg1.png", "stack_T0_Z0", "stack_T0_Z1"]
-    assert all(isinstance(img, QImage) for _, img in items)
+    assert readers == []
+    # Nothing is decoded until the batch worker runs the loaders.
+    assert [load().shape for _, load in items] == [(8, 8, 3)] * 3
 
 
 # --- batch detection -------------------------------------------------------
@@ -479,6 +495,221 @@ def test_batch_auto_accept_commits_including_slices(dino_ready, tmp_path):
     assert "cell" in window.all_annotations.get("stack_T0_Z0", {})
 
 
+def test_a_cancelled_batch_resumes_where_it_stopped(dino_ready, monkeypatch, tmp_path):
+    import digitalsreeni_image_annotator.controllers.dino_controller as dc
+
+    window = dino_ready
+    c = window.dino_controller
+    names = _seed_batch(window, tmp_path)
+    window.dino_batch_mode.setCurrentText("Review before accepting")
+    monkeypatch.setattr(c, "_show_dino_batch_review", lambda: None)
+    detected = []
+    detect_many = window.dino_utils.detect_many_blocking
+
+    def _counting(arrays, *a, **k):
+        detected.append(len(arrays))
+        return detect_many(arrays, *a, **k)
+
+    monkeypatch.setattr(window.dino_utils, "detect_many_blocking", _counting)
+
+    class _CancelAfterOne(dc.BatchDetectionWorker):
+        def __init__(self, items, detect, **kwargs):
+            def detect_then_cancel(arrays):
+                self.cancel()
+                return detect(arrays)
+
+            super().__init__(items, detect_then_cancel, batch_size=1, **kwargs)
+
+    worker_class = dc.BatchDetectionWorker
+    monkeypatch.setattr(dc, "BatchDetectionWorker", _CancelAfterOne)
+    c.run_dino_detection_batch()
+    # Detected, then cancelled before it reached the GUI: journalled, not shown.
+    assert window.dino_batch_results == {}
+
+    monkeypatch.setattr(dc, "BatchDetectionWorker", worker_class)  # same batch again
+    c.run_dino_detection_batch()
+
+    assert detected == [1, 1], "the finished image was detected again"
+    assert set(window.dino_batch_results) == set(names[1:])
+    c.review_detection_journal()  # where the cancelled image's results are
+    assert set(window.dino_batch_results) == set(names)
+
+
+def test_an_item_delivered_after_cancel_is_not_committed(dino_ready, tmp_path):
+    from PyQt6.QtWidgets import QProgressDialog
+
+    import digitalsreeni_image_annotator.controllers.dino_controller as dc
+
+    window = dino_ready
+    c = window.dino_controller
+    _seed_batch(window, tmp_path)
+    worker = dc.BatchDetectionWorker([], lambda batch: [])
+    progress = QProgressDialog()
+    run = c._batch_run = dc._BatchRun(True, progress, worker)
+    detection = {"class_name": "cell", "score": 0.9, "bbox": [1, 1, 10, 10]}
+    sam = [{"segmentation": [1.0, 1.0, 10.0, 1.0, 10.0, 10.0, 1.0, 10.0]}]
+    try:
+        c._on_batch_item("reg1.png", ([detection], sam))
+        assert run.committed == 1
+
+        worker.cancel()
+        c._on_batch_item("stack_T0_Z0", ([detection], sam))  # the batch in flight
+    finally:
+        c._batch_run = None
+        progress.close()
+
+    assert "cell" in window.all_annotations["reg1.png"]
+    assert "stack_T0_Z0" not in window.all_annotations
+    assert run.committed == 1
+
+
+def test_a_box_sam_returned_no_mask_for_is_journalled_as_an_error(
+    dino_ready, monkeypatch, tmp_path
+):
+    window = dino_ready
+    c = window.dino_controller
+    _seed_batch(window, tmp_path)
+    window.dino_batch_mode.setCurrentText("Review before accepting")
+    monkeypatch.setattr(c, "_show_dino_batch_review", lambda: None)
+    monkeypatch.setattr(
+        window.dino_utils, "detect_many_blocking",
+        lambda arrays, configs, **k: [
+            [[{"class_name": "cell", "score": 0.9, "bbox": [1, 1, 10, 10]},
+              {"class_name": "cell", "score": 0.8, "bbox": [30, 30, 40, 40]}]]
+            for _ in arrays
+        ],
+    )
+    monkeypatch.setattr(
+        window.sam_utils, "predict_boxes_blocking",
+        lambda image_np, boxes: [
+            {"segmentation": [1.0, 1.0, 10.0, 1.0, 10.0, 10.0]},
+            {"error": "No mask generated."},
+        ],
+    )
+
+    c.run_dino_detection_batch()
+
+    journal = c._detection_journal()
+    job = c._batch_job(c._build_dino_class_configs())
+    (per_class,) = journal.pending(job.model_key, job.class_keys)["reg1.png"]
+    assert [("error" in d) for d in per_class] == [False, True]
+    assert len(window.dino_batch_results["reg1.png"]) == 1
+
+
+def test_sam_results_that_do_not_match_the_boxes_are_not_recorded(
+    dino_ready, monkeypatch, tmp_path
+):
+    # One result for two boxes cannot say which box it belongs to: the image
+    # fails and is detected again on the next run.
+    window = dino_ready
+    c = window.dino_controller
+    _seed_batch(window, tmp_path)
+    window.dino_batch_mode.setCurrentText("Review before accepting")
+    monkeypatch.setattr(c, "_show_dino_batch_review", lambda: None)
+    monkeypatch.setattr(
+        window.dino_utils, "detect_many_blocking",
+        lambda arrays, configs, **k: [
+            [[{"class_name": "cell", "score": 0.9, "bbox": [1, 1, 10, 10]},
+              {"class_name": "cell", "score": 0.8, "bbox": [30, 30, 40, 40]}]]
+            for _ in arrays
+        ],
+    )
+    monkeypatch.setattr(
+        window.sam_utils, "predict_boxes_blocking",
+        lambda image_np, boxes: [{"segmentation": [1.0, 1.0, 10.0, 1.0, 10.0, 10.0]}],
+    )
+
+    c.run_dino_detection_batch()
+
+    journal = c._detection_journal()
+    job = c._batch_job(c._build_dino_class_configs())
+    assert "reg1.png" not in journal.pending(job.model_key, job.class_keys)
+    assert "reg1.png" not in window.dino_batch_results
+
+
+def test_forgetting_saved_detections_detects_again(dino_ready, monkeypatch, tmp_path):
+    from PyQt6.QtWidgets import QMessageBox
+
+    window = dino_ready
+    c = window.dino_controller
+    _seed_batch(window, tmp_path)
+    window.current_project_file = str(tmp_path / "project.iap")
+    window.dino_batch_mode.setCurrentText("Review before accepting")
+    monkeypatch.setattr(c, "_show_dino_batch_review", lambda: None)
+    calls = _dino_calls(window, monkeypatch)
+    c.run_dino_detection_batch()
+
+    monkeypatch.setattr(
+        QMessageBox, "question",
+        staticmethod(lambda *a, **k: QMessageBox.StandardButton.Yes),
+    )
+    c.forget_detection_journal()
+    c.run_dino_detection_batch()
+
+    assert calls == [["cell"], ["cell"]]
+    with open(tmp_path / "project.detections.jsonl", encoding="utf-8") as f:
+        assert len(f.readlines()) == 2  # the re-run's, nothing superseded
+
+
+def _dino_calls(window, monkeypatch):
+    """Record the class names of every batch DINO call."""
+    calls = []
+    detect_many = window.dino_utils.detect_many_blocking
+
+    def _recording(arrays, configs, **k):
+        calls.append([cfg["name"] for cfg in configs])
+        return detect_many(arrays, configs, **k)
+
+    monkeypatch.setattr(window.dino_utils, "detect_many_blocking", _recording)
+    return calls
+
+
+def test_adding_a_class_detects_only_that_class(dino_ready, monkeypatch, tmp_path):
+    window = dino_ready
+    c = window.dino_controller
+    _seed_batch(window, tmp_path)
+    window.current_project_file = str(tmp_path / "project.iap")
+    window.class_mapping["nucleus"] = 2
+    window.dino_batch_mode.setCurrentText("Auto-accept all detections")
+    calls = _dino_calls(window, monkeypatch)
+    cell = {"name": "cell", "phrases": ["cell"], "box_thr": 0.3, "txt_thr": 0.25, "nms_thr": 0.5}
+    nucleus = dict(cell, name="nucleus", phrases=["nucleus"])
+
+    c.run_dino_detection_batch()
+    monkeypatch.setattr(c, "_build_dino_class_configs", lambda: [cell, nucleus])
+    c.run_dino_detection_batch()
+    c.run_dino_detection_batch()
+
+    assert calls == [["cell"], ["nucleus"]]
+    assert (tmp_path / "project.detections.jsonl").exists()
+    # The nucleus box sits exactly on the cell box: cross-class NMS against
+    # the journalled cell result keeps the new class from duplicating it.
+    assert "nucleus" not in window.all_annotations["reg1.png"]
+    assert len(window.all_annotations["reg1.png"]["cell"]) == 1
+
+
+def test_saved_detections_can_be_reviewed_in_a_later_session(
+    dino_ready, monkeypatch, tmp_path
+):
+    window = dino_ready
+    c = window.dino_controller
+    names = _seed_batch(window, tmp_path)
+    window.current_project_file = str(tmp_path / "project.iap")
+    window.dino_batch_mode.setCurrentText("Review before accepting")
+    monkeypatch.setattr(c, "_show_dino_batch_review", lambda: None)
+    c.run_dino_detection_batch()
+
+    window.dino_batch_results.clear()
+    c._journal = None  # what reopening the project amounts to
+    calls = _dino_calls(window, monkeypatch)
+    c.review_detection_journal()
+
+    assert calls == []
+    assert set(window.dino_batch_results) == set(names)
+    (result,) = window.dino_batch_results["reg1.png"]
+    assert result["segmentation"] == [1.0, 1.0, 10.0, 1.0, 10.0, 10.0]
+
+
 # --- temp re-sync on image/slice switch (the bleed-bug regression) ---------
 
 def test_refresh_dino_temp_clears_stale_masks_on_switch(window):
@@ -349,16 +349,20 @@ def test_far_slice_annotation_survives_save_reload(
 
 def test_collect_dino_batch_flattens_lazy_stack(tmp_path, window, fake_dimension_dialog):
     """DINO batch flattening yields one work item per slice of a lazily-loaded
-    stack, each a real QImage (materialised on demand)."""
+    stack, each decoded only when its loader runs -- and without the shared
+    LRU, which the batch worker may not touch."""
     path, _ = make_tiff(tmp_path, "stack3d.tif", (4, 8, 6), axes="ZYX")
     window.image_controller.load_tiff(path)
     window.all_images.append({"file_name": "stack3d.tif", "is_multi_slice": True})
+    lazy = window.image_slices["stack3d"]
+    lazy.release()
 
-    items = window.dino_controller._collect_dino_batch_work_items()
+    items, _ = window.dino_controller._collect_dino_batch_work_items()
 
     names = [n for n, _ in items]
-    assert names == window.image_slices["stack3d"].names
-    assert all(isinstance(img, QImage) for _, img in items)
+    assert names == lazy.names
+    assert all(load().shape == (8, 6, 3) for _, load in items)
+    assert get_shared_lru().count_prefix(lazy.provider_id) == 0
 
 
 def test_open_images_releases_previous_stack(
@@ -409,7 +413,7 @@ def test_deleting_stack_evicts_lru(tmp_path, window, fake_dimension_dialog, no_n
     window.all_images.append({"file_name": "stack3d.tif", "width": 6, "height": 8,
                               "id": 1, "is_multi_slice": True})
     window.image_paths["stack3d.tif"] = path
-    window.image_list.addItem("stack3d.tif")
+    window.image_list.sync()
     window.image_list.setCurrentRow(window.image_list.count() - 1)
 
     window.image_controller.delete_selected_image()
@@ -35,7 +35,7 @@ def test_annotation_commit_path_reapplies_filter(window):
     # the "never hide current row" exemption doesn't mask the assertion.
     for name in ("a.png", "b.png"):
         window.all_images.append({"file_name": name, "is_multi_slice": False})
-        window.image_list.addItem(name)
+    window.image_list.sync()
 
     window.image_filter_combo.setCurrentIndex(FILTER_WITH)
     assert window.image_list.isRowHidden(0)
@@ -62,7 +62,7 @@ def test_hiding_current_row_keeps_canvas_and_fires_no_switch(window):
     # worked-on image while its row leaves the list.
     for name in ("annot.png", "plain.png"):
         window.all_images.append({"file_name": name, "is_multi_slice": False})
-        window.image_list.addItem(name)
+    window.image_list.sync()
     window.all_annotations["annot.png"] = {
         "cell": [{"segmentation": [0, 0, 1, 0, 1, 1], "category_name": "cell"}]
     }
@@ -94,7 +94,7 @@ def test_annotation_commit_sets_status_badge(window):
     # apply_image_filter -> refresh_image_status_icons.
     for name in ("a.png", "b.png"):
         window.all_images.append({"file_name": name, "is_multi_slice": False})
-        window.image_list.addItem(name)
+    window.image_list.sync()
     window.image_controller.refresh_image_status_icons()
 
     def _icon_for(name):
@@ -144,3 +144,26 @@ def test_group_survives_save_reload_roundtrip(window, tmp_path):
 
     reloaded = next(i for i in window.all_images if i["file_name"] == "photo.png")
     assert reloaded.get("group") == "Batch A"
+
+
+def test_statistics_follow_the_annotation_commit_path(window):
+    window.all_images.append({"file_name": "a.png", "is_multi_slice": False})
+    window.image_list.sync()
+    window.image_file_name = "a.png"
+    square = [0, 0, 10, 0, 10, 10, 0, 10]
+    window.image_label.annotations = {
+        "cell": [{"segmentation": square, "category_name": "cell", "number": 1}]
+    }
+    window.image_label.annotationsBatchSaved.emit()
+
+    stats = window.image_controller.annotation_statistics()
+    assert stats.class_counts() == {"cell": 1}
+    assert stats.areas_by_class()["cell"][0][2] == 100.0
+
+    # A geometry edit keeps the counts; the statistics still see it.
+    window.image_label.annotations["cell"][0]["segmentation"] = [
+        0, 0, 20, 0, 20, 20, 0, 20
+    ]
+    window.image_label.annotationsBatchSaved.emit()
+    stats = window.image_controller.annotation_statistics()
+    assert stats.areas_by_class()["cell"][0][2] == 400.0
@@ -0,0 +1,143 @@
+"""Live QC: the per-image rules re-run on the edited image (QCController).
+
+Goes through the real mutation path -- ImageLabel signals into
+AnnotationController -- because the point of the mode is that no caller has
+to remember to ask for a check.
+"""
+
+import pytest
+
+from src.digitalsreeni_image_annotator.core import annotation_qc
+
+BOWTIE = [0, 0, 40, 40, 40, 0, 0, 40]
+SQUARE = [10, 10, 50, 10, 50, 50, 10, 50]
+
+
+@pytest.fixture
+def window(qt_application):
+    from digitalsreeni_image_annotator.annotator_window import ImageAnnotator
+
+    w = ImageAnnotator()
+    w.qc_controller._live_timer.setInterval(0)
+    for name in ("a.png", "b.png"):
+        w.all_images.append({"file_name": name, "is_multi_slice": False})
+    w.image_list.sync()
+    w.image_file_name = "a.png"
+    yield w
+    w.qc_controller.wait_for_live_checks()
+    w.deleteLater()
+
+
+def _draw(window, *segmentations):
+    window.image_label.annotations = {
+        "cell": [
+            {"segmentation": list(s), "category_name": "cell", "number": n + 1}
+            for n, s in enumerate(segmentations)
+        ]
+    }
+    window.image_label.annotationsBatchSaved.emit()
+
+
+def _settled(qtbot, window):
+    qc = window.qc_controller
+    qtbot.waitUntil(
+        lambda: not qc._live_timer.isActive()
+        and qc._live_thread is None
+        and not qc._live_pending
+    )
+
+
+def test_an_edit_is_checked_and_badged_in_the_background(window, qtbot):
+    window.qc_controller.set_live_enabled(True)
+    _draw(window, BOWTIE)
+    _settled(qtbot, window)
+
+    findings = window.qc_controller.live_findings["a.png"]
+    assert annotation_qc.RULE_SELF_INTERSECTING in {f.rule for f in findings}
+    severity, summary = window.qc_controller.live_badge("a.png")
+    assert severity == annotation_qc.SEVERITY_ERROR
+    assert summary == f"Live check: {len(findings)} error(s)"
+    assert window.qc_controller.live_badge("b.png") is None
+
+    _draw(window, SQUARE)
+    _settled(qtbot, window)
+    assert "a.png" not in window.qc_controller.live_findings
+
+
+def test_a_committed_annotation_is_checked_from_the_label(window, qtbot):
+    window.qc_controller.set_live_enabled(True)
+    window.image_label.annotations = {
+        "cell": [{"segmentation": BOWTIE, "category_name": "cell", "number": 1}]
+    }
+    window.image_label.annotationCommitted.emit(window.image_label.annotations["cell"][0])
+    _settled(qtbot, window)
+
+    assert "a.png" not in window.all_annotations  # not written back yet
+    assert window.qc_controller.live_badge("a.png") is not None
+
+
+def test_a_result_for_an_image_edited_again_is_dropped(window, qtbot):
+    qc = window.qc_controller
+    qc.set_live_enabled(True)
+    _draw(window, BOWTIE)
+    qc.schedule_live_check("a.png")  # edited again before the first result
+    qc._on_live_checked("a.png", 1, ["stale"], True)
+
+    assert "a.png" not in qc.live_findings
+    _settled(qtbot, window)
+    assert annotation_qc.RULE_SELF_INTERSECTING in {
+        f.rule for f in qc.live_findings["a.png"]
+    }
+
+
+def test_a_result_from_before_a_clear_is_dropped(window, qtbot):
+    qc = window.qc_controller
+    qc.set_live_enabled(True)
+    _draw(window, BOWTIE)
+    stale = qc._live_generation["a.png"]
+    qc.clear_live()  # Clear All, or another project
+
+    _draw(window, SQUARE)  # the same name, edited again
+    qc._on_live_checked("a.png", stale, ["stale"], True)
+
+    assert "a.png" not in qc.live_findings
+    _settled(qtbot, window)
+    assert "a.png" not in qc.live_findings
+
+
+def test_a_repaired_slice_is_badged_on_its_stacks_row(window, qtbot):
+    window.all_images.append({"file_name": "stack.tif", "is_multi_slice": True})
+    window.image_list.sync()
+    window.all_annotations["stack_Z2"] = {
+        "cell": [{"segmentation": BOWTIE, "category_name": "cell", "number": 1}]
+    }
+    qc = window.qc_controller
+    qc.set_live_enabled(True)
+    _settled(qtbot, window)
+
+    qc.schedule_live_check("stack_Z2")  # as fix_findings does for each key
+    _settled(qtbot, window)
+
+    assert "stack_Z2" in qc.live_findings
+    assert qc.live_badge("stack.tif") is not None
+    assert qc.live_badge("stack_Z2") is None
+
+
+def test_nothing_is_checked_while_the_mode_is_off(window, qtbot):
+    _draw(window, BOWTIE)
+    assert not window.qc_controller._live_timer.isActive()
+    assert window.qc_controller._live_thread is None
+
+    window.qc_controller.set_live_enabled(True)
+    _settled(qtbot, window)
+    window.qc_controller.set_live_enabled(False)
+    assert window.qc_controller.live_findings == {}
+
+
+def test_the_badged_row_paints(window, qtbot):
+    window.qc_controller.set_live_enabled(True)
+    _draw(window, BOWTIE)
+    _settled(qtbot, window)
+    window.image_list.resize(200, 80)
+
+    assert not window.image_list.grab().isNull()
@@ -47,6 +47,10 @@ class _Sam3Stub:
         # Fresh dicts each call (batch reuses across work items).
         return [dict(i) for i in self._instances]
 
+    def detect_text_blocking(self, image_np, class_configs):
+        # The batch worker's entry point; recorded in the same spy list.
+        return self.detect_text(image_np, class_configs)
+
     def unload(self):
         self.loaded = False
 
@@ -283,6 +287,23 @@ def test_inflight_guard_absorbs_busy(sam3_ready, tmp_path, monkeypatch):
     window.dino_batch_mode.setCurrentText("Review before accepting")
     monkeypatch.setattr(c, "_show_dino_batch_review", lambda: None)
     c.run_dino_detection_batch()  # must not raise
+    assert window.dino_batch_results == {}
+
+
+def test_batch_does_not_start_while_inference_is_in_flight(sam3_ready, tmp_path, monkeypatch):
+    from digitalsreeni_image_annotator.inference import sam_utils
+
+    window = sam3_ready
+    c = window.dino_controller
+    _seed_batch(window, tmp_path)
+    monkeypatch.setattr(c, "_show_dino_batch_review", lambda: None)
+    sam_utils.claim_inference()
+    try:
+        c.run_dino_detection_batch()
+    finally:
+        sam_utils.release_inference()
+    assert window.sam3_utils.detect_calls == []
+    assert "still running" in window.lbl_dino_status.text()
 
 
 def test_dino_path_does_not_call_sam3(sam3_ready, monkeypatch):
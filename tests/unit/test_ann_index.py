@@ -0,0 +1,116 @@
+"""IVF-index pass for curation beyond ALL_PAIRS_LIMIT (core/ann_index).
+
+The index may miss pairs; these tests pin what that is allowed to do to the
+answer. Probing every list is the exact answer, near-duplicate bursts are
+found at the default recall, and a missed pair can only split a cluster or
+add an outlier -- never merge two clusters or hide one.
+"""
+
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from src.digitalsreeni_image_annotator.core import similarity
+from src.digitalsreeni_image_annotator.core.ann_index import IVFIndex
+
+
+def _random(count, dimension=8, seed=0):
+    rng = np.random.default_rng(seed)
+    return {
+        f"img{index:04d}": rng.normal(size=dimension).astype(np.float32)
+        for index in range(count)
+    }
+
+
+def _bursts(bursts, size, dimension=16, spread=0.02, seed=0):
+    """``bursts`` groups of ``size`` near-identical frames each."""
+    rng = np.random.default_rng(seed)
+    embeddings = {}
+    for burst in range(bursts):
+        centre = rng.normal(size=dimension)
+        for frame in range(size):
+            vector = centre + rng.normal(scale=spread, size=dimension)
+            embeddings[f"b{burst:03d}_f{frame:02d}"] = vector.astype(np.float32)
+    return embeddings
+
+
+def test_ann_index_imports_without_qt():
+    code = (
+        "import sys;"
+        "sys.path.insert(0, 'src');"
+        "import digitalsreeni_image_annotator.core.ann_index as m;"
+        "qt = [n for n in sys.modules if n.startswith('PyQt6')];"
+        "assert not qt, qt"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+
+
+def test_every_row_lands_in_exactly_one_list():
+    names, matrix = similarity._matrix(_random(400))
+    index = IVFIndex(matrix)
+    members = np.concatenate(index.members)
+    assert index.lists == 20
+    assert sorted(members.tolist()) == list(range(400))
+
+
+@pytest.mark.parametrize("threshold", [0.3, 0.6, 0.9])
+def test_probing_every_list_is_the_exact_answer(threshold):
+    embeddings = _random(300, seed=3)
+    lists = IVFIndex(similarity._matrix(embeddings)[1]).lists
+
+    exact = similarity.analyse(embeddings, threshold, 0.2)
+    approximate = similarity.analyse(embeddings, threshold, 0.2, probes=lists)
+
+    assert approximate["approximate"] and not exact["approximate"]
+    for key in ("clusters", "outliers", "modes"):
+        assert approximate[key] == exact[key], key
+
+
+def test_near_duplicate_bursts_are_found_at_the_default_recall(monkeypatch):
+    embeddings = _bursts(60, 8)
+    exact = similarity.cluster(embeddings, 0.95)
+    assert len(exact) == 60
+
+    monkeypatch.setattr(similarity, "ALL_PAIRS_LIMIT", 100)
+    result = similarity.analyse(embeddings, 0.95)
+
+    assert result["approximate"]
+    assert result["clusters"] == exact
+
+
+def test_low_recall_only_splits_clusters_and_adds_outliers():
+    embeddings = _random(500, dimension=4, seed=5)
+    threshold = 0.95
+    exact = similarity.cluster(embeddings, threshold)
+    approximate = similarity.cluster(embeddings, threshold, probes=1)
+
+    home = {name: index for index, group in enumerate(exact) for name in group}
+    for group in approximate:
+        assert len({home[name] for name in group}) == 1, "two clusters merged"
+    assert set(similarity.outliers(embeddings, threshold)) <= set(
+        similarity.outliers(embeddings, threshold, probes=1)
+    )
+
+
+def test_join_matches_the_reference_components():
+    rng = np.random.default_rng(2)
+    pairs = rng.integers(0, 200, size=(150, 2))
+    labelling = similarity._Labelling(200)
+    for chunk in np.array_split(pairs, 7):
+        labelling.join(chunk[:, 0], chunk[:, 1])
+
+    parent = list(range(200))
+
+    def find(node):
+        while parent[node] != node:
+            node = parent[node]
+        return node
+
+    for first, second in pairs.tolist():
+        low, high = sorted((find(first), find(second)))
+        parent[high] = low
+    assert labelling.labels.tolist() == [find(node) for node in range(200)]
+    assert labelling.distinct == len({find(node) for node in range(200)})
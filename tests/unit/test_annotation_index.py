@@ -0,0 +1,64 @@
+"""Annotation counts per key and per image-list row (core/annotation_index).
+
+Every update must leave the per-row totals equal to a fresh count, and report
+exactly the rows whose annotated status flipped.
+"""
+
+import subprocess
+import sys
+
+from src.digitalsreeni_image_annotator.core.annotation_index import (
+    AnnotationIndex,
+    annotation_count,
+)
+
+TWO = {"cell": [{"number": 1}], "nucleus": [{"number": 1}]}
+
+
+def _owner(key):
+    return key.split("_Z")[0]
+
+
+def test_annotation_index_imports_without_qt():
+    code = (
+        "import sys;"
+        "sys.path.insert(0, 'src');"
+        "import digitalsreeni_image_annotator.core.annotation_index as m;"
+        "qt = [n for n in sys.modules if n.startswith('PyQt6')];"
+        "assert not qt, qt"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+
+
+def test_counts_sum_over_a_rows_keys():
+    index = AnnotationIndex()
+    index.rebuild({"s_Z1": TWO, "s_Z2": {"cell": []}, "a": TWO}, _owner)
+
+    assert annotation_count(TWO) == 2
+    assert index.count("s") == 2 and index.count("a") == 2
+    assert index.annotated("s") and not index.annotated("b")
+    assert len(index) == 3
+
+
+def test_updates_report_only_flipped_rows():
+    index = AnnotationIndex()
+    index.rebuild({"s_Z1": TWO}, _owner)
+
+    assert index.update("s_Z2", TWO, "s") == []  # already annotated
+    assert index.update("s_Z1", {}, "s") == []  # Z2 still is
+    assert index.update("s_Z2", None, "s", present=False) == ["s"]
+    assert index.count("s") == 0
+    assert len(index) == 1
+
+    assert index.update("t_Z1", TWO, "t") == ["t"]
+    # A key moving rows flips both.
+    assert index.update("t_Z1", TWO, "s") == ["s", "t"]
+
+
+def test_a_key_with_no_row_is_counted_but_owned_by_nobody():
+    index = AnnotationIndex()
+    index.rebuild({"orphan": TWO}, lambda key: None)
+
+    assert len(index) == 1
+    assert not index.annotated(None)
@@ -200,6 +200,33 @@ def test_two_distinct_objects_are_not_duplicates():
     assert qc.RULE_NEAR_DUPLICATE not in _rules(findings)
 
 
+def test_only_overlapping_pairs_are_compared_and_in_order(monkeypatch):
+    """A grid of separate squares plus one duplicate: the duplicate's pair is
+    the only one whose IoU is ever computed, and each finding still reports
+    the earlier annotation against the later one."""
+    from src.digitalsreeni_image_annotator.core import mask_filters
+
+    computed = []
+    real = mask_filters._geometry_iou
+
+    def _counted(a, b):
+        computed.append(1)
+        return real(a, b)
+
+    monkeypatch.setattr(mask_filters, "_geometry_iou", _counted)
+    cells = [
+        _square(50 * col, 50 * row, 40, number=10 * row + col + 1)
+        for row in range(10) for col in range(10)
+    ]
+    cells.append(_square(101, 50, 40, number=999))
+    findings = qc.check_redundancy(
+        {"img.png": {"cell": cells}}, {"img.png": (600, 600)}, qc.QCConfig()
+    )
+
+    assert [(f.annotation_number, f.detail["other"]) for f in findings] == [(13, 999)]
+    assert len(computed) == 1
+
+
 def test_heavy_cross_class_overlap_is_reported():
     project = _project({
         "cell": [_square(10, 10, 40, name="cell")],
@@ -434,3 +461,21 @@ def test_thresholds_are_configurable():
 def test_empty_project_is_handled():
     assert qc.run_audit({}, {}) == []
     assert qc.run_audit(None, None) == []
+
+
+# --- one image, within a budget --------------------------------------------
+
+
+def test_a_spent_budget_skips_the_remaining_rule_groups(monkeypatch):
+    by_class = {"cell": [_square(0, 0, 40, number=1), _square(0, 0, 40, number=2)]}
+    findings, complete = qc.check_image("img.png", by_class, (20, 20), qc.QCConfig())
+    assert complete
+    assert _rules(findings) == {qc.RULE_OUT_OF_BOUNDS, qc.RULE_NEAR_DUPLICATE}
+
+    clock = iter([0.0, 0.0, 0.0, 5.0])
+    monkeypatch.setattr(qc.time, "monotonic", lambda: next(clock))
+    findings, complete = qc.check_image(
+        "img.png", by_class, (20, 20), qc.QCConfig(), budget=1.0
+    )
+    assert not complete
+    assert _rules(findings) == {qc.RULE_OUT_OF_BOUNDS}
@@ -0,0 +1,149 @@
+"""Annotation statistics per key, with running totals (core/annotation_stats).
+
+After any sequence of edits the totals must equal a fresh count, and the
+statistics dialog, the training summary and the QC rules must read the same
+numbers.
+"""
+
+import subprocess
+import sys
+
+from src.digitalsreeni_image_annotator.core import annotation_qc as qc
+from src.digitalsreeni_image_annotator.core import task_inference as ti
+from src.digitalsreeni_image_annotator.core.annotation_stats import AnnotationStats
+
+
+def _square(number, size=10):
+    return {
+        "number": number,
+        "segmentation": [0, 0, size, 0, size, size, 0, size],
+    }
+
+
+def _box(number, w=4, h=5):
+    return {"number": number, "bbox": [0, 0, w, h]}
+
+
+def _pose(number):
+    return {"number": number, "keypoints": [1, 1, 2], "bbox": [0, 0, 3, 3]}
+
+
+def _project():
+    return {
+        "a.png": {"cell": [_square(1), _square(2, 20)], "nucleus": [_box(1)]},
+        "s_Z1": {"person": [_pose(1)], "Temp-cell": [_square(1)]},
+        "s_Z2": {"cell": []},
+    }
+
+
+def _fresh(annotations):
+    return AnnotationStats().sync(annotations)
+
+
+def test_annotation_stats_imports_without_qt():
+    code = (
+        "import sys;"
+        "sys.path.insert(0, 'src');"
+        "import digitalsreeni_image_annotator.core.annotation_stats as m;"
+        "qt = [n for n in sys.modules if n.startswith('PyQt6')];"
+        "assert not qt, qt"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+
+
+def test_totals_follow_the_shared_counting_rules():
+    stats = _fresh(_project())
+
+    assert stats.total() == 5
+    assert stats.class_counts() == {"cell": 2, "nucleus": 1, "person": 1, "Temp-cell": 1}
+    assert stats.key_counts() == {"a.png": 3, "s_Z1": 2, "s_Z2": 0}
+    # Review classes are not training data.
+    assert stats.shape_counts() == {"polygon": 2, "bbox": 1, "pose": 1}
+    assert stats.classes() == ["cell", "nucleus", "person"]
+    assert stats.trainable("a.png") and not stats.trainable("s_Z2")
+
+    areas = stats.areas_by_class()
+    assert sorted(area for _key, _n, area in areas["cell"]) == [100.0, 400.0]
+    assert areas["nucleus"] == [("a.png", 1, 20.0)]
+    assert "person" not in areas  # pose instances have no area
+
+    counts, edges = stats.area_histogram(bins=4)
+    assert counts.sum() == 3  # the review class is left out
+    assert edges[0] == 20.0 and edges[-1] == 400.0
+
+
+def test_only_reported_or_changed_keys_are_measured_again():
+    project = _project()
+    stats = _fresh(project)
+    before = {key: stats[key] for key in stats.keys()}
+
+    # Geometry edit: counts unchanged, so only a report picks it up.
+    project["a.png"]["cell"][0] = _square(1, 30)
+    stats.sync(project)
+    assert stats["a.png"] is before["a.png"]
+    stats.invalidate("a.png")
+    stats.sync(project)
+    assert stats["a.png"] is not before["a.png"]
+    assert stats["s_Z1"] is before["s_Z1"]
+
+    # Keys added, removed or replaced are noticed without a report.
+    project["s_Z2"] = {"cell": [_box(1)]}
+    project["b.png"] = {"cell": [_square(1)]}
+    del project["s_Z1"]
+    stats.sync(project)
+
+    fresh = _fresh(project)
+    assert stats.class_counts() == fresh.class_counts()
+    assert stats.key_counts() == fresh.key_counts()
+    assert stats.shape_counts() == fresh.shape_counts()
+    assert stats.areas_by_class() == fresh.areas_by_class()
+    assert list(stats.keys()) == list(project)
+
+
+def test_another_project_starts_over():
+    stats = _fresh(_project())
+    other = {"x.png": {"cell": [_box(1)]}}
+
+    assert stats.sync(other).key_counts() == {"x.png": 1}
+
+
+def test_the_training_summary_reads_the_same_numbers():
+    project = _project()
+    stats = _fresh(project)
+
+    assert ti.count_shapes(project, stats) == stats.shape_counts()
+    assert ti.summarise_dataset(project, ["a.png", "s_Z1", "s_Z2"], stats) == (
+        ti.summarise_dataset(project, ["a.png", "s_Z1", "s_Z2"])
+    )
+
+
+def test_qc_statistics_from_the_stats_match_the_shards():
+    project = {
+        f"img{i}.png": {"cell": [_square(1, 10 + i % 3)], "rare": []}
+        for i in range(8)
+    }
+    project["img0.png"]["cell"].append(_square(2, 200))  # an area outlier
+    sizes = {name: (500, 500) for name in project}
+
+    expected = qc.run_audit(project, sizes)
+    assert qc.run_audit(project, sizes, stats=_fresh(project)) == expected
+    assert qc.RULE_AREA_OUTLIER in {f.rule for f in expected}
+
+
+def test_qc_findings_follow_the_projects_order_not_the_stats():
+    project = {
+        "x.png": {"b": [_square(n) for n in range(1, 5)]},
+        "y.png": {"a": [_square(n) for n in range(1, 5)] + [_square(5, 200)],
+                  "b": [_square(5, 200)]},
+    }
+    stats = _fresh(project)
+    project["x.png"] = project.pop("x.png")  # same entry, now listed last
+
+    expected = qc.run_audit(project)
+    tied = [f.class_name for f in expected if f.rule == qc.RULE_AREA_OUTLIER]
+    assert tied == ["a", "b"]  # one image, one rule: the order is the project's
+    assert qc.run_audit(project, stats=stats.sync(project)) == expected
+    assert qc.check_statistics(project, None, qc.QCConfig(), stats) == (
+        qc.check_statistics(project, None, qc.QCConfig())
+    )
@@ -0,0 +1,199 @@
+"""Streaming "Detect All Images" pipeline (inference/batch_detection).
+
+Pins the promises the batch makes: images are decoded ahead of the detector
+but never more than the prefetch bound at once, the detector sees them in
+batches, one bad image does not sink its batch, and a cancel stops the run.
+"""
+
+import threading
+
+import cv2
+import numpy as np
+import pytest
+
+from src.digitalsreeni_image_annotator.core.slice_cache import (
+    LazySliceList,
+    SliceProvider,
+    get_shared_lru,
+)
+from src.digitalsreeni_image_annotator.inference.batch_detection import (
+    BatchDetectionWorker,
+    VideoFrameReader,
+    slice_loaders,
+)
+
+
+def _items(count, decoded=None):
+    def load(i):
+        if decoded is not None:
+            decoded.append(i)
+        return np.full((4, 4, 3), i, np.uint8)
+
+    return [(f"img{i}", lambda i=i: load(i)) for i in range(count)]
+
+
+def _run(qtbot, worker):
+    received = []
+    worker.item_done.connect(lambda name, outcome: received.append((name, outcome)))
+    with qtbot.waitSignal(worker.finished, timeout=5000):
+        worker.start()
+    worker.wait()
+    return received
+
+
+def test_images_are_detected_in_batches_in_order(qtbot):
+    batches = []
+
+    def detect(batch):
+        batches.append([int(a[0, 0, 0]) for _, a in batch])
+        return [([{"value": int(a[0, 0, 0])}], []) for _, a in batch]
+
+    worker = BatchDetectionWorker(_items(7), detect, batch_size=3)
+    received = _run(qtbot, worker)
+
+    assert batches == [[0, 1, 2], [3, 4, 5], [6]]
+    assert [name for name, _ in received] == [f"img{i}" for i in range(7)]
+    assert received[4][1] == ([{"value": 4}], [])
+
+
+def test_decoding_runs_ahead_only_as_far_as_the_prefetch_bound(qtbot):
+    decoded = []
+    release = threading.Event()
+
+    def detect(batch):
+        release.wait(2)
+        return [([], []) for _ in batch]
+
+    worker = BatchDetectionWorker(_items(20, decoded), detect, batch_size=1, prefetch=2)
+    worker.start()
+    qtbot.waitUntil(lambda: len(decoded) >= 4, timeout=5000)
+    qtbot.wait(100)
+    # one image in the detector, two queued, one blocked on the full queue
+    assert len(decoded) == 4
+    release.set()
+    worker.wait()
+    assert len(decoded) == 20
+
+
+def test_a_failing_batch_is_retried_image_by_image(qtbot):
+    def detect(batch):
+        if any(name == "img1" for name, _ in batch):
+            raise RuntimeError("bad image")
+        return [([], []) for _ in batch]
+
+    received = dict(_run(qtbot, BatchDetectionWorker(_items(3), detect, batch_size=3)))
+
+    assert received == {"img0": ([], []), "img1": None, "img2": ([], [])}
+
+
+def test_an_image_that_fails_to_decode_is_reported_and_skipped(qtbot):
+    items = _items(2)
+    items.insert(1, ("broken", lambda: None))
+    seen = []
+
+    def detect(batch):
+        seen.extend(batch)
+        return [([], []) for _ in batch]
+
+    received = dict(_run(qtbot, BatchDetectionWorker(items, detect)))
+
+    assert received["broken"] is None
+    assert len(seen) == 2
+
+
+def test_an_item_the_lookup_answers_is_neither_decoded_nor_detected(qtbot):
+    decoded = []
+    seen = []
+
+    def detect(batch):
+        seen.extend(name for name, _ in batch)
+        return [([], []) for _ in batch]
+
+    worker = BatchDetectionWorker(
+        _items(4, decoded), detect,
+        lookup=lambda name: "kept" if name in ("img1", "img3") else None,
+    )
+    cached = []
+    worker.item_cached.connect(lambda name, outcome: cached.append((name, outcome)))
+    received = _run(qtbot, worker)
+
+    assert cached == [("img1", "kept"), ("img3", "kept")]
+    assert [name for name, _ in received] == ["img0", "img2"]
+    assert seen == ["img0", "img2"] and decoded == [0, 2]
+
+
+def test_cancel_stops_decoding_and_detection(qtbot):
+    decoded = []
+    worker = None
+
+    def detect(batch):
+        worker.cancel()
+        return [([], []) for _ in batch]
+
+    worker = BatchDetectionWorker(_items(50, decoded), detect, batch_size=2, prefetch=2)
+    received = _run(qtbot, worker)
+
+    assert worker.canceled
+    assert [name for name, _ in received] == ["img0", "img1"]
+    assert len(decoded) < 10
+
+
+# --- loaders ---------------------------------------------------------------
+
+
+def test_stack_slices_load_without_the_shared_lru():
+    array = np.random.default_rng(0).integers(0, 255, (3, 8, 6), dtype=np.uint8)
+    slices = LazySliceList(SliceProvider(array, ["Z", "H", "W"], "stack"))
+    try:
+        loaders = slice_loaders(slices, [])
+        assert [name for name, _ in loaders] == slices.names
+        assert loaders[1][1]().shape == (8, 6, 3)
+        assert get_shared_lru().count_prefix(slices.provider_id) == 0
+    finally:
+        slices.release()
+
+
+def test_a_provider_that_is_neither_thread_safe_nor_a_file_is_refused():
+    class _Provider:
+        provider_id = 7
+        names = ["a"]
+
+        def extract(self, name):
+            raise AssertionError("extracted off the GUI thread")
+
+    assert slice_loaders(LazySliceList(_Provider()), []) is None
+
+
+@pytest.fixture
+def video(tmp_path):
+    path = str(tmp_path / "clip.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 10, (16, 8))
+    if not writer.isOpened():
+        pytest.skip("no MJPG writer in this OpenCV build")
+    for value in (0, 120, 240):
+        writer.write(np.full((8, 16, 3), value, np.uint8))
+    writer.release()
+    return path
+
+
+def test_video_frames_are_read_through_a_private_capture(video):
+    from src.digitalsreeni_image_annotator.core.video_handler import (
+        VideoHandler,
+        VideoSliceProvider,
+    )
+
+    handler = VideoHandler(video)
+    slices = LazySliceList(VideoSliceProvider(handler, "clip"))
+    readers = []
+    try:
+        loaders = slice_loaders(slices, readers)
+        (reader,) = readers
+        assert isinstance(reader, VideoFrameReader)
+        frames = [load() for _, load in reversed(loaders)]
+        assert [f.shape for f in frames] == [(8, 16, 3)] * 3
+        assert [round(f.mean() / 120) for f in frames] == [2, 1, 0]
+    finally:
+        for reader in readers:
+            reader.close()
+        slices.release()
+        handler.release()
@@ -7,8 +7,11 @@ afford to run once is a curation tool nobody uses" was already in the module
 docstring; it just was not true for slices.
 """
 
+import threading
+
 import numpy as np
 import pytest
+from PyQt6.QtGui import QImage
 from PyQt6.QtWidgets import QListWidget, QWidget
 
 from src.digitalsreeni_image_annotator.controllers.curation_controller import (
@@ -18,15 +21,24 @@ from src.digitalsreeni_image_annotator.controllers.review_controller import (
     MODE_DISAGREEMENT,
     MODE_UNCERTAINTY,
 )
-from src.digitalsreeni_image_annotator.inference.embedding_utils import (
-    EmbeddingCache,
-    slice_digest,
-)
+from src.digitalsreeni_image_annotator.core.embedding_cache import EmbeddingCache
+from src.digitalsreeni_image_annotator.inference.embedding_utils import slice_digest
 
 
 class _Provider:
-    def __init__(self, dimensions):
-        self.dimensions = list(dimensions)
+    """Duck-types a SliceProvider: extractable off the GUI thread."""
+
+    thread_safe_extract = True
+
+    def __init__(self, dimensions, materialised):
+        self.dimensions = list(dimensions) if dimensions is not None else None
+        self.materialised = materialised
+
+    def extract(self, name):
+        self.materialised.append(name)
+        image = QImage(8, 8, QImage.Format.Format_RGB888)
+        image.fill(0)
+        return image
 
 
 class _Slices:
@@ -35,24 +47,24 @@ class _Slices:
     def __init__(self, names, dimensions=None):
         self.names = list(names)
         self.materialised = []
-        if dimensions is not None:
-            self.provider = _Provider(dimensions)
-
-    def get(self, name):
-        self.materialised.append(name)
-        return object()  # stands in for a QImage; the embedder is a stub
+        self.provider = _Provider(dimensions, self.materialised)
 
 
 class _Embedder:
-    """Counts calls, so "was this actually recomputed" is answerable."""
+    """Counts images and batches, so "was this actually recomputed" is
+    answerable."""
 
     def __init__(self, vector=(1.0, 0.0)):
         self.vector = list(vector)
         self.calls = 0
+        self.batches = []
+        self.threads = set()
 
-    def embed_qimage(self, _qimage):
-        self.calls += 1
-        return list(self.vector)
+    def embed_arrays(self, arrays):
+        self.calls += len(arrays)
+        self.batches.append(len(arrays))
+        self.threads.add(threading.current_thread())
+        return [list(self.vector) for _ in arrays]
 
     def load(self, _model_name):
         pass
@@ -105,6 +117,13 @@ def _add_stack(window, file_name, path, slice_names, dimensions=None):
     return window.image_slices[base]
 
 
+def _embed(controller, cache):
+    """One embedding run over the project, synchronously on this thread."""
+    worker = controller._embedding_worker(controller.collect_work_items(), cache)
+    worker.run()
+    return worker
+
+
 # --- collection ------------------------------------------------------------
 
 
@@ -128,11 +147,11 @@ def test_a_stack_without_a_path_still_embeds(controller):
     controller.mw.all_images.append({"file_name": "stack.tif"})
     controller.mw.image_slices["stack"] = _Slices(["stack_T1", "stack_T2"])
 
-    items = controller.collect_work_items()
-    assert len(items) == 2
+    assert len(controller.collect_work_items()) == 2
     cache = EmbeddingCache(None)
-    vector, from_cache = controller._embed_one("slice", items[0][2], cache)
-    assert vector is not None and not from_cache
+    worker = _embed(controller, cache)
+    assert sorted(worker.results) == ["stack_T1", "stack_T2"]
+    assert worker.cached_hits == 0
     assert len(cache) == 0
 
 
@@ -149,17 +168,14 @@ def test_a_slice_is_cached_and_the_second_run_recomputes_nothing(
     _add_stack(controller.mw, "clip.mp4", str(video), ["clip_F00000", "clip_F00001"])
     cache = EmbeddingCache(str(tmp_path))
 
-    items = controller.collect_work_items()
-    for _name, kind, payload in items:
-        controller._embed_one(kind, payload, cache)
+    _embed(controller, cache)
     assert controller.embedder.calls == 2
     assert len(cache) == 2
 
     # Second run: fresh digest memo, same files.
     controller._digests = {}
-    for _name, kind, payload in items:
-        _vector, from_cache = controller._embed_one(kind, payload, cache)
-        assert from_cache
+    worker = _embed(controller, cache)
+    assert worker.cached_hits == 2
     assert controller.embedder.calls == 2, "a cached slice was re-embedded"
 
 
@@ -172,12 +188,11 @@ def test_a_cached_slice_is_never_materialised(controller, tmp_path):
         controller.mw, "clip.mp4", str(video), ["clip_F00000"]
     )
     cache = EmbeddingCache(str(tmp_path))
-    payload = controller.collect_work_items()[0][2]
 
-    controller._embed_one("slice", payload, cache)
+    _embed(controller, cache)
     assert slices.materialised == ["clip_F00000"]
 
-    controller._embed_one("slice", payload, cache)
+    _embed(controller, cache)
     assert slices.materialised == ["clip_F00000"], "a cached frame was decoded"
 
 
@@ -200,10 +215,7 @@ def test_the_source_file_is_hashed_once_not_once_per_frame(
     monkeypatch.setattr(
         module, "content_hash", lambda path: hashed.append(path) or "digest"
     )
-    cache = EmbeddingCache(None)
-
-    for _name, kind, payload in controller.collect_work_items():
-        controller._embed_one(kind, payload, cache)
+    _embed(controller, EmbeddingCache(None))
 
     assert hashed == [str(video)]
 
@@ -240,14 +252,12 @@ def test_the_controller_passes_the_axis_assignment_into_the_key(
     cache = EmbeddingCache(str(tmp_path))
 
     _add_stack(controller.mw, "stack.tif", str(stack), ["stack_Z1"], ["Z", "H", "W"])
-    payload = controller.collect_work_items()[0][2]
-    controller._embed_one("slice", payload, cache)
+    _embed(controller, cache)
 
     _add_stack(controller.mw, "stack.tif", str(stack), ["stack_Z1"], ["H", "W", "Z"])
-    payload = controller.collect_work_items()[0][2]
-    _vector, from_cache = controller._embed_one("slice", payload, cache)
+    worker = _embed(controller, cache)
 
-    assert not from_cache, "a different axis assignment reused the old vectors"
+    assert worker.cached_hits == 0, "a different axis assignment reused the old vectors"
 
 
 def test_slice_cache_entries_do_not_cross_models(controller, tmp_path):
@@ -255,13 +265,12 @@ def test_slice_cache_entries_do_not_cross_models(controller, tmp_path):
     video.write_bytes(b"pretend video")
     _add_stack(controller.mw, "clip.mp4", str(video), ["clip_F00000"])
     cache = EmbeddingCache(str(tmp_path))
-    payload = controller.collect_work_items()[0][2]
 
-    controller._embed_one("slice", payload, cache)
+    _embed(controller, cache)
     controller.set_model("DINOv2 (base)")
-    _vector, from_cache = controller._embed_one("slice", payload, cache)
+    worker = _embed(controller, cache)
 
-    assert not from_cache, "a DINOv2 run reused CLIP vectors"
+    assert worker.cached_hits == 0, "a DINOv2 run reused CLIP vectors"
 
 
 # --- backend switching -----------------------------------------------------
@@ -369,9 +378,9 @@ def test_the_clusters_are_computed_once_per_embedding_set(controller):
 
     real = module.similarity.cluster
 
-    def _counted(embeddings, threshold):
+    def _counted(embeddings, threshold, probes=None):
         passes.append(threshold)
-        return real(embeddings, threshold)
+        return real(embeddings, threshold, probes)
 
     controller.clusters()
     module.similarity.cluster = _counted
@@ -403,19 +412,11 @@ def test_the_backend_cannot_be_switched_while_a_run_is_in_flight(controller):
     assert controller.model_name != "DINOv2 (base)"
 
 
-def test_embeddings_are_stored_as_float32_arrays(controller, monkeypatch):
+def test_embeddings_are_stored_as_float32_arrays(controller):
     """At the supported ceiling this is 60 MB against roughly 500 MB of Python
-    float objects, which is the claim the ADR rests on.
-
-    Stubbed at `_embed_one`, deliberately: letting the real one run on a fake
-    file yields no embeddings, and `compute` then opens a modal QMessageBox
-    with nobody to dismiss it -- so the test would hang rather than fail.
-    """
+    float objects, which is the claim the ADR rests on."""
     controller.mw.all_images.append({"file_name": "clip.mp4"})
     controller.mw.image_slices["clip"] = _Slices(["clip_F00000", "clip_F00001"])
-    monkeypatch.setattr(
-        controller, "_embed_one", lambda _kind, _payload, _cache: ([0.1, 0.2], False)
-    )
 
     assert controller.compute() is True
 
@@ -424,26 +425,113 @@ def test_embeddings_are_stored_as_float32_arrays(controller, monkeypatch):
     assert stored.dtype == np.float32
 
 
-def test_a_cancelled_run_still_saves_what_it_computed(controller, monkeypatch):
+def test_a_cancelled_run_still_saves_what_it_computed(
+    controller, tmp_path, monkeypatch
+):
     """Embedding is the expensive half; throwing away a cancelled run's work
     would make the next attempt start from nothing."""
-    controller.mw.all_images.append({"file_name": "clip.mp4"})
-    controller.mw.image_slices["clip"] = _Slices(["clip_F00000", "clip_F00001"])
+    video = tmp_path / "clip.mp4"
+    video.write_bytes(b"pretend video")
+    _add_stack(controller.mw, "clip.mp4", str(video), ["clip_F00000", "clip_F00001"])
     saved = []
     real_cache = controller.cache()
-    monkeypatch.setattr(real_cache, "save", lambda: saved.append(True))
-
-    from PyQt6.QtWidgets import QProgressDialog
+    monkeypatch.setattr(real_cache, "save", lambda: saved.append(len(real_cache)))
 
-    monkeypatch.setattr(QProgressDialog, "wasCanceled", lambda _self: True)
+    # Cancel from inside the first batch, as the dialog's button would.
+    workers = []
+    make_worker = controller._embedding_worker
+    monkeypatch.setattr(
+        controller,
+        "_embedding_worker",
+        lambda *args: workers.append(make_worker(*args)) or workers[-1],
+    )
+    embed = controller.embedder.embed_arrays
+    controller.embedder.embed_arrays = lambda arrays: (
+        workers[0].cancel() or embed(arrays)
+    )
 
     assert controller.compute() is False
-    assert saved, "a cancelled run discarded the embeddings it had computed"
+    assert saved == [2], "a cancelled run discarded the embeddings it had computed"
+
+
+def test_images_reach_the_model_in_batches_off_the_gui_thread(controller):
+    """One forward pass per image kept the model idle most of the time, and
+    the loop ran on the GUI thread."""
+    controller.mw.all_images.append({"file_name": "clip.mp4"})
+    controller.mw.image_slices["clip"] = _Slices(
+        [f"clip_F{index:05d}" for index in range(5)]
+    )
+    controller.batch_size = 2
+
+    assert controller.compute() is True
+
+    assert controller.embedder.batches == [2, 2, 1]
+    assert threading.main_thread() not in controller.embedder.threads
+    assert sorted(controller.embeddings) == [f"clip_F{index:05d}" for index in range(5)]
+
+
+def test_a_failing_batch_is_retried_image_by_image(controller):
+    embed = controller.embedder.embed_arrays
+
+    def _fussy(arrays):
+        if len(arrays) > 1:
+            raise RuntimeError("out of memory")
+        return embed(arrays)
+
+    controller.embedder.embed_arrays = _fussy
+    controller.mw.image_slices["stack"] = _Slices(["stack_T1", "stack_T2"])
+    controller.mw.all_images.append({"file_name": "stack.tif"})
+
+    worker = _embed(controller, EmbeddingCache(None))
+
+    assert sorted(worker.results) == ["stack_T1", "stack_T2"]
+    assert controller.embedder.batches == [1, 1]
+
+
+def test_an_image_whose_digest_fails_costs_only_itself(
+    controller, tmp_path, monkeypatch
+):
+    for name in ("a.png", "b.png", "c.png"):
+        image = QImage(8, 8, QImage.Format.Format_RGB888)
+        image.fill(0)
+        image.save(str(tmp_path / name))
+        controller.mw.all_images.append({"file_name": name})
+        controller.mw.image_paths[name] = str(tmp_path / name)
+    source_digest = controller._source_digest
+
+    def fussy_digest(path):
+        if path.endswith("b.png"):
+            raise ValueError("unreadable")
+        return source_digest(path)
+
+    monkeypatch.setattr(controller, "_source_digest", fussy_digest)
+    worker = controller._embedding_worker(
+        controller.collect_work_items(), EmbeddingCache(None)
+    )
+    done = []
+    worker.progress.connect(done.append)
+    worker.run()
+
+    assert worker.error is None
+    assert sorted(worker.results) == ["a.png", "c.png"]
+    assert done[-1] == 3
+
+
+def test_a_run_that_fails_part_way_is_not_a_finished_one(controller, monkeypatch):
+    controller.mw.image_slices["stack"] = _Slices(["stack_T1", "stack_T2"])
+    controller.mw.all_images.append({"file_name": "stack.tif"})
+    cache = EmbeddingCache(None)
+    monkeypatch.setattr(cache, "put", lambda *_args: 1 / 0)
+
+    worker = _embed(controller, cache)
+
+    assert worker.error is not None
+    assert "division by zero" in worker.error
 
 
 def test_a_second_run_cannot_start_while_one_is_in_flight(controller, monkeypatch):
-    """`compute` spins `processEvents` on every item behind a NON-modal
-    progress dialog, so the backend combo stays live. Re-entering unloads the
+    """`compute` runs an event loop behind a NON-modal progress dialog while
+    the worker embeds, so the backend combo stays live. Re-entering unloads the
     model the outer loop is still using and leaves a mixed CLIP+DINOv2
     embedding set — undetectable downstream, since both are 768-d, and
     `refine` feeds it into a real training run's split (ADR-013).
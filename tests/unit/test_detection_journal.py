@@ -0,0 +1,127 @@
+"""Checkpoint journal of batch text detection (core/detection_journal)."""
+
+import json
+import subprocess
+import sys
+
+import numpy as np
+
+from src.digitalsreeni_image_annotator.core.detection_journal import (
+    DetectionJournal,
+    config_key,
+    journal_path,
+    merge_detections,
+)
+
+
+def _det(name, score, bbox):
+    return {"class_name": name, "score": score, "bbox": bbox, "source": "dino",
+            "segmentation": [0, 0, 1, 0, 1, 1]}
+
+
+def test_detection_journal_imports_without_qt():
+    code = (
+        "import sys;"
+        "sys.path.insert(0, 'src');"
+        "import digitalsreeni_image_annotator.core.detection_journal as m;"
+        "qt = [n for n in sys.modules if n.startswith('PyQt6')];"
+        "assert not qt, qt"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+
+
+def test_journal_sits_beside_the_project():
+    assert journal_path("/data/cells.iap") == "/data/cells.detections.jsonl"
+
+
+def test_config_keys_ignore_key_order_but_not_values():
+    assert config_key({"name": "cell", "box_thr": 0.3}) == config_key({"box_thr": 0.3, "name": "cell"})
+    assert config_key({"name": "cell", "box_thr": 0.3}) != config_key({"name": "cell", "box_thr": 0.4})
+
+
+def test_only_unrecorded_classes_are_missing():
+    journal = DetectionJournal()
+    journal.record("img", "model", "a.png", {"cell": [_det("cell", 0.9, [0, 0, 10, 10])]})
+    assert journal.missing("img", "model", ["cell", "nucleus"]) == ["nucleus"]
+    assert journal.missing("img", "other-model", ["cell"]) == ["cell"]
+    assert journal.missing("edited-img", "model", ["cell"]) == ["cell"]
+
+
+def test_entries_survive_a_reload_and_a_torn_last_line(tmp_path):
+    path = str(tmp_path / "p.detections.jsonl")
+    journal = DetectionJournal(path)
+    journal.record("img", "model", "a.png", {
+        "cell": [_det("cell", np.float32(0.5), [0, 0, 10, 10])],
+        "nucleus": [],
+    })
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"image": "img2", "model"')  # the crash
+
+    reloaded = DetectionJournal(path)
+    assert len(reloaded) == 2
+    assert reloaded.detections("img", "model", "cell")[0]["score"] == 0.5
+    assert reloaded.detections("img", "model", "nucleus") == []
+
+
+def test_a_later_line_replaces_an_earlier_one(tmp_path):
+    path = str(tmp_path / "p.detections.jsonl")
+    DetectionJournal(path).record("img", "m", "a.png", {"cell": []})
+    DetectionJournal(path).record("img", "m", "a.png", {"cell": [_det("cell", 0.7, [0, 0, 1, 1])]})
+    with open(path, encoding="utf-8") as f:
+        assert len([json.loads(line) for line in f]) == 2
+    assert len(DetectionJournal(path).detections("img", "m", "cell")) == 1
+
+
+def test_forgotten_entries_are_detected_again_and_leave_the_file(tmp_path):
+    path = str(tmp_path / "p.detections.jsonl")
+    journal = DetectionJournal(path)
+    journal.record("img", "m", "a.png", {"cell": [], "nucleus": []})
+    journal.record("img", "other", "a.png", {"cell": []})
+
+    assert journal.forget("m", ["cell"]) == 1
+    assert journal.missing("img", "m", ["cell", "nucleus"]) == ["cell"]
+    assert journal.forget() == 2
+
+    with open(path, encoding="utf-8") as f:
+        assert f.read() == ""
+    assert len(DetectionJournal(path)) == 0
+
+
+def test_a_file_of_mostly_superseded_lines_is_compacted_on_load(tmp_path):
+    path = str(tmp_path / "p.detections.jsonl")
+    for score in (0.1, 0.2, 0.3):
+        DetectionJournal(path).record(
+            "img", "m", "a.png", {"cell": [_det("cell", score, [0, 0, 1, 1])]}
+        )
+
+    reloaded = DetectionJournal(path)
+
+    with open(path, encoding="utf-8") as f:
+        (line,) = f.readlines()
+    assert json.loads(line)["detections"][0]["score"] == 0.3
+    assert reloaded.detections("img", "m", "cell")[0]["score"] == 0.3
+
+
+def test_pending_groups_by_image_and_keeps_the_latest_content():
+    journal = DetectionJournal()
+    journal.record("old", "m", "a.png", {"cell": [_det("cell", 0.1, [0, 0, 1, 1])]})
+    journal.record("new", "m", "a.png", {"cell": [_det("cell", 0.9, [0, 0, 1, 1])]})
+    journal.record("img-b", "m", "b.png", {"cell": [], "gone": [_det("gone", 0.5, [0, 0, 1, 1])]})
+    journal.record("img-c", "other", "c.png", {"cell": []})
+
+    pending = journal.pending("m", ["cell"])
+
+    assert set(pending) == {"a.png", "b.png"}
+    assert pending["a.png"][0][0]["score"] == 0.9
+    assert pending["b.png"] == [[]]
+
+
+def test_cross_class_nms_keeps_the_best_of_overlapping_boxes():
+    cell = [_det("cell", 0.8, [0, 0, 10, 10]), _det("cell", 0.6, [50, 50, 60, 60])]
+    nucleus = [_det("nucleus", 0.9, [1, 0, 10, 10])]
+
+    merged = merge_detections([cell, nucleus], 0.5)
+
+    assert [(d["class_name"], d["score"]) for d in merged] == [("nucleus", 0.9), ("cell", 0.6)]
+    assert len(merge_detections([cell, nucleus], None)) == 3
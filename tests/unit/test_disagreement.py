@@ -14,9 +14,11 @@ is pure noise while looking entirely reasonable.
 import subprocess
 import sys
 
+import numpy as np
 import pytest
 
 from src.digitalsreeni_image_annotator.core import disagreement as dg
+from src.digitalsreeni_image_annotator.core.mask_filters import polygon_iou
 
 
 def _square(x0, y0, side, name="cell", score=None):
@@ -157,7 +159,7 @@ def test_greedy_and_optimal_differ_and_optimal_wins():
 
     gt0 overlaps pred0 best, so greedy takes that pair first and leaves gt1
     with whatever remains. Swapping partners raises the total IoU, and the
-    swap pass has to find it.
+    assignment has to find it.
     """
     gt = [_square(0, 0, 10), _square(6, 0, 10)]
     pred = [_square(1, 0, 10, name="Temp-cell"), _square(6, 0, 10, name="Temp-cell")]
@@ -188,6 +190,63 @@ def test_matching_is_per_class():
     assert [p[0] for p in pairs] == [1], "paired with the nucleus, not the cell"
 
 
+def _best_total(iou, rows, cols):
+    """Brute-force maximum total IoU over every matching of the candidates."""
+    if not rows:
+        return 0.0
+    first, rest = rows[0], rows[1:]
+    best = _best_total(iou, rest, cols)
+    for j in cols:
+        if (first, j) in iou:
+            best = max(best, iou[(first, j)] + _best_total(iou, rest, cols - {j}))
+    return best
+
+
+@pytest.mark.parametrize("seed", range(25))
+def test_matching_is_optimal_on_crowded_images(seed):
+    rng = np.random.default_rng(seed)
+    gt = [_square(*rng.integers(0, 30, size=2).tolist(), 10) for _ in range(5)]
+    pred = [
+        _square(*rng.integers(0, 30, size=2).tolist(), int(rng.integers(8, 13)),
+                name="Temp-cell")
+        for _ in range(int(rng.integers(2, 8)))
+    ]
+    iou = {
+        (i, j): value
+        for i, g in enumerate(gt)
+        for j, p in enumerate(pred)
+        if (value := polygon_iou(g["segmentation"], p["segmentation"])) >= dg.DEFAULT_MATCH_IOU
+    }
+
+    pairs, unmatched_gt, unmatched_pred = dg.match_pairs(gt, pred)
+
+    assert sum(value for _i, _j, value in pairs) == pytest.approx(
+        _best_total(iou, list(range(len(gt))), set(range(len(pred))))
+    )
+    assert all(iou[(i, j)] == value for i, j, value in pairs)
+    assert len({i for i, _j, _v in pairs}) == len({j for _i, j, _v in pairs}) == len(pairs)
+    assert len(pairs) + len(unmatched_gt) == len(gt)
+    assert len(pairs) + len(unmatched_pred) == len(pred)
+
+
+def test_only_shapes_whose_boxes_overlap_are_compared(monkeypatch):
+    compared = []
+    real = dg.polygon_iou
+
+    def _counted(a, b):
+        compared.append((a[0], b[0]))
+        return real(a, b)
+
+    monkeypatch.setattr(dg, "polygon_iou", _counted)
+    gt = [_square(x, 0, 10) for x in range(0, 1000, 20)]
+    pred = [_square(x + 1, 0, 10, name="Temp-cell") for x in range(0, 1000, 20)]
+
+    pairs, _unmatched_gt, _unmatched_pred = dg.match_pairs(gt, pred)
+
+    assert [(i, j) for i, j, _v in pairs] == [(k, k) for k in range(50)]
+    assert sorted(compared) == [(x, x + 1) for x in range(0, 1000, 20)]
+
+
 # --- pose exclusion --------------------------------------------------------
 
 
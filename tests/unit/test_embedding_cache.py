@@ -0,0 +1,203 @@
+"""Binary, memory-mapped embedding store (core/embedding_cache).
+
+Pins what the JSON cache could not do: open without parsing the vectors,
+serve them as one mapped matrix, and save by appending -- compacting once
+superseded rows would outnumber the live ones.
+"""
+
+import json
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from src.digitalsreeni_image_annotator.core.embedding_cache import (
+    CACHE_DIRNAME,
+    LEGACY_CACHE_FILENAME,
+    EmbeddingCache,
+)
+
+
+def _vector(value, dim=4):
+    return np.full(dim, value, dtype=np.float32)
+
+
+def test_embedding_cache_imports_without_qt():
+    code = (
+        "import sys;"
+        "sys.path.insert(0, 'src');"
+        "import digitalsreeni_image_annotator.core.embedding_cache as m;"
+        "qt = [n for n in sys.modules if n.startswith('PyQt6')];"
+        "assert not qt, qt"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+
+
+def test_a_reopened_cache_serves_views_into_one_mapped_matrix(tmp_path):
+    cache = EmbeddingCache(str(tmp_path))
+    for index in range(3):
+        cache.put("CLIP (ViT-B/32)", f"hash{index}", _vector(index))
+    cache.save()
+
+    reopened = EmbeddingCache(str(tmp_path))
+    rows = [reopened.get("CLIP (ViT-B/32)", f"hash{index}") for index in range(3)]
+
+    assert [row.tolist() for row in rows] == [[0.0] * 4, [1.0] * 4, [2.0] * 4]
+    assert all(isinstance(row.base, np.memmap) for row in rows)
+    assert rows[0].base is rows[2].base
+    assert not rows[0].flags.writeable
+    assert len(reopened) == 3
+
+
+def test_save_appends_only_what_is_new(tmp_path):
+    cache = EmbeddingCache(str(tmp_path))
+    cache.put("CLIP", "a", _vector(1))
+    cache.save()
+    rows = tmp_path / CACHE_DIRNAME / "clip.f32"
+    first = rows.read_bytes()
+
+    cache.put("CLIP", "b", _vector(2))
+    cache.save()
+    cache.save()
+
+    assert rows.read_bytes()[: len(first)] == first
+    assert rows.stat().st_size == 2 * 4 * 4
+    assert EmbeddingCache(str(tmp_path)).get("CLIP", "b").tolist() == [2.0] * 4
+
+
+def test_a_view_stays_valid_after_later_saves(tmp_path):
+    cache = EmbeddingCache(str(tmp_path))
+    cache.put("CLIP", "a", _vector(1))
+    cache.save()
+    view = cache.get("CLIP", "a")
+
+    cache.put("CLIP", "b", _vector(2))
+    cache.save()
+
+    assert view.tolist() == [1.0] * 4
+
+
+def test_a_digest_written_twice_keeps_its_latest_row(tmp_path):
+    cache = EmbeddingCache(str(tmp_path))
+    cache.put("CLIP", "a", _vector(1))
+    cache.save()
+    cache.put("CLIP", "a", _vector(5))
+    cache.save()
+
+    reopened = EmbeddingCache(str(tmp_path))
+    assert reopened.get("CLIP", "a").tolist() == [5.0] * 4
+    assert len(reopened) == 1
+
+
+def test_the_saved_vectors_are_one_mapped_matrix_with_a_row_index(tmp_path):
+    cache = EmbeddingCache(str(tmp_path))
+    for index in range(3):
+        cache.put("CLIP", f"hash{index}", _vector(index))
+    cache.save()
+    cache.put("CLIP", "unsaved", _vector(9))
+
+    matrix, rows = EmbeddingCache(str(tmp_path)).matrix("CLIP")
+
+    assert isinstance(matrix, np.memmap)
+    assert matrix.shape == (3, 4)
+    assert rows == {"hash0": 0, "hash1": 1, "hash2": 2}
+    assert matrix[rows["hash2"]].tolist() == [2.0] * 4
+    assert EmbeddingCache(str(tmp_path)).matrix("DINOv2")[0].shape == (0, 0)
+
+
+def test_superseded_rows_are_compacted_away_once_they_outnumber_the_live_ones(tmp_path):
+    cache = EmbeddingCache(str(tmp_path))
+    cache.put("CLIP", "a", _vector(1))
+    cache.put("CLIP", "b", _vector(2))
+    cache.save()
+    cache.put("CLIP", "a", _vector(3))
+    cache.save()
+    store = tmp_path / CACHE_DIRNAME
+    assert (store / "clip.f32").stat().st_size == 3 * 4 * 4  # appended
+    view = cache.get("CLIP", "b")
+
+    cache.put("CLIP", "a", _vector(4))
+    cache.put("CLIP", "b", _vector(5))
+    cache.save()
+
+    assert sorted(path.name for path in store.iterdir()) == ["clip.1.f32", "clip.keys"]
+    assert (store / "clip.1.f32").stat().st_size == 2 * 4 * 4
+    assert view.tolist() == [2.0] * 4
+    reopened = EmbeddingCache(str(tmp_path))
+    assert reopened.get("CLIP", "a").tolist() == [4.0] * 4
+    assert reopened.get("CLIP", "b").tolist() == [5.0] * 4
+    assert reopened.matrix("CLIP")[0].shape == (2, 4)
+
+
+def test_a_compaction_that_did_not_finish_leaves_the_old_store(tmp_path):
+    cache = EmbeddingCache(str(tmp_path))
+    cache.put("CLIP", "a", _vector(1))
+    cache.save()
+    store = tmp_path / CACHE_DIRNAME
+    # The new rows were written; the keys naming them were not.
+    (store / "clip.1.f32").write_bytes(_vector(7).tobytes())
+    (store / "clip.keys.tmp").write_text("half a header", encoding="utf-8")
+
+    reopened = EmbeddingCache(str(tmp_path))
+
+    assert reopened.get("CLIP", "a").tolist() == [1.0] * 4
+    assert sorted(path.name for path in store.iterdir()) == ["clip.f32", "clip.keys"]
+
+
+def test_models_get_separate_stores(tmp_path):
+    cache = EmbeddingCache(str(tmp_path))
+    cache.put("CLIP", "a", _vector(1, dim=4))
+    cache.put("DINOv2", "a", _vector(2, dim=6))
+    cache.save()
+
+    reopened = EmbeddingCache(str(tmp_path))
+    assert reopened.get("CLIP", "a").shape == (4,)
+    assert reopened.get("DINOv2", "a").tolist() == [2.0] * 6
+
+
+def test_a_torn_append_is_cut_back_to_the_rows_both_files_agree_on(tmp_path):
+    cache = EmbeddingCache(str(tmp_path))
+    cache.put("CLIP", "a", _vector(1))
+    cache.save()
+    store = tmp_path / CACHE_DIRNAME
+    with open(store / "clip.f32", "ab") as handle:
+        handle.write(_vector(2).tobytes()[:10])  # the crash
+
+    reopened = EmbeddingCache(str(tmp_path))
+    assert len(reopened) == 1
+    reopened.put("CLIP", "b", _vector(3))
+    reopened.save()
+
+    again = EmbeddingCache(str(tmp_path))
+    assert again.get("CLIP", "a").tolist() == [1.0] * 4
+    assert again.get("CLIP", "b").tolist() == [3.0] * 4
+    # Opening rewrote the store without the torn row.
+    assert sorted(path.name for path in store.iterdir()) == ["clip.1.f32", "clip.keys"]
+
+
+def test_a_legacy_json_cache_is_imported_and_removed(tmp_path):
+    legacy = tmp_path / LEGACY_CACHE_FILENAME
+    legacy.write_text(
+        json.dumps({"CLIP::abc:clip_F00000:ZHW": [0.5, 0.5], "junk": [1.0]}),
+        encoding="utf-8",
+    )
+
+    cache = EmbeddingCache(str(tmp_path))
+
+    assert cache.get("CLIP", "abc:clip_F00000:ZHW").tolist() == pytest.approx([0.5, 0.5])
+    assert len(cache) == 1
+    assert not legacy.exists()
+    assert len(EmbeddingCache(str(tmp_path))) == 1
+
+
+def test_a_legacy_cache_is_kept_when_its_import_cannot_be_written(tmp_path):
+    legacy = tmp_path / LEGACY_CACHE_FILENAME
+    legacy.write_text(json.dumps({"CLIP::abc": [0.5, 0.5]}), encoding="utf-8")
+    (tmp_path / CACHE_DIRNAME).write_text("")  # the store cannot be created
+
+    cache = EmbeddingCache(str(tmp_path))
+
+    assert cache.get("CLIP", "abc").tolist() == pytest.approx([0.5, 0.5])
+    assert legacy.exists()
@@ -0,0 +1,127 @@
+"""Vectorised polygon measurements (core/geometry).
+
+Every batch result must equal what the scalar ``utils`` helper gives the same
+annotation, including the degenerate inputs a project can hold.
+"""
+
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from src.digitalsreeni_image_annotator.core import annotation_qc, mask_filters
+from src.digitalsreeni_image_annotator.core.annotation_qc import QCConfig
+from src.digitalsreeni_image_annotator.core.geometry import (
+    PackedPolygons,
+    annotation_areas,
+    keypoint_rows,
+)
+from src.digitalsreeni_image_annotator.utils import calculate_area, calculate_bbox
+
+
+def _polygons(count, seed=0):
+    rng = np.random.default_rng(seed)
+    return [
+        rng.uniform(-50, 500, size=2 * int(rng.integers(3, 40))).round(1).tolist()
+        for _ in range(count)
+    ]
+
+
+def test_geometry_imports_without_qt():
+    code = (
+        "import sys;"
+        "sys.path.insert(0, 'src');"
+        "import digitalsreeni_image_annotator.core.geometry as m;"
+        "qt = [n for n in sys.modules if n.startswith('PyQt6')];"
+        "assert not qt, qt"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+
+
+def test_areas_and_boxes_match_the_scalar_helpers():
+    polygons = _polygons(200)
+    packed = PackedPolygons(polygons)
+
+    assert packed.areas() == pytest.approx(
+        [calculate_area({"segmentation": polygon}) for polygon in polygons]
+    )
+    assert packed.bboxes() == pytest.approx(
+        np.array([calculate_bbox(polygon) for polygon in polygons])
+    )
+
+
+def test_degenerate_polygons_have_no_area_and_no_bounds():
+    packed = PackedPolygons([None, [], [5], [0, 0, 4, 0, 4, 3], [0, 0, 4, 0, 4, 3, 9]])
+
+    assert packed.counts.tolist() == [0, 0, 0, 3, 3]
+    assert packed.areas().tolist() == [0.0, 0.0, 0.0, 6.0, 6.0]
+    bounds = packed.bounds()
+    assert np.isnan(bounds[:3]).all()
+    assert bounds[3:].tolist() == [[0, 0, 4, 3], [0, 0, 4, 3]]
+
+
+def test_annotation_areas_fall_back_to_the_box():
+    annotations = [
+        {"segmentation": [0, 0, 10, 0, 10, 10, 0, 10]},
+        {"bbox": [1, 1, 3, 4]},
+        {"keypoints": [1, 1, 2]},
+        {"segmentation": [], "bbox": [0, 0, 5, 5]},
+    ]
+    expected = [calculate_area(annotation) for annotation in annotations]
+    assert annotation_areas(annotations).tolist() == expected == [100, 12, 0, 0]
+
+
+def test_keypoint_rows_drop_a_partial_triple():
+    assert keypoint_rows([1, 2, 2, 3, 4, 0, 5]).tolist() == [[1, 2, 2], [3, 4, 0]]
+    assert keypoint_rows(None).shape == (0, 3)
+
+
+def test_geometry_rules_match_the_per_annotation_reference():
+    polygons = _polygons(60, seed=3)
+    annotations = {
+        "a.png": {
+            "cell": [
+                {"segmentation": polygon, "number": k, "bbox": calculate_bbox(polygon)}
+                for k, polygon in enumerate(polygons)
+            ],
+        },
+    }
+    annotations["a.png"]["cell"][7]["bbox"] = [0, 0, 1, 1]
+    sizes = {"a.png": (400, 400)}
+
+    findings = annotation_qc.check_geometry(annotations, sizes, QCConfig())
+
+    out = [
+        k for k, polygon in enumerate(polygons)
+        if min(polygon[0::2]) < 0 or max(polygon[0::2]) > 400
+        or min(polygon[1::2]) < 0 or max(polygon[1::2]) > 400
+    ]
+    assert [
+        f.annotation_number for f in findings if f.rule == annotation_qc.RULE_OUT_OF_BOUNDS
+    ] == out
+    mismatched = [f for f in findings if f.rule == annotation_qc.RULE_BBOX_MISMATCH]
+    assert [f.annotation_number for f in mismatched] == [7]
+    assert mismatched[0].detail["derived"] == calculate_bbox(polygons[7])
+
+
+def test_the_proposal_filter_only_compares_proposals_near_existing_ones(monkeypatch):
+    square = [0, 0, 20, 0, 20, 20, 0, 20]
+    far = [300, 300, 320, 300, 320, 320, 300, 320]
+    compared = []
+    real = mask_filters.polygon_iou
+
+    def _counted(a, b):
+        compared.append((a, b))
+        return real(a, b)
+
+    monkeypatch.setattr(mask_filters, "polygon_iou", _counted)
+    kept, dropped = mask_filters.filter_mask_proposals(
+        [{"segmentation": square, "score": 0.9}, {"segmentation": far, "score": 0.8}],
+        1000, 1000, existing_segmentations=[square, None], min_area=10,
+    )
+
+    assert [p["segmentation"] for p in kept] == [far]
+    assert dropped["overlapping"] == 1
+    assert compared == [(square, square)]
@@ -0,0 +1,191 @@
+"""Single-pass multi-class Grounding DINO (core/grounding_prompt, DINOUtils).
+
+Detection ran one full forward pass per class. In single-pass mode the
+classes' phrases share one prompt (chunked at the token limit), and each
+token's score is traced back to the class whose phrase it came from.
+"""
+
+import subprocess
+import sys
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from src.digitalsreeni_image_annotator.core import grounding_prompt
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("torchvision")
+transformers = pytest.importorskip("transformers")
+
+
+def _words(text):
+    return len(text.split())
+
+
+# --- core ------------------------------------------------------------------
+
+
+def test_grounding_prompt_imports_without_qt():
+    code = (
+        "import sys;"
+        "sys.path.insert(0, 'src');"
+        "import digitalsreeni_image_annotator.core.grounding_prompt as m;"
+        "qt = [n for n in sys.modules if n.startswith('PyQt6')];"
+        "assert not qt, qt"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+
+
+def test_phrases_are_cleaned_as_the_per_class_pass_does():
+    assert grounding_prompt.clean_phrases({"name": "cell", "phrases": [" round cell.", " "]}) == [
+        "round cell"
+    ]
+    assert grounding_prompt.clean_phrases({"name": "cell", "phrases": []}) == ["cell"]
+    assert grounding_prompt.class_prompt(["cell", "nucleus"]) == "cell . nucleus ."
+
+
+def test_classes_share_one_prompt_when_they_fit():
+    (chunk,) = grounding_prompt.pack_prompts([["cell"], ["red blood cell", "rbc"]], _words)
+    assert chunk.text == "cell . red blood cell . rbc ."
+    assert [chunk.text[a:b] for a, b, _ in chunk.spans] == ["cell", "red blood cell", "rbc"]
+    assert [c for _, _, c in chunk.spans] == [0, 1, 1]
+
+
+def test_classes_are_chunked_at_the_limit_and_never_split():
+    # Each class costs 3 "tokens" ("a . b ." has 4 words; "x ." has 2), the
+    # budget is 8 - 2 special tokens = 6.
+    phrase_lists = [["a", "b"], ["c"], ["d"], ["e"]]
+    chunks = grounding_prompt.pack_prompts(phrase_lists, _words, max_tokens=8)
+    assert [chunk.classes for chunk in chunks] == [[0, 1], [2, 3]]
+
+
+def test_an_oversized_class_gets_a_prompt_of_its_own():
+    chunks = grounding_prompt.pack_prompts([["a"], ["w"] * 20, ["b"]], _words, max_tokens=8)
+    assert [chunk.classes for chunk in chunks] == [[0], [1], [2]]
+
+
+def test_tokens_map_back_to_their_class_and_separators_to_none():
+    (chunk,) = grounding_prompt.pack_prompts([["cell"], ["dead cell"]], _words)
+    # "cell . dead cell ." with [CLS]/[SEP] reported as (0, 0)
+    offsets = [(0, 0), (0, 4), (5, 6), (7, 11), (12, 16), (17, 18), (0, 0)]
+    assert grounding_prompt.token_classes(offsets, chunk.spans) == [-1, 0, -1, 1, 1, -1, -1]
+
+
+# --- DINOUtils -------------------------------------------------------------
+
+
+@pytest.fixture
+def tokenizer():
+    words = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]", ".", "cell", "dead", "nucleus"]
+    return transformers.BertTokenizer(vocab={word: i for i, word in enumerate(words)})
+
+
+class _Inputs(dict):
+    def to(self, device):
+        return self
+
+
+class _Processor:
+    def __init__(self, tokenizer):
+        self.tokenizer = tokenizer
+        self.prompts = []
+        self.batches = []
+
+    def __call__(self, images=None, text=None, return_tensors=None):
+        self.prompts.append(text[0])
+        self.batches.append(len(images))
+        return _Inputs(input_ids=self.tokenizer(text, return_tensors="pt")["input_ids"])
+
+
+class _Model:
+    """Three queries: a box whose best token is "nucleus", a second box
+    matching "dead cell", and a near-duplicate of the first that scores
+    lower (per-class NMS must drop it)."""
+
+    config = SimpleNamespace(max_text_len=256)
+
+    def __init__(self, tokenizer):
+        self.tokenizer = tokenizer
+        self.calls = 0
+
+    def __call__(self, input_ids):
+        self.calls += 1
+        batch = len(input_ids)
+        tokens = self.tokenizer.convert_ids_to_tokens(input_ids[0].tolist())
+        logits = torch.full((batch, 3, 256), -10.0)
+        for position, token in enumerate(tokens):
+            if token == "nucleus":
+                logits[:, 0, position] = 2.0
+                logits[:, 2, position] = 1.0
+            elif token == "dead":
+                logits[:, 1, position] = 0.0  # sigmoid 0.5
+        boxes = torch.tensor([[0.2, 0.2, 0.1, 0.1], [0.7, 0.7, 0.2, 0.2], [0.2, 0.2, 0.1, 0.1]])
+        return SimpleNamespace(logits=logits, pred_boxes=boxes.repeat(batch, 1, 1))
+
+
+@pytest.fixture
+def dino(qtbot, tokenizer):
+    from src.digitalsreeni_image_annotator.inference.dino_utils import DINOUtils
+
+    utils = DINOUtils()
+    utils._proc = _Processor(tokenizer)
+    utils._model = _Model(tokenizer)
+    return utils
+
+
+def _pil(width=200, height=100):
+    from PIL import Image
+
+    return Image.new("RGB", (width, height))
+
+
+def test_one_forward_pass_serves_every_class(dino):
+    configs = [
+        {"name": "nucleus", "phrases": ["nucleus"], "box_thr": 0.3},
+        {"name": "dead", "phrases": ["dead cell"], "box_thr": 0.3},
+        {"name": "cell", "phrases": ["cell"], "box_thr": 0.3},
+    ]
+    (per_class,) = dino._run_single_pass([_pil()], configs, "cpu")
+
+    assert dino._model.calls == 1
+    assert dino._proc.prompts == ["nucleus . dead cell . cell ."]
+    (nucleus_boxes, nucleus_scores, nucleus_labels), dead, cell = per_class
+    assert nucleus_labels == ["nucleus"], "the near-duplicate survived per-class NMS"
+    assert nucleus_boxes[0].tolist() == pytest.approx([30.0, 15.0, 50.0, 25.0])
+    assert nucleus_scores[0].item() == pytest.approx(torch.sigmoid(torch.tensor(2.0)).item())
+    assert dead[2] == ["dead"]
+    assert cell[2] == []
+
+
+def test_per_class_box_thresholds_still_apply(dino):
+    configs = [
+        {"name": "nucleus", "phrases": ["nucleus"], "box_thr": 0.3},
+        {"name": "dead", "phrases": ["dead cell"], "box_thr": 0.6},
+    ]
+    ((_, dead),) = dino._run_single_pass([_pil()], configs, "cpu")
+    assert dead[2] == []
+
+
+def test_single_pass_is_routed_from_detect_blocking(dino, monkeypatch):
+    monkeypatch.setattr(dino, "_load_model_blocking", lambda path: None)
+    dino._loaded_model_path = "model"
+    configs = [
+        {"name": "nucleus", "phrases": ["nucleus"]},
+        {"name": "dead", "phrases": ["dead cell"]},
+    ]
+    results = dino._detect_blocking(
+        np.zeros((100, 200, 3), np.uint8), configs, "model", None, single_pass=True
+    )
+    assert dino._model.calls == 1
+    assert sorted(r["class_name"] for r in results) == ["dead", "nucleus"]
+
+
+def test_images_share_each_forward_pass(dino):
+    configs = [{"name": "nucleus", "phrases": ["nucleus"], "box_thr": 0.3}]
+    wide, tall = dino._run_single_pass([_pil(200, 100), _pil(100, 200)], configs, "cpu")
+    assert dino._model.calls == 1
+    assert dino._proc.batches == [2]
+    assert wide[0][0].tolist() == [pytest.approx([30.0, 15.0, 50.0, 25.0])]
+    assert tall[0][0].tolist() == [pytest.approx([15.0, 30.0, 25.0, 50.0])]
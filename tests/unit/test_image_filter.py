@@ -5,11 +5,12 @@ Covers ImageController.image_has_annotations and apply_image_filter.
 """
 
 import pytest
-from PyQt6.QtWidgets import QWidget, QListWidget, QComboBox
+from PyQt6.QtWidgets import QWidget, QComboBox
 
 from src.digitalsreeni_image_annotator.controllers.image_controller import (
     ImageController,
 )
+from src.digitalsreeni_image_annotator.ui.image_list_model import ImageListView
 
 
 FILTER_ALL = 0
@@ -25,7 +26,7 @@ class FakeMainWindow(QWidget):
 def mw(qtbot):
     window = FakeMainWindow()
     qtbot.addWidget(window)
-    window.image_list = QListWidget(window)
+    window.image_list = ImageListView(lambda: window.all_images, parent=window)
     window.image_filter_combo = QComboBox(window)
     window.image_filter_combo.addItems(
         ["All images", "Without annotations", "With annotations"]
@@ -43,7 +44,7 @@ def _add_image(mw, file_name, is_multi_slice=False):
     mw.all_images.append(
         {"file_name": file_name, "is_multi_slice": is_multi_slice}
     )
-    mw.image_list.addItem(file_name)
+    mw.image_list.sync()
 
 
 class TestImageHasAnnotations:
@@ -213,3 +214,91 @@ class TestGroupFilter:
         assert not any(
             mw.image_list.isRowHidden(i) for i in range(mw.image_list.count())
         )
+
+
+class TestIncrementalRefresh:
+    """After the first full pass, a mutation repaints only the rows whose
+    status flipped (refresh_annotation_status), from the annotation index."""
+
+    ANNOTATION = {"cell": [{"segmentation": [0, 0, 1, 0, 1, 1]}]}
+
+    @pytest.fixture
+    def project(self, mw, monkeypatch):
+        mw.current_slice = None
+        mw.image_file_name = "a.png"
+        for name in ("a.png", "b.png"):
+            _add_image(mw, name)
+        _add_image(mw, "stack.tif", is_multi_slice=True)
+        mw.image_slices["stack"] = [("stack_Z1", None), ("stack_Z2", None)]
+        mw.image_filter_combo.setCurrentIndex(FILTER_WITH)
+        mw.image_controller.apply_image_filter()
+        # Rows repainted one by one, and full re-filters of the list.
+        mw.repainted, mw.full_passes = [], []
+        refresh_rows = mw.image_list.refresh_rows
+        set_row_filter = mw.image_list.set_row_filter
+        monkeypatch.setattr(
+            mw.image_list, "refresh_rows",
+            lambda names=None: mw.repainted.append(sorted(names)) or refresh_rows(names),
+        )
+        monkeypatch.setattr(
+            mw.image_list, "set_row_filter",
+            lambda hide: mw.full_passes.append(hide) or set_row_filter(hide),
+        )
+        return mw
+
+    def _visible(self, mw):
+        return [
+            mw.image_list.item(i).text()
+            for i in range(mw.image_list.count())
+            if not mw.image_list.isRowHidden(i)
+        ]
+
+    def test_an_edit_of_the_current_image_repaints_only_its_row(self, project):
+        project.all_annotations["a.png"] = dict(self.ANNOTATION)
+        project.image_controller.refresh_annotation_status()
+
+        assert project.repainted == [["a.png"]]
+        assert project.full_passes == []
+        assert self._visible(project) == ["a.png"]
+
+        project.image_controller.refresh_annotation_status()
+        assert project.repainted == [["a.png"]], "nothing flipped, nothing repainted"
+
+    def test_a_noted_off_screen_slice_flips_its_stack(self, project):
+        project.all_annotations["stack_Z2"] = dict(self.ANNOTATION)
+        project.image_controller.note_annotations_changed("stack_Z2")
+        project.image_controller.refresh_annotation_status()
+
+        assert project.repainted == [["stack.tif"]]
+        assert self._visible(project) == ["stack.tif"]
+
+        del project.all_annotations["stack_Z2"]
+        project.image_controller.note_annotations_changed("stack_Z2")
+        project.image_controller.refresh_annotation_status()
+        assert self._visible(project) == []
+
+    def test_an_unnoted_new_key_falls_back_to_the_full_pass(self, project):
+        project.all_annotations["b.png"] = dict(self.ANNOTATION)
+        project.image_controller.refresh_annotation_status()
+
+        assert len(project.full_passes) == 1
+        assert project.repainted == []
+        assert self._visible(project) == ["b.png"]
+
+    def test_the_index_agrees_with_image_has_annotations(self, mw):
+        _add_image(mw, "plain.png")
+        _add_image(mw, "loaded.tif", is_multi_slice=True)
+        _add_image(mw, "unloaded.tif", is_multi_slice=True)
+        _add_image(mw, "un.tif", is_multi_slice=True)
+        mw.image_slices["loaded"] = [("loaded_Z1", None)]
+        mw.all_annotations.update({
+            "plain.png": {"cell": []},
+            "loaded_8bit": dict(self.ANNOTATION),
+            "unloaded_T1_Z3": dict(self.ANNOTATION),
+        })
+        mw.image_controller.apply_image_filter()
+
+        for info in mw.all_images:
+            assert mw.image_controller.annotation_index.annotated(
+                info["file_name"]
+            ) == mw.image_controller.image_has_annotations(info), info
@@ -0,0 +1,145 @@
+"""
+Unit tests for the model/view image and slice lists (ui/image_list_model).
+
+The view stands in for the QListWidget the controllers were written
+against: rows are model rows (hidden ones included), item(i) is
+all_images[i], and currentRowChanged -- wired to switch_image -- fires only
+when the user or a caller moves the current row, never because rows were
+sorted, hidden or re-read.
+"""
+
+import pytest
+from PyQt6.QtCore import Qt
+from PyQt6.QtGui import QColor
+
+from src.digitalsreeni_image_annotator.ui.image_list_model import (
+    ImageListView,
+    SliceListView,
+)
+
+
+@pytest.fixture
+def images():
+    return [{"file_name": name} for name in ("c.png", "a.png", "d.png", "b.png")]
+
+
+@pytest.fixture
+def view(qtbot, images):
+    made = ImageListView(lambda: images)
+    qtbot.addWidget(made)
+    made.sync()
+    made.moves = []
+    made.currentRowChanged.connect(made.moves.append)
+    return made
+
+
+def _texts(view):
+    return [view.item(row).text() for row in range(view.count())]
+
+
+def _by_name(info):
+    return info["file_name"]
+
+
+def test_rows_are_all_images(view, images):
+    assert _texts(view) == [info["file_name"] for info in images]
+    assert view.item(view.count()) is None
+    assert view.findItems("d.png", Qt.MatchFlag.MatchExactly)[0].row() == 2
+    assert view.findItems("nope.png", Qt.MatchFlag.MatchExactly) == []
+
+
+def test_a_sort_moves_the_current_row_with_its_image(view, images):
+    view.setCurrentRow(0)  # c.png
+    assert view.moves == [0]
+
+    view.sort_images(_by_name)
+
+    assert [info["file_name"] for info in images] == _texts(view)
+    assert _texts(view) == ["a.png", "b.png", "c.png", "d.png"]
+    assert view.currentItem().text() == "c.png"
+    assert view.currentRow() == 2
+    assert view.moves == [0], "a sort is not a navigation"
+
+
+def test_the_current_row_stays_current_while_hidden(view):
+    view.setCurrentRow(1)  # a.png
+    view.moves.clear()
+
+    view.set_row_filter(lambda row: view.item(row).text() in {"a.png", "b.png"})
+    assert [view.isRowHidden(row) for row in range(4)] == [False, True, False, True]
+    assert view.currentItem().text() == "a.png"
+
+    view.set_row_filter(None)
+    assert not any(view.isRowHidden(row) for row in range(4))
+    assert view.selectionModel().currentIndex().row() == 1
+    assert view.moves == []
+
+
+def test_a_refreshed_row_is_filtered_again(view):
+    hidden = {"a.png"}
+    view.set_row_filter(lambda row: view.item(row).text() in hidden)
+
+    hidden = {"d.png"}
+    view.refresh_rows(["a.png", "d.png"])
+
+    assert [view.isRowHidden(row) for row in range(4)] == [False, False, True, False]
+
+
+def test_sync_follows_appends_and_rebinds(qtbot):
+    holder = {"images": [{"file_name": "a.png"}, {"file_name": "b.png"}]}
+    view = ImageListView(lambda: holder["images"])
+    qtbot.addWidget(view)
+    view.sync()
+    view.setCurrentRow(1)
+    moves = []
+    view.currentRowChanged.connect(moves.append)
+
+    holder["images"].append({"file_name": "c.png"})
+    view.sync()
+    assert view.count() == 3 and view.currentRow() == 1
+
+    holder["images"] = [{"file_name": "b.png"}, {"file_name": "c.png"}]
+    view.sync()
+    assert view.currentItem().text() == "b.png"
+
+    holder["images"] = [{"file_name": "c.png"}]
+    view.sync()
+    assert view.currentItem() is None
+    assert moves == []
+
+
+def test_selected_items_are_model_rows(view):
+    view.set_row_filter(lambda row: row == 0)
+    for name in ("d.png", "b.png"):
+        view.findItems(name, Qt.MatchFlag.MatchExactly)[0].setSelected(True)
+
+    assert [item.text() for item in view.selectedItems()] == ["d.png", "b.png"]
+
+
+def test_only_painted_rows_are_read(qtbot):
+    images = [{"file_name": f"img{i:05d}.png"} for i in range(20000)]
+    asked = []
+    view = ImageListView(lambda: images, lambda name: asked.append(name))
+    qtbot.addWidget(view)
+    view.resize(200, 200)
+    view.sync()
+    view.sort_images(lambda info: info["file_name"][::-1])
+    view.grab()
+
+    assert 0 < len(set(asked)) < 100
+
+
+def test_slice_rows_are_coloured_when_read(qtbot):
+    annotated = {"s_Z2"}
+    colours = {True: (QColor("white"), QColor("blue")),
+               False: (QColor("black"), QColor("gray"))}
+    view = SliceListView(lambda name: colours[name in annotated])
+    qtbot.addWidget(view)
+    view.set_names(["s_Z1", "s_Z2"])
+
+    assert view.item(1).data(Qt.ItemDataRole.BackgroundRole) == QColor("blue")
+    annotated.clear()
+    assert view.item(1).data(Qt.ItemDataRole.BackgroundRole) == QColor("gray")
+
+    view.clear()
+    assert view.count() == 0
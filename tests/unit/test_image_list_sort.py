@@ -7,11 +7,12 @@ by COCO import), and never fire a spurious switch_image.
 """
 
 import pytest
-from PyQt6.QtWidgets import QWidget, QListWidget, QComboBox
+from PyQt6.QtWidgets import QWidget, QComboBox
 
 from src.digitalsreeni_image_annotator.controllers.image_controller import (
     ImageController,
 )
+from src.digitalsreeni_image_annotator.ui.image_list_model import ImageListView
 
 
 class FakeMainWindow(QWidget):
@@ -22,7 +23,7 @@ class FakeMainWindow(QWidget):
 def mw(qtbot):
     window = FakeMainWindow()
     qtbot.addWidget(window)
-    window.image_list = QListWidget(window)
+    window.image_list = ImageListView(lambda: window.all_images, parent=window)
     window.image_filter_combo = QComboBox(window)
     window.image_filter_combo.addItems(
         ["All images", "Without annotations", "With annotations"]
@@ -40,11 +41,11 @@ def mw(qtbot):
 
 
 def _populate(mw, names):
-    # Populate out of order, mimicking the model+view pairing that
-    # add_images_to_list produces before a sort.
+    # Populate out of order, mimicking what add_images_to_list leaves
+    # before a sort.
     for n in names:
         mw.all_images.append({"file_name": n, "is_multi_slice": False})
-        mw.image_list.addItem(n)
+    mw.image_list.sync()
 
 
 def _list_texts(mw):
@@ -104,7 +105,7 @@ def _populate_grouped(mw, entries):
         if group:
             info["group"] = group
         mw.all_images.append(info)
-        mw.image_list.addItem(name)
+    mw.image_list.sync()
 
 
 def test_grouped_images_cluster_then_sort_by_name(mw):
@@ -6,11 +6,12 @@ annotated rows and a hollow dot on un-annotated ones, cached per
 (annotated, dark_mode) and rebuilt on a theme flip.
 """
 
-from PyQt6.QtWidgets import QListWidget, QWidget
+from PyQt6.QtWidgets import QWidget
 
 from src.digitalsreeni_image_annotator.controllers.image_controller import (
     ImageController,
 )
+from src.digitalsreeni_image_annotator.ui.image_list_model import ImageListView
 
 
 class FakeMainWindow(QWidget):
@@ -19,7 +20,11 @@ class FakeMainWindow(QWidget):
 
 def _make_window():
     window = FakeMainWindow()
-    window.image_list = QListWidget(window)
+    window.image_list = ImageListView(
+        lambda: window.all_images,
+        lambda name: window.image_controller.status_icon_for(name),
+        parent=window,
+    )
     window.all_images = []
     window.all_annotations = {}
     window.image_slices = {}
@@ -30,7 +35,7 @@ def _make_window():
 
 def _add_image(window, name, annotated=False):
     window.all_images.append({"file_name": name, "is_multi_slice": False})
-    window.image_list.addItem(name)
+    window.image_list.sync()
     if annotated:
         window.all_annotations[name] = {
             "cell": [{"segmentation": [0, 0, 1, 0, 1, 1]}]
@@ -61,11 +66,13 @@ def test_icons_are_cached_per_state(qt_application):
     _add_image(window, "a.png", annotated=True)
 
     window.image_controller.refresh_image_status_icons()
+    window.image_list.item(0).icon()  # built when the row is painted
     cache = window.image_controller._status_icon_cache
     assert (True, False) in cache  # annotated, light theme
 
     cached_icon = cache[(True, False)]
     window.image_controller.refresh_image_status_icons()
+    window.image_list.item(0).icon()
     # Second refresh reuses the same cached QIcon object.
     assert cache[(True, False)] is cached_icon
 
@@ -85,12 +92,11 @@ def test_theme_flip_repaints_icons_with_theme_tuned_colors(qt_application):
 
     window.dark_mode = True
     window.image_controller.on_theme_changed()
+    dark_img = window.image_list.item(0).icon().pixmap(12, 12).toImage()
 
     cache = window.image_controller._status_icon_cache
     assert (False, True) in cache  # rebuilt for the dark theme
     assert (False, False) not in cache  # stale light-theme entry cleared
-
-    dark_img = window.image_list.item(0).icon().pixmap(12, 12).toImage()
     assert dark_img != light_img  # the dot actually recolours per theme
 
     window.deleteLater()
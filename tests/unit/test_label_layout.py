@@ -0,0 +1,121 @@
+"""Batched, decluttered annotation labels (core/label_layout, CanvasRenderer).
+
+Labels used to be laid out per annotation per repaint and drawn on top of each
+other on dense images. Now they are laid out once, drawn in screen space, and
+a label that would overlap one already placed is dropped.
+"""
+
+import random
+import subprocess
+import sys
+
+import pytest
+from PyQt6.QtGui import QColor
+
+from src.digitalsreeni_image_annotator.core import label_layout
+from tests.canvas_fixtures import RecordingPainter, make_label, square
+
+
+def _overlap(a, b):
+    return a[0] < b[0] + b[2] and b[0] < a[0] + a[2] and a[1] < b[1] + b[3] and b[1] < a[1] + a[3]
+
+
+# --- core ------------------------------------------------------------------
+
+
+def test_label_layout_imports_without_qt():
+    code = (
+        "import sys;"
+        "sys.path.insert(0, 'src');"
+        "import digitalsreeni_image_annotator.core.label_layout as m;"
+        "qt = [n for n in sys.modules if n.startswith('PyQt6')];"
+        "assert not qt, qt"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+
+
+def test_no_two_kept_labels_overlap():
+    rng = random.Random(0)
+    boxes = [(rng.uniform(0, 500), rng.uniform(0, 500), 40.0, 14.0) for _ in range(2000)]
+    kept = label_layout.declutter(boxes)
+    assert 0 < len(kept) < len(boxes)
+    for n, i in enumerate(kept):
+        for j in kept[n + 1:]:
+            assert not _overlap(boxes[i], boxes[j])
+
+
+def test_separated_labels_are_all_kept():
+    boxes = [(x * 100.0, 0.0, 40.0, 14.0) for x in range(50)]
+    assert label_layout.declutter(boxes) == list(range(50))
+
+
+def test_priority_decides_who_wins_a_collision():
+    boxes = [(0.0, 0.0, 40.0, 14.0), (10.0, 5.0, 40.0, 14.0)]
+    assert label_layout.declutter(boxes) == [0]
+    assert label_layout.declutter(boxes, order=[1, 0]) == [1]
+
+
+def test_labels_off_the_viewport_are_culled_and_claim_no_space():
+    boxes = [(-100.0, 0.0, 40.0, 14.0), (200.0, 0.0, 40.0, 14.0), (-90.0, 2.0, 40.0, 14.0)]
+    assert label_layout.declutter(boxes, viewport=(0.0, 0.0, 300.0, 300.0)) == [1]
+
+
+def test_no_boxes_keeps_nothing():
+    assert label_layout.declutter([]) == []
+
+
+# --- wired into the renderer -----------------------------------------------
+
+
+@pytest.fixture
+def label(qtbot):
+    lbl = make_label(qtbot, width=1000, height=1000)
+    lbl.class_colors = {"cell": QColor("#1F77B4")}
+    return lbl
+
+
+def _draw(label):
+    painter = RecordingPainter()
+    label.renderer.draw_annotations(painter)
+    return painter
+
+
+def test_overlapping_labels_are_decluttered_and_come_back_on_zoom_in(label):
+    label.annotations = {"cell": [square(100 + i, 100, 40, number=i + 1) for i in range(5)]}
+    label.zoom_factor = 1.0
+    assert _draw(label).texts() == ["cell 1"]
+    label.zoom_factor = 50.0
+    assert len(_draw(label).texts()) == 5
+
+
+def test_a_selected_annotation_keeps_its_label(label):
+    annotations = [square(100 + i, 100, 40, number=i + 1) for i in range(5)]
+    label.annotations = {"cell": annotations}
+    label.highlighted_annotations = [annotations[3]]
+    assert _draw(label).texts() == ["cell 4"]
+
+
+def test_labels_are_drawn_after_every_shape(label):
+    label.annotations = {"cell": [square(10, 10, 40, number=1), square(300, 300, 40, number=2)]}
+    painter = _draw(label)
+    assert painter.index_of("drawStaticText") > painter.index_of("drawPolygon", occurrence=1)
+
+
+def test_layouts_and_fonts_are_reused_across_repaints_and_zoom(label):
+    label.annotations = {"cell": [square(10, 10, 40, number=1)]}
+    first = next(a[1] for n, a in _draw(label).calls if n == "drawStaticText")
+    label.zoom_factor = 0.5
+    second = next(a[1] for n, a in _draw(label).calls if n == "drawStaticText")
+    assert first is second
+    assert label.renderer._overlay_font() is label.renderer._overlay_font()
+
+
+def test_centroid_is_cached_until_the_segmentation_is_replaced(label):
+    annotation = square(10, 10, 40)
+    renderer = label.renderer
+    first = renderer._ring_centroid(annotation["segmentation"], annotation)
+    assert renderer._ring_centroid(annotation["segmentation"], annotation) is first
+    annotation["segmentation"] = [c + 10 for c in annotation["segmentation"]]
+    moved = renderer._ring_centroid(annotation["segmentation"], annotation)
+    assert (moved.x(), moved.y()) == (first.x() + 10, first.y() + 10)
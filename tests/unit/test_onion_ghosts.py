@@ -0,0 +1,174 @@
+"""Onion-skin image ghosts prepared off the GUI thread (widgets/onion_ghosts).
+
+Pins three promises: a slice step does no decode or smooth rescale on the GUI
+thread for a lazy stack, a one-slice step reuses the slice just shown as the
+new ghost, and a zoom change stretches the old ghost until its rescale lands.
+"""
+
+import threading
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from PyQt6.QtGui import QPixmap
+
+from src.digitalsreeni_image_annotator.core import onion
+from src.digitalsreeni_image_annotator.core.slice_cache import (
+    LazySliceList,
+    SliceProvider,
+    get_shared_lru,
+)
+from tests.canvas_fixtures import RecordingPainter, make_label
+
+
+@pytest.fixture
+def label(qtbot):
+    return make_label(qtbot, width=64, height=48)
+
+
+@pytest.fixture
+def stack():
+    array = np.random.default_rng(0).integers(0, 255, (5, 48, 64), dtype=np.uint8)
+    slices = LazySliceList(SliceProvider(array, ["Z", "H", "W"], "stack"))
+    yield slices
+    slices.release()
+
+
+def _controller(label, slices, current):
+    from src.digitalsreeni_image_annotator.controllers.image_controller import (
+        ImageController,
+    )
+
+    controller = ImageController.__new__(ImageController)
+    controller.mw = SimpleNamespace(
+        image_label=label,
+        onion_enabled=True,
+        onion_opacity=0.5,
+        onion_offset=1,
+        onion_mode=onion.MODE_PREVIOUS,
+        onion_content=onion.CONTENT_IMAGE,
+        current_slice=current,
+        current_image=None,
+        slices=slices,
+        all_annotations={},
+    )
+    return controller
+
+
+def _show(controller, name):
+    """What switch_slice + display_image do for ``name``."""
+    image = controller.mw.slices.get(name)
+    controller.mw.current_slice = name
+    controller.mw.current_image = image
+    controller.mw.image_label.setPixmap(image)
+    controller.refresh_onion_skin()
+
+
+def _settle(qtbot, controller):
+    controller._onion_preparer.wait()
+    qtbot.waitUntil(lambda: not controller._onion_preparer._threads, timeout=2000)
+
+
+def test_ghost_arrives_from_the_worker_at_the_current_zoom(qtbot, label, stack):
+    label.zoom_factor = 0.5
+    controller = _controller(label, stack, "stack_Z3")
+    lru = get_shared_lru()
+    _show(controller, "stack_Z3")
+    cached_before = lru.count_prefix(stack.provider_id)
+    _settle(qtbot, controller)
+
+    (ghost,) = label.scaled_onion_pixmaps()
+    assert (ghost.width(), ghost.height()) == (32, 24)
+    assert lru.count_prefix(stack.provider_id) == cached_before, "worker wrote to the LRU"
+
+
+def test_a_one_slice_step_reuses_the_slice_just_shown(qtbot, label, stack):
+    controller = _controller(label, stack, "stack_Z3")
+    _show(controller, "stack_Z3")
+    _settle(qtbot, controller)
+    shown = label.scaled_pixmap
+
+    _show(controller, "stack_Z4")
+
+    assert not controller._onion_preparer._threads, "re-prepared a ghost it already had"
+    (ghost,) = label.scaled_onion_pixmaps()
+    assert ghost.cacheKey() == shown.cacheKey()
+
+
+def test_a_superseded_step_never_lands(qtbot, label, stack):
+    controller = _controller(label, stack, "stack_Z2")
+    stack.release()  # nothing cached: both steps go to the worker
+    controller.mw.current_slice = "stack_Z2"
+    controller.refresh_onion_skin()
+    controller.mw.current_slice = "stack_Z5"
+    controller.refresh_onion_skin()
+    _settle(qtbot, controller)
+
+    assert controller._onion_preparer._wanted == [(stack.provider_id, "stack_Z4")]
+    assert len(label.scaled_onion_pixmaps()) == 1
+
+
+def test_disabling_drops_ghosts_still_in_flight(qtbot, label, stack):
+    controller = _controller(label, stack, "stack_Z3")
+    _show(controller, "stack_Z3")
+    controller.mw.onion_enabled = False
+    controller.refresh_onion_skin()
+    _settle(qtbot, controller)
+    assert label.scaled_onion_pixmaps() == []
+
+
+def test_a_zoom_change_stretches_then_rescales(qtbot, label, stack):
+    controller = _controller(label, stack, "stack_Z3")
+    _show(controller, "stack_Z3")
+    _settle(qtbot, controller)
+
+    label.zoom_factor = 2.0
+    ((_, stretch),) = label.onion_layers()
+    assert stretch == pytest.approx(2.0)
+    _settle(qtbot, controller)
+    ((pixmap, stretch),) = label.onion_layers()
+    assert stretch == 1.0
+    assert pixmap.width() == 128
+
+
+def test_a_provider_without_thread_safe_extract_decodes_on_the_gui_thread(qtbot, label):
+    decoded_on = []
+
+    class _VideoLike:
+        provider_id = 424242
+        names = ["clip_frame_000000", "clip_frame_000001"]
+
+        def extract(self, name):
+            decoded_on.append(threading.current_thread())
+            return QPixmap(64, 48).toImage()
+
+    slices = LazySliceList(_VideoLike())
+    try:
+        controller = _controller(label, slices, "clip_frame_000001")
+        controller.refresh_onion_skin()
+        _settle(qtbot, controller)
+    finally:
+        slices.release()
+    assert decoded_on == [threading.main_thread()]
+    assert len(label.scaled_onion_pixmaps()) == 1
+
+
+# --- the label/renderer side -----------------------------------------------
+
+
+def test_stale_ghost_is_drawn_stretched_and_rescale_is_asked_once(label):
+    pixmap = QPixmap(64, 48)
+    requested = []
+    label.set_prepared_onion_pixmaps([(pixmap, 1.0)], requested.append)
+    label.zoom_factor = 2.0
+    for _ in range(2):
+        painter = RecordingPainter()
+        label.renderer.draw_onion_skin(painter)
+    assert ("scale", (2.0, 2.0)) in painter.calls
+    assert requested == [2.0]
+
+
+def test_plain_ghosts_drop_the_prepared_state(label):
+    label.set_prepared_onion_pixmaps([(QPixmap(8, 8), 1.0)], lambda zoom: None)
+    label.set_onion_pixmaps([])
+    assert label.onion_layers() == []
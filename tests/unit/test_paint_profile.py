@@ -0,0 +1,197 @@
+"""Canvas paint instrumentation (core/paint_profile).
+
+The counters are Qt-free and driven here by a fake clock, so the arithmetic is
+exact. One test at the end paints a real ``ImageLabel`` to check that the
+layers the HUD reports are the layers ``paintEvent`` actually draws.
+"""
+
+import json
+import logging
+import subprocess
+import sys
+
+import pytest
+from PyQt6.QtGui import QColor, QImage
+
+from src.digitalsreeni_image_annotator.core import paint_profile
+from src.digitalsreeni_image_annotator.core.paint_profile import PaintProfiler
+from tests.canvas_fixtures import make_label, square
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+def _frame(profiler, clock, layers, gap=0.0):
+    """One frame: each ``(name, seconds)`` in ``layers`` drawn in order."""
+    profiler.begin_frame()
+    for name, seconds in layers:
+        with profiler.layer(name):
+            clock.advance(seconds)
+    profiler.end_frame()
+    clock.advance(gap)
+
+
+# --- Qt-free guarantee -----------------------------------------------------
+
+
+def test_the_profiler_imports_without_qt():
+    code = (
+        "import sys;"
+        "sys.path.insert(0, 'src');"
+        "import digitalsreeni_image_annotator.core.paint_profile as m;"
+        "qt = [n for n in sys.modules if n.startswith('PyQt6')];"
+        "assert not qt, qt;"
+        "print('clean')"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    assert "clean" in result.stdout
+
+
+# --- counters --------------------------------------------------------------
+
+
+def test_disabled_profiler_records_nothing():
+    clock = FakeClock()
+    profiler = PaintProfiler(clock=clock)
+    _frame(profiler, clock, [("image", 0.01)])
+    report = profiler.report()
+    assert report["layers"] == {}
+    assert report["frame"]["count"] == 0
+
+
+def test_layers_are_timed_and_kept_in_draw_order():
+    clock = FakeClock()
+    profiler = PaintProfiler(clock=clock, enabled=True)
+    _frame(profiler, clock, [("image", 0.002), ("annotations", 0.010)])
+    _frame(profiler, clock, [("image", 0.004), ("annotations", 0.030)])
+
+    report = profiler.report()
+    assert list(report["layers"]) == ["image", "annotations"]
+    annotations = report["layers"]["annotations"]
+    assert annotations["count"] == 2
+    assert annotations["total_ms"] == pytest.approx(40.0)
+    assert annotations["mean_ms"] == pytest.approx(20.0)
+    assert annotations["max_ms"] == pytest.approx(30.0)
+    assert report["frame"]["mean_ms"] == pytest.approx(23.0)
+
+
+def test_rolling_window_forgets_old_samples_but_totals_do_not():
+    clock = FakeClock()
+    profiler = PaintProfiler(window=2, clock=clock, enabled=True)
+    for seconds in (0.100, 0.001, 0.001):
+        _frame(profiler, clock, [("annotations", seconds)])
+    layer = profiler.report()["layers"]["annotations"]
+    assert layer["recent_mean_ms"] == pytest.approx(1.0)
+    assert layer["max_ms"] == pytest.approx(100.0), "lifetime max survives the window"
+    assert layer["count"] == 3
+
+
+def test_fps_is_the_painted_frame_rate_not_one_over_paint_time():
+    """An idle canvas painting in 1 ms is not running at 1000 FPS."""
+    clock = FakeClock()
+    profiler = PaintProfiler(clock=clock, enabled=True)
+    for _ in range(11):
+        _frame(profiler, clock, [("image", 0.001)], gap=0.099)
+    assert profiler.fps() == pytest.approx(10.0)
+
+
+def test_a_layer_that_raises_is_still_recorded():
+    clock = FakeClock()
+    profiler = PaintProfiler(clock=clock, enabled=True)
+    with pytest.raises(RuntimeError):
+        with profiler.layer("annotations"):
+            clock.advance(0.005)
+            raise RuntimeError("boom")
+    assert profiler.report()["layers"]["annotations"]["count"] == 1
+
+
+def test_reset_clears_everything():
+    clock = FakeClock()
+    profiler = PaintProfiler(clock=clock, enabled=True)
+    _frame(profiler, clock, [("image", 0.01)], gap=0.01)
+    _frame(profiler, clock, [("image", 0.01)])
+    profiler.reset()
+    assert profiler.report()["layers"] == {}
+    assert profiler.fps() == 0.0
+
+
+def test_hud_lists_the_slowest_layer_first():
+    clock = FakeClock()
+    profiler = PaintProfiler(clock=clock, enabled=True)
+    _frame(profiler, clock, [("image", 0.001), ("annotations", 0.020), ("onion_skin", 0.005)])
+    lines = profiler.hud_lines()
+    assert "FPS" in lines[0]
+    assert [line.split()[0] for line in lines[1:]] == ["annotations", "onion_skin", "image"]
+
+
+@pytest.mark.parametrize("value, expected", [("", False), ("0", False), ("1", True), ("yes", True)])
+def test_environment_switch(value, expected):
+    assert paint_profile.enabled_from_env({paint_profile.ENV_VAR: value}) is expected
+
+
+# --- dumps -----------------------------------------------------------------
+
+
+def test_json_dump_roundtrips_with_context(tmp_path):
+    clock = FakeClock()
+    profiler = PaintProfiler(clock=clock, enabled=True)
+    _frame(profiler, clock, [("annotations", 0.01)])
+    path = profiler.dump_json(str(tmp_path / "p.json"), {"annotations": 3000})
+    data = json.loads((tmp_path / "p.json").read_text())
+    assert path.endswith("p.json")
+    assert data["version"] == paint_profile.REPORT_VERSION
+    assert data["context"] == {"annotations": 3000}
+    assert data["layers"]["annotations"]["count"] == 1
+
+
+def test_log_dump_has_one_line_per_layer(caplog):
+    clock = FakeClock()
+    profiler = PaintProfiler(clock=clock, enabled=True)
+    _frame(profiler, clock, [("image", 0.001), ("annotations", 0.01)])
+    logger = logging.getLogger("test.paint_profile")
+    with caplog.at_level(logging.INFO, logger="test.paint_profile"):
+        profiler.dump_to_log(logger)
+    messages = [r.getMessage() for r in caplog.records]
+    assert messages[0].startswith("Paint profile: 1 frames")
+    assert any("annotations" in m for m in messages[1:])
+    assert any("image" in m for m in messages[1:])
+
+
+# --- wired into the canvas -------------------------------------------------
+
+
+def test_paint_event_reports_the_canvas_layers(qtbot):
+    label = make_label(qtbot)
+    label.class_colors = {"cell": QColor("#1F77B4")}
+    label.annotations = {"cell": [square(10, 10, 40)]}
+    label.resize(200, 200)
+    label.set_paint_hud_visible(True)
+
+    target = QImage(200, 200, QImage.Format.Format_ARGB32)
+    label.render(target)
+
+    layers = label.paint_profiler.layer_names()
+    assert layers[:3] == ["image", "onion_skin", "annotations"]
+    assert "tool_overlays" in layers
+    context = label.paint_profile_context()
+    assert context["annotations"] == 1
+    assert context["vertices"] == 4
+
+
+def test_hiding_the_hud_stops_the_counters(qtbot, monkeypatch):
+    monkeypatch.delenv(paint_profile.ENV_VAR, raising=False)
+    label = make_label(qtbot)
+    label.set_paint_hud_visible(True)
+    assert label.paint_profiler.enabled
+    label.toggle_paint_hud()
+    assert not label.show_paint_hud
+    assert not label.paint_profiler.enabled
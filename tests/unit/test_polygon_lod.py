@@ -0,0 +1,190 @@
+"""Render-only level-of-detail simplification (core/polygon_lod, render_cache).
+
+The promise is two-sided: at low zoom the canvas draws fewer vertices, and the
+drawn outline never strays from the stored one by more than the screen budget.
+Neither side may touch the stored geometry.
+"""
+
+import math
+import subprocess
+import sys
+
+import pytest
+from PyQt6.QtGui import QColor
+from shapely.geometry import Polygon
+
+from src.digitalsreeni_image_annotator.core import polygon_lod
+from src.digitalsreeni_image_annotator.widgets.render_cache import RenderGeometryCache
+from tests.canvas_fixtures import RecordingPainter, make_label
+
+
+def _circle(n, r=200.0, cx=500.0, cy=500.0):
+    flat = []
+    for i in range(n):
+        a = 2 * math.pi * i / n
+        flat += [cx + r * math.cos(a), cy + r * math.sin(a)]
+    return flat
+
+
+def _polygon(flat):
+    return Polygon(list(zip(flat[0::2], flat[1::2])))
+
+
+# --- Qt-free guarantee -----------------------------------------------------
+
+
+def test_the_lod_maths_imports_without_qt():
+    code = (
+        "import sys;"
+        "sys.path.insert(0, 'src');"
+        "import digitalsreeni_image_annotator.core.polygon_lod as m;"
+        "qt = [n for n in sys.modules if n.startswith('PyQt6')];"
+        "assert not qt, qt;"
+        "print('clean')"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+
+
+# --- level selection -------------------------------------------------------
+
+
+@pytest.mark.parametrize("zoom", [1.0, 2.0, 8.0])
+def test_native_or_closer_zoom_draws_the_raw_outline(zoom):
+    assert polygon_lod.level_for_zoom(zoom) == polygon_lod.RAW_LEVEL
+
+
+@pytest.mark.parametrize("zoom", [0, -1, float("nan"), float("inf")])
+def test_nonsense_zoom_falls_back_to_raw(zoom):
+    assert polygon_lod.level_for_zoom(zoom) == polygon_lod.RAW_LEVEL
+
+
+@pytest.mark.parametrize("zoom", [0.9, 0.5, 0.3, 0.1, 0.05, 0.01, 0.001])
+def test_chosen_level_stays_inside_the_screen_budget(zoom):
+    level = polygon_lod.level_for_zoom(zoom)
+    assert 0 <= level < polygon_lod.LEVELS
+    assert polygon_lod.tolerance(level) * zoom <= polygon_lod.SCREEN_TOLERANCE_PX
+
+
+def test_coarser_zoom_never_picks_a_finer_level():
+    levels = [polygon_lod.level_for_zoom(z) for z in (0.9, 0.5, 0.25, 0.1, 0.02)]
+    assert levels == sorted(levels)
+
+
+# --- simplification --------------------------------------------------------
+
+
+def test_simplified_ring_is_within_tolerance_of_the_original():
+    flat = _circle(2000)
+    for level in range(polygon_lod.LEVELS):
+        simplified = polygon_lod.simplify_ring(flat, level)
+        assert len(simplified) < len(flat)
+        # Douglas-Peucker keeps every dropped vertex within tolerance of the
+        # simplified outline; the float32 round trip adds a hair.
+        distance = _polygon(flat).hausdorff_distance(_polygon(simplified))
+        assert distance <= polygon_lod.tolerance(level) + 1e-3
+
+
+def test_small_rings_are_left_alone():
+    flat = _circle(polygon_lod.MIN_VERTICES - 1)
+    assert polygon_lod.simplify_ring(flat, polygon_lod.LEVELS - 1) == flat
+
+
+def test_a_ring_that_would_collapse_is_kept_whole():
+    """A shape vanishing on zoom-out is worse than a few extra vertices."""
+    flat = _circle(64, r=0.2)
+    assert polygon_lod.simplify_ring(flat, polygon_lod.LEVELS - 1) == flat
+
+
+# --- the cache -------------------------------------------------------------
+
+
+def test_cache_returns_the_same_polygon_until_the_list_is_replaced(qtbot):
+    cache = RenderGeometryCache()
+    flat = _circle(100)
+    first = cache.polygon(flat, 1.0)
+    assert cache.polygon(flat, 1.0) is first
+    replaced = list(flat)
+    replaced[0] += 10
+    assert cache.polygon(replaced, 1.0) is not first
+    assert cache.polygon(replaced, 1.0)[0].x() == pytest.approx(replaced[0])
+
+
+def test_cache_holds_one_variant_per_level(qtbot):
+    cache = RenderGeometryCache()
+    flat = _circle(2000)
+    raw = cache.polygon(flat, 1.0)
+    coarse = cache.polygon(flat, 0.05)
+    assert raw.count() == 2000
+    assert coarse.count() < raw.count()
+    assert cache.polygon(flat, 0.05) is coarse
+
+
+def test_stale_entries_are_swept(qtbot):
+    cache = RenderGeometryCache()
+    cache.begin_pass()
+    for _ in range(300):
+        cache.polygon(_circle(8), 1.0)
+    for _ in range(4):
+        cache.begin_pass()
+    keep = _circle(8)
+    cache.polygon(keep, 1.0)
+    cache.begin_pass()
+    assert len(cache) <= 1
+
+
+# --- wired into the renderer -----------------------------------------------
+
+
+@pytest.fixture
+def label(qtbot):
+    lbl = make_label(qtbot, width=1000, height=1000)
+    lbl.class_colors = {"cell": QColor("#1F77B4")}
+    return lbl
+
+
+def _drawn_vertex_counts(label):
+    painter = RecordingPainter()
+    label.renderer.draw_annotations(painter)
+    return [args[0].count() for name, args in painter.calls if name == "drawPolygon"]
+
+
+def test_zoomed_out_canvas_draws_fewer_vertices_and_stores_none_of_them(label):
+    flat = _circle(2000)
+    annotation = {"segmentation": flat, "category_name": "cell", "number": 1}
+    label.annotations = {"cell": [annotation]}
+
+    label.zoom_factor = 1.0
+    assert _drawn_vertex_counts(label) == [2000]
+    label.zoom_factor = 0.1
+    (count,) = _drawn_vertex_counts(label)
+    assert count < 200
+    assert annotation["segmentation"] is flat and len(flat) == 4000
+
+
+def test_label_anchor_does_not_move_with_the_level(label):
+    annotation = {"segmentation": _circle(2000), "category_name": "cell", "number": 1}
+    label.annotations = {"cell": [annotation]}
+    anchors = []
+    for zoom in (1.0, 0.1):
+        label.zoom_factor = zoom
+        painter = RecordingPainter()
+        label.renderer.draw_annotations(painter)
+        # Labels are drawn in screen space; map the x back to the image.
+        left = next(args[0] for name, args in painter.calls if name == "drawStaticText")
+        anchors.append((left.x() - label.offset_x) / zoom)
+    assert anchors[0] == pytest.approx(anchors[1])
+
+
+def test_polygon_being_vertex_edited_is_drawn_from_its_live_vertices(label):
+    """Vertex drags mutate the list in place; a cached polygon would lag."""
+    flat = _circle(64)
+    annotation = {"segmentation": flat, "category_name": "cell", "number": 1}
+    label.annotations = {"cell": [annotation]}
+    _drawn_vertex_counts(label)
+    label.editing_polygon = annotation
+    flat[0] = 999.0
+    painter = RecordingPainter()
+    label.renderer.draw_annotations(painter)
+    drawn = next(args[0] for name, args in painter.calls if name == "drawPolygon")
+    assert drawn[0].x() == 999.0
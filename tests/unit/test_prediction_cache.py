@@ -0,0 +1,122 @@
+"""Review predictions kept between runs (core/prediction_cache).
+
+A hit must hand back exactly what was stored for that model and those pixels,
+across a reopen, and a damaged file may only cost inference.
+"""
+
+import os
+import subprocess
+import sys
+
+from src.digitalsreeni_image_annotator.core.prediction_cache import (
+    CACHE_DIRNAME,
+    MAX_MODEL_KEYS,
+    PredictionCache,
+)
+
+PREDICTIONS = [{"category_name": "Temp-cell", "score": 0.5, "bbox": [1.0, 2.0, 3.0, 4.0]}]
+
+
+def test_prediction_cache_imports_without_qt():
+    code = (
+        "import sys;"
+        "sys.path.insert(0, 'src');"
+        "import digitalsreeni_image_annotator.core.prediction_cache as m;"
+        "qt = [n for n in sys.modules if n.startswith('PyQt6')];"
+        "assert not qt, qt"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+
+
+def test_entries_are_per_model_and_survive_a_reopen(tmp_path):
+    cache = PredictionCache(str(tmp_path))
+    cache.put("m1", "d1", PREDICTIONS)
+    cache.put("m2", "d1", [])
+    cache.save()
+
+    reopened = PredictionCache(str(tmp_path))
+    assert reopened.get("m1", "d1") == PREDICTIONS
+    assert reopened.get("m2", "d1") == []
+    assert reopened.get("m1", "d2") is None
+
+
+def test_the_latest_entry_for_a_digest_wins(tmp_path):
+    cache = PredictionCache(str(tmp_path))
+    cache.put("m1", "d1", [])
+    cache.save()
+    cache.put("m1", "d1", PREDICTIONS)
+    cache.save()
+
+    assert PredictionCache(str(tmp_path)).get("m1", "d1") == PREDICTIONS
+    lines = (tmp_path / CACHE_DIRNAME / "m1.jsonl").read_text(encoding="utf-8")
+    assert len(lines.splitlines()) == 1  # rewritten, not appended to
+
+
+def test_a_file_with_a_digest_twice_is_rewritten(tmp_path):
+    cache = PredictionCache(str(tmp_path))
+    cache.put("m1", "d1", PREDICTIONS)
+    cache.put("m1", "d2", [])
+    cache.save()
+    path = tmp_path / CACHE_DIRNAME / "m1.jsonl"
+    text = path.read_text(encoding="utf-8")
+    path.write_text(text + text.splitlines()[0] + "\n", encoding="utf-8")
+
+    reopened = PredictionCache(str(tmp_path))
+    reopened.put("m1", "d1", PREDICTIONS)  # unchanged: nothing to write
+    reopened.get("m1", "d3")
+    reopened.save()
+
+    assert path.read_text(encoding="utf-8") == text
+    assert PredictionCache(str(tmp_path)).get("m1", "d2") == []
+
+
+def test_only_the_most_recently_used_models_are_kept(tmp_path):
+    cache = PredictionCache(str(tmp_path))
+    for i in range(MAX_MODEL_KEYS + 2):
+        cache.put(f"old{i}", "d1", PREDICTIONS)
+    cache.save()
+    directory = tmp_path / CACHE_DIRNAME
+    assert len(list(directory.iterdir())) == MAX_MODEL_KEYS
+    for i in range(2, MAX_MODEL_KEYS + 2):  # old2 is the oldest left
+        os.utime(directory / f"old{i}.jsonl", (1000 + i, 1000 + i))
+
+    reopened = PredictionCache(str(tmp_path))
+    assert reopened.get("old2", "d1") == PREDICTIONS  # used again
+    reopened.put("new", "d1", [])
+    reopened.save()
+
+    kept = sorted(path.stem for path in directory.iterdir())
+    expected = ["new", "old2"] + [f"old{i}" for i in range(4, MAX_MODEL_KEYS + 2)]
+    assert kept == sorted(expected)
+    assert reopened.get("old3", "d1") is None
+
+
+def test_no_model_key_or_digest_is_never_cached(tmp_path):
+    cache = PredictionCache(str(tmp_path))
+    cache.put(None, "d1", PREDICTIONS)
+    cache.put("m1", None, PREDICTIONS)
+    cache.save()
+
+    assert len(cache) == 0
+    assert cache.get(None, "d1") is None
+
+
+def test_an_unreadable_line_is_skipped(tmp_path):
+    cache = PredictionCache(str(tmp_path))
+    cache.put("m1", "d1", PREDICTIONS)
+    cache.save()
+    path = tmp_path / CACHE_DIRNAME / "m1.jsonl"
+    path.write_text("{not json\n" + path.read_text(encoding="utf-8"), encoding="utf-8")
+
+    assert PredictionCache(str(tmp_path)).get("m1", "d1") == PREDICTIONS
+
+
+def test_an_in_memory_cache_writes_nothing(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    cache = PredictionCache()
+    cache.put("m1", "d1", PREDICTIONS)
+    cache.save()
+
+    assert cache.get("m1", "d1") == PREDICTIONS
+    assert list(tmp_path.iterdir()) == []
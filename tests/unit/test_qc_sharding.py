@@ -0,0 +1,157 @@
+"""Sharded, cached QC audit (core/annotation_qc.run_audit, core/qc_cache).
+
+However the shards are run -- in process, in a pool, or from the cache -- the
+findings must be the ones the rule groups give over the whole project, in the
+same order. The cache must hand back a result only while the image's
+annotations, its size and the config are all unchanged.
+"""
+
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from src.digitalsreeni_image_annotator.core import annotation_qc as qc
+from src.digitalsreeni_image_annotator.core.qc_cache import QCCache
+
+
+def _square(x0, y0, side, number):
+    return {
+        "segmentation": [x0, y0, x0 + side, y0, x0 + side, y0 + side, x0, y0 + side],
+        "number": number,
+    }
+
+
+def _project(images=12, seed=0):
+    """Squares, duplicates, bowties, outliers and poses over several images."""
+    rng = np.random.default_rng(seed)
+    annotations = {}
+    sizes = {}
+    for i in range(images):
+        cells = []
+        for number in range(int(rng.integers(0, 8))):
+            x, y = rng.integers(-10, 190, size=2).tolist()
+            cells.append(_square(x, y, int(rng.choice([5, 10, 12, 200])), number))
+        if cells and i % 3 == 0:
+            cells.append(dict(cells[0], number=99))
+        nuclei = [{"segmentation": [0, 0, 20, 20, 20, 0, 0, 20], "number": 1}]
+        person = [{"keypoints": [5, 5, 2, 300, 5, 2, 0, 0, 0], "num_keypoints": 3,
+                   "bbox": [0, 0, 50, 50], "number": 1}]
+        annotations[f"img{i:02d}.png"] = {
+            "cell": cells, "nucleus": nuclei if i % 4 == 0 else [],
+            "person": person if i % 5 == 0 else [],
+        }
+        sizes[f"img{i:02d}.png"] = (200, 200)
+    sizes["empty.png"] = (200, 200)
+    return annotations, sizes
+
+
+def _reference(annotations, sizes):
+    """The rule groups over the whole project, unsharded."""
+    config = qc.QCConfig()
+    findings = []
+    findings += qc.check_geometry(annotations, sizes, config)
+    findings += qc.check_pose(annotations, sizes, config)
+    findings += qc.check_redundancy(annotations, sizes, config)
+    findings += qc.check_statistics(annotations, sizes, config)
+    findings += qc.check_hygiene(annotations, ["cell", "nucleus", "person"], config)
+    findings.sort(key=qc.Finding.sort_key)
+    return findings
+
+
+@pytest.fixture
+def audited(monkeypatch):
+    """Images audited by the next ``run_audit`` calls (in process only)."""
+    seen = []
+    real = qc.audit_image
+
+    def _audit(image, by_class, size, config):
+        seen.append(image)
+        return real(image, by_class, size, config)
+
+    monkeypatch.setattr(qc, "audit_image", _audit)
+    return seen
+
+
+def test_qc_cache_imports_without_qt():
+    code = (
+        "import sys;"
+        "sys.path.insert(0, 'src');"
+        "import digitalsreeni_image_annotator.core.qc_cache as m;"
+        "qt = [n for n in sys.modules if n.startswith('PyQt6')];"
+        "assert not qt, qt"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+
+
+def test_a_sharded_audit_matches_the_rule_groups():
+    annotations, sizes = _project()
+    expected = _reference(annotations, sizes)
+
+    assert {f.rule for f in expected} >= {
+        qc.RULE_OUT_OF_BOUNDS, qc.RULE_NEAR_DUPLICATE, qc.RULE_SELF_INTERSECTING,
+        qc.RULE_POSE_POINT_OUTSIDE_BBOX, qc.RULE_AREA_OUTLIER, qc.RULE_EMPTY_IMAGE,
+    }
+    assert qc.run_audit(annotations, sizes) == expected
+
+
+def test_a_process_pool_gives_the_same_findings(monkeypatch):
+    monkeypatch.setattr(qc, "_PARALLEL_MIN_IMAGES", 0)
+    annotations, sizes = _project()
+
+    assert qc.run_audit(annotations, sizes, workers=2) == _reference(annotations, sizes)
+
+
+def test_cached_images_are_not_audited_again(tmp_path, audited):
+    annotations, sizes = _project()
+    path = str(tmp_path / "qc.jsonl")
+    first = qc.run_audit(annotations, sizes, cache=QCCache(path))
+    audited.clear()
+
+    annotations["img03.png"]["cell"].append(_square(0, 0, 300, 50))
+    second = qc.run_audit(annotations, sizes, cache=QCCache(path))
+
+    assert audited == ["img03.png"]
+    assert second == _reference(annotations, sizes)
+    assert second != first
+
+
+def test_a_new_size_or_config_misses_the_cache(audited):
+    annotations, sizes = _project(images=3)
+    cache = QCCache()
+    qc.run_audit(annotations, sizes, cache=cache)
+    audited.clear()
+
+    sizes["img01.png"] = (100, 100)
+    qc.run_audit(annotations, sizes, cache=cache)
+    assert audited == ["img01.png"]
+
+    audited.clear()
+    qc.run_audit(annotations, sizes, config=qc.QCConfig(min_area=50), cache=cache)
+    assert audited == list(annotations)
+
+
+def test_the_cache_keeps_only_the_entries_last_used(tmp_path):
+    annotations, sizes = _project(images=4)
+    path = str(tmp_path / "qc.jsonl")
+    qc.run_audit(annotations, sizes, cache=QCCache(path))
+    annotations["img00.png"]["cell"] = []
+
+    qc.run_audit(annotations, sizes, cache=QCCache(path))
+
+    assert len(QCCache(path)) == len(annotations)
+
+
+def test_an_unreadable_cache_line_is_skipped(tmp_path, audited):
+    annotations, sizes = _project(images=2)
+    path = tmp_path / "qc.jsonl"
+    qc.run_audit(annotations, sizes, cache=QCCache(str(path)))
+    path.write_text(path.read_text(encoding="utf-8") + "{not json\n", encoding="utf-8")
+    audited.clear()
+
+    findings = qc.run_audit(annotations, sizes, cache=QCCache(str(path)))
+
+    assert audited == []
+    assert findings == _reference(annotations, sizes)
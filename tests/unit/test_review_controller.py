@@ -13,14 +13,24 @@ The unit tests that existed passed a bare list, which is why they missed it.
 These pass the real return shape.
 """
 
+import threading
+
+import numpy as np
 import pytest
+from PIL import Image
 from PyQt6.QtWidgets import QWidget
 
+from src.digitalsreeni_image_annotator.controllers import review_controller
 from src.digitalsreeni_image_annotator.controllers.review_controller import (
     MODE_DISAGREEMENT,
     MODE_UNCERTAINTY,
     ReviewController,
     _unwrap_results,
+    score_predictions,
+)
+from src.digitalsreeni_image_annotator.core.slice_cache import (
+    LazySliceList,
+    SliceProvider,
 )
 
 
@@ -68,13 +78,63 @@ class _Trainer:
         return _results(), (640, 480), (640, 480)
 
 
+class _Tensor:
+    def __init__(self, values):
+        self._values = np.asarray(values, np.float32)
+
+    def detach(self):
+        return self
+
+    def cpu(self):
+        return self
+
+    def numpy(self):
+        return self._values
+
+
+class _Weights:
+    """Just enough of an Ultralytics model for ``model_key`` to digest."""
+
+    names = {0: "cell", 1: "nucleus"}
+
+    def __init__(self, value=1.0):
+        self.model = self
+        self._value = value
+
+    def state_dict(self):
+        return {"conv.weight": _Tensor([self._value, 2.0])}
+
+
+class _BatchTrainer(_Trainer):
+    """Adds the batched call, recording the size of every batch."""
+
+    def __init__(self, model=None):
+        self.batches = []
+        self.conf_threshold = 0.25
+        if model is not None:
+            self.model = model
+
+    def predict_batch(self, images):
+        self.batches.append(len(images))
+        return [_results()[0] for _ in images]
+
+
 class _Window(QWidget):
     def __init__(self, annotations=None):
         super().__init__()
         self.all_annotations = annotations or {}
         self.all_images = []
         self.image_paths = {}
+        self.image_slices = {}
         self.image_file_name = ""
+        self.refreshed = 0
+        self.image_controller = self
+
+    def save_current_annotations(self):
+        pass
+
+    def refresh_image_list_scores(self):
+        self.refreshed += 1
 
 
 @pytest.fixture
@@ -129,10 +189,16 @@ def test_extraction_still_works_from_a_bare_list(controller):
 # --- scoring through the trainer ------------------------------------------
 
 
+def _score(controller, name):
+    """What a run does with one image: extract, then score on the pool."""
+    predictions = controller.extract_predictions(_Trainer().predict(name), name)
+    return score_predictions(controller._ground_truth(name), predictions)
+
+
 def test_an_unannotated_image_scores_real_uncertainty(controller):
     """Before the fix this returned 0.0 with 0 detections on an image the
     model finds two objects in."""
-    record = controller.score_image("a.png", "a.png", _Trainer())
+    record = _score(controller, "a.png")
 
     assert record["mode"] == MODE_UNCERTAINTY
     assert record["breakdown"]["detections"] == 2
@@ -147,7 +213,7 @@ def test_an_annotated_image_scores_real_disagreement(qtbot):
     qtbot.addWidget(win)
     controller = ReviewController(win)
 
-    record = controller.score_image("a.png", "a.png", _Trainer())
+    record = _score(controller, "a.png")
 
     assert record["mode"] == MODE_DISAGREEMENT
     # The cell prediction matches the label; the nucleus one is spurious.
@@ -165,7 +231,177 @@ def test_perfect_agreement_still_scores_zero(qtbot):
     qtbot.addWidget(win)
     controller = ReviewController(win)
 
-    record = controller.score_image("a.png", "a.png", _Trainer())
+    record = _score(controller, "a.png")
 
     assert record["score"] == pytest.approx(0.0, abs=0.05)
     assert record["breakdown"]["matched"] == 2
+
+
+# --- batched runs over images, slices and frames ---------------------------
+
+
+def _project(tmp_path, qtbot):
+    """A plain image, a loaded three-slice stack and a stack never opened."""
+    path = tmp_path / "a.png"
+    Image.fromarray(np.zeros((8, 8, 3), np.uint8)).save(path)
+    stack = np.arange(3 * 8 * 8, dtype=np.uint8).reshape(3, 8, 8)
+    win = _Window({"stack_Z2": {"cell": [
+        {"bbox": [10, 10, 50, 50], "category_name": "cell", "number": 1}
+    ]}})
+    qtbot.addWidget(win)
+    win.all_images = [
+        {"file_name": "a.png"},
+        {"file_name": "stack.tif", "is_multi_slice": True},
+        {"file_name": "closed.tif", "is_multi_slice": True},
+    ]
+    source = tmp_path / "stack.tif"
+    source.write_bytes(stack.tobytes())
+    win.image_paths = {"a.png": str(path), "stack.tif": str(source)}
+    win.image_slices = {
+        "stack": LazySliceList(SliceProvider(stack, ["Z", "H", "W"], "stack")),
+    }
+    return win
+
+
+def test_work_items_cover_slices_and_name_what_they_skip(tmp_path, qtbot):
+    controller = ReviewController(_project(tmp_path, qtbot))
+
+    items, readers, skipped = controller.collect_work_items()
+
+    assert [name for name, _load, _digest in items] == [
+        "a.png", "stack_Z1", "stack_Z2", "stack_Z3",
+    ]
+    assert items[0][1]().shape == (8, 8, 3)
+    assert len({digest() for _name, _load, digest in items}) == 4
+    assert readers == []
+    assert skipped == ["closed.tif"]
+
+
+def test_a_run_scores_every_slice_in_batches(tmp_path, qtbot, monkeypatch):
+    reports = []
+    monkeypatch.setattr(
+        review_controller.QMessageBox, "information",
+        lambda _parent, _title, text: reports.append(text),
+    )
+    monkeypatch.setattr(review_controller, "REVIEW_BATCH_IMAGES", 3)
+    win = _project(tmp_path, qtbot)
+    win.yolo_trainer = trainer = _BatchTrainer()
+    controller = ReviewController(win)
+
+    controller.run()
+
+    assert trainer.batches == [3, 1]
+    assert set(controller.scores) == {"a.png", "stack_Z1", "stack_Z2", "stack_Z3"}
+    assert controller.mode_for("stack_Z2") == MODE_DISAGREEMENT
+    assert controller.mode_for("stack_Z1") == MODE_UNCERTAINTY
+    # The stack's image-list row shows its worst slice.
+    assert controller.score_for("stack.tif") == max(
+        controller.score_for(name) for name in ("stack_Z1", "stack_Z2", "stack_Z3")
+    )
+    assert controller.score_for("closed.tif") is None
+    assert win.refreshed == 1
+    assert "1 image(s) were not scored" in reports[0]
+
+
+# --- predictions reused across runs -----------------------------------------
+
+
+@pytest.fixture
+def quiet(monkeypatch):
+    monkeypatch.setattr(review_controller.QMessageBox, "information", lambda *a: None)
+
+
+def test_a_rerun_after_editing_labels_only_rescores(tmp_path, qtbot, quiet):
+    win = _project(tmp_path, qtbot)
+    win.yolo_trainer = trainer = _BatchTrainer(_Weights())
+    controller = ReviewController(win)
+    controller.run()
+    assert controller.mode_for("a.png") == MODE_UNCERTAINTY
+    predicted = list(trainer.batches)
+
+    win.all_annotations["a.png"] = {"cell": [
+        {"bbox": [10, 10, 50, 50], "category_name": "cell", "number": 1}
+    ]}
+    controller.run()
+
+    assert trainer.batches == predicted, "nothing changed but the labels"
+    assert controller.mode_for("a.png") == MODE_DISAGREEMENT
+    assert controller.scores["a.png"]["breakdown"]["matched"] == 1
+
+
+def test_hashing_runs_off_the_gui_thread_and_hits_are_not_decoded(
+    tmp_path, qtbot, quiet, monkeypatch
+):
+    hashed_on = []
+    content_hash = review_controller.content_hash
+
+    def recording_hash(path):
+        # On a worker thread, and only once the run (and its cancellable
+        # progress dialog) is up.
+        hashed_on.append((threading.current_thread(), controller._run is not None))
+        return content_hash(path)
+
+    monkeypatch.setattr(review_controller, "content_hash", recording_hash)
+    win = _project(tmp_path, qtbot)
+    win.yolo_trainer = _BatchTrainer(_Weights())
+    controller = ReviewController(win)
+    controller.run()
+
+    decoded = []
+    collect = controller.collect_work_items
+
+    def recording_items():
+        items, readers, skipped = collect()
+        return [
+            (name, lambda load=load, name=name: decoded.append(name) or load(), digest)
+            for name, load, digest in items
+        ], readers, skipped
+
+    monkeypatch.setattr(controller, "collect_work_items", recording_items)
+    controller.run()
+
+    assert hashed_on
+    assert all(thread is not threading.main_thread() and in_run for thread, in_run in hashed_on)
+    assert decoded == []
+    assert len(controller.scores) == 4
+
+
+def test_a_new_model_or_threshold_predicts_again(tmp_path, qtbot, quiet):
+    win = _project(tmp_path, qtbot)
+    win.yolo_trainer = trainer = _BatchTrainer(_Weights())
+    controller = ReviewController(win)
+    controller.run()
+    first = len(trainer.batches)
+
+    trainer.conf_threshold = 0.5
+    controller.run()
+    assert len(trainer.batches) == 2 * first
+
+    trainer.model = _Weights(value=3.0)
+    controller.run()
+    assert len(trainer.batches) == 3 * first
+
+
+def test_predictions_persist_beside_the_project(tmp_path, qtbot, quiet):
+    win = _project(tmp_path, qtbot)
+    win.current_project_file = str(tmp_path / "project.iap")
+    win.yolo_trainer = _BatchTrainer(_Weights())
+    ReviewController(win).run()
+
+    win.yolo_trainer = trainer = _BatchTrainer(_Weights())
+    controller = ReviewController(win)
+    controller.run()
+
+    assert trainer.batches == []
+    assert len(controller.scores) == 4
+
+
+def test_a_model_without_readable_weights_is_never_cached(tmp_path, qtbot, quiet):
+    win = _project(tmp_path, qtbot)
+    win.yolo_trainer = trainer = _BatchTrainer()
+    controller = ReviewController(win)
+    controller.run()
+    controller.run()
+
+    assert sum(trainer.batches) == 8
+    assert len(controller.cache()) == 0
@@ -0,0 +1,261 @@
+"""Per-image SAM encoder features (core/feature_cache, SAMUtils).
+
+Every box drag and every added point used to re-run the image encoder on an
+unchanged image. Now the encoder runs once per image, prompts only run the
+decoder, and the image on screen plus the next one are encoded in the
+background.
+"""
+
+import subprocess
+import sys
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from PyQt6.QtGui import QColor, QImage
+
+from src.digitalsreeni_image_annotator.core.feature_cache import FeatureCache, array_digest
+from src.digitalsreeni_image_annotator.inference.sam_utils import SAMUtils
+
+torch = pytest.importorskip("torch")
+
+
+# --- core ------------------------------------------------------------------
+
+
+def test_feature_cache_imports_without_qt():
+    code = (
+        "import sys;"
+        "sys.path.insert(0, 'src');"
+        "import digitalsreeni_image_annotator.core.feature_cache as m;"
+        "qt = [n for n in sys.modules if n.startswith('PyQt6')];"
+        "assert not qt, qt"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+
+
+def test_least_recently_used_entries_go_first_once_over_budget():
+    cache = FeatureCache(budget_bytes=100)
+    cache.put("a", "A", 40)
+    cache.put("b", "B", 40)
+    assert cache.get("a") == "A"  # b is now the oldest
+    cache.put("c", "C", 40)
+    assert "b" not in cache
+    assert (cache.get("a"), cache.get("c")) == ("A", "C")
+    assert cache.nbytes == 80
+
+
+def test_an_entry_larger_than_the_budget_is_not_stored():
+    cache = FeatureCache(budget_bytes=100)
+    cache.put("a", "A", 40)
+    cache.put("huge", "H", 101)
+    assert "huge" not in cache
+    assert len(cache) == 1
+
+
+def test_replacing_an_entry_does_not_double_count_it():
+    cache = FeatureCache(budget_bytes=100)
+    cache.put("a", "A", 60)
+    cache.put("a", "A2", 60)
+    assert cache.nbytes == 60
+    assert cache.get("a") == "A2"
+
+
+def test_digest_follows_pixels_not_identity():
+    image = np.zeros((4, 5, 3), np.uint8)
+    assert array_digest(image) == array_digest(image.copy())
+    changed = image.copy()
+    changed[0, 0, 0] = 1
+    assert array_digest(changed) != array_digest(image)
+    assert array_digest(image) != array_digest(image.reshape(5, 4, 3))
+
+
+# --- SAMUtils --------------------------------------------------------------
+
+
+class _Predictor:
+    """Stands in for the ultralytics SAM predictor: an "encoder" that counts
+    its calls and a "decoder" returning one full-image mask per prompt, plus
+    one low-scoring mask that the ``conf`` filter must drop."""
+
+    def __init__(self, model, overrides=None, _callbacks=None):
+        self.model_stub = model
+        self.args = SimpleNamespace(conf=overrides["conf"])
+        self.features = None
+
+    def setup_model(self, model=None, verbose=True):
+        pass
+
+    def set_image(self, image):
+        self.model_stub.encoded.append(array_digest(image))
+        if self.model_stub.fail_decode:
+            raise RuntimeError("unsupported architecture")
+        self.features = torch.zeros(1, 4)
+
+    def reset_image(self):
+        self.features = None
+
+    def inference_features(self, features, src_shape, bboxes=None, points=None, labels=None):
+        self.model_stub.decoded += 1
+        masks = torch.zeros((2, *src_shape), dtype=torch.bool)
+        masks[0, 1:-1, 1:-1] = True
+        boxes = torch.tensor([[0, 0, 1, 1, 0.9, 0], [0, 0, 1, 1, 0.1, 1]])
+        return masks, boxes
+
+
+class _Model:
+    def __init__(self):
+        self.encoded = []
+        self.decoded = 0
+        self.full_calls = 0
+        self.fail_decode = False
+        self.callbacks = {}
+        self.model = object()
+
+    def _smart_load(self, key):
+        assert key == "predictor"
+        return lambda overrides, _callbacks: _Predictor(self, overrides, _callbacks)
+
+    def __call__(self, image_np, device=None, **prompts):
+        self.full_calls += 1
+        mask = np.zeros((1, *image_np.shape[:2]), bool)
+        mask[0, 1:-1, 1:-1] = True
+        data = SimpleNamespace(cpu=lambda: SimpleNamespace(numpy=lambda: mask))
+        conf = SimpleNamespace(cpu=lambda: SimpleNamespace(numpy=lambda: np.array([0.9])))
+        return [SimpleNamespace(masks=SimpleNamespace(data=data), boxes=SimpleNamespace(conf=conf))]
+
+
+def _image(value=0, size=(64, 48)):
+    image = QImage(*size, QImage.Format.Format_RGB888)
+    image.fill(QColor(value, value, value))
+    return image
+
+
+@pytest.fixture
+def sam(qtbot):
+    utils = SAMUtils()
+    utils._model = _Model()
+    utils.current_sam_model = "SAM 2 tiny"
+    utils._loaded_model_file = "sam2_t.pt"
+    utils._device = "cpu"
+    yield utils
+    utils.wait_for_prefetch()
+
+
+def test_prompts_on_one_image_encode_it_once(sam):
+    image = _image()
+    first = sam.apply_sam_prediction(image, [5, 5, 60, 44])
+    sam.apply_sam_prediction(image, [4, 4, 61, 45])
+    sam.apply_sam_points(image, [[30, 20]], [])
+    sam.apply_sam_predictions_batch(image, [[5, 5, 60, 44]])
+
+    assert len(sam._model.encoded) == 1
+    assert sam._model.decoded == 4
+    assert sam._model.full_calls == 0
+    assert first["score"] == pytest.approx(0.9)
+
+
+def test_a_different_image_or_model_encodes_again(sam):
+    sam.apply_sam_prediction(_image(0), [5, 5, 60, 44])
+    sam.apply_sam_prediction(_image(200), [5, 5, 60, 44])
+    assert len(set(sam._model.encoded)) == 2
+
+    sam._forget_features()  # what change_sam_model / unload do
+    sam.apply_sam_prediction(_image(0), [5, 5, 60, 44])
+    assert len(sam._model.encoded) == 3
+
+
+def test_an_unsupported_decoder_path_falls_back_to_full_inference(sam):
+    sam._model.fail_decode = True
+    result = sam.apply_sam_prediction(_image(), [5, 5, 60, 44])
+    sam.apply_sam_prediction(_image(), [5, 5, 60, 44])
+    assert result is not None
+    assert sam._model.full_calls == 2
+    assert len(sam._model.encoded) == 1, "kept retrying the decoder-only path"
+
+
+def test_prefetch_encodes_in_the_background(qtbot, sam, tmp_path):
+    path = tmp_path / "next.png"
+    _image(120).save(str(path))
+    sam.prefetch_features([_image(0), str(path), None])
+    qtbot.waitUntil(lambda: sam._prefetch_thread is None, timeout=5000)
+    assert len(sam._model.encoded) == 2
+
+    sam.apply_sam_prediction(QImage(str(path)), [5, 5, 60, 44])
+    assert len(sam._model.encoded) == 2, "the prompt re-ran the encoder"
+
+
+def test_the_decoder_path_says_which_box_each_mask_answers(sam):
+    # The stub's second mask scores under the conf filter and is dropped.
+    results = sam.apply_sam_predictions_batch(_image(), [[5, 5, 60, 44], [0, 0, 3, 3]])
+
+    assert "segmentation" in results[0]
+    assert results[1] == {"error": "No mask generated."}
+
+
+def test_the_prefetch_queue_is_replaced_in_place(qtbot, sam):
+    """The prefetch thread pops from the queue while the GUI thread replaces
+    it; swapping the list out from under a pop raced."""
+    queue = sam._prefetch_queue
+    sam.prefetch_features([_image(0), _image(1)])
+    sam.wait_for_prefetch()
+    sam.prefetch_features([_image(2)])
+    qtbot.waitUntil(lambda: sam._prefetch_thread is None, timeout=5000)
+
+    assert sam._prefetch_queue is queue
+    assert sam._next_prefetch() is None
+
+
+def test_prefetch_is_a_no_op_without_a_model(qtbot):
+    utils = SAMUtils()
+    utils.prefetch_features([_image()])
+    assert utils._prefetch_thread is None
+
+
+# --- what gets prefetched --------------------------------------------------
+
+
+def _controller(**mw):
+    from src.digitalsreeni_image_annotator.controllers.image_controller import (
+        ImageController,
+    )
+
+    controller = ImageController.__new__(ImageController)
+    controller.mw = SimpleNamespace(**mw)
+    return controller
+
+
+def test_the_next_slice_is_prefetched_only_when_already_decoded():
+    images = [_image(v) for v in (0, 1, 2)]
+    slices = [(f"s_Z{i}", image) for i, image in enumerate(images)]
+    controller = _controller(slices=slices, current_slice="s_Z1")
+    assert controller._next_image_source() is images[2]
+    controller.mw.current_slice = "s_Z2"
+    assert controller._next_image_source() is None
+
+
+def test_the_next_plain_image_is_prefetched_by_path(qtbot, tmp_path):
+    from PyQt6.QtWidgets import QListWidget
+
+    image_list = QListWidget()
+    qtbot.addWidget(image_list)
+    image_list.addItems(["a.png", "b.png", "c.tif"])
+    for name in ("a.png", "b.png", "c.tif"):
+        (tmp_path / name).write_bytes(b"")
+    controller = _controller(
+        slices=[],
+        current_slice=None,
+        image_list=image_list,
+        all_images=[
+            {"file_name": "a.png"},
+            {"file_name": "b.png"},
+            {"file_name": "c.tif", "is_multi_slice": True},
+        ],
+        image_paths={n: str(tmp_path / n) for n in ("a.png", "b.png", "c.tif")},
+        current_project_dir=str(tmp_path),
+    )
+    image_list.setCurrentRow(0)
+    assert controller._next_image_source() == str(tmp_path / "b.png")
+    image_list.setCurrentRow(1)
+    assert controller._next_image_source() is None, "would decode a whole stack"
@@ -0,0 +1,202 @@
+"""Prompted SAM mask post-processing (inference/sam_utils).
+
+The candidates' areas, extents and prompt points are checked on the mask
+stack first; only the winner is traced, and only around its extent.
+"""
+
+import threading
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from src.digitalsreeni_image_annotator.inference import sam_utils
+from src.digitalsreeni_image_annotator.inference.sam_utils import SAMUtils
+
+
+def _masks(*rects, shape=(60, 80)):
+    masks = np.zeros((len(rects), *shape), dtype=bool)
+    for mask, (x0, y0, x1, y1) in zip(masks, rects):
+        mask[y0:y1 + 1, x0:x1 + 1] = True
+    return masks
+
+
+@pytest.fixture
+def sam(qtbot, monkeypatch):
+    utils = SAMUtils()
+    traced = []
+    real = sam_utils._mask_to_polygon
+
+    def _spy(mask, extent=None):
+        traced.append(extent)
+        return real(mask, extent)
+
+    monkeypatch.setattr(sam_utils, "_mask_to_polygon", _spy)
+    utils.traced = traced
+    return utils
+
+
+def _predicting(utils, masks, confidences=None, prompts=None):
+    confidences = np.linspace(0.9, 0.5, len(masks)) if confidences is None else confidences
+    prompts = np.arange(len(masks)) if prompts is None else np.asarray(prompts)
+    utils._predict_masks = lambda image_np, **_prompts: (masks, confidences, prompts)
+
+
+def test_extents_and_areas_come_off_the_stack():
+    masks = _masks((10, 5, 19, 9), (0, 0, 79, 59))
+    masks = np.concatenate([masks, np.zeros((1, 60, 80), bool)])
+
+    areas, extents = sam_utils._mask_extents(masks)
+
+    assert areas.tolist() == [50, 4800, 0]
+    assert extents.tolist() == [[10, 5, 19, 9], [0, 0, 79, 59], [-1, -1, -1, -1]]
+
+
+def test_a_cropped_trace_matches_the_full_image_one():
+    masks = _masks((0, 0, 30, 20), (40, 10, 79, 59))
+    masks[0, 50:55, 60:70] = True  # a second, smaller blob
+    areas, extents = sam_utils._mask_extents(masks)
+
+    for mask, extent in zip(masks, extents):
+        assert sam_utils._mask_to_polygon(mask, extent) == sam_utils._mask_to_polygon(mask)
+
+
+def test_points_are_tested_against_each_extent():
+    _areas, extents = sam_utils._mask_extents(_masks((10, 10, 20, 20), (0, 0, 79, 59)))
+    within = sam_utils._points_in_extents(extents, [[15, 15], [20, 20.9], [-1, 15], [500, 15]])
+    assert within.tolist() == [[True, False, False, False], [True, True, False, False]]
+
+
+def test_a_click_in_a_ring_masks_hole_keeps_the_ring(sam):
+    ring = _masks((10, 10, 50, 50), (0, 0, 5, 5))
+    ring[0, 20:41, 20:41] = False  # the hole
+    _predicting(sam, ring)
+
+    result = sam._sam_points_blocking(np.zeros((60, 80, 3), np.uint8), [[30, 30]], [])
+
+    # The old contour check accepts a point inside the outer contour.
+    assert sam_utils._bbox_of_contour(result["segmentation"]) == (10, 10, 50, 50)
+
+
+def test_only_the_largest_plausible_box_mask_is_traced(sam):
+    # Too small for the box, the winner, and a smaller plausible one.
+    _predicting(sam, _masks((20, 20, 24, 24), (10, 10, 50, 40), (12, 12, 45, 36)))
+
+    result = sam._sam_bbox_blocking(np.zeros((60, 80, 3), np.uint8), [10, 10, 50, 40])
+
+    assert result["score"] == pytest.approx(0.7)
+    assert [list(extent) for extent in sam.traced] == [[10, 10, 50, 40]]
+
+
+def test_a_stray_speck_does_not_fail_the_box_constraints(sam):
+    masks = _masks((10, 10, 50, 40))
+    masks[0, 58, 78] = True  # far outside the box, but not in the biggest contour
+    _predicting(sam, masks)
+
+    result = sam._sam_bbox_blocking(np.zeros((60, 80, 3), np.uint8), [10, 10, 50, 40])
+
+    assert sam_utils._bbox_of_contour(result["segmentation"]) == (10, 10, 50, 40)
+
+
+def test_a_negative_point_passes_over_the_largest_mask(sam):
+    _predicting(sam, _masks((0, 0, 79, 59), (10, 10, 30, 30)))
+
+    result = sam._sam_points_blocking(np.zeros((60, 80, 3), np.uint8), [[20, 20]], [[60, 50]])
+
+    assert sam_utils._bbox_of_contour(result["segmentation"]) == (10, 10, 30, 30)
+
+
+def test_batch_errors_are_reported_per_box_without_tracing_rejects(sam):
+    masks = _masks((10, 10, 50, 40), (20, 20, 22, 22), (0, 0, 1, 1))
+    masks[2] = False
+    _predicting(sam, masks)
+    boxes = [[10, 10, 50, 40], [10, 10, 50, 40], [0, 0, 10, 10]]
+
+    results = sam._sam_batch_blocking(np.zeros((60, 80, 3), np.uint8), boxes)
+
+    assert "segmentation" in results[0]
+    assert results[1] == {"error": "Mask failed bbox constraints."}
+    assert results[2] == {"error": "No valid mask polygon."}
+    assert len(sam.traced) == 1
+
+
+def test_boxes_sam_returned_no_mask_for_still_get_a_result(sam):
+    # Ultralytics drops masks below its confidence threshold.
+    _predicting(sam, _masks((10, 10, 50, 40)))
+    boxes = [[10, 10, 50, 40], [0, 0, 10, 10], [60, 40, 70, 50]]
+
+    results = sam._sam_batch_blocking(np.zeros((60, 80, 3), np.uint8), boxes)
+
+    assert len(results) == 3
+    assert "segmentation" in results[0]
+    assert results[1:] == [{"error": "No mask generated."}] * 2
+
+
+def test_a_mask_dropped_from_the_middle_leaves_the_others_on_their_boxes(sam):
+    boxes = [[0, 0, 20, 20], [30, 0, 50, 20], [60, 30, 79, 59]]
+    # The conf filter dropped the middle box's mask; the survivors say which
+    # prompt they answer.
+    _predicting(
+        sam, _masks((0, 0, 20, 20), (60, 30, 79, 59)), np.array([0.9, 0.7]), [0, 2]
+    )
+
+    results = sam._sam_batch_blocking(np.zeros((60, 80, 3), np.uint8), boxes)
+
+    assert results[1] == {"error": "No mask generated."}
+    assert results[0]["score"] == pytest.approx(0.9)
+    assert results[2]["score"] == pytest.approx(0.7)
+    xs = results[2]["segmentation"][0::2]
+    assert min(xs) >= 60, "the last box got its neighbour's mask"
+
+
+class _EverythingModel:
+    """Unprompted SAM: one centred square mask per call, recording the
+    shapes it was called on."""
+
+    def __init__(self, stop=None):
+        self.shapes = []
+        self.stop = stop
+
+    def __call__(self, image_np, device=None):
+        self.shapes.append(image_np.shape[:2])
+        if self.stop is not None:
+            self.stop.set()
+        height, width = image_np.shape[:2]
+        mask = np.zeros((1, height, width), bool)
+        mask[0, height // 2 - 20:height // 2 + 20, width // 2 - 20:width // 2 + 20] = True
+        data = SimpleNamespace(cpu=lambda: SimpleNamespace(numpy=lambda: mask))
+        conf = SimpleNamespace(cpu=lambda: SimpleNamespace(numpy=lambda: np.array([0.9])))
+        return [SimpleNamespace(masks=SimpleNamespace(data=data), boxes=SimpleNamespace(conf=conf))]
+
+
+def test_a_tiled_run_segments_each_tile_at_full_resolution(sam):
+    sam._model = _EverythingModel()
+    image = np.zeros((1500, 2000, 3), np.uint8)
+
+    proposals = sam._sam_everything_blocking(image, tiled=True)
+
+    tiles = sam_utils.mask_filters.tile_grid(
+        2000, 1500, sam_utils.EVERYTHING_TILE, sam_utils.EVERYTHING_TILE_OVERLAP
+    )
+    assert sam._model.shapes == [(y1 - y0, x1 - x0) for x0, y0, x1, y1 in tiles]
+    centres = sorted(
+        (round(sum(p["segmentation"][0::2]) / 4), round(sum(p["segmentation"][1::2]) / 4))
+        for p in proposals
+    )
+    expected = sorted(((x0 + x1) // 2, (y0 + y1) // 2) for x0, y0, x1, y1 in tiles)
+    assert all(abs(a - c) <= 1 and abs(b - d) <= 1 for (a, b), (c, d) in zip(centres, expected))
+    assert len(centres) == len(expected)
+
+
+def test_a_small_image_or_an_untiled_run_is_one_pass(sam):
+    sam._model = _EverythingModel()
+    sam._sam_everything_blocking(np.zeros((1500, 2000, 3), np.uint8))
+    sam._sam_everything_blocking(np.zeros((600, 800, 3), np.uint8), tiled=True)
+    assert sam._model.shapes == [(1500, 2000), (600, 800)]
+
+
+def test_a_tiled_run_stops_between_tiles(sam):
+    stop = threading.Event()
+    sam._model = _EverythingModel(stop)
+    sam._sam_everything_blocking(np.zeros((1500, 2000, 3), np.uint8), tiled=True, stop=stop)
+    assert len(sam._model.shapes) == 1
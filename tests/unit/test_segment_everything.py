@@ -63,6 +63,23 @@ def test_self_intersecting_geometry_is_repaired_not_raised():
     assert mask_filters.polygon_iou(bowtie, _ring(0, 0, 10)) >= 0.0
 
 
+def test_overlapping_pairs_match_polygon_iou_on_every_pair():
+    segmentations = [
+        _ring(0, 0, 10), _ring(5, 0, 10), _ring(100, 100, 10), _ring(9, 9, 10),
+        [0, 0, 10, 10, 10, 0, 0, 10],  # self-intersecting
+        [1, 2], None, _ring(10, 0, 10),  # degenerate, missing, edge-touching
+    ]
+    expected = [
+        (i, j, mask_filters.polygon_iou(segmentations[i], segmentations[j]))
+        for i in range(len(segmentations))
+        for j in range(i + 1, len(segmentations))
+    ]
+    expected = [pair for pair in expected if pair[2] > 0]
+
+    assert mask_filters.overlapping_pairs(segmentations) == expected
+    assert mask_filters.overlapping_pairs([_ring(0, 0, 10)]) == []
+
+
 # --- filtering -------------------------------------------------------------
 
 
@@ -143,6 +160,68 @@ def test_describe_dropped_is_empty_when_nothing_was_dropped():
     ) == ""
 
 
+# --- tiled runs ------------------------------------------------------------
+
+
+def _rect(x0, y0, x1, y1):
+    return [x0, y0, x1, y0, x1, y1, x0, y1]
+
+
+def _tiled(segmentation, tile, score=0.9):
+    return {"segmentation": segmentation, "score": score, "tile": tile}
+
+
+# tile_grid(200, 100, 120, 40): two tiles sharing the strip x = 80..120.
+LEFT, RIGHT = (0, 0, 120, 100), (80, 0, 200, 100)
+
+
+def test_tiles_cover_the_image_with_at_least_the_overlap():
+    tiles = mask_filters.tile_grid(3000, 1500, 1024, 256)
+
+    xs = sorted({t[0] for t in tiles})
+    ys = sorted({t[1] for t in tiles})
+    assert len(tiles) == len(xs) * len(ys)
+    assert (xs[0], ys[0]) == (0, 0)
+    assert max(t[2] for t in tiles) == 3000 and max(t[3] for t in tiles) == 1500
+    assert all(b - a <= 1024 - 256 for a, b in zip(xs, xs[1:]))
+    assert mask_filters.tile_grid(200, 100, 120, 40) == [LEFT, RIGHT]
+    assert mask_filters.tile_grid(500, 400, 1024, 256) == [(0, 0, 500, 400)]
+
+
+def test_an_object_found_in_two_tiles_is_proposed_once():
+    merged = mask_filters.merge_tiled_proposals([
+        _tiled(_rect(90, 10, 110, 30), LEFT, 0.7),
+        _tiled(_rect(91, 10, 110, 31), RIGHT, 0.9),
+        _tiled(_rect(10, 10, 30, 30), LEFT, 0.8),
+    ], 200, 100)
+
+    assert [p["score"] for p in merged] == [0.9, 0.8]
+    assert all("tile" not in p for p in merged)
+
+
+def test_a_part_cut_by_a_tile_edge_gives_way_to_the_whole_object():
+    merged = mask_filters.merge_tiled_proposals([
+        _tiled(_rect(60, 10, 100, 40), LEFT, 0.7),
+        _tiled(_rect(80, 10, 100, 40), RIGHT, 0.9),
+    ], 200, 100)
+
+    assert merged == [{"segmentation": _rect(60, 10, 100, 40), "score": 0.7}]
+
+
+def test_an_object_larger_than_the_overlap_is_stitched_together():
+    merged = mask_filters.merge_tiled_proposals([
+        _tiled(_rect(20, 10, 119, 50), LEFT, 0.6),
+        _tiled(_rect(80, 10, 180, 50), RIGHT, 0.8),
+        # A different object, cut by the same edge, meets neither.
+        _tiled(_rect(100, 70, 119, 90), LEFT, 0.5),
+    ], 200, 100)
+
+    assert len(merged) == 2
+    stitched = merged[0]
+    assert stitched["score"] == 0.8
+    assert mask_filters.polygon_iou(stitched["segmentation"], _rect(20, 10, 180, 50)) == pytest.approx(1.0)
+
+
 # --- candidate assignment on the canvas -----------------------------------
 
 
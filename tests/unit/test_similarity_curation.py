@@ -18,10 +18,8 @@ import sys
 import pytest
 
 from src.digitalsreeni_image_annotator.core import similarity
-from src.digitalsreeni_image_annotator.inference.embedding_utils import (
-    EmbeddingCache,
-    content_hash,
-)
+from src.digitalsreeni_image_annotator.core.embedding_cache import EmbeddingCache
+from src.digitalsreeni_image_annotator.inference.embedding_utils import content_hash
 
 
 def _unit(*components):
@@ -277,11 +275,11 @@ def test_analyse_agrees_with_the_individual_functions():
 def test_analyse_of_a_trivial_project_reports_one_mode_per_image():
     assert similarity.analyse({}) == {
         "clusters": [], "outliers": [], "modes": [],
-        "mode_threshold": similarity.MODE_SIMILARITY,
+        "mode_threshold": similarity.MODE_SIMILARITY, "approximate": False,
     }
     assert similarity.analyse({"only": _unit(1, 0)}) == {
         "clusters": [], "outliers": [], "modes": [["only"]],
-        "mode_threshold": similarity.MODE_SIMILARITY,
+        "mode_threshold": similarity.MODE_SIMILARITY, "approximate": False,
     }
 
 
@@ -352,7 +350,7 @@ def test_content_hash_of_a_missing_file_is_none(tmp_path):
 def test_cache_returns_what_it_stored(tmp_path):
     cache = EmbeddingCache(str(tmp_path))
     cache.put("CLIP", "hash1", [0.1, 0.2])
-    assert cache.get("CLIP", "hash1") == [0.1, 0.2]
+    assert cache.get("CLIP", "hash1").tolist() == pytest.approx([0.1, 0.2])
 
 
 def test_cache_misses_on_a_different_content_hash(tmp_path):
@@ -377,20 +375,19 @@ def test_cache_survives_a_round_trip_to_disk(tmp_path):
     cache.save()
 
     reopened = EmbeddingCache(str(tmp_path))
-    assert reopened.get("CLIP", "hash1") == [0.1, 0.2]
+    assert reopened.get("CLIP", "hash1").tolist() == pytest.approx([0.1, 0.2])
 
 
 def test_a_corrupt_cache_is_discarded_not_fatal(tmp_path):
     """A bad cache is a performance problem, never a correctness one."""
-    from src.digitalsreeni_image_annotator.inference.embedding_utils import (
-        CACHE_FILENAME,
-    )
-
-    (tmp_path / CACHE_FILENAME).write_text("{not json at all", encoding="utf-8")
+    store = tmp_path / ".embedding_cache"
+    store.mkdir()
+    (store / "clip.keys").write_text("{not json at all\nhash1\n", encoding="utf-8")
+    (store / "clip.f32").write_bytes(b"\0" * 8)
     cache = EmbeddingCache(str(tmp_path))
     assert len(cache) == 0
     cache.put("CLIP", "hash1", [0.5])
-    assert cache.get("CLIP", "hash1") == [0.5]
+    assert cache.get("CLIP", "hash1").tolist() == [0.5]
 
 
 def test_a_cache_without_a_directory_stays_in_memory():
@@ -398,7 +395,7 @@ def test_a_cache_without_a_directory_stays_in_memory():
     litter next to an unrelated working directory."""
     cache = EmbeddingCache(None)
     cache.put("CLIP", "hash1", [0.1])
-    assert cache.get("CLIP", "hash1") == [0.1]
+    assert cache.get("CLIP", "hash1").tolist() == pytest.approx([0.1])
     assert cache.path is None
     cache.save()  # must not raise
 
@@ -214,7 +214,8 @@ def test_the_matrix_is_built_without_a_second_copy():
     assert peak < matrix_bytes * 1.5, f"{peak / 1e6:.0f} MB for a {matrix_bytes / 1e6:.0f} MB matrix"
 
 
-def test_the_main_pass_is_blocked():
+@pytest.mark.parametrize("workers", [1, 4])
+def test_the_main_pass_is_blocked(monkeypatch, workers):
     """The routine the module header quotes its headline figure for.
 
     `representative` got a memory test after a review found it unblocked;
@@ -232,6 +233,7 @@ def test_the_main_pass_is_blocked():
 
     count = 4000
     assert similarity._block_rows(count) < count, "pick a size that blocks"
+    monkeypatch.setattr(similarity, "SCAN_WORKERS", workers)
     rng = numpy.random.default_rng(1)
     embeddings = {
         f"n{index:05d}": rng.random(4).astype(numpy.float32)
@@ -313,6 +315,44 @@ def test_the_block_height_is_never_zero():
     assert similarity._block_rows(0) >= 1
 
 
+# --- parallel scan ---------------------------------------------------------
+
+
+@pytest.mark.parametrize("probes", [None, 2])
+def test_the_worker_count_does_not_change_the_answer(monkeypatch, probes):
+    """Each worker labels its own blocks and the labellings are merged at the
+    end, so a component whose edges land in different workers' blocks is only
+    whole if the merge is right. Single-row blocks spread every chain across
+    all the workers."""
+    embeddings = _random_embeddings(40, seed=5)
+    threshold = 0.5
+    monkeypatch.setattr(similarity, "SCAN_WORKERS", 1)
+    expected = similarity.analyse(embeddings, threshold, 0.3, probes=probes)
+    assert expected["clusters"], "pick a threshold that actually clusters something"
+
+    monkeypatch.setattr(similarity, "_MAX_BLOCK_ELEMENTS", 1)
+    monkeypatch.setattr(similarity, "SCAN_WORKERS", 4)
+    assert similarity.analyse(embeddings, threshold, 0.3, probes=probes) == expected
+
+
+def test_parallel_pairwise_stats_match_the_reference():
+    embeddings = _random_embeddings(30, seed=9)
+    pairs = _pairwise(embeddings)
+    matrix = similarity._stack(sorted(embeddings), embeddings)
+
+    for workers in (1, 3):
+        minimum, mean = similarity._pairwise_stats(matrix, workers)
+        assert minimum == pytest.approx(min(pairs), abs=1e-5)
+        assert mean == pytest.approx(sum(pairs) / len(pairs), abs=1e-5)
+
+
+def test_workers_share_the_block_budget():
+    """Blocks in flight at once split the budget between them, so running on
+    more cores never raises the peak."""
+    assert similarity._block_rows(4000, 4) == similarity._block_rows(4000) // 4
+    assert similarity._block_rows(10**9, 64) >= 1
+
+
 # --- degenerate vectors ----------------------------------------------------
 
 
@@ -8,12 +8,13 @@ a half-added entry.
 """
 
 import pytest
-from PyQt6.QtWidgets import QWidget, QListWidget, QComboBox
+from PyQt6.QtWidgets import QWidget, QComboBox
 
 import src.digitalsreeni_image_annotator.controllers.image_controller as ic_module
 from src.digitalsreeni_image_annotator.controllers.image_controller import (
     ImageController,
 )
+from src.digitalsreeni_image_annotator.ui.image_list_model import ImageListView
 
 LZW_ERROR = "<COMPRESSION.LZW: 5> requires the 'imagecodecs' package"
 
@@ -26,7 +27,7 @@ class FakeMainWindow(QWidget):
 def mw(qtbot):
     window = FakeMainWindow()
     qtbot.addWidget(window)
-    window.image_list = QListWidget(window)
+    window.image_list = ImageListView(lambda: window.all_images, parent=window)
     window.image_filter_combo = QComboBox(window)
     window.image_filter_combo.addItems(
         ["All images", "Without annotations", "With annotations"]